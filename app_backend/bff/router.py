@@ -1,24 +1,41 @@
 from fastapi import APIRouter, HTTPException
 from sqlalchemy import text
-from database import SessionLocal
+from database import ReadSessionLocal
 
 router = APIRouter(prefix="/bff", tags=["bff"])
 
 
+_HAS_CLIENT_SUMMARY_SQL = text("SELECT to_regclass('public.client_summary') IS NOT NULL")
+
+_CLIENTS_SQL = text("""
+    SELECT
+        id, external_id, full_name, email, phone,
+        primary_address, country, tax_id, segment,
+        risk_rating
+    FROM clients
+    ORDER BY id
+""")
+
+# Once client_summary exists (backend_v2/migrations/002_client_summary.sql)
+_CLIENTS_WITH_SUMMARY_SQL = text("""
+    SELECT
+        c.id, c.external_id, c.full_name, c.email, c.phone,
+        c.primary_address, c.country, c.tax_id, c.segment,
+        c.risk_rating,
+        s.account_count, s.open_kyc_flags, s.last_transaction_date,
+        s.kyc_overall_status, s.match_decision_count
+    FROM clients c
+    LEFT JOIN client_summary s ON s.client_id = c.id
+    ORDER BY c.id
+""")
+
+
 @router.get("/clients")
 def list_clients():
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
-        rows = db.execute(
-            text("""
-                SELECT
-                    id, external_id, full_name, email, phone,
-                    primary_address, country, tax_id, segment,
-                    risk_rating
-                FROM clients
-                ORDER BY id
-            """)
-        ).fetchall()
+        has_summary = db.execute(_HAS_CLIENT_SUMMARY_SQL).scalar()
+        rows = db.execute(_CLIENTS_WITH_SUMMARY_SQL if has_summary else _CLIENTS_SQL).fetchall()
 
         return {"clients": [dict(r._mapping) for r in rows]}
     finally:
@@ -27,7 +44,7 @@ def list_clients():
 
 @router.get("/clients/{client_id}")
 def get_client_detail(client_id: int):
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
         client = db.execute(
             text("SELECT * FROM clients WHERE id = :id"),
@@ -0,0 +1,420 @@
+"""
+Batched audit writer: events go into a bounded in-process queue and a
+background thread writes them to audit_events in batches.
+
+  - emit() only enqueues. When the queue is full it blocks for up to
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS (backpressure on the producer, e.g. a bulk
+    ingestion) and then raises AuditSinkFull.
+  - The writer takes up to AUDIT_BATCH_SIZE events at a time, lingering up to
+    AUDIT_FLUSH_INTERVAL_SECONDS for a batch to fill, and writes each batch
+    with one COPY (psycopg) or one multi-row INSERT (other drivers).
+  - A failed batch is kept and retried with backoff (capped) until it is
+    written; no event is dropped during an outage. Meanwhile stats() reports
+    "failing" and the last error, the queue fills, and producers see the
+    backpressure (AuditSinkFull names the write error).
+  - flush() waits until everything enqueued so far is written; close()
+    flushes and stops the thread (FastAPI shutdown, atexit). Batches that
+    still cannot be written at close are spilled to JSON-lines files in
+    spill_dir and written first by the next sink started on that directory.
+    A worker claims a spill file by renaming it to claimed-<pid>-...; one
+    left behind by a worker that died mid-replay is renamed back by hand.
+
+So ingesting N records costs about N / AUDIT_BATCH_SIZE audit writes.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+AUDIT_COLUMNS = (
+    "occurred_at",
+    "actor",
+    "event_type",
+    "client_id",
+    "source_record_id",
+    "evidence_bundle_id",
+    "details",
+)
+
+AuditEvent = Dict[str, Any]
+Writer = Callable[[List[AuditEvent]], None]
+
+_RETRY_BACKOFF_SECONDS = (0.5, 1.0, 2.0, 5.0, 10.0)  # the last one repeats until the write succeeds
+_STOP = object()
+
+
+class AuditSinkFull(RuntimeError):
+    """The audit queue stayed full for the whole enqueue timeout."""
+
+
+def audit_event(
+    event_type: str,
+    actor: str,
+    *,
+    client_id: Optional[int] = None,
+    source_record_id: Optional[str] = None,
+    evidence_bundle_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    occurred_at: Optional[datetime] = None,
+) -> AuditEvent:
+    """An audit_events row (audit_event_id is assigned by the database)."""
+    return {
+        "occurred_at": occurred_at or datetime.now(timezone.utc),
+        "actor": actor,
+        "event_type": event_type,
+        "client_id": client_id,
+        "source_record_id": source_record_id,
+        "evidence_bundle_id": evidence_bundle_id,
+        "details": details or {},
+    }
+
+
+# ---------------------------
+# Stores
+# ---------------------------
+_INSERT_SQL = text(f"""
+    INSERT INTO audit_events ({", ".join(AUDIT_COLUMNS)})
+    VALUES ({", ".join(":" + c for c in AUDIT_COLUMNS)})
+""")
+
+_COPY_SQL = f"COPY audit_events ({', '.join(AUDIT_COLUMNS)}) FROM STDIN"
+
+
+class DatabaseAuditStore:
+    """audit_events in the primary database."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+    def write(self, batch: List[AuditEvent]) -> None:
+        if self.engine.dialect.driver == "psycopg":
+            self._copy(batch)
+            return
+        rows = [{**e, "details": json.dumps(e["details"], default=str)} for e in batch]
+        with self.engine.begin() as conn:
+            conn.execute(_INSERT_SQL, rows)  # one multi-row INSERT (insertmanyvalues)
+
+    def _copy(self, batch: List[AuditEvent]) -> None:
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cur:
+                with cur.copy(_COPY_SQL) as copy:
+                    for e in batch:
+                        copy.write_row(
+                            [json.dumps(e[c], default=str) if c == "details" else e[c] for c in AUDIT_COLUMNS]
+                        )
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+
+
+class MemoryAuditStore:
+    """
+    Bounded in-process store (tests, demos without a database): keeps the
+    newest `maxlen` events, indexed by details["entity_id"].
+    """
+
+    def __init__(self, maxlen: int = 10_000) -> None:
+        self._events: Deque[AuditEvent] = deque()
+        self._by_entity: Dict[Any, Deque[AuditEvent]] = {}
+        self._maxlen = maxlen
+        self._lock = threading.Lock()
+
+    def write(self, batch: List[AuditEvent]) -> None:
+        with self._lock:
+            for e in batch:
+                if len(self._events) >= self._maxlen:
+                    oldest = self._events.popleft()
+                    bucket = self._by_entity.get(oldest["details"].get("entity_id"))
+                    if bucket:
+                        bucket.popleft()
+                self._events.append(e)
+                self._by_entity.setdefault(e["details"].get("entity_id"), deque()).append(e)
+
+    def read(self, entity_id: Optional[str] = None) -> List[AuditEvent]:
+        with self._lock:
+            if entity_id is None:
+                return list(self._events)
+            return list(self._by_entity.get(entity_id, ()))
+
+
+# ---------------------------
+# Sink
+# ---------------------------
+class AuditSink:
+    def __init__(
+        self,
+        writer: Writer,
+        *,
+        capacity: int = 50_000,
+        batch_size: int = 5_000,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 30.0,
+        spill_dir: Optional[Path] = None,
+    ) -> None:
+        self._writer = writer
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=capacity)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._lock = threading.Condition()
+        self._pending = 0  # enqueued, not yet written (or given up on)
+        self._flush_requested = threading.Event()
+        self._closing = threading.Event()  # stop retrying: spill what cannot be written
+        self._spill_waiting = threading.Event()  # replay spill_dir after the next successful write
+        self._closed = False
+        self._counters = {
+            "enqueued": 0, "written": 0, "batches": 0, "failed": 0, "retries": 0,
+            "blocked_enqueues": 0, "spilled": 0, "replayed": 0,
+        }
+        self._last_error: Optional[str] = None
+        self._failing_since: Optional[datetime] = None
+
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+
+    # -- producer side --
+    def emit(self, event: AuditEvent) -> None:
+        self.emit_many([event])
+
+    def emit_many(self, events: Iterable[AuditEvent], spill_when_full: bool = False) -> None:
+        """
+        Enqueue `events`, blocking while the queue is full. After
+        enqueue_timeout: AuditSinkFull, or, with `spill_when_full` (events
+        about changes that are already committed), the rest are spilled to
+        spill_dir and written once the writer catches up.
+        """
+        events = list(events)
+        for i, event in enumerate(events):
+            if self._closed:
+                raise RuntimeError("audit sink is closed")
+            with self._lock:
+                self._pending += 1
+                self._counters["enqueued"] += 1
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                with self._lock:
+                    self._counters["blocked_enqueues"] += 1
+                try:
+                    self._queue.put(event, timeout=self.enqueue_timeout)
+                except queue.Full:
+                    self._done(1)
+                    with self._lock:
+                        self._counters["enqueued"] -= 1
+                    if spill_when_full and self.spill_dir is not None:
+                        self._spill(events[i:])
+                        return
+                    cause = ""
+                    with self._lock:
+                        if self._failing_since is not None:
+                            cause = f"; writes failing since {self._failing_since.isoformat()}: {self._last_error}"
+                    raise AuditSinkFull(
+                        f"audit queue full ({self._queue.maxsize} events) for {self.enqueue_timeout}s{cause}"
+                    ) from None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event emitted so far is written; False on timeout."""
+        self._flush_requested.set()
+        with self._lock:
+            return self._lock.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        if self._closed:
+            return True
+        flushed = self.flush(timeout)
+        self._closed = True
+        self._closing.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "queued": self._queue.qsize(),
+                "pending": self._pending,
+                "capacity": self._queue.maxsize,
+                "batch_size": self.batch_size,
+                "failing": self._failing_since is not None,
+                "failing_since": self._failing_since.isoformat() if self._failing_since else None,
+                "last_error": self._last_error,
+                "spill_dir": str(self.spill_dir) if self.spill_dir else None,
+            }
+
+    # -- writer thread --
+    def _done(self, n: int) -> None:
+        with self._lock:
+            self._pending -= n
+            self._lock.notify_all()
+
+    def _next_batch(self) -> Optional[List[AuditEvent]]:
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                # Linger for a fuller batch unless someone is waiting on flush()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._flush_requested.is_set():
+                    break
+                try:
+                    item = self._queue.get(timeout=min(remaining, 0.05))
+                except queue.Empty:
+                    continue
+            if item is _STOP:
+                self._queue.put(_STOP)  # finish this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _write(self, batch: List[AuditEvent]) -> bool:
+        """Write `batch`, retrying until it succeeds; False only once closing (batch spilled or failed)."""
+        attempt = 0
+        while True:
+            try:
+                self._writer(batch)
+            except Exception as e:
+                with self._lock:
+                    self._last_error = f"{type(e).__name__}: {e}"
+                    if self._failing_since is None:
+                        self._failing_since = datetime.now(timezone.utc)
+                if self._closing.is_set():
+                    self._spill(batch)
+                    return False
+                with self._lock:
+                    self._counters["retries"] += 1
+                self._closing.wait(_RETRY_BACKOFF_SECONDS[min(attempt, len(_RETRY_BACKOFF_SECONDS) - 1)])
+                attempt += 1
+                continue
+            with self._lock:
+                self._counters["written"] += len(batch)
+                self._counters["batches"] += 1
+                self._failing_since = None
+            return True
+
+    def _spill(self, batch: List[AuditEvent]) -> None:
+        if self.spill_dir is None:
+            with self._lock:
+                self._counters["failed"] += len(batch)
+            return
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spill_dir / f"audit-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl"
+        with path.open("w", encoding="utf-8") as f:
+            for e in batch:
+                f.write(json.dumps(e, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self._counters["spilled"] += len(batch)
+        self._spill_waiting.set()
+
+    def _replay_spilled(self) -> None:
+        """
+        Write spilled batches (this sink's or an earlier one's). Each file is
+        claimed by renaming it first, so workers sharing spill_dir never
+        write the same file twice; one that fails is released for a later try.
+        """
+        self._spill_waiting.clear()
+        if self.spill_dir is None or not self.spill_dir.is_dir():
+            return
+        for path in sorted(self.spill_dir.glob("audit-*.jsonl")):
+            claimed = path.with_name(f"claimed-{os.getpid()}-{path.name}")
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:  # claimed by another worker
+                continue
+            batch = []
+            for line in claimed.read_text(encoding="utf-8").splitlines():
+                e = json.loads(line)
+                e["occurred_at"] = datetime.fromisoformat(e["occurred_at"])
+                batch.append(e)
+            try:
+                self._writer(batch)
+            except Exception as e:
+                os.replace(claimed, path)
+                with self._lock:
+                    self._last_error = f"{type(e).__name__}: {e}"
+                self._spill_waiting.set()
+                return
+            claimed.unlink()
+            with self._lock:
+                self._counters["replayed"] += len(batch)
+
+    def _run(self) -> None:
+        self._replay_spilled()
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                if self._write(batch) and self._spill_waiting.is_set():
+                    self._replay_spilled()
+            finally:
+                self._done(len(batch))
+                if self._queue.empty():
+                    self._flush_requested.clear()
+
+
+# ---------------------------
+# Process-wide sink (audit_events on the primary)
+# ---------------------------
+_SINK: Optional[AuditSink] = None
+_LOCK = threading.Lock()
+_DEFAULT_SPILL_DIR = Path(__file__).resolve().parents[1] / "var" / "audit-spill"
+
+
+def default_sink() -> AuditSink:
+    global _SINK
+    with _LOCK:
+        if _SINK is None:
+            from app.config import settings
+            from app.db import engine
+
+            _SINK = AuditSink(
+                DatabaseAuditStore(engine).write,
+                capacity=settings.AUDIT_QUEUE_CAPACITY,
+                batch_size=settings.AUDIT_BATCH_SIZE,
+                flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+                enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+                spill_dir=Path(settings.AUDIT_SPILL_DIR) if settings.AUDIT_SPILL_DIR else _DEFAULT_SPILL_DIR,
+            )
+            atexit.register(_SINK.close)
+        return _SINK
+
+
+def shutdown() -> None:
+    """Flush and stop the process-wide sink, if one was started."""
+    global _SINK
+    with _LOCK:
+        sink, _SINK = _SINK, None
+    if sink is not None:
+        sink.close()
+
+
+def stats() -> Optional[Dict[str, Any]]:
+    return _SINK.stats() if _SINK is not None else None
@@ -1,14 +1,53 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app import db_pool, schema_registry
+from app.db_routing import ReplicaRouter
 from app.config import settings
 
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
+# Pool sizing, pre-ping strategy and external-pooler mode come from Settings
+# (app/db_pool.py). Unless an external pooler is in front, repeated
+# statements (schema-registry statements, text() constants) become
+# server-side prepared statements: parsed and planned once per connection.
+engine = create_engine(settings.DATABASE_URL, **db_pool.engine_options(settings, "primary"))
+
+# Async engine for hot read paths (async routes). Same URL: the psycopg
+# dialect picks its asyncio driver under create_async_engine. Requests wait
+# on the database without holding a threadpool thread.
+async_engine = create_async_engine(
+    settings.DATABASE_URL, **db_pool.engine_options(settings, "primary_async", is_async=True)
 )
 
+# Read replica (optional): read-only endpoints use get_read_db / get_async_read_db,
+# ingestion and create paths stay on get_db / get_async_db (the primary).
+_sync_engines = [engine, async_engine.sync_engine]
+replica_engine = None
+async_replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL, **db_pool.engine_options(settings, "replica")
+    )
+    async_replica_engine = create_async_engine(
+        settings.DATABASE_REPLICA_URL, **db_pool.engine_options(settings, "replica_async", is_async=True)
+    )
+    _sync_engines += [replica_engine, async_replica_engine.sync_engine]
+replica_router = ReplicaRouter(settings.DB_REPLICA_MAX_LAG_SECONDS, settings.DB_REPLICA_CHECK_SECONDS)
+
+schema_registry.set_prepare_threshold(db_pool.prepare_threshold(settings))
+schema_registry.set_max_age(settings.SCHEMA_MAX_AGE_SECONDS)
+for _sync_engine in _sync_engines:
+    db_pool.instrument(_sync_engine, settings)
+    event.listen(_sync_engine, "after_cursor_execute", schema_registry.record_execution)
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+ReplicaSessionLocal = sessionmaker(bind=replica_engine, autoflush=False, autocommit=False) if replica_engine else None
+AsyncReplicaSessionLocal = (
+    async_sessionmaker(bind=async_replica_engine, autoflush=False, expire_on_commit=False)
+    if async_replica_engine
+    else None
+)
 Base = declarative_base()
 
 
@@ -18,3 +57,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Session for read-only endpoints: the replica unless it is lagging or unreachable."""
+    use_replica = replica_engine is not None and replica_router.use_replica(replica_engine)
+    db = (ReplicaSessionLocal if use_replica else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    use_replica = async_replica_engine is not None and await replica_router.use_replica_async(async_replica_engine)
+    async with (AsyncReplicaSessionLocal if use_replica else AsyncSessionLocal)() as db:
+        yield db
@@ -0,0 +1,238 @@
+"""
+Connection pool construction and telemetry for the engines in app.db.
+
+Pool sizing, recycling and the pre-ping strategy come from Settings:
+
+  DB_PRE_PING = "always"  ping on every checkout (a round trip per checkout)
+              = "idle"    ping only connections idle for DB_PRE_PING_IDLE_SECONDS
+                          or longer, i.e. the ones a server/firewall timeout
+                          may have dropped; busy connections are handed out as is
+              = "never"   rely on DB_POOL_RECYCLE and the retry on error
+
+DB_EXTERNAL_POOLER runs behind PgBouncer or a similar pooler:
+
+  "transaction"  the pooler owns pooling (NullPool here) and a server connection
+                 only lasts a transaction, so no server-side prepared statements
+  "statement"    as above, and every statement runs in autocommit so the pooler
+                 can route each one to any server connection
+
+Every pool records checkout telemetry (wait time including any pre-ping or
+new connection, overflow checkouts, timeouts, "idle" pre-pings); stats() adds the
+live gauges (in use, idle, overflow) and backs GET /admin/pool.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+POOLER_MODES = ("", "transaction", "statement")
+
+_WAIT_SAMPLES = 2048  # recent checkouts kept for the percentiles
+
+
+class PoolTelemetry:
+    """Checkout counters for one named pool (survives pool recreation)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.pre_pings = 0
+        self.pre_ping_failures = 0
+        self.peak_in_use = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def checkout(self, wait_ms: float, in_use: int, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            self._waits.append(wait_ms)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            if overflowed:
+                self.overflow_checkouts += 1
+
+    def timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def pre_ping(self, ok: bool) -> None:
+        with self._lock:
+            self.pre_pings += 1
+            if not ok:
+                self.pre_ping_failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+
+            def pct(p: float) -> Optional[float]:
+                if not waits:
+                    return None
+                return round(waits[min(len(waits) - 1, round(p / 100.0 * (len(waits) - 1)))], 3)
+
+            return {
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "pre_pings": self.pre_pings,
+                "pre_ping_failures": self.pre_ping_failures,
+                "peak_in_use": self.peak_in_use,
+                "wait_ms": {
+                    "mean": round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else None,
+                    "p50": pct(50),
+                    "p99": pct(99),
+                    "max": round(self.wait_ms_max, 3),
+                },
+            }
+
+
+_TELEMETRY: Dict[str, PoolTelemetry] = {}
+_ENGINES: Dict[str, Engine] = {}
+_LOCK = threading.Lock()
+
+
+def telemetry(name: str) -> PoolTelemetry:
+    with _LOCK:
+        return _TELEMETRY.setdefault(name, PoolTelemetry())
+
+
+def _gauges(pool: Pool) -> Dict[str, Optional[int]]:
+    """Live pool state; NullPool keeps nothing, so only in-use is known there."""
+    if not isinstance(pool, QueuePool):
+        return {"size": None, "in_use": None, "idle": None, "overflow": None}
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+class _TimedPool:
+    """Mixin timing Pool.connect(): queue wait, plus pre-ping / connect when they happen."""
+
+    def connect(self):  # type: ignore[override]
+        stats = telemetry(self._orig_logging_name or "default")  # type: ignore[attr-defined]
+        started = time.perf_counter()
+        try:
+            conn = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            stats.timeout()
+            raise
+        gauges = _gauges(self)  # type: ignore[arg-type]
+        in_use = gauges["in_use"] or 0
+        overflowed = gauges["size"] is not None and in_use > gauges["size"]
+        stats.checkout((time.perf_counter() - started) * 1000.0, in_use, overflowed)
+        return conn
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPool, NullPool):
+    pass
+
+
+def engine_options(cfg: Any, name: str, *, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments for `cfg` (Settings)."""
+    if cfg.DB_PRE_PING not in PRE_PING_STRATEGIES:
+        raise ValueError(f"DB_PRE_PING must be one of {PRE_PING_STRATEGIES}, got {cfg.DB_PRE_PING!r}")
+    if cfg.DB_EXTERNAL_POOLER not in POOLER_MODES:
+        raise ValueError(f"DB_EXTERNAL_POOLER must be one of {POOLER_MODES}, got {cfg.DB_EXTERNAL_POOLER!r}")
+
+    options: Dict[str, Any] = {
+        "pool_logging_name": name,
+        "pool_pre_ping": cfg.DB_PRE_PING == "always",
+        "pool_recycle": cfg.DB_POOL_RECYCLE,
+    }
+    if cfg.DB_EXTERNAL_POOLER:
+        options["poolclass"] = TimedNullPool
+        if cfg.DB_EXTERNAL_POOLER == "statement":
+            options["isolation_level"] = "AUTOCOMMIT"
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+            pool_size=cfg.DB_POOL_SIZE,
+            max_overflow=cfg.DB_MAX_OVERFLOW,
+            pool_timeout=cfg.DB_POOL_TIMEOUT,
+        )
+    if cfg.DATABASE_URL.startswith("postgresql+psycopg"):
+        options["connect_args"] = {"prepare_threshold": prepare_threshold(cfg)}
+    return options
+
+
+def prepare_threshold(cfg: Any) -> Optional[int]:
+    """Server-side prepared statements do not survive an external pooler's connection switching."""
+    return None if cfg.DB_EXTERNAL_POOLER else cfg.DB_PREPARE_THRESHOLD
+
+
+def instrument(engine: Engine, cfg: Any) -> None:
+    """Register `engine` for stats() and install the "idle" pre-ping (pass async_engine.sync_engine)."""
+    name = engine.pool._orig_logging_name or "default"
+    with _LOCK:
+        _ENGINES[name] = engine
+    if cfg.DB_PRE_PING != "idle":
+        return
+    idle_after = cfg.DB_PRE_PING_IDLE_SECONDS
+
+    @event.listens_for(engine, "checkin")
+    def _stamp_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_after:
+            return  # new, or used moments ago
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            telemetry(name).pre_ping(ok=False)
+            # The pool discards this connection and retries the checkout with a new one
+            raise exc.DisconnectionError("idle connection failed pre-ping") from e
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        telemetry(name).pre_ping(ok=True)
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        engines = dict(_ENGINES)
+        names = sorted(set(_TELEMETRY) | set(engines))
+    out: Dict[str, Any] = {}
+    for name in names:
+        engine = engines.get(name)
+        out[name] = {
+            "pool": type(engine.pool).__name__ if engine is not None else None,
+            **(_gauges(engine.pool) if engine is not None else {}),
+            **telemetry(name).snapshot(),
+        }
+    return out
+
+
+def reset() -> None:
+    """Forget the counters (engines stay registered)."""
+    with _LOCK:
+        _TELEMETRY.clear()
@@ -0,0 +1,114 @@
+"""
+Read/write session routing (app.db): read-only endpoints go to a replica
+while it keeps up, everything else to the primary.
+
+The replica's lag is probed at most every DB_REPLICA_CHECK_SECONDS and the
+result shared by all requests in between. A replica more than
+DB_REPLICA_MAX_LAG_SECONDS behind, or one that cannot be reached, sends
+reads back to the primary until a later probe finds it healthy again.
+
+Lag is 0 on a server that is not in recovery (a second standalone Postgres
+standing in as the replica, as in local tests) and on a streaming standby
+that has replayed everything it received; otherwise it is the age of the
+last replayed transaction. A standby whose WAL receiver is not streaming
+has received nothing new, so "replayed everything received" says nothing
+about how stale it is: the probe returns NULL and reads go to the primary.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql.elements import TextClause
+
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """Lag-aware choice between replica and primary for read sessions."""
+
+    def __init__(
+        self,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+        lag_sql: TextClause = REPLICA_LAG_SQL,
+    ) -> None:
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._lag_sql = lag_sql
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._lag: Optional[float] = None
+        self._error: Optional[str] = None
+        self._replica_reads = 0
+        self._primary_fallbacks = 0
+
+    def _claim_check(self) -> bool:
+        """True for the one caller that should probe now; others use the last result."""
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval_seconds:
+                return False
+            self._checked_at = now
+            return True
+
+    def _record(self, lag: Optional[float], error: Optional[str]) -> None:
+        with self._lock:
+            self._lag, self._error = lag, error
+
+    def _record_probe(self, value: Any) -> None:
+        if value is None:
+            self._record(None, "replica is not streaming from the primary")
+        else:
+            self._record(float(value), None)
+
+    def _decide(self) -> bool:
+        with self._lock:
+            healthy = self._error is None and self._lag is not None and self._lag <= self.max_lag_seconds
+            if healthy:
+                self._replica_reads += 1
+            else:
+                self._primary_fallbacks += 1
+            return healthy
+
+    def use_replica(self, replica: Engine) -> bool:
+        if self._claim_check():
+            try:
+                with replica.connect() as conn:
+                    self._record_probe(conn.execute(self._lag_sql).scalar())
+            except Exception as e:
+                self._record(None, f"{type(e).__name__}: {e}")
+        return self._decide()
+
+    async def use_replica_async(self, replica: AsyncEngine) -> bool:
+        if self._claim_check():
+            try:
+                async with replica.connect() as conn:
+                    self._record_probe((await conn.execute(self._lag_sql)).scalar())
+            except Exception as e:
+                self._record(None, f"{type(e).__name__}: {e}")
+        return self._decide()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_lag_seconds": self.max_lag_seconds,
+                "check_interval_seconds": self.check_interval_seconds,
+                "lag_seconds": self._lag,
+                "error": self._error,
+                "replica_reads": self._replica_reads,
+                "primary_fallbacks": self._primary_fallbacks,
+            }
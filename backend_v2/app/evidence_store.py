@@ -0,0 +1,204 @@
+"""
+Content-addressed evidence store on the local filesystem.
+
+Objects are keyed by the SHA-256 of their bytes and sharded two levels deep
+(<root>/ab/cd/abcd...), so identical artefacts are stored once however many
+database rows refer to them.
+
+  - Writes are append-only: an object is written to a temporary file, fsynced
+    and renamed into place, then made read-only. An object that already
+    exists is never rewritten (put() just returns its hash).
+  - The database keeps a reference (storage_ref "cas:sha256:<hex>" and
+    content_hash) instead of the content (tools/offload_evidence_content.py).
+
+Nothing is ever deleted from the store.
+
+Evidence files under evidence/ and MissionLog's public folder are not kept
+in the store (nothing would read them from it): publish() writes them as
+plain files, and only when their content changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+REF_PREFIX = "cas:sha256:"
+_CHUNK_SIZE = 64 * 1024
+_HEX = frozenset("0123456789abcdef")
+
+_LOCK = threading.Lock()
+_STORE: Optional["ContentStore"] = None
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def json_bytes(payload: Any) -> bytes:
+    """The encoding evidence JSON files have always used (indent 2, UTF-8, trailing newline)."""
+    return (json.dumps(payload, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def ref(digest: str) -> str:
+    return REF_PREFIX + digest
+
+
+def parse_ref(storage_ref: Optional[str]) -> Optional[str]:
+    """The hash in a store reference, or None if `storage_ref` is not one."""
+    if not storage_ref or not storage_ref.startswith(REF_PREFIX):
+        return None
+    digest = storage_ref[len(REF_PREFIX):]
+    return digest if _valid(digest) else None
+
+
+def _valid(digest: str) -> bool:
+    return len(digest) == 64 and set(digest) <= _HEX
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # e.g. Windows: directories cannot be opened
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ContentStore:
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self._stats = {"writes": 0, "deduplicated": 0, "bytes_written": 0, "bytes_deduplicated": 0}
+        self._stats_lock = threading.Lock()
+
+    def path(self, digest: str) -> Path:
+        if not _valid(digest):
+            raise ValueError(f"not a sha256 hex digest: {digest!r}")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def put(self, data: bytes) -> str:
+        """Store `data` (once) and return its hash."""
+        digest = content_hash(data)
+        target = self.path(digest)
+        if target.is_file():
+            self._count("deduplicated", "bytes_deduplicated", len(data))
+            return digest
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            # A concurrent writer of the same hash wrote the same bytes, so
+            # whichever rename lands last leaves the object unchanged.
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        _fsync_dir(target.parent)
+        self._count("writes", "bytes_written", len(data))
+        return digest
+
+    def put_json(self, payload: Any) -> str:
+        return self.put(json_bytes(payload))
+
+    def get(self, digest: str) -> bytes:
+        return self.path(digest).read_bytes()
+
+    def open(self, digest: str) -> BinaryIO:
+        return self.path(digest).open("rb")
+
+    def iter_chunks(self, digest: str, chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(digest) as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def size(self, digest: str) -> int:
+        return self.path(digest).stat().st_size
+
+    def verify(self, digest: str) -> bool:
+        """True if the object exists and its bytes still hash to `digest`."""
+        if not self.exists(digest):
+            return False
+        h = hashlib.sha256()
+        for chunk in self.iter_chunks(digest):
+            h.update(chunk)
+        return h.hexdigest() == digest
+
+    def _count(self, key: str, bytes_key: str, size: int) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+            self._stats[bytes_key] += size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {"root": str(self.root), **self._stats}
+
+
+def publish(data: bytes, dest: Path) -> bool:
+    """
+    Write `data` to `dest` (atomically replaced). Returns False, writing
+    nothing, if `dest` already has exactly that content.
+    """
+    dest = Path(dest)
+    if dest.is_file() and content_hash(dest.read_bytes()) == content_hash(data):
+        return False
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return True
+
+
+def publish_json(payload: Any, dest: Path) -> bool:
+    return publish(json_bytes(payload), dest)
+
+
+def default_root() -> Path:
+    """
+    EVIDENCE_STORE_DIR, or evidence/store at the repo root. Read from the
+    environment rather than app.config: the story tools in CI import this
+    module with only the root requirements installed.
+    """
+    configured = os.environ.get("EVIDENCE_STORE_DIR", "").strip()
+    return Path(configured) if configured else REPO_ROOT / "evidence" / "store"
+
+
+def inside_checkout(path: Path | str) -> bool:
+    """True if `path` is inside this repository (where git clean could remove it)."""
+    return Path(path).resolve().is_relative_to(REPO_ROOT)
+
+
+def default_store() -> ContentStore:
+    global _STORE
+    with _LOCK:
+        if _STORE is None:
+            _STORE = ContentStore(default_root())
+        return _STORE
+
+
+def reset() -> None:
+    global _STORE
+    with _LOCK:
+        _STORE = None
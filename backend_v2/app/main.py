@@ -3,10 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
+from app import audit_sink, schema_registry
+from app.routers.admin_router import router as admin_router
 from app.routers.client_router import router as client_router
+from app.routers.evidence_router import router as evidence_router
 from app.routers.ingestion_router import router as ingestion_router
 from app.routers.missioncontrol_runner import router as missioncontrol_router
+from app.routers.search_router import router as search_router
 from app.atlas.routes import router as atlas_router  # <-- ADDED
+from app.config import settings
+from app.db import SessionLocal
+from app.services import audit_partition_service
+from app.services.client_search_service import ClientSearchService
 
 
 app = FastAPI(
@@ -28,6 +36,9 @@ app.include_router(client_router)
 app.include_router(ingestion_router)
 app.include_router(missioncontrol_router)
 app.include_router(atlas_router)  # <-- ADDED
+app.include_router(search_router)
+app.include_router(admin_router)
+app.include_router(evidence_router)
 
 
 # -------------------------------------------------------------------
@@ -42,6 +53,67 @@ app.mount(
     name="missionlog",
 )
 
+# -------------------------------------------------------------------
+# Startup: reflect adaptive schemas and compile their statements once per worker
+# -------------------------------------------------------------------
+@app.on_event("startup")
+def warm_schema_registry():
+    db = SessionLocal()
+    try:
+        schema_registry.refresh(db)
+    except Exception:
+        # DB not reachable yet: the registry refreshes on first lookup
+        pass
+    finally:
+        db.close()
+
+
+# -------------------------------------------------------------------
+# Startup: map prebuilt search segments (SEARCH_INDEX_DIR), if any
+# -------------------------------------------------------------------
+@app.on_event("startup")
+def load_search_index():
+    db = SessionLocal()
+    try:
+        ClientSearchService.load_persisted(db)
+    except Exception:
+        # No segments or DB not reachable: the index is built on first search
+        pass
+    finally:
+        db.close()
+    if settings.SEARCH_CATCH_UP_SECONDS is not None:
+        ClientSearchService.start_catch_up(SessionLocal, settings.SEARCH_CATCH_UP_SECONDS)
+
+
+# -------------------------------------------------------------------
+# Startup: keep upcoming audit_events partitions created (migration 003),
+# now and every AUDIT_PARTITION_CHECK_SECONDS
+# -------------------------------------------------------------------
+@app.on_event("startup")
+def maintain_audit_partitions():
+    audit_partition_service.start_maintenance(
+        SessionLocal, settings.AUDIT_PARTITIONS_AHEAD, settings.AUDIT_PARTITION_CHECK_SECONDS
+    )
+
+
+# -------------------------------------------------------------------
+# Shutdown: write out buffered audit events
+# -------------------------------------------------------------------
+@app.on_event("shutdown")
+def flush_audit_sink():
+    audit_sink.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_audit_partition_maintenance():
+    audit_partition_service.stop_maintenance()
+
+
+@app.on_event("shutdown")
+def stop_search_catch_up():
+    ClientSearchService.stop_catch_up()
+
+
 # Health check (unchanged)
 @app.get("/health")
 def health():
@@ -0,0 +1,253 @@
+"""
+Attribute normalisation for match keys and search fields (ST-17).
+
+One place that turns raw source values into comparable keys, shared by:
+  - matching (match_rule_engine)
+  - survivorship comparisons and transform rules
+  - search indexing
+
+Keys are derived from stored values when they are compared; persisted
+identifiers and attributes are never rewritten with them.
+
+Scalar normalisers are memoised (LRU) because source data repeats heavily
+(countries, legal suffixes, shared mailboxes); column normalisers
+additionally de-duplicate a batch before normalising it.
+
+Every normaliser returns None when a value is empty or cannot be normalised,
+so callers can report the limitation instead of indexing garbage.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+
+_CACHE_SIZE = 65_536
+
+# -------------------------------------------------------------------
+# Precompiled tables
+# -------------------------------------------------------------------
+_WS_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_ID_STRIP_RE = re.compile(r"[^0-9A-Z]")
+_PHONE_STRIP_RE = re.compile(r"[^\d+]")
+
+LEGAL_SUFFIXES = (
+    "limited", "ltd", "llp", "lp", "plc", "llc", "inc", "incorporated",
+    "corp", "corporation", "co", "company",
+    "ag", "gmbh", "kg", "se", "sa", "sas", "sarl", "srl", "spa",
+    "bv", "nv", "oy", "ab", "as", "pte", "pty",
+)
+# Trailing suffix tokens (possibly several, e.g. "co ltd"); applied after punctuation removal
+_LEGAL_SUFFIX_RE = re.compile(r"(?:\s+(?:" + "|".join(LEGAL_SUFFIXES) + r"))+$")
+
+# Country names / alpha-3 / legacy codes -> ISO 3166-1 alpha-2
+COUNTRY_ALIASES: Dict[str, str] = {
+    "uk": "GB", "gb": "GB", "gbr": "GB", "great britain": "GB", "united kingdom": "GB",
+    "england": "GB", "scotland": "GB", "wales": "GB", "northern ireland": "GB",
+    "de": "DE", "deu": "DE", "germany": "DE", "deutschland": "DE",
+    "fr": "FR", "fra": "FR", "france": "FR",
+    "ie": "IE", "irl": "IE", "ireland": "IE",
+    "nl": "NL", "nld": "NL", "netherlands": "NL", "the netherlands": "NL", "holland": "NL",
+    "ch": "CH", "che": "CH", "switzerland": "CH",
+    "lu": "LU", "lux": "LU", "luxembourg": "LU",
+    "je": "JE", "jey": "JE", "jersey": "JE",
+    "gg": "GG", "ggy": "GG", "guernsey": "GG",
+    "es": "ES", "esp": "ES", "spain": "ES",
+    "it": "IT", "ita": "IT", "italy": "IT",
+    "us": "US", "usa": "US", "united states": "US", "united states of america": "US",
+    "ca": "CA", "can": "CA", "canada": "CA",
+    "sg": "SG", "sgp": "SG", "singapore": "SG",
+    "hk": "HK", "hkg": "HK", "hong kong": "HK",
+    "jp": "JP", "jpn": "JP", "japan": "JP",
+    "au": "AU", "aus": "AU", "australia": "AU",
+}
+
+# ISO alpha-2 -> (calling code, national trunk prefix)
+CALLING_CODES: Dict[str, tuple] = {
+    "GB": ("44", "0"), "JE": ("44", "0"), "GG": ("44", "0"),
+    "DE": ("49", "0"), "FR": ("33", "0"), "IE": ("353", "0"), "NL": ("31", "0"),
+    "CH": ("41", "0"), "LU": ("352", ""), "ES": ("34", ""), "IT": ("39", ""),
+    "US": ("1", "1"), "CA": ("1", "1"), "SG": ("65", ""), "HK": ("852", ""),
+    "JP": ("81", "0"), "AU": ("61", "0"),
+}
+
+ADDRESS_ABBREVIATIONS: Dict[str, str] = {
+    "street": "st", "road": "rd", "avenue": "ave", "square": "sq", "lane": "ln",
+    "place": "pl", "drive": "dr", "court": "ct", "house": "ho", "building": "bldg",
+    "floor": "fl", "suite": "ste", "united kingdom": "gb",
+}
+_ADDRESS_ABBR_RE = re.compile(r"\b(" + "|".join(map(re.escape, ADDRESS_ABBREVIATIONS)) + r")\b")
+
+
+# -------------------------------------------------------------------
+# Scalar normalisers (memoised)
+# -------------------------------------------------------------------
+@lru_cache(maxsize=_CACHE_SIZE)
+def clean_text(value: Optional[str]) -> Optional[str]:
+    """Unicode NFKC + whitespace collapse, keeping case. Replaces ad-hoc `.strip()`."""
+    if value is None:
+        return None
+    out = _WS_RE.sub(" ", unicodedata.normalize("NFKC", str(value))).strip()
+    return out or None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_text(value: Optional[str]) -> Optional[str]:
+    """clean_text + casefold + punctuation removal: the generic search key."""
+    out = clean_text(value)
+    if out is None:
+        return None
+    out = _WS_RE.sub(" ", _PUNCT_RE.sub(" ", out.casefold())).strip()
+    return out or None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_name(value: Optional[str]) -> Optional[str]:
+    """Person / legal entity name with trailing legal-form suffixes removed."""
+    out = normalise_text(value)
+    if out is None:
+        return None
+    stripped = _LEGAL_SUFFIX_RE.sub("", out).strip()
+    # Never strip a name down to nothing ("AG" on its own stays "ag")
+    return stripped or out
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_email(value: Optional[str]) -> Optional[str]:
+    out = clean_text(value)
+    if out is None:
+        return None
+    out = out.replace(" ", "").casefold()
+    local, sep, domain = out.partition("@")
+    if not sep or not local or "." not in domain:
+        return None
+    return out
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_identifier(value: Optional[str]) -> Optional[str]:
+    """Tax ids, registration numbers, external ids: upper-case alphanumerics only."""
+    out = clean_text(value)
+    if out is None:
+        return None
+    out = _ID_STRIP_RE.sub("", out.upper())
+    return out or None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_country(value: Optional[str]) -> Optional[str]:
+    """Country name or code -> ISO 3166-1 alpha-2; unknown 2-letter codes pass through."""
+    out = normalise_text(value)
+    if out is None:
+        return None
+    code = COUNTRY_ALIASES.get(out)
+    if code:
+        return code
+    if len(out) == 2 and out.isalpha():
+        return out.upper()
+    return None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_phone(value: Optional[str], default_country: Optional[str] = None) -> Optional[str]:
+    """
+    E.164 formatting (+<country code><national number>).
+
+    Numbers without an international prefix need `default_country`
+    (any form accepted by normalise_country) to resolve the calling code.
+    """
+    out = clean_text(value)
+    if out is None:
+        return None
+    digits = _PHONE_STRIP_RE.sub("", out)
+
+    if digits.startswith("+"):
+        digits = digits[1:].replace("+", "")
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    else:
+        country = normalise_country(default_country) if default_country else None
+        if country not in CALLING_CODES:
+            return None
+        code, trunk = CALLING_CODES[country]
+        if trunk and digits.startswith(trunk):
+            digits = digits[len(trunk):]
+        digits = code + digits
+
+    if not digits.isdigit() or not 8 <= len(digits) <= 15:
+        return None
+    return "+" + digits
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalise_address(value: Optional[str]) -> Optional[str]:
+    out = normalise_text(value)
+    if out is None:
+        return None
+    return _ADDRESS_ABBR_RE.sub(lambda m: ADDRESS_ABBREVIATIONS[m.group(1)], out)
+
+
+# National numbers (no + / 00 prefix) are read as this country's by the "phone"
+# field normaliser; callers that know a record's country pass it to normalise_phone
+DEFAULT_PHONE_COUNTRY = "GB"
+
+
+def normalise_phone_field(value: Optional[str]) -> Optional[str]:
+    """normalise_phone with DEFAULT_PHONE_COUNTRY for national numbers."""
+    return normalise_phone(value, DEFAULT_PHONE_COUNTRY)
+
+
+# Logical field -> normaliser; consumers look fields up here rather than hard-coding
+FIELD_NORMALISERS: Dict[str, Callable[[Optional[str]], Optional[str]]] = {
+    "name": normalise_name,
+    "email": normalise_email,
+    "tax_id": normalise_identifier,
+    "registration_number": normalise_identifier,
+    "external_id": normalise_identifier,
+    "country": normalise_country,
+    "phone": normalise_phone_field,
+    "address": normalise_address,
+    "text": normalise_text,
+}
+
+
+# -------------------------------------------------------------------
+# Column / batch normalisers
+# -------------------------------------------------------------------
+def normalise_column(field: str, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """
+    Normalise a whole column at once. Each distinct value is normalised once,
+    then results are broadcast back to the input positions.
+    """
+    fn = FIELD_NORMALISERS[field]
+    distinct = {v: fn(v) for v in set(values)}
+    return [distinct[v] for v in values]
+
+
+def normalise_records(
+    records: Iterable[Mapping[str, Any]],
+    fields: Mapping[str, str],
+) -> List[Dict[str, Any]]:
+    """
+    Column-wise normalisation of a batch of records.
+
+    `fields` maps record key -> logical field (a FIELD_NORMALISERS key);
+    normalised values are written to `<key>_norm` on copies of the records.
+    """
+    rows = [dict(r) for r in records]
+    for key, field in fields.items():
+        column = normalise_column(field, [r.get(key) for r in rows])
+        for row, value in zip(rows, column):
+            row[f"{key}_norm"] = value
+    return rows
+
+
+def cache_info() -> Dict[str, Any]:
+    """Memo hit/miss counters per normaliser (diagnostics)."""
+    fns = (clean_text, normalise_text, normalise_name, normalise_email, normalise_identifier,
+           normalise_country, normalise_phone, normalise_address)
+    return {fn.__name__: fn.cache_info()._asdict() for fn in fns}
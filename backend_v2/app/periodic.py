@@ -0,0 +1,51 @@
+"""
+Background maintenance that every API worker runs on an interval (audit
+partition creation, search index catch-up).
+
+A PeriodicTask calls its function at start and then every `interval`
+seconds on a daemon thread until close(). A failure (e.g. the database is
+unreachable) is counted, kept in stats() and retried at the next interval.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class PeriodicTask:
+    def __init__(self, name: str, fn: Callable[[], Any], interval: float):
+        self.name = name
+        self._fn = fn
+        self._interval = interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {"runs": 0, "failures": 0, "last_result": None, "last_error": None}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def run_once(self) -> None:
+        try:
+            result = self._fn()
+        except Exception as exc:
+            with self._lock:
+                self._stats["failures"] += 1
+                self._stats["last_error"] = repr(exc)
+            return
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["last_result"] = result
+            self._stats["last_error"] = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self._interval)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"interval_seconds": self._interval, **self._stats}
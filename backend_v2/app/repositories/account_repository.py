@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.account import Account
 from app.schemas.account import AccountCreate
@@ -20,3 +22,8 @@ class AccountRepository:
     @staticmethod
     def list_by_client(db: Session, client_id: int) -> list[Account]:
         return db.query(Account).filter(Account.client_id == client_id).all()
+
+    # Async reads (hot read paths on the async engine)
+    @staticmethod
+    async def list_by_client_async(db: AsyncSession, client_id: int) -> list[Account]:
+        return list((await db.scalars(select(Account).where(Account.client_id == client_id))).all())
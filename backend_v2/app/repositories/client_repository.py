@@ -1,3 +1,7 @@
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.client import Client
 from app.schemas.client import ClientCreate
@@ -20,3 +24,12 @@ class ClientRepository:
     @staticmethod
     def list(db: Session) -> list[Client]:
         return db.query(Client).all()
+
+    # Async reads (hot read paths on the async engine)
+    @staticmethod
+    async def get_async(db: AsyncSession, client_id: int) -> Client | None:
+        return await db.get(Client, client_id)
+
+    @staticmethod
+    async def list_async(db: AsyncSession) -> List[Client]:
+        return list((await db.scalars(select(Client))).all())
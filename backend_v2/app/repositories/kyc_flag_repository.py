@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.kyc_flag import KycFlag
 from app.schemas.kyc_flag import KycFlagCreate
@@ -16,3 +18,8 @@ class KycFlagRepository:
     @staticmethod
     def list_by_client(db: Session, client_id: int) -> list[KycFlag]:
         return db.query(KycFlag).filter(KycFlag.client_id == client_id).all()
+
+    # Async reads (hot read paths on the async engine)
+    @staticmethod
+    async def list_by_client_async(db: AsyncSession, client_id: int) -> list[KycFlag]:
+        return list((await db.scalars(select(KycFlag).where(KycFlag.client_id == client_id))).all())
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.transaction import Transaction
 from app.schemas.transaction import TransactionCreate
@@ -16,3 +18,16 @@ class TransactionRepository:
     @staticmethod
     def list_by_account(db: Session, account_id: int) -> list[Transaction]:
         return db.query(Transaction).filter(Transaction.account_id == account_id).all()
+
+    # Async reads (hot read paths on the async engine)
+    @staticmethod
+    async def list_by_accounts_async(db: AsyncSession, account_ids: list[int]) -> list[Transaction]:
+        """Transactions of several accounts in one query, grouped by account."""
+        if not account_ids:
+            return []
+        stmt = (
+            select(Transaction)
+            .where(Transaction.account_id.in_(account_ids))
+            .order_by(Transaction.account_id, Transaction.id)
+        )
+        return list((await db.scalars(stmt)).all())
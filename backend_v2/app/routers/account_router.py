@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.schemas.account import AccountCreate, AccountRead
 from app.services.account_service import AccountService
 from app.services.transaction_service import TransactionService
@@ -17,10 +17,10 @@ def create_account(data: AccountCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{account_id}", response_model=AccountRead | None)
-def get_account(account_id: int, db: Session = Depends(get_db)):
+def get_account(account_id: int, db: Session = Depends(get_read_db)):
     return AccountService.get(db, account_id)
 
 
 @router.get("/{account_id}/transactions", response_model=list[TransactionRead])
-def get_account_transactions(account_id: int, db: Session = Depends(get_db)):
+def get_account_transactions(account_id: int, db: Session = Depends(get_read_db)):
     return TransactionService.list_by_account(db, account_id)
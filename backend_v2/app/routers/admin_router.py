@@ -0,0 +1,83 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import audit_sink, db_pool, schema_registry
+from app.config import settings
+from app.db import get_db, replica_router
+from app.services import audit_partition_service
+from app.services.audit_partition_service import AuditPartitionService
+
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/schema")
+def schema_status() -> Dict[str, Any]:
+    return schema_registry.stats()
+
+
+@router.post("/schema/refresh")
+def refresh_schema(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Re-reflect tracked tables and recompile adaptive statements (run after a
+    migration). Only the worker serving the request refreshes now; the others
+    pick the migration up within SCHEMA_MAX_AGE_SECONDS.
+    """
+    return schema_registry.refresh(db)
+
+
+@router.get("/statements")
+def statement_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Per-statement execution counters for the registry's compiled statements,
+    plus the server's view of one pooled connection (pg_prepared_statements is
+    per session, so this samples whichever connection serves the request).
+    """
+    sample = db.execute(
+        text("""
+            SELECT count(*) AS prepared, COALESCE(sum(generic_plans), 0) AS generic_plans,
+                   COALESCE(sum(custom_plans), 0) AS custom_plans
+            FROM pg_prepared_statements
+        """)
+    ).mappings().one()
+    return {
+        "prepare_threshold": schema_registry.stats()["prepare_threshold"],
+        "statements": schema_registry.execution_stats(),
+        "connection_sample": dict(sample),
+    }
+
+
+@router.get("/pool")
+def pool_stats() -> Dict[str, Any]:
+    """
+    Per-engine pool gauges (in use, idle, overflow) and checkout telemetry
+    (wait time percentiles, overflow checkouts, timeouts, idle pre-pings).
+    """
+    return {
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pre_ping": settings.DB_PRE_PING,
+            "pre_ping_idle_seconds": settings.DB_PRE_PING_IDLE_SECONDS,
+            "external_pooler": settings.DB_EXTERNAL_POOLER or None,
+            "prepare_threshold": db_pool.prepare_threshold(settings),
+            "replica": bool(settings.DATABASE_REPLICA_URL),
+        },
+        "engines": db_pool.stats(),
+        "replica_routing": replica_router.status(),
+    }
+
+
+@router.get("/audit")
+def audit_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Batched audit writer (queue depth, batches, retries, failures) and audit_events partitions."""
+    return {
+        "sink": audit_sink.stats(),
+        "partitions": AuditPartitionService.partitions(db),
+        "partition_maintenance": audit_partition_service.maintenance_stats(),
+    }
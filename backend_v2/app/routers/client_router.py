@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import date  # <-- ADDED (minimal)
 
-from app.db import get_db
+from app.db import get_async_read_db, get_db
 from app.schemas.client import ClientCreate, ClientRead
 from app.schemas.account import AccountRead
 from app.schemas.kyc_flag import KycFlagRead
@@ -39,29 +40,49 @@ def _date_to_iso(value):  # <-- ADDED (minimal helper)
 # -----------------------------
 # Basic CRUD / helper endpoints
 # -----------------------------
+# Reads are async (async engine, no threadpool thread held while waiting on
+# Postgres) and served by the read replica when one is configured; writes stay
+# on the sync engine, services and the primary.
 @router.post("/", response_model=ClientRead)
 def create_client(data: ClientCreate, db: Session = Depends(get_db)):
     return ClientService.create(db, data)
 
 
 @router.get("/", response_model=list[ClientRead])
-def list_clients(db: Session = Depends(get_db)):
-    return ClientService.list(db)
+async def list_clients(db: AsyncSession = Depends(get_async_read_db)):
+    return await ClientService.list_async(db)
 
 
 @router.get("/{client_id}", response_model=ClientRead | None)
-def get_client(client_id: int, db: Session = Depends(get_db)):
-    return ClientService.get(db, client_id)
+async def get_client(client_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await ClientService.get_async(db, client_id)
 
 
 @router.get("/{client_id}/accounts", response_model=list[AccountRead])
-def get_client_accounts(client_id: int, db: Session = Depends(get_db)):
-    return AccountService.list_by_client(db, client_id)
+async def get_client_accounts(client_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await AccountService.list_by_client_async(db, client_id)
 
 
 @router.get("/{client_id}/kyc_flags", response_model=list[KycFlagRead])
-def get_client_kyc_flags(client_id: int, db: Session = Depends(get_db)):
-    return KycFlagService.list_by_client(db, client_id)
+async def get_client_kyc_flags(client_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await KycFlagService.list_by_client_async(db, client_id)
+
+
+@router.get("/{client_id}/match_decisions")
+async def get_client_match_decisions(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    limit: int = Query(default=25, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+):
+    """
+    Cursor-paginated match decisions for the profile panel ("load more").
+    Pass back `next_cursor` from the previous page; null means no more rows.
+    """
+    try:
+        return await MatchDecisionService.list_page_async(db, client_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 # ----------------------------------------
@@ -85,7 +106,7 @@ def get_client_kyc_flags(client_id: int, db: Session = Depends(get_db)):
     "/{client_id}/profile",
     response_model=SCVClientProfileResponse  # <-- ADDED (only decorator change)
 )
-def get_client_profile_for_ui(client_id: int, db: Session = Depends(get_db)):
+async def get_client_profile_for_ui(client_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Canonical SCV profile endpoint.
 
@@ -99,47 +120,45 @@ def get_client_profile_for_ui(client_id: int, db: Session = Depends(get_db)):
     Story 1 focus:
     - trade_history must show REAL data (sourced from transactions table)
     """
-    client = ClientService.get(db, client_id)
+    client = await ClientService.get_async(db, client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
-    accounts = AccountService.list_by_client(db, client_id)
+    accounts = await AccountService.list_by_client_async(db, client_id)
     account_ids = [a.id for a in accounts]
 
-    # Pull real transactions and flatten into trade_history
+    # Pull real transactions (one query for all accounts) and flatten into trade_history
     trade_history: list[dict] = []
-    for acc_id in account_ids:
-        txns = TransactionService.list_by_account(db, acc_id)
-        for t in txns:
-            td = t.trade_date
-            # UI expects strings in some places; keep simple
-            trade_history.append(
-                {
-                    "trade_id": str(t.id),
-                    "account_id": str(t.account_id),
-                    "trade_date": _date_to_iso(td),  # <-- CHANGED (only functional change)
-                    "instrument": None,
-                    "direction": t.txn_type,
-                    "quantity": abs(t.amount) if t.amount is not None else None,
-
-                    # ONLY CHANGE (pass through real values from transactions table)
-                    "price": t.price,
-                    "pnl": t.pnl,
-
-                    "amount": t.amount,
-                    "currency": t.currency,
-                    "txn_type": t.txn_type,
-                    "description": t.description,
-                }
-            )
-
-    match_decisions = MatchDecisionService.list_by_client(db, client_id)
-
-    regulatory_enrichment = RegulatoryEnrichmentService.get_latest_by_client(db, client_id)
-
-    evidence_artefacts = EvidenceArtefactService.list_by_client(db, client_id)
-
-    audit_trail = AuditTrailService.list_by_client(db, client_id)
+    for t in await TransactionService.list_by_accounts_async(db, account_ids):
+        td = t.trade_date
+        # UI expects strings in some places; keep simple
+        trade_history.append(
+            {
+                "trade_id": str(t.id),
+                "account_id": str(t.account_id),
+                "trade_date": _date_to_iso(td),  # <-- CHANGED (only functional change)
+                "instrument": None,
+                "direction": t.txn_type,
+                "quantity": abs(t.amount) if t.amount is not None else None,
+
+                # ONLY CHANGE (pass through real values from transactions table)
+                "price": t.price,
+                "pnl": t.pnl,
+
+                "amount": t.amount,
+                "currency": t.currency,
+                "txn_type": t.txn_type,
+                "description": t.description,
+            }
+        )
+
+    match_decisions = await MatchDecisionService.list_by_client_async(db, client_id)
+
+    regulatory_enrichment = await RegulatoryEnrichmentService.get_latest_by_client_async(db, client_id)
+
+    evidence_artefacts = await EvidenceArtefactService.list_by_client_async(db, client_id)
+
+    audit_trail = await AuditTrailService.list_by_client_async(db, client_id)
 
     # Canonical keys (always present)
     client_payload = jsonable_encoder(client)
@@ -188,7 +207,7 @@ def get_client_profile_for_ui(client_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{client_id}/sources")
-def get_client_sources_for_ui(client_id: int, db: Session = Depends(get_db)):
+async def get_client_sources_for_ui(client_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Return a synthetic 'raw sources' array so the existing UI can render
     something in the Raw sources panel.
@@ -196,7 +215,7 @@ def get_client_sources_for_ui(client_id: int, db: Session = Depends(get_db)):
     This is intentionally a placeholder until ingestion/source-record tables
     are implemented. It is safe and non-invasive.
     """
-    client = ClientService.get(db, client_id)
+    client = await ClientService.get_async(db, client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
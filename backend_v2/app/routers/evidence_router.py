@@ -0,0 +1,52 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db import get_read_db
+from app.services.evidence_artefact_service import EvidenceArtefactService
+
+
+router = APIRouter(prefix="/evidence", tags=["evidence"])
+
+# Revalidate every time; a matching ETag costs one content_hash lookup and a 304
+_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag(content_hash: str) -> str:
+    return f'"{content_hash}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+@router.get("/{artefact_id}/content")
+def get_evidence_content(
+    artefact_id: UUID,
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    The artefact's content (JSON), loaded when the profile panel expands a
+    row. The ETag is the content hash, so a client holding the current
+    version gets 304 without the blob being read from the database.
+    """
+    stored_hash = EvidenceArtefactService.get_content_hash(db, str(artefact_id))
+    if stored_hash and _matches(if_none_match, _etag(stored_hash)):
+        return Response(status_code=304, headers={"ETag": _etag(stored_hash), "Cache-Control": _CACHE_CONTROL})
+
+    found = EvidenceArtefactService.get_content(db, str(artefact_id))
+    if found is None:
+        raise HTTPException(status_code=404, detail="Evidence artefact not found")
+    content_hash, size, chunks = found
+    headers = {"ETag": _etag(content_hash), "Cache-Control": _CACHE_CONTROL}
+    if _matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(chunks, media_type="application/json", headers=headers)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_read_db
 from app.services.client_service import ClientService
 from app.services.account_service import AccountService
 from app.services.transaction_service import TransactionService
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/scv", tags=["single_client_view"])
 
 
 @router.get("/{client_id}")
-def get_single_client_view(client_id: int, db: Session = Depends(get_db)):
+def get_single_client_view(client_id: int, db: Session = Depends(get_read_db)):
     client = ClientService.get(db, client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
@@ -0,0 +1,48 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db, get_read_db
+from app.services.client_search_service import ClientSearchService
+
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("")
+def search_clients(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0, le=10_000),
+    mode: Literal["and", "or"] = Query(default="and"),
+    fuzzy: Literal["auto", "on", "off"] = Query(default="auto"),
+    country: Optional[List[str]] = Query(default=None),
+    segment: Optional[List[str]] = Query(default=None),
+    risk_rating: Optional[List[str]] = Query(default=None),
+    kyc_flag: Optional[List[str]] = Query(default=None, description="Open KYC flag codes, e.g. PEP, SANCTIONS"),
+    facets: bool = Query(default=False),
+    hydrate: bool = Query(default=True, description="Attach a summary row to each hit"),
+    db: Session = Depends(get_read_db),
+):
+    filters = {"country": country, "segment": segment, "risk_rating": risk_rating, "kyc_flag": kyc_flag}
+    return ClientSearchService.search(
+        db, q, limit=limit, mode=mode, fuzzy=fuzzy, offset=offset, filters=filters, facets=facets, hydrate=hydrate
+    )
+
+
+@router.get("/suggest")
+def suggest_clients(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+):
+    return ClientSearchService.suggest(db, q, limit=limit)
+
+
+@router.post("/rebuild")
+def rebuild_search_index(
+    workers: int = Query(default=1, ge=1, le=16),
+    db: Session = Depends(get_db),
+):
+    return ClientSearchService.rebuild(db, workers=workers)
@@ -0,0 +1,239 @@
+"""
+Schema registry: which optional tables and columns this database has, and
+the SQL the adaptive services compile from that.
+
+Several services adapt to schema differences between environments (optional
+columns on match_decisions and evidence_artefacts, which audit table exists,
+whether a migration has been applied). They declare the tables they care
+about and register a builder for each statement they derive from the
+columns; refresh() then:
+
+  - reflects every tracked table in one information_schema query, and
+  - runs every builder once, so requests only look up prebuilt statements.
+
+The app refreshes at startup (cold requests cost the same as warm ones);
+POST /admin/schema/refresh re-reflects after a migration. The registry is
+per process, so that request reaches one worker only: every worker also
+refreshes on the first lookup once its schema is older than the max age
+(SCHEMA_MAX_AGE_SECONDS), one catalog query per interval. If the startup
+refresh could not reach the database, the first lookup does it instead.
+
+Compiled statements are the same objects on every call, so SQLAlchemy's
+compiled cache serves them and psycopg prepares them server-side once a
+connection has run them DB_PREPARE_THRESHOLD times (app.db). Executions are
+counted per statement (record_execution is an engine event listener):
+compile-cache hits, and executions served by an existing server-side
+prepared statement, i.e. with parse and plan skipped. Statements are
+identified by their SQL text, not the object: after a refresh the compiled
+cache keeps handing out the compiled form of the previous, equal statement.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+
+Schema = Mapping[str, FrozenSet[str]]  # table -> columns (tables that exist only)
+Builder = Callable[[Schema], Any]
+
+_CATALOG_SQL = text("""
+    SELECT table_name, column_name
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+      AND table_name = ANY(:tables)
+""")
+
+_TRACKED: set = set()
+_BUILDERS: Dict[str, Builder] = {}
+
+# Swapped together under _LOCK on every load
+_SCHEMA: Optional[Dict[str, FrozenSet[str]]] = None
+_COMPILED: Dict[str, Any] = {}
+_LOADED_AT: Optional[str] = None
+_LOADED_MONOTONIC = 0.0
+_GENERATION = 0
+_LOCK = threading.Lock()
+# Re-reflect on lookup once the schema is this old (seconds; None: never)
+_MAX_AGE: Optional[float] = None
+
+# Execution counters: SQL text -> name for the current compiled set
+_NAMES: Dict[str, str] = {}
+_COUNTERS: Dict[str, Dict[str, int]] = {}
+_PER_CONNECTION: "weakref.WeakKeyDictionary[Any, Dict[str, int]]" = weakref.WeakKeyDictionary()
+_PREPARE_THRESHOLD: Optional[int] = None
+
+
+def track(*tables: str) -> None:
+    """Reflect these tables on every refresh."""
+    _TRACKED.update(tables)
+
+
+def register(name: str, *tables: str) -> Callable[[Builder], Builder]:
+    """
+    Decorator: `builder(schema)` derives statement `name` from the tracked
+    schema (it must cope with any of `tables` being absent).
+    """
+    track(*tables)
+
+    def decorate(builder: Builder) -> Builder:
+        _BUILDERS[name] = builder
+        if _SCHEMA is not None:
+            with _LOCK:
+                _COMPILED[name] = builder(_SCHEMA)
+                _NAMES.update(_statement_names({name: _COMPILED[name]}))
+        return builder
+
+    return decorate
+
+
+def _statement_names(compiled: Mapping[str, Any]) -> Dict[str, str]:
+    """Name every TextClause a builder produced ("name", or "name.variant" for dicts)."""
+    names: Dict[str, str] = {}
+    for name, value in compiled.items():
+        variants = value.items() if isinstance(value, dict) else [(None, value)]
+        for variant, stmt in variants:
+            if isinstance(stmt, TextClause):
+                names[stmt.text] = name if variant is None else f"{name}.{variant}"
+    return names
+
+
+def load(schema: Mapping[str, Iterable[str]]) -> None:
+    """Install a reflected schema and recompile every registered statement."""
+    global _SCHEMA, _COMPILED, _NAMES, _LOADED_AT, _LOADED_MONOTONIC, _GENERATION
+    frozen = {table: frozenset(cols) for table, cols in schema.items() if cols}
+    compiled = {name: build(frozen) for name, build in _BUILDERS.items()}
+    with _LOCK:
+        _SCHEMA, _COMPILED, _NAMES = frozen, compiled, _statement_names(compiled)
+        _LOADED_AT = datetime.now(timezone.utc).isoformat()
+        _LOADED_MONOTONIC = time.monotonic()
+        _GENERATION += 1
+
+
+def _load_rows(rows: Iterable[Any]) -> Dict[str, Any]:
+    schema: Dict[str, set] = {}
+    for table_name, column_name in rows:
+        schema.setdefault(table_name, set()).add(column_name)
+    load(schema)
+    return stats()
+
+
+def refresh(db: Session) -> Dict[str, Any]:
+    """One catalog query for every tracked table, then recompile."""
+    return _load_rows(db.execute(_CATALOG_SQL, {"tables": sorted(_TRACKED)}).fetchall())
+
+
+async def refresh_async(db: AsyncSession) -> Dict[str, Any]:
+    result = await db.execute(_CATALOG_SQL, {"tables": sorted(_TRACKED)})
+    return _load_rows(result.fetchall())
+
+
+def reset() -> None:
+    """Forget the reflected schema and counters; the next lookup refreshes."""
+    global _SCHEMA, _COMPILED, _NAMES, _LOADED_AT
+    with _LOCK:
+        _SCHEMA, _COMPILED, _NAMES, _LOADED_AT = None, {}, {}, None
+        _COUNTERS.clear()
+        _PER_CONNECTION.clear()
+
+
+def set_max_age(seconds: Optional[float]) -> None:
+    """Refresh on lookup once the reflected schema is older than this (None: never)."""
+    global _MAX_AGE
+    _MAX_AGE = seconds
+
+
+def _stale() -> bool:
+    if _SCHEMA is None:
+        return True
+    return _MAX_AGE is not None and time.monotonic() - _LOADED_MONOTONIC > _MAX_AGE
+
+
+def _schema(db: Session) -> Schema:
+    if _stale():
+        refresh(db)
+    return _SCHEMA  # type: ignore[return-value]
+
+
+def columns(db: Session, table: str) -> FrozenSet[str]:
+    return _schema(db).get(table, frozenset())
+
+
+def has_table(db: Session, table: str) -> bool:
+    return table in _schema(db)
+
+
+def compiled(db: Session, name: str) -> Any:
+    """The statement registered as `name`, built against the current schema."""
+    _schema(db)
+    return _COMPILED[name]
+
+
+async def compiled_async(db: AsyncSession, name: str) -> Any:
+    if _stale():
+        await refresh_async(db)
+    return _COMPILED[name]
+
+
+# ---------------------------
+# Execution counters
+# ---------------------------
+def set_prepare_threshold(threshold: Optional[int]) -> None:
+    """The driver's prepare threshold (None: statements are never prepared server-side)."""
+    global _PREPARE_THRESHOLD
+    _PREPARE_THRESHOLD = threshold
+
+
+def record_execution(conn, cursor, statement, parameters, context, executemany) -> None:
+    """Engine "after_cursor_execute" listener: count executions of registered statements."""
+    compiled_stmt = getattr(context, "compiled", None)
+    sql = getattr(getattr(compiled_stmt, "statement", None), "text", None)
+    name = _NAMES.get(sql) if sql is not None else None
+    if name is None:
+        return
+
+    runs_here = None
+    # The driver's own connection (psycopg Connection / AsyncConnection), where statements are prepared
+    driver_conn = getattr(conn.connection, "driver_connection", None)
+    with _LOCK:
+        counters = _COUNTERS.setdefault(
+            name, {"executions": 0, "compile_cache_hits": 0, "prepared_executions": 0}
+        )
+        counters["executions"] += 1
+        if context.cache_hit is CACHE_HIT:
+            counters["compile_cache_hits"] += 1
+        if driver_conn is not None:
+            per_conn = _PER_CONNECTION.setdefault(driver_conn, {})
+            runs_here = per_conn[name] = per_conn.get(name, 0) + 1
+        # psycopg prepares on the execution after `threshold` plain ones; later ones reuse it
+        if _PREPARE_THRESHOLD is not None and runs_here is not None and runs_here > _PREPARE_THRESHOLD + 1:
+            counters["prepared_executions"] += 1
+
+
+def execution_stats() -> Dict[str, Dict[str, int]]:
+    with _LOCK:
+        return {name: dict(c) for name, c in sorted(_COUNTERS.items())}
+
+
+def stats() -> Dict[str, Any]:
+    schema = _SCHEMA or {}
+    return {
+        "generation": _GENERATION,
+        "loaded_at": _LOADED_AT,
+        "tracked": sorted(_TRACKED),
+        "present": {table: len(schema[table]) for table in sorted(schema)},
+        "missing": sorted(_TRACKED - set(schema)),
+        "statements": sorted(_BUILDERS),
+        "max_age_seconds": _MAX_AGE,
+        "prepare_threshold": _PREPARE_THRESHOLD,
+        "executions": execution_stats(),
+    }
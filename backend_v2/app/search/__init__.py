@@ -0,0 +1,4 @@
+# search package (FT-08 / FT-09 / FT-16)
+from app.search.index import InvertedIndex, SearchDocument
+
+__all__ = ["InvertedIndex", "SearchDocument"]
@@ -0,0 +1,92 @@
+"""
+Field analysers for the client search index (ST-17).
+
+Index-time and query-time terms go through the same normalisers
+(app.normalisation), so "ACME Ltd." and "acme" meet on the same term.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from app.normalisation import (
+    LEGAL_SUFFIXES,
+    normalise_address,
+    normalise_email,
+    normalise_identifier,
+    normalise_name,
+    normalise_text,
+)
+
+
+# Indexed fields (order is stable; later structures key off the position)
+FIELDS = ("identifier", "name", "email", "address")
+
+_SUFFIXES = frozenset(LEGAL_SUFFIXES)
+
+
+def analyse_document(
+    *,
+    identifiers: List[Optional[str]],
+    name: Optional[str],
+    email: Optional[str],
+    address: Optional[str],
+) -> Dict[str, List[str]]:
+    """Return field -> terms (with repeats, so term frequencies can be derived)."""
+    terms: Dict[str, List[str]] = {f: [] for f in FIELDS}
+
+    for raw in identifiers:
+        ident = normalise_identifier(raw)
+        if ident:
+            terms["identifier"].append(ident)
+
+    n = normalise_name(name)
+    if n:
+        terms["name"].extend(n.split())
+
+    e = normalise_email(email)
+    if e:
+        terms["email"].append(e)
+        terms["email"].extend((normalise_text(e) or "").split())
+
+    a = normalise_address(address)
+    if a:
+        terms["address"].extend(a.split())
+
+    return terms
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Split a free-text query into matchable tokens.
+
+    Legal-form suffixes are dropped (they are stripped from indexed names),
+    unless the query consists only of suffixes.
+    """
+    tokens = (normalise_text(query) or "").split()
+    kept = [t for t in tokens if t not in _SUFFIXES]
+    return kept or tokens
+
+
+def term_variants(token: str) -> Dict[str, str]:
+    """Field -> term a single query token is looked up as."""
+    out = {"name": token, "email": token}
+    addr = normalise_address(token)
+    if addr:
+        out["address"] = addr
+    ident = normalise_identifier(token)
+    if ident:
+        out["identifier"] = ident
+    return out
+
+
+def whole_query_variants(query: str) -> Dict[str, str]:
+    """Exact-key lookups for the full query string (e.g. "CRM-CORP-001", an email)."""
+    out: Dict[str, str] = {}
+    ident = normalise_identifier(query)
+    if ident:
+        out["identifier"] = ident
+    e = normalise_email(query)
+    if e:
+        out["email"] = e
+    return out
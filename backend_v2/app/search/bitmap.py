@@ -0,0 +1,182 @@
+"""
+Compressed integer bitmaps for search filters and facet counts (roaring-style).
+
+Values (client ids) are split into 16-bit chunks by their high bits. Each
+chunk is stored as either:
+  - a sorted array('H') of low bits, while it holds <= 4096 values, or
+  - a 65536-bit Python int, once denser than that.
+
+AND / OR / AND NOT / intersection cardinality work chunk by chunk; dense-dense chunks
+are single big-int operations and popcounts (int.bit_count), so counting
+a facet never walks the matching rows.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, Iterator, Union
+
+
+_ARRAY_MAX = 4_096
+_CHUNK_BYTES = 65_536 // 8
+
+Container = Union[array, int]
+
+
+def _to_bits(lows: Iterable[int]) -> int:
+    buf = bytearray(_CHUNK_BYTES)
+    for x in lows:
+        buf[x >> 3] |= 1 << (x & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _to_array(bits: int) -> array:
+    out = array("H")
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
+
+def _card(c: Container) -> int:
+    return c.bit_count() if isinstance(c, int) else len(c)
+
+
+def _shrink(bits: int) -> Container:
+    return _to_array(bits) if bits.bit_count() <= _ARRAY_MAX else bits
+
+
+def _and(a: Container, b: Container) -> Container:
+    if isinstance(a, int) and isinstance(b, int):
+        return _shrink(a & b)
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        return array("H", (x for x in a if b >> x & 1))
+    return array("H", sorted(set(a).intersection(b)))
+
+
+def _and_card(a: Container, b: Container) -> int:
+    if isinstance(a, int) and isinstance(b, int):
+        return (a & b).bit_count()
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        return sum(1 for x in a if b >> x & 1)
+    return len(set(a).intersection(b))
+
+
+def _andnot(a: Container, b: Container) -> Container:
+    if isinstance(a, int):
+        return _shrink(a & ~(b if isinstance(b, int) else _to_bits(b)))
+    if isinstance(b, int):
+        return array("H", (x for x in a if not b >> x & 1))
+    return array("H", sorted(set(a).difference(b)))
+
+
+def _or(a: Container, b: Container) -> Container:
+    if isinstance(a, int) or isinstance(b, int):
+        bits_a = a if isinstance(a, int) else _to_bits(a)
+        bits_b = b if isinstance(b, int) else _to_bits(b)
+        return bits_a | bits_b
+    merged = set(a).union(b)
+    if len(merged) > _ARRAY_MAX:
+        return _to_bits(merged)
+    return array("H", sorted(merged))
+
+
+class Bitmap:
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks: Dict[int, Container] | None = None) -> None:
+        self.chunks: Dict[int, Container] = chunks or {}
+
+    @classmethod
+    def from_iterable(cls, values: Iterable[int]) -> "Bitmap":
+        grouped: Dict[int, list] = {}
+        for v in set(values):
+            grouped.setdefault(v >> 16, []).append(v & 0xFFFF)
+        chunks: Dict[int, Container] = {}
+        for high, lows in grouped.items():
+            chunks[high] = _to_bits(lows) if len(lows) > _ARRAY_MAX else array("H", sorted(lows))
+        return cls(chunks)
+
+    def add(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        c = self.chunks.get(high)
+        if c is None:
+            self.chunks[high] = array("H", [low])
+        elif isinstance(c, int):
+            self.chunks[high] = c | (1 << low)
+        elif low not in c:
+            self.chunks[high] = _or(c, array("H", [low]))
+
+    def discard(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        c = self.chunks.get(high)
+        if c is None:
+            return
+        if isinstance(c, int):
+            c = _shrink(c & ~(1 << low))
+        else:
+            c = array("H", (x for x in c if x != low))
+        if _card(c):
+            self.chunks[high] = c
+        else:
+            del self.chunks[high]
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        c = self.chunks.get(value >> 16)
+        if c is None:
+            return False
+        low = value & 0xFFFF
+        return bool(c >> low & 1) if isinstance(c, int) else low in c
+
+    def __len__(self) -> int:
+        return sum(_card(c) for c in self.chunks.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self.chunks):
+            c = self.chunks[high]
+            base = high << 16
+            for low in (_to_array(c) if isinstance(c, int) else c):
+                yield base | low
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        out: Dict[int, Container] = {}
+        small, large = (self, other) if len(self.chunks) <= len(other.chunks) else (other, self)
+        for high, c in small.chunks.items():
+            o = large.chunks.get(high)
+            if o is not None:
+                r = _and(c, o)
+                if _card(r):
+                    out[high] = r
+        return Bitmap(out)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        out = dict(self.chunks)
+        for high, c in other.chunks.items():
+            out[high] = _or(out[high], c) if high in out else c
+        return Bitmap(out)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        out: Dict[int, Container] = {}
+        for high, c in self.chunks.items():
+            o = other.chunks.get(high)
+            r = c if o is None else _andnot(c, o)
+            if _card(r):
+                out[high] = r
+        return Bitmap(out)
+
+    def and_cardinality(self, other: "Bitmap") -> int:
+        """|self & other| without materialising the intersection."""
+        total = 0
+        small, large = (self, other) if len(self.chunks) <= len(other.chunks) else (other, self)
+        for high, c in small.chunks.items():
+            o = large.chunks.get(high)
+            if o is not None:
+                total += _and_card(c, o)
+        return total
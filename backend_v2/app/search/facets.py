@@ -0,0 +1,205 @@
+"""
+Search filters and facet counts over client attributes (country, segment,
+risk_rating, open kyc_flags codes).
+
+Every (facet, value) pair has a Bitmap of client ids. A filter is an OR
+of its values' bitmaps within a facet and an AND across facets; facet
+counts are intersection cardinalities between each value's bitmap and the
+text-match bitmap under the other facets' filters (multi-select faceting).
+Filter bitmaps are cached per filter combination, since ops dashboards
+repeat the same few.
+
+The index also keeps each client's current values (and open flag counts
+per code), so a write moves the client between bitmaps instead of only
+adding it: upsert_client replaces its attributes, add_flag / set_flags
+its open flags (a code's bitmap drops the client with its last open flag
+of that code), remove_client takes it out everywhere. Writes and reads
+take the index's lock, so a request never counts a bitmap another thread
+is changing.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app.normalisation import clean_text, normalise_country
+from app.search.bitmap import Bitmap
+
+
+FACET_FIELDS = ("country", "segment", "risk_rating", "kyc_flag")
+_ATTRIBUTE_FIELDS = FACET_FIELDS[:3]
+
+_VALUE_KEYS: Dict[str, Callable[[Optional[str]], Optional[str]]] = {
+    "country": lambda v: normalise_country(v) or clean_text(v),
+    "segment": clean_text,
+    "risk_rating": lambda v: (clean_text(v) or "").upper() or None,
+    "kyc_flag": lambda v: (clean_text(v) or "").upper() or None,
+}
+
+_FILTER_CACHE_SIZE = 256
+
+Filters = Mapping[str, Sequence[str]]
+
+
+def facet_value(field: str, raw: Optional[str]) -> Optional[str]:
+    return _VALUE_KEYS[field](raw)
+
+
+def _attribute_values(country: Optional[str], segment: Optional[str], risk_rating: Optional[str]) -> Tuple[Optional[str], ...]:
+    return tuple(facet_value(f, raw) for f, raw in zip(_ATTRIBUTE_FIELDS, (country, segment, risk_rating)))
+
+
+def _filter_key(filters: Filters, exclude: Optional[str]) -> Tuple:
+    return (exclude,) + tuple(
+        (f, tuple(sorted({facet_value(f, v) or "" for v in filters[f]})))
+        for f in FACET_FIELDS
+        if f != exclude and filters.get(f)
+    )
+
+
+class FacetIndex:
+    def __init__(self) -> None:
+        self.values: Dict[str, Dict[str, Bitmap]] = {f: {} for f in FACET_FIELDS}
+        # client_id -> (country, segment, risk_rating) values / {kyc_flag value: open flags}
+        self.client_values: Dict[int, Tuple[Optional[str], ...]] = {}
+        self.client_flags: Dict[int, Dict[str, int]] = {}
+        self._cache: "OrderedDict[Tuple, Optional[Bitmap]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(
+        cls,
+        clients: Iterable[Tuple[int, Optional[str], Optional[str], Optional[str]]],
+        open_flags: Iterable[Tuple[int, str]],
+    ) -> "FacetIndex":
+        """clients: (id, country, segment, risk_rating); open_flags: (client_id, code)."""
+        idx = cls()
+        ids: Dict[str, Dict[str, List[int]]] = {f: {} for f in FACET_FIELDS}
+        for client_id, country, segment, risk_rating in clients:
+            values = _attribute_values(country, segment, risk_rating)
+            idx.client_values[client_id] = values
+            for field, value in zip(_ATTRIBUTE_FIELDS, values):
+                if value:
+                    ids[field].setdefault(value, []).append(client_id)
+        for client_id, code in open_flags:
+            value = facet_value("kyc_flag", code)
+            if value:
+                flags = idx.client_flags.setdefault(client_id, {})
+                if value not in flags:
+                    ids["kyc_flag"].setdefault(value, []).append(client_id)
+                flags[value] = flags.get(value, 0) + 1
+
+        for field, by_value in ids.items():
+            idx.values[field] = {v: Bitmap.from_iterable(c) for v, c in by_value.items()}
+        return idx
+
+    def _add(self, field: str, value: str, client_id: int) -> None:
+        self.values[field].setdefault(value, Bitmap()).add(client_id)
+
+    def _discard(self, field: str, value: str, client_id: int) -> None:
+        bitmap = self.values[field].get(value)
+        if bitmap is not None:
+            bitmap.discard(client_id)
+            if not bitmap.chunks:
+                del self.values[field][value]
+
+    def _set_flags(self, client_id: int, flags: Dict[str, int]) -> None:
+        old = self.client_flags.pop(client_id, {})
+        for value in old.keys() - flags.keys():
+            self._discard("kyc_flag", value, client_id)
+        for value in flags.keys() - old.keys():
+            self._add("kyc_flag", value, client_id)
+        if flags:
+            self.client_flags[client_id] = flags
+
+    def upsert_client(
+        self,
+        client_id: int,
+        country: Optional[str] = None,
+        segment: Optional[str] = None,
+        risk_rating: Optional[str] = None,
+    ) -> None:
+        """New or changed client: its attribute values replace the previous ones."""
+        values = _attribute_values(country, segment, risk_rating)
+        with self._lock:
+            old = self.client_values.get(client_id, (None,) * len(_ATTRIBUTE_FIELDS))
+            for field, before, after in zip(_ATTRIBUTE_FIELDS, old, values):
+                if before == after:
+                    continue
+                if before:
+                    self._discard(field, before, client_id)
+                if after:
+                    self._add(field, after, client_id)
+            self.client_values[client_id] = values
+            self._cache.clear()
+
+    def add_flag(self, client_id: int, code: str) -> None:
+        """One more open flag with `code` for the client."""
+        value = facet_value("kyc_flag", code)
+        if not value:
+            return
+        with self._lock:
+            flags = dict(self.client_flags.get(client_id, {}))
+            flags[value] = flags.get(value, 0) + 1
+            self._set_flags(client_id, flags)
+            self._cache.clear()
+
+    def set_flags(self, client_id: int, open_codes: Iterable[str]) -> None:
+        """The client's open flag codes, as now stored (closed ones drop out)."""
+        flags: Dict[str, int] = {}
+        for code in open_codes:
+            value = facet_value("kyc_flag", code)
+            if value:
+                flags[value] = flags.get(value, 0) + 1
+        with self._lock:
+            self._set_flags(client_id, flags)
+            self._cache.clear()
+
+    def remove_client(self, client_id: int) -> None:
+        """Deleted client: out of every bitmap."""
+        with self._lock:
+            for field, value in zip(_ATTRIBUTE_FIELDS, self.client_values.pop(client_id, ())):
+                if value:
+                    self._discard(field, value, client_id)
+            self._set_flags(client_id, {})
+            self._cache.clear()
+
+    def filter_bitmap(self, filters: Filters, exclude: Optional[str] = None) -> Optional[Bitmap]:
+        """Clients passing every facet filter except `exclude`; None means no restriction."""
+        with self._lock:
+            return self._filter_bitmap(filters, exclude)
+
+    def _filter_bitmap(self, filters: Filters, exclude: Optional[str]) -> Optional[Bitmap]:
+        key = _filter_key(filters, exclude)
+        if len(key) == 1:
+            return None
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        result: Optional[Bitmap] = None
+        for field, values in key[1:]:
+            by_value = self.values[field]
+            either = Bitmap()
+            for v in values:
+                if v in by_value:
+                    either = either | by_value[v]
+            result = either if result is None else result & either
+
+        self._cache[key] = result
+        if len(self._cache) > _FILTER_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def counts(self, matched: Bitmap, filters: Filters) -> Dict[str, Dict[str, int]]:
+        """Per facet value: matched clients that would remain if that value were selected."""
+        out: Dict[str, Dict[str, int]] = {}
+        for field in FACET_FIELDS:
+            with self._lock:
+                others = self._filter_bitmap(filters, exclude=field)
+                base = matched if others is None else matched & others
+                counts = {v: bm.and_cardinality(base) for v, bm in self.values[field].items()}
+            out[field] = dict(sorted(((v, n) for v, n in counts.items() if n), key=lambda kv: (-kv[1], kv[0])))
+        return out
@@ -0,0 +1,298 @@
+"""
+In-process inverted index over clients and CRM contacts (FT-08 / ST-16).
+
+Postings are sorted arrays of dense integer doc ids (array('I')),
+one per (field, term), with a parallel array of term frequencies.
+Queries are evaluated as boolean AND/OR over those arrays: AND walks the
+shortest list and probes the others with binary search, OR merges.
+Matched docs are then ranked with BM25 (app.search.ranking).
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.search.analysis import FIELDS, analyse_document, query_terms, term_variants, whole_query_variants
+from app.search.bitmap import Bitmap
+from app.search.ranking import FIELD_BOOSTS, idf, length_norms, round_breakdown, term_score, top_k
+from app.search.trigram import TrigramIndex
+
+
+_EMPTY = array("I")
+
+# (field, boost * idf, postings, term frequencies, length norms)
+_Lookup = Tuple[str, float, array, array, array]
+
+# score(): probe a postings list per doc rather than walk it when it is this
+# many times longer than the docs being scored (about the cost of a bisect)
+_PROBE_RATIO = 16
+
+# client_bitmap(): postings at least this long keep their bitmap once built
+# (the index is frozen); shorter ones are cheaper to rebuild than to hold
+_CLIENT_BITMAP_CACHE_MIN = 1_024
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    key: str  # "client:<id>" | "crm_contact:<uuid>"
+    kind: str  # "client" | "crm_contact"
+    client_id: Optional[int]
+    name: Optional[str]
+    identifiers: Sequence[Optional[str]] = ()
+    email: Optional[str] = None
+    address: Optional[str] = None
+
+
+def intersect(lists: Sequence[Sequence[int]]) -> List[int]:
+    """AND of sorted postings: iterate the shortest, binary-search the rest."""
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    head, rest = lists[0], lists[1:]
+    if not rest:
+        return list(head)
+
+    out: List[int] = []
+    cursors = [0] * len(rest)
+    for doc in head:
+        for i, other in enumerate(rest):
+            pos = bisect_left(other, doc, cursors[i])
+            cursors[i] = pos
+            if pos == len(other) or other[pos] != doc:
+                break
+        else:
+            out.append(doc)
+    return out
+
+
+def union(lists: Sequence[Sequence[int]]) -> List[int]:
+    """OR of sorted postings."""
+    lists = [p for p in lists if len(p)]
+    if not lists:
+        return []
+    if len(lists) == 1:
+        return list(lists[0])
+    merged = set(lists[0])
+    for p in lists[1:]:
+        merged.update(p)
+    return sorted(merged)
+
+
+class InvertedIndex:
+    def __init__(self) -> None:
+        self.docs: List[SearchDocument] = []
+        # Owning client per doc (0 for docs without one), for filters without decoding docs
+        self.client_ids = array("I")
+        self.postings: Dict[str, Dict[str, array]] = {f: {} for f in FIELDS}
+        self.tfs: Dict[str, Dict[str, array]] = {f: {} for f in FIELDS}
+        self.lengths: Dict[str, array] = {f: array("H") for f in FIELDS}
+        # Precomputed at freeze(): per-field IDF per term and BM25 length norm per doc
+        self.idf: Dict[str, Dict[str, float]] = {f: {} for f in FIELDS}
+        self.norms: Dict[str, array] = {f: array("f") for f in FIELDS}
+        self.trigrams = TrigramIndex()
+        self._client_bitmaps: Dict[Tuple[str, str], Bitmap] = {}
+        self._building: Optional[Dict[str, Dict[str, Tuple[List[int], List[int]]]]] = {f: {} for f in FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ---------------------------
+    # Build
+    # ---------------------------
+    def add(self, doc: SearchDocument) -> int:
+        if self._building is None:
+            raise RuntimeError("Index is frozen; build a new index to add documents")
+
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        self.client_ids.append(doc.client_id or 0)
+        fields = analyse_document(
+            identifiers=list(doc.identifiers),
+            name=doc.name,
+            email=doc.email,
+            address=doc.address,
+        )
+        for field, terms in fields.items():
+            self.lengths[field].append(min(len(terms), 0xFFFF))
+            by_term = self._building[field]
+            for term, tf in Counter(terms).items():
+                ids, tfs = by_term.setdefault(term, ([], []))
+                ids.append(doc_id)
+                tfs.append(min(tf, 0xFFFF))
+        return doc_id
+
+    def freeze(self) -> "InvertedIndex":
+        """Compact build lists into sorted integer arrays and precompute IDF / length norms."""
+        if self._building is not None:
+            n_docs = len(self.docs)
+            for field, by_term in self._building.items():
+                self.postings[field] = {term: array("I", ids) for term, (ids, _) in by_term.items()}
+                self.tfs[field] = {term: array("H", tfs) for term, (_, tfs) in by_term.items()}
+                self.idf[field] = {term: idf(n_docs, len(ids)) for term, (ids, _) in by_term.items()}
+                self.norms[field] = length_norms(self.lengths[field])
+            self.trigrams = TrigramIndex.from_names((i, d.name) for i, d in enumerate(self.docs))
+            self._building = None
+        return self
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[SearchDocument]) -> "InvertedIndex":
+        idx = cls()
+        for d in docs:
+            idx.add(d)
+        return idx.freeze()
+
+    # ---------------------------
+    # Query
+    # ---------------------------
+    def postings_for(self, field: str, term: str) -> Sequence[int]:
+        return self.postings[field].get(term, _EMPTY)
+
+    def _token_postings(self, token: str) -> List[int]:
+        return union([self.postings_for(f, t) for f, t in term_variants(token).items()])
+
+    def match(self, query: str, mode: str = "and") -> List[int]:
+        """
+        Doc ids matching `query`.
+
+        mode="and": every token must hit some field; mode="or": any token.
+        A whole-query exact identifier/email hit always matches.
+        """
+        tokens = query_terms(query)
+        exact = union([self.postings_for(f, t) for f, t in whole_query_variants(query).items()])
+        if not tokens:
+            return exact
+
+        per_token = [self._token_postings(t) for t in tokens]
+        matched = intersect(per_token) if mode == "and" else union(per_token)
+        return union([matched, exact]) if exact else matched
+
+    def client_bitmap(self, field: str, term: str) -> Bitmap:
+        """Owning client ids of the docs posted under (field, term)."""
+        cached = self._client_bitmaps.get((field, term))
+        if cached is not None:
+            return cached
+        postings = self.postings_for(field, term)
+        owners = self.client_ids
+        bitmap = Bitmap.from_iterable(owners[d] for d in postings if owners[d])
+        if len(postings) >= _CLIENT_BITMAP_CACHE_MIN:
+            self._client_bitmaps[(field, term)] = bitmap
+        return bitmap
+
+    def _variants_bitmap(self, variants: Dict[str, str]) -> Bitmap:
+        out = Bitmap()
+        for f, t in variants.items():
+            out = out | self.client_bitmap(f, t)
+        return out
+
+    def match_clients(self, query: str, mode: str = "and") -> Bitmap:
+        """
+        Owning client ids of the docs matching `query`: match() evaluated on
+        client bitmaps, which agree because a client has one doc per index.
+        """
+        tokens = query_terms(query)
+        exact = self._variants_bitmap(whole_query_variants(query))
+        if not tokens:
+            return exact
+
+        matched: Optional[Bitmap] = None
+        for t in tokens:
+            per_token = self._variants_bitmap(term_variants(t))
+            if matched is None:
+                matched = per_token
+            else:
+                matched = matched & per_token if mode == "and" else matched | per_token
+        return matched | exact
+
+    def lookups(self, query: str, idf_of: Optional[Callable[[str, str], float]] = None) -> List[_Lookup]:
+        """
+        Distinct (field, term) lookups for `query`, weighted by field boost * IDF.
+
+        `idf_of` overrides this index's own IDF table (a segmented index passes
+        IDF over all of its segments).
+        """
+        wanted: Dict[Tuple[str, str], None] = {}
+        for field, term in whole_query_variants(query).items():
+            wanted[(field, term)] = None
+        for token in query_terms(query):
+            for field, term in term_variants(token).items():
+                wanted[(field, term)] = None
+
+        out: List[_Lookup] = []
+        for field, term in wanted:
+            postings = self.postings[field].get(term)
+            if postings is None:
+                continue
+            weight = FIELD_BOOSTS[field] * (idf_of(field, term) if idf_of else self.idf[field][term])
+            out.append((field, weight, postings, self.tfs[field][term], self.norms[field]))
+        return out
+
+    @staticmethod
+    def _contributions(doc_id: int, lookups: List[_Lookup]) -> Iterator[Tuple[str, float]]:
+        for field, weight, postings, tfs, norms in lookups:
+            pos = bisect_left(postings, doc_id)
+            if pos < len(postings) and postings[pos] == doc_id:
+                yield field, term_score(tfs[pos], norms[doc_id], weight)
+
+    def score(self, doc_ids: Iterable[int], lookups: List[_Lookup]) -> Dict[int, float]:
+        """
+        BM25 scores of `doc_ids`, accumulated term at a time: each lookup's
+        postings are walked once, adding to the docs being scored. A postings
+        list much longer than the docs being scored is probed per doc instead
+        (a short AND result against a common term).
+        """
+        scores = dict.fromkeys(doc_ids, 0.0)
+        if not scores:
+            return scores
+        for _, weight, postings, tfs, norms in lookups:
+            if len(postings) > _PROBE_RATIO * len(scores):
+                for d in scores:
+                    pos = bisect_left(postings, d)
+                    if pos < len(postings) and postings[pos] == d:
+                        scores[d] += term_score(tfs[pos], norms[d], weight)
+            else:
+                for pos, d in enumerate(postings):
+                    if d in scores:
+                        scores[d] += term_score(tfs[pos], norms[d], weight)
+        return scores
+
+    def breakdown(self, doc_id: int, lookups: List[_Lookup]) -> Dict[str, float]:
+        return round_breakdown(self._contributions(doc_id, lookups))
+
+    def rank(
+        self,
+        query: str,
+        mode: str = "and",
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[int, List[Tuple[int, float, Dict[str, float]]]]:
+        """
+        BM25-ranked page of matches: (total, [(doc_id, score, per-field breakdown)]).
+
+        Only the matched docs are scored; the page is taken with a bounded heap
+        and the per-field breakdown is computed for the returned hits only.
+        """
+        matched = self.match(query, mode=mode)
+        if not matched:
+            return 0, []
+
+        lookups = self.lookups(query)
+        page = top_k(self.score(matched, lookups), offset + limit)[offset:]
+        return len(matched), [
+            (d, round(score, 4), self.breakdown(d, lookups)) for d, score in page
+        ]
+
+    def fuzzy(self, query: str, limit: Optional[int] = 50) -> List[Tuple[int, float]]:
+        """Typo-tolerant name search: (doc_id, similarity) best first (limit=None: all)."""
+        return self.trigrams.search_docs(query, limit=limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self.docs),
+            "distinct_names": len(self.trigrams),
+            "terms": {f: len(p) for f, p in self.postings.items()},
+            "postings": sum(len(a) for p in self.postings.values() for a in p.values()),
+        }
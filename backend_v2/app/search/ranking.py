@@ -0,0 +1,62 @@
+"""
+BM25 ranking for the client search index (ST-19 / ST-33).
+
+Each field is scored with BM25 on its own length statistics and the
+per-field scores are combined with static boosts, so an exact identifier
+hit outranks a legal-name hit, which outranks email and address hits.
+
+IDF and document-length norms are computed once when the index is frozen;
+a query only touches the postings of its own terms and the matched docs.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+# ST-19: identifier > legal name > email > address
+FIELD_BOOSTS: Dict[str, float] = {
+    "identifier": 8.0,
+    "name": 3.0,
+    "email": 2.0,
+    "address": 1.0,
+}
+
+K1 = 1.2
+B = 0.75
+
+
+def idf(n_docs: int, df: int) -> float:
+    """BM25 IDF (the +1 form, never negative)."""
+    return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def length_norms(lengths: Sequence[int], k1: float = K1, b: float = B) -> array:
+    """Per-doc K = k1 * (1 - b + b * len / avg_len), stored as float32."""
+    avg = (sum(lengths) / len(lengths)) if lengths else 0.0
+    if not avg:
+        return array("f", [k1] * len(lengths))
+    return array("f", (k1 * (1.0 - b + b * n / avg) for n in lengths))
+
+
+def term_score(tf: int, norm: float, weight: float, k1: float = K1) -> float:
+    """weight (boost * idf) * saturated term frequency."""
+    return weight * tf * (k1 + 1.0) / (tf + norm)
+
+
+def top_k(scores: Dict[int, float], k: int) -> List[Tuple[int, float]]:
+    """Best k (doc_id, score) by score desc, doc_id asc, without sorting everything."""
+    if k <= 0:
+        return []
+    best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+    return [(doc_id, score) for doc_id, score in best]
+
+
+def round_breakdown(parts: Iterable[Tuple[str, float]]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for field, value in parts:
+        out[field] = out.get(field, 0.0) + value
+    return {f: round(v, 4) for f, v in out.items()}
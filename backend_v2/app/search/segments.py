@@ -0,0 +1,315 @@
+"""
+Segmented, incrementally maintained search index.
+
+The index is a list of immutable segments (each a frozen InvertedIndex)
+plus per-segment tombstones:
+
+  - upsert(docs): tombstones any previous version of each key and writes the
+    batch as one new small segment, so a 10-row CRM delta is searchable
+    after indexing just those 10 rows.
+  - delete(keys): tombstones only.
+  - merges: when small segments pile up (or a segment is mostly deleted),
+    the live docs of those segments are rewritten into one segment on a
+    background thread and swapped in atomically. Docs updated or deleted
+    while the merge ran are tombstoned in the merged segment on swap.
+
+Segments opened from disk (app.search.storage.MappedIndex) are not scanned
+on attach: their documents are located through the segment's own sorted key
+table when a later write needs to tombstone them, so opening is O(1) in the
+number of documents.
+
+Readers take a snapshot of the segment list and never block on writers.
+IDF is computed over all segments at query time so a fresh segment
+scores like the rest of the corpus.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Container, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.search.bitmap import Bitmap
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.ranking import idf, top_k
+
+
+SMALL_SEGMENT = 10_000  # segments below this size are merge candidates
+MERGE_FACTOR = 8  # merge once this many small segments exist
+MAX_DELETED_RATIO = 0.3  # rewrite a segment once this share of it is deleted
+BULK_SEGMENT_SIZE = 250_000
+
+
+@dataclass(eq=False)
+class Segment:
+    index: InvertedIndex
+    deleted: Set[int] = field(default_factory=set)
+    # owning client ids of the deleted docs (matched_clients subtracts them)
+    deleted_clients: Bitmap = field(default_factory=Bitmap)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def mapped(self) -> bool:
+        """Docs are located via index.locate() rather than the in-memory live map."""
+        return hasattr(self.index, "locate")
+
+    @property
+    def live_count(self) -> int:
+        return len(self.index) - len(self.deleted)
+
+    def tombstone(self, local: int) -> None:
+        self.deleted.add(local)
+        owner = self.index.client_ids[local]
+        if owner:
+            self.deleted_clients.add(owner)
+
+    def live_docs(self) -> Iterator[Tuple[int, SearchDocument]]:
+        for local, doc in enumerate(self.index.docs):
+            if local not in self.deleted:
+                yield local, doc
+
+
+def _chunks(docs: Iterable[SearchDocument], size: int) -> Iterator[List[SearchDocument]]:
+    chunk: List[SearchDocument] = []
+    for d in docs:
+        chunk.append(d)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class SegmentedIndex:
+    def __init__(self, segments: Optional[List[Segment]] = None, background_merge: bool = True) -> None:
+        self.segments: List[Segment] = []
+        self.live: Dict[str, Tuple[Segment, int]] = {}
+        self.background_merge = background_merge
+        self._lock = threading.Lock()
+        self._merging = False
+        for seg in segments or []:
+            self._attach(seg)
+
+    def _location(self, key: str) -> Optional[Tuple[Segment, int]]:
+        location = self.live.get(key)
+        if location is not None:
+            return location
+        for seg in self.segments:
+            if seg.mapped:
+                local = seg.index.locate(key)  # type: ignore[attr-defined]
+                if local is not None and local not in seg.deleted:
+                    return seg, local
+        return None
+
+    def _attach(self, seg: Segment) -> None:
+        if not seg.mapped:
+            for local, doc in enumerate(seg.index.docs):
+                previous = self._location(doc.key)
+                if previous is not None:
+                    previous[0].tombstone(previous[1])
+                self.live[doc.key] = (seg, local)
+        self.segments = self.segments + [seg]
+
+    # ---------------------------
+    # Build
+    # ---------------------------
+    @classmethod
+    def from_documents(
+        cls,
+        docs: Iterable[SearchDocument],
+        segment_size: int = BULK_SEGMENT_SIZE,
+        workers: int = 1,
+        background_merge: bool = True,
+    ) -> "SegmentedIndex":
+        """
+        Full (e.g. nightly) build. With workers > 1, segments are built in
+        parallel processes and attached in input order.
+        """
+        chunks = _chunks(docs, segment_size)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                built = list(pool.map(InvertedIndex.from_documents, chunks))
+        else:
+            built = [InvertedIndex.from_documents(c) for c in chunks]
+        return cls([Segment(i) for i in built], background_merge=background_merge)
+
+    # ---------------------------
+    # Incremental maintenance
+    # ---------------------------
+    def upsert(self, docs: Iterable[SearchDocument]) -> int:
+        """Index a batch of new or changed documents as one segment."""
+        latest: Dict[str, SearchDocument] = {d.key: d for d in docs}
+        if not latest:
+            return 0
+        seg = Segment(InvertedIndex.from_documents(latest.values()))
+        with self._lock:
+            self._attach(seg)
+        self.maybe_merge()
+        return len(latest)
+
+    def delete(self, keys: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                location = self._location(key)
+                self.live.pop(key, None)
+                if location is not None:
+                    location[0].tombstone(location[1])
+                    removed += 1
+        if removed:
+            self.maybe_merge()
+        return removed
+
+    def merge_candidates(self) -> List[Segment]:
+        segments = self.segments
+        small = [s for s in segments if len(s) < SMALL_SEGMENT]
+        chosen = small if len(small) >= MERGE_FACTOR else []
+        chosen += [
+            s for s in segments
+            if s not in chosen and len(s) and len(s.deleted) / len(s) >= MAX_DELETED_RATIO
+        ]
+        return chosen
+
+    def maybe_merge(self) -> bool:
+        """Start a merge if the policy asks for one and none is running."""
+        with self._lock:
+            if self._merging or not self.merge_candidates():
+                return False
+            self._merging = True
+        if self.background_merge:
+            threading.Thread(target=self._merge_and_release, name="search-segment-merge", daemon=True).start()
+        else:
+            self._merge_and_release()
+        return True
+
+    def _merge_and_release(self) -> None:
+        try:
+            self.merge(self.merge_candidates())
+        finally:
+            with self._lock:
+                self._merging = False
+
+    def merge(self, segments: List[Segment]) -> Optional[Segment]:
+        """Rewrite the live docs of `segments` into one segment and swap it in."""
+        if not segments:
+            return None
+        sources = [(seg, local) for seg in segments for local, _ in seg.live_docs()]
+        merged = Segment(InvertedIndex.from_documents(seg.index.docs[local] for seg, local in sources))
+
+        with self._lock:
+            current = set(map(id, self.segments))
+            if not all(id(seg) in current for seg in segments):
+                return None  # another merge already replaced one of them
+            for new_local, (seg, local) in enumerate(sources):
+                key = seg.index.docs[local].key
+                if self._location(key) == (seg, local):
+                    self.live[key] = (merged, new_local)
+                else:
+                    merged.tombstone(new_local)  # changed or deleted while merging
+            gone = set(map(id, segments))
+            kept = [s for s in self.segments if id(s) not in gone]
+            self.segments = kept + ([merged] if len(merged) else [])
+        return merged
+
+    # ---------------------------
+    # Query
+    # ---------------------------
+    def __len__(self) -> int:
+        return len(self.live) + sum(s.live_count for s in self.segments if s.mapped)
+
+    def _idf(self, segments: List[Segment]):
+        n_docs = sum(len(s) for s in segments)
+
+        def idf_of(field_name: str, term: str) -> float:
+            df = sum(len(s.index.postings[field_name].get(term, ())) for s in segments)
+            return idf(n_docs, df)
+
+        return idf_of
+
+    def match(self, query: str, mode: str = "and") -> List[SearchDocument]:
+        return [
+            seg.index.docs[d]
+            for seg in self.segments
+            for d in seg.index.match(query, mode=mode)
+            if d not in seg.deleted
+        ]
+
+    def _matched(self, seg: Segment, query: str, mode: str, clients: Optional[Container[int]]) -> List[int]:
+        matched = [d for d in seg.index.match(query, mode=mode) if d not in seg.deleted]
+        if clients is not None:
+            owners = seg.index.client_ids
+            matched = [d for d in matched if owners[d] in clients]
+        return matched
+
+    def matched_clients(self, query: str, mode: str = "and") -> Bitmap:
+        """
+        Owning client ids of live docs matching `query` (docs without a client
+        excluded), as bitmap algebra: each segment's term bitmaps less its
+        deleted clients, OR'd across segments.
+        """
+        out = Bitmap()
+        for seg in self.segments:
+            out = out | (seg.index.match_clients(query, mode=mode) - seg.deleted_clients)
+        return out
+
+    def rank(
+        self,
+        query: str,
+        mode: str = "and",
+        offset: int = 0,
+        limit: int = 50,
+        clients: Optional[Container[int]] = None,
+    ) -> Tuple[int, List[Tuple[SearchDocument, float, Dict[str, float]]]]:
+        """
+        BM25-ranked page across segments: (total, [(doc, score, breakdown)]).
+        `clients` restricts hits to docs owned by those client ids (filters).
+        """
+        segments = self.segments
+        idf_of = self._idf(segments)
+
+        scores: Dict[Tuple[int, int], float] = {}
+        lookups = []
+        for seg_no, seg in enumerate(segments):
+            matched = self._matched(seg, query, mode, clients)
+            seg_lookups = seg.index.lookups(query, idf_of) if matched else []
+            lookups.append(seg_lookups)
+            for d, score in seg.index.score(matched, seg_lookups).items():
+                scores[(seg_no, d)] = score
+
+        page = top_k(scores, offset + limit)[offset:]
+        return len(scores), [
+            (
+                segments[seg_no].index.docs[d],
+                round(score, 4),
+                segments[seg_no].index.breakdown(d, lookups[seg_no]),
+            )
+            for (seg_no, d), score in page
+        ]
+
+    def fuzzy(
+        self, query: str, limit: Optional[int] = 50, clients: Optional[Container[int]] = None
+    ) -> List[Tuple[SearchDocument, float]]:
+        """Best fuzzy name matches first; limit=None returns every match (each segment's trigram candidates)."""
+        hits: List[Tuple[float, int, int]] = []
+        segments = self.segments
+        for seg_no, seg in enumerate(segments):
+            owners = seg.index.client_ids
+            seg_limit = None if limit is None else limit + len(seg.deleted)
+            for d, score in seg.index.fuzzy(query, limit=seg_limit):
+                if d not in seg.deleted and (clients is None or owners[d] in clients):
+                    hits.append((score, seg_no, d))
+        hits.sort(key=lambda h: (-h[0], h[1], h[2]))
+        return [(segments[seg_no].index.docs[d], score) for score, seg_no, d in hits[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        segments = self.segments
+        return {
+            "documents": len(self),
+            "segments": len(segments),
+            "segment_sizes": [len(s) for s in segments],
+            "deleted": sum(len(s.deleted) for s in segments),
+            "merging": self._merging,
+        }
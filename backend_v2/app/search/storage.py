@@ -0,0 +1,401 @@
+"""
+Read-only binary search segments, opened with mmap.
+
+A segment file holds everything a frozen InvertedIndex serves queries
+from (term dictionaries, postings, term frequencies, IDF, length norms,
+stored documents and the trigram name index) as flat little-endian
+arrays. MappedIndex exposes them through memoryviews over the mapping,
+so opening a segment reads only the header, and every worker process
+that opens the same file shares its pages through the OS page cache.
+
+Layout:
+    b"SCVSEG01" | u32 header length | JSON header | sections (8-byte aligned)
+
+The header maps section name -> [offset, nbytes, typecode]. Segment
+directories carry a manifest.json listing the segment files plus the
+database watermarks they were built at (see tools/build_search_segments.py).
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.search.analysis import FIELDS
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.segments import Segment, SegmentedIndex
+from app.search.trigram import TrigramIndex
+
+
+MAGIC = b"SCVSEG01"
+FORMAT_VERSION = 2
+MANIFEST = "manifest.json"
+SEGMENT_SUFFIX = ".scvseg"
+# Replaced segment files stay on disk this long (seconds) after the manifest
+# stops referencing them, for workers that read the previous manifest
+RETAIN_SECONDS = 3600.0
+
+_ALIGN = 8
+
+
+class SegmentFormatError(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Read-side views
+# -------------------------------------------------------------------
+class _Strings(Sequence[str]):
+    """Indexed UTF-8 strings: offsets (u32, n + 1) into one blob."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self._blob[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+    def find(self, value: str) -> int:
+        """Position of `value` in a sorted table, or -1."""
+        i = bisect_left(self, value)
+        return i if i < len(self) and self[i] == value else -1
+
+
+class _Ragged(Sequence[memoryview]):
+    """Row i = data[starts[i]:starts[i + 1]]."""
+
+    def __init__(self, starts: memoryview, data: memoryview) -> None:
+        self._starts = starts
+        self._data = data
+
+    def __len__(self) -> int:
+        return max(len(self._starts) - 1, 0)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        return self._data[self._starts[i] : self._starts[i + 1]]
+
+
+class _TermArrays:
+    """Read-only mapping term -> memoryview slice (postings or term frequencies)."""
+
+    def __init__(self, terms: _Strings, rows: _Ragged) -> None:
+        self._terms = terms
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def get(self, term: str, default: Any = None) -> Any:
+        i = self._terms.find(term)
+        return self._rows[i] if i >= 0 else default
+
+    def __getitem__(self, term: str) -> memoryview:
+        i = self._terms.find(term)
+        if i < 0:
+            raise KeyError(term)
+        return self._rows[i]
+
+    def __contains__(self, term: object) -> bool:
+        return isinstance(term, str) and self._terms.find(term) >= 0
+
+
+class _TermValues:
+    """Read-only mapping term -> float (per-term IDF)."""
+
+    def __init__(self, terms: _Strings, values: memoryview) -> None:
+        self._terms = terms
+        self._values = values
+
+    def __getitem__(self, term: str) -> float:
+        i = self._terms.find(term)
+        if i < 0:
+            raise KeyError(term)
+        return self._values[i]
+
+
+class _Documents(Sequence[SearchDocument]):
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        self._raw = _Strings(offsets, blob)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        key, kind, client_id, name, identifiers, email, address = json.loads(self._raw[i])
+        return SearchDocument(
+            key=key,
+            kind=kind,
+            client_id=client_id,
+            name=name,
+            identifiers=tuple(identifiers),
+            email=email,
+            address=address,
+        )
+
+
+class MappedTrigramIndex(TrigramIndex):
+    def __init__(self, sections: Dict[str, memoryview]) -> None:
+        self.names = _Strings(sections["tri.names.offsets"], sections["tri.names.blob"])
+        self.doc_ids = _Ragged(sections["tri.doc_starts"], sections["tri.doc_ids"])
+        self.gram_counts = sections["tri.gram_counts"]
+        grams = _Strings(sections["tri.grams.offsets"], sections["tri.grams.blob"])
+        self.postings = _TermArrays(grams, _Ragged(sections["tri.starts"], sections["tri.postings"]))
+
+
+class MappedIndex(InvertedIndex):
+    """A frozen InvertedIndex served from an mmapped segment file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header, sections = _read_sections(self._mmap, self.path)
+        self.header = header
+
+        self.docs = _Documents(sections["docs.offsets"], sections["docs.blob"])  # type: ignore[assignment]
+        self.client_ids = sections["docs.client_ids"]  # type: ignore[assignment]
+        self._keys = _Strings(sections["keys.offsets"], sections["keys.blob"])
+        self._key_locals = sections["keys.locals"]
+        self.postings = {}
+        self.tfs = {}
+        self.idf = {}
+        self.norms = {}
+        self.lengths = {}
+        for field in FIELDS:
+            terms = _Strings(sections[f"{field}.terms.offsets"], sections[f"{field}.terms.blob"])
+            starts = sections[f"{field}.starts"]
+            self.postings[field] = _TermArrays(terms, _Ragged(starts, sections[f"{field}.postings"]))  # type: ignore[assignment]
+            self.tfs[field] = _TermArrays(terms, _Ragged(starts, sections[f"{field}.tfs"]))  # type: ignore[assignment]
+            self.idf[field] = _TermValues(terms, sections[f"{field}.idf"])  # type: ignore[assignment]
+            self.norms[field] = sections[f"{field}.norms"]  # type: ignore[assignment]
+        self.trigrams = MappedTrigramIndex(sections)
+        self._client_bitmaps = {}
+        self._building = None
+
+    def locate(self, key: str) -> Optional[int]:
+        """Local doc id for a document key, via the sorted key table (no doc decoding)."""
+        i = self._keys.find(key)
+        return self._key_locals[i] if i >= 0 else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self.docs),
+            "distinct_names": len(self.trigrams),
+            "terms": {f: len(p) for f, p in self.postings.items()},
+            "file": str(self.path),
+            "bytes": len(self._mmap),
+        }
+
+
+def _read_sections(buf: mmap.mmap, path: Path) -> Tuple[Dict[str, Any], Dict[str, memoryview]]:
+    if buf[: len(MAGIC)] != MAGIC:
+        raise SegmentFormatError(f"{path}: not a search segment")
+    (header_len,) = struct.unpack_from("<I", buf, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(buf[start : start + header_len]))
+    if header.get("version") != FORMAT_VERSION:
+        raise SegmentFormatError(f"{path}: unsupported segment version {header.get('version')}")
+    if header.get("byteorder") != sys.byteorder:
+        raise SegmentFormatError(f"{path}: written as {header.get('byteorder')}-endian")
+
+    view = memoryview(buf)
+    sections = {
+        name: view[offset : offset + nbytes].cast(typecode)
+        for name, (offset, nbytes, typecode) in header["sections"].items()
+    }
+    return header, sections
+
+
+# -------------------------------------------------------------------
+# Writing
+# -------------------------------------------------------------------
+def _string_table(values: Iterable[str]) -> Tuple[array, bytes]:
+    offsets = array("I", [0])
+    blob = bytearray()
+    for v in values:
+        blob += v.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def _ragged(rows: Iterable[Sequence[int]], typecode: str) -> Tuple[array, array]:
+    starts = array("I", [0])
+    data = array(typecode)
+    for row in rows:
+        data.extend(row)
+        starts.append(len(data))
+    return starts, data
+
+
+def _doc_record(doc: SearchDocument) -> str:
+    return json.dumps(
+        [doc.key, doc.kind, doc.client_id, doc.name, list(doc.identifiers), doc.email, doc.address],
+        separators=(",", ":"),
+    )
+
+
+def write_segment(index: InvertedIndex, path: Path) -> Path:
+    """Serialise a frozen InvertedIndex to `path` (written to a temp file, then renamed)."""
+    index.freeze()
+    sections: List[Tuple[str, str, bytes]] = []
+
+    def add(name: str, typecode: str, data: Any) -> None:
+        sections.append((name, typecode, data.tobytes() if isinstance(data, array) else bytes(data)))
+
+    offsets, blob = _string_table(_doc_record(d) for d in index.docs)
+    add("docs.offsets", "I", offsets)
+    add("docs.blob", "B", blob)
+    add("docs.client_ids", "I", index.client_ids)
+    by_key = sorted((d.key, local) for local, d in enumerate(index.docs))
+    offsets, blob = _string_table(k for k, _ in by_key)
+    add("keys.offsets", "I", offsets)
+    add("keys.blob", "B", blob)
+    add("keys.locals", "I", array("I", (local for _, local in by_key)))
+
+    for field in FIELDS:
+        terms = sorted(index.postings[field])
+        offsets, blob = _string_table(terms)
+        add(f"{field}.terms.offsets", "I", offsets)
+        add(f"{field}.terms.blob", "B", blob)
+        starts, postings = _ragged((index.postings[field][t] for t in terms), "I")
+        _, tfs = _ragged((index.tfs[field][t] for t in terms), "H")
+        add(f"{field}.starts", "I", starts)
+        add(f"{field}.postings", "I", postings)
+        add(f"{field}.tfs", "H", tfs)
+        add(f"{field}.idf", "f", array("f", (index.idf[field][t] for t in terms)))
+        add(f"{field}.norms", "f", array("f", index.norms[field]))
+
+    tri = index.trigrams
+    offsets, blob = _string_table(tri.names)
+    add("tri.names.offsets", "I", offsets)
+    add("tri.names.blob", "B", blob)
+    starts, doc_ids = _ragged(tri.doc_ids, "I")
+    add("tri.doc_starts", "I", starts)
+    add("tri.doc_ids", "I", doc_ids)
+    add("tri.gram_counts", "H", array("H", tri.gram_counts))
+    grams = sorted(tri.postings)
+    offsets, blob = _string_table(grams)
+    add("tri.grams.offsets", "I", offsets)
+    add("tri.grams.blob", "B", blob)
+    starts, postings = _ragged((tri.postings[g] for g in grams), "I")
+    add("tri.starts", "I", starts)
+    add("tri.postings", "I", postings)
+
+    # Section offsets depend on the header size, which depends on the offsets:
+    # lay out relative to a padded header, growing the pad until it fits.
+    pad = 4096
+    while True:
+        table: Dict[str, List[Any]] = {}
+        offset = pad
+        for name, typecode, data in sections:
+            table[name] = [offset, len(data), typecode]
+            offset += len(data) + (-len(data) % _ALIGN)
+        header = json.dumps(
+            {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "documents": len(index.docs), "sections": table}
+        ).encode("utf-8")
+        if len(MAGIC) + 4 + len(header) <= pad:
+            break
+        pad *= 2
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(b"\0" * (pad - len(MAGIC) - 4 - len(header)))
+        for _, _, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % _ALIGN))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+# -------------------------------------------------------------------
+# Segment directories
+# -------------------------------------------------------------------
+def write_index_dir(
+    directory: Path,
+    segments: Iterable[InvertedIndex],
+    meta: Optional[Dict[str, Any]] = None,
+    generation: Optional[str] = None,
+    retain_seconds: float = RETAIN_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Write segments plus manifest.json, replacing the previous generation.
+
+    The manifest is replaced atomically, so workers opening the directory
+    see either the previous generation or the new one. Files it no longer
+    references are not deleted now (a worker may have just read the previous
+    manifest and not opened them yet): the manifest lists them under
+    "retired" with the time they were replaced, and the first write at least
+    `retain_seconds` later deletes them. A file that cannot be deleted yet
+    (e.g. still mapped by a worker on Windows) stays listed.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    generation = generation or str(os.getpid())
+
+    names: List[str] = []
+    for n, index in enumerate(segments):
+        name = f"seg-{generation}-{n:05d}{SEGMENT_SUFFIX}"
+        write_segment(index, directory / name)
+        names.append(name)
+
+    now = time.time()
+    previous = read_manifest(directory) or {}
+    current = set(previous.get("segments") or [])  # still served until the swap below
+    retired: Dict[str, float] = dict(previous.get("retired") or {})
+    for p in directory.glob(f"*{SEGMENT_SUFFIX}"):
+        if p.name not in names:
+            retired.setdefault(p.name, now)
+    for name, since in list(retired.items()):
+        if name in names or not (directory / name).exists():
+            del retired[name]
+        elif name not in current and now - since >= retain_seconds:
+            try:
+                (directory / name).unlink()
+                del retired[name]
+            except OSError:
+                pass
+
+    manifest = {"version": FORMAT_VERSION, "segments": names, **(meta or {}), "retired": retired}
+    tmp = directory / (MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, directory / MANIFEST)
+    return manifest
+
+
+def read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    path = Path(directory) / MANIFEST
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def open_index_dir(directory: Path, background_merge: bool = True) -> Tuple[SegmentedIndex, Dict[str, Any]]:
+    """Map every segment in the manifest; no documents are read or analysed."""
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(Path(directory) / MANIFEST)
+    segments = [Segment(MappedIndex(Path(directory) / name)) for name in manifest["segments"]]
+    return SegmentedIndex(segments, background_merge=background_merge), manifest
@@ -0,0 +1,237 @@
+"""
+Prefix autocomplete for the client picker (type-ahead on names and external ids).
+
+Keys live in one sorted list searched with bisect, so a prefix maps to a
+contiguous range [lo, hi). Each key points at a client entry with a
+static weight; the best N clients in the range are taken with a heap over
+fixed-size blocks (per-block max weight). Very short prefixes, whose ranges
+cover a large part of the corpus, are answered from a top-N table built
+with the index; other wide ranges (e.g. a shared external id stem like
+"CRM-") are memoised on first use, since the sorted keys are immutable.
+
+Clients created or changed after the build go to a small delta (upsert),
+which is scanned at query time and merged with the sorted keys' answer;
+their entries from the build are skipped. Deleted clients are kept in the
+delta as removals (remove), so only their built entries are skipped. The delta is emptied by the
+next build.
+
+Keys are namespaced:
+  "n:<normalised name from each word start>"  e.g. "n:capital markets llp"
+  "i:<normalised external id>"                e.g. "i:CRMFI002"
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.normalisation import normalise_identifier, normalise_text
+
+
+_BLOCK = 64
+_HEAD_LEN = 2  # prefixes up to this many characters (after the namespace) are precomputed
+_HEAD_N = 50
+_WIDE_RANGE = 4_096  # ranges at least this wide have their answers memoised
+_WIDE_CACHE_SIZE = 4_096
+_HIGH = "\U0010ffff"
+# Clients changed since the build past which the owner should rebuild
+DELTA_REBUILD = 10_000
+
+# Static segment weights (matched on the normalised segment prefix); unknown -> default
+SEGMENT_WEIGHTS: Tuple[Tuple[str, float], ...] = (
+    ("financial institution", 1.0),
+    ("corporate large cap", 0.9),
+    ("asset manager", 0.8),
+    ("corporate mid cap", 0.7),
+    ("public sector", 0.6),
+)
+DEFAULT_WEIGHT = 0.5
+
+
+def segment_weight(segment: Optional[str]) -> float:
+    key = normalise_text(segment) or ""
+    for prefix, weight in SEGMENT_WEIGHTS:
+        if key.startswith(prefix):
+            return weight
+    return DEFAULT_WEIGHT
+
+
+def _name_keys(name: Optional[str]) -> List[str]:
+    words = (normalise_text(name) or "").split()
+    return ["n:" + " ".join(words[i:]) for i in range(len(words))]
+
+
+def _entry_keys(name: Optional[str], external_id: Optional[str]) -> List[str]:
+    keys = _name_keys(name)
+    ident = normalise_identifier(external_id)
+    if ident:
+        keys.append("i:" + ident)
+    return keys
+
+
+class SuggestIndex:
+    """
+    Sorted keys -> client entries, with per-key weights and per-block maxima.
+
+    Entries (client_id, label, external_id, weight) are stored once; keys only
+    carry the entry number.
+    """
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self.key_entry = array("I")
+        self.key_weight = array("f")
+        self.block_max = array("f")
+
+        self.client_ids = array("I")
+        self.labels: List[str] = []
+        self.external_ids: List[Optional[str]] = []
+        self.weights = array("f")
+
+        # namespaced short prefix -> best entries, weight desc
+        self.head: Dict[str, List[int]] = {}
+        self._wide: Dict[Tuple[Tuple[str, ...], int], List[Dict[str, Any]]] = {}
+
+        # client_id -> (label, external_id, weight, keys) upserted since the build,
+        # or None once removed; replaced as a whole on write, so readers take it
+        # without a lock
+        self.delta: Dict[int, Optional[Tuple[str, Optional[str], float, Tuple[str, ...]]]] = {}
+        self._delta_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, clients: Iterable[Tuple[int, str, Optional[str], float]]) -> "SuggestIndex":
+        """Build from (client_id, full_name, external_id, weight) rows."""
+        idx = cls()
+        pairs: List[Tuple[str, int]] = []
+        for client_id, name, external_id, weight in clients:
+            entry = len(idx.labels)
+            idx.client_ids.append(client_id)
+            idx.labels.append(name)
+            idx.external_ids.append(external_id)
+            idx.weights.append(weight)
+
+            pairs.extend((k, entry) for k in _entry_keys(name, external_id))
+
+        pairs.sort()
+        idx.keys = [k for k, _ in pairs]
+        idx.key_entry = array("I", (e for _, e in pairs))
+        idx.key_weight = array("f", (idx.weights[e] for _, e in pairs))
+        idx.block_max = array(
+            "f", (max(idx.key_weight[i : i + _BLOCK]) for i in range(0, len(pairs), _BLOCK))
+        )
+
+        for pos in sorted(range(len(pairs)), key=lambda p: (-idx.key_weight[p], p)):
+            key, entry = pairs[pos]
+            for n in range(1, _HEAD_LEN + 1):
+                if len(key) < 2 + n:
+                    break
+                best = idx.head.setdefault(key[: 2 + n], [])
+                if len(best) < _HEAD_N and entry not in best:
+                    best.append(entry)
+        return idx
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _HIGH, lo)
+        return lo, hi
+
+    def _push_range(self, heap: List[Tuple[float, int, int]], lo: int, hi: int) -> None:
+        """Push keys in [lo, hi): partial blocks key by key, whole blocks as one entry."""
+        first = -(-lo // _BLOCK)  # first whole block
+        last = hi // _BLOCK  # one past the last whole block
+        if first >= last:
+            heap.extend((-self.key_weight[i], 0, i) for i in range(lo, hi))
+            return
+        weights, block_max = self.key_weight, self.block_max
+        heap.extend((-weights[i], 0, i) for i in range(lo, first * _BLOCK))
+        heap.extend((-block_max[b], 1, b) for b in range(first, last))
+        heap.extend((-weights[i], 0, i) for i in range(last * _BLOCK, hi))
+
+    @property
+    def needs_rebuild(self) -> bool:
+        return len(self.delta) >= DELTA_REBUILD
+
+    def upsert(self, client_id: int, name: str, external_id: Optional[str], weight: float) -> None:
+        """New or changed client: searchable at once through the delta."""
+        entry = (name, external_id, weight, tuple(_entry_keys(name, external_id)))
+        with self._delta_lock:
+            self.delta = {**self.delta, client_id: entry}
+
+    def remove(self, client_id: int) -> None:
+        """Deleted client: no longer suggested."""
+        with self._delta_lock:
+            self.delta = {**self.delta, client_id: None}
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top `limit` distinct clients whose name (from any word) or external id starts with `query`."""
+        text = normalise_text(query)
+        ident = normalise_identifier(query)
+        if not text and not ident:
+            return []
+
+        prefixes = [p for p in ("n:" + text if text else None, "i:" + ident if ident else None) if p]
+        delta = self.delta
+        if not delta:
+            return [dict(s) for s in self._suggest_built(prefixes, limit)]
+
+        # Built entries of clients in the delta are dropped, so fetch that many more
+        hits = [dict(s) for s in self._suggest_built(prefixes, limit + len(delta)) if s["client_id"] not in delta]
+        for client_id, entry in delta.items():
+            if entry is None:  # removed
+                continue
+            label, external_id, weight, keys = entry
+            if any(k.startswith(p) for k in keys for p in prefixes):
+                hits.append({"client_id": client_id, "label": label, "external_id": external_id, "weight": round(weight, 4)})
+        hits.sort(key=lambda s: -s["weight"])
+        return hits[:limit]
+
+    def _suggest_built(self, prefixes: List[str], limit: int) -> List[Dict[str, Any]]:
+        """Answer from the built keys only (cached lists are shared: callers copy)."""
+        if limit <= _HEAD_N and all(len(p) <= 2 + _HEAD_LEN for p in prefixes):
+            best = [e for p in prefixes for e in self.head.get(p, ())]
+            best.sort(key=lambda e: -self.weights[e])
+            return [self._suggestion(e) for e in dict.fromkeys(best)][:limit]
+
+        ranges = [self._range(p) for p in prefixes]
+        wide = sum(hi - lo for lo, hi in ranges) >= _WIDE_RANGE
+        cache_key = (tuple(prefixes), limit)
+        if wide and cache_key in self._wide:
+            return self._wide[cache_key]
+
+        heap: List[Tuple[float, int, int]] = []
+        for lo, hi in ranges:
+            self._push_range(heap, lo, hi)
+        heapq.heapify(heap)
+
+        seen = set()
+        out: List[Dict[str, Any]] = []
+        while heap and len(out) < limit:
+            _, is_block, pos = heapq.heappop(heap)
+            if is_block:
+                start = pos * _BLOCK
+                for i in range(start, start + _BLOCK):
+                    heapq.heappush(heap, (-self.key_weight[i], 0, i))
+                continue
+            entry = self.key_entry[pos]
+            if entry in seen:
+                continue
+            seen.add(entry)
+            out.append(self._suggestion(entry))
+
+        if wide and len(self._wide) < _WIDE_CACHE_SIZE:
+            self._wide[cache_key] = out
+        return out
+
+    def _suggestion(self, entry: int) -> Dict[str, Any]:
+        return {
+            "client_id": self.client_ids[entry],
+            "label": self.labels[entry],
+            "external_id": self.external_ids[entry],
+            "weight": round(self.weights[entry], 4),
+        }
@@ -0,0 +1,182 @@
+"""
+Character-trigram index for typo-tolerant name search (FT-09 / ST-18).
+
+Evaluation is candidate-then-rerank:
+  1. candidates: prefix filtering over trigram postings. A name sharing at
+     least `m` of the query's T trigrams must appear in one of the T - m + 1
+     rarest postings, so only those lists are scanned; the remaining
+     trigrams are counted for the surviving candidates only.
+  2. filter: Dice coefficient on trigram sets, bounded to `max_candidates`.
+  3. rerank: bounded Levenshtein distance on the surviving candidates.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.normalisation import normalise_name
+
+
+def trigrams(value: str) -> List[str]:
+    """Padded trigrams: "acme" -> ["  a", " ac", "acm", "cme", "me "]."""
+    s = f"  {value} "
+    return [s[i : i + 3] for i in range(len(s) - 2)]
+
+
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> int:
+    """
+    Edit distance, or max_dist + 1 as soon as it must exceed max_dist.
+
+    Only the diagonal band |i - j| <= max_dist is evaluated (Ukkonen).
+    """
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    if len(a) > len(b):
+        a, b = b, a
+
+    over = max_dist + 1
+    n = len(a)
+    prev = [i if i <= max_dist else over for i in range(n + 1)]
+    for j, cb in enumerate(b, 1):
+        lo = max(1, j - max_dist)
+        hi = min(n, j + max_dist)
+        cur = [over] * (n + 1)
+        cur[0] = j if j <= max_dist else over
+        row_min = cur[0]
+        for i in range(lo, hi + 1):
+            d = prev[i - 1] if a[i - 1] == cb else prev[i - 1] + 1
+            if prev[i] + 1 < d:
+                d = prev[i] + 1
+            if cur[i - 1] + 1 < d:
+                d = cur[i - 1] + 1
+            cur[i] = d
+            if d < row_min:
+                row_min = d
+        if row_min > max_dist:
+            return over
+        prev = cur
+    return min(prev[n], over)
+
+
+class TrigramIndex:
+    """
+    Trigram postings over distinct normalised names.
+
+    name ids are dense; `doc_ids[name_id]` lists the documents carrying that name.
+    """
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.doc_ids: List[array] = []
+        self.gram_counts = array("H")
+        self.postings: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_names(cls, names: Iterable[Tuple[int, Optional[str]]]) -> "TrigramIndex":
+        """Build from (doc_id, raw name) pairs."""
+        idx = cls()
+        name_ids: Dict[str, int] = {}
+        building: Dict[str, List[int]] = {}
+
+        for doc_id, raw in names:
+            name = normalise_name(raw)
+            if not name:
+                continue
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = len(idx.names)
+                name_ids[name] = name_id
+                idx.names.append(name)
+                idx.doc_ids.append(array("I"))
+                grams = set(trigrams(name))
+                idx.gram_counts.append(min(len(grams), 0xFFFF))
+                for g in grams:
+                    building.setdefault(g, []).append(name_id)
+            idx.doc_ids[name_id].append(doc_id)
+
+        idx.postings = {g: array("I", ids) for g, ids in building.items()}
+        return idx
+
+    def candidates(
+        self,
+        query: str,
+        min_similarity: float = 0.4,
+        max_candidates: int = 100,
+    ) -> List[Tuple[int, float]]:
+        """(name_id, dice) pairs above `min_similarity`, best first, at most max_candidates."""
+        grams = set(trigrams(query))
+        if not grams:
+            return []
+
+        ordered = sorted(grams, key=lambda g: len(self.postings.get(g, ())))
+        t = len(ordered)
+        # Dice >= s with overlap <= |c|  =>  overlap >= s * T / (2 - s)
+        min_overlap = max(1, math.ceil(min_similarity * t / (2.0 - min_similarity) - 1e-9))
+        split = t - min_overlap + 1
+        prefix, rest = ordered[:split], ordered[split:]
+
+        counts: Counter = Counter()
+        for g in prefix:
+            counts.update(self.postings.get(g, ()))
+
+        rest_postings = [self.postings[g] for g in rest if g in self.postings]
+        gram_counts = self.gram_counts
+        half_s = min_similarity / 2.0
+        reachable = len(rest_postings)
+        # Drop names that cannot reach the threshold even if every remaining trigram matches,
+        # then count the remaining trigrams for the survivors only (set probes run in C)
+        live = {n for n, overlap in counts.items() if overlap + reachable >= half_s * (t + gram_counts[n])}
+        for p in rest_postings:
+            counts.update(live.intersection(p))
+
+        scored: List[Tuple[int, float]] = []
+        for name_id in live:
+            dice = 2.0 * counts[name_id] / (t + gram_counts[name_id])
+            if dice >= min_similarity:
+                scored.append((name_id, dice))
+
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return scored[:max_candidates]
+
+    def search(
+        self,
+        raw_query: str,
+        limit: Optional[int] = 10,
+        min_similarity: float = 0.4,
+        max_candidates: int = 100,
+        max_edits: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Fuzzy name search. Returns (name_id, score) best first, where score is
+        normalised edit similarity (1.0 = identical after normalisation).
+        """
+        query = normalise_name(raw_query)
+        if not query:
+            return []
+        if max_edits is None:
+            max_edits = max(1, len(query) // 4)
+
+        reranked: List[Tuple[int, float]] = []
+        for name_id, dice in self.candidates(query, min_similarity, max_candidates):
+            name = self.names[name_id]
+            dist = bounded_levenshtein(query, name, max_edits)
+            if dist > max_edits:
+                continue
+            sim = 1.0 - dist / max(len(query), len(name))
+            reranked.append((name_id, round(sim, 4)))
+
+        reranked.sort(key=lambda x: (-x[1], x[0]))
+        return reranked[:limit]
+
+    def search_docs(self, raw_query: str, limit: Optional[int] = 10, **kwargs) -> List[Tuple[int, float]]:
+        """Like search(), expanded to (doc_id, score)."""
+        out: List[Tuple[int, float]] = []
+        for name_id, score in self.search(raw_query, limit=limit, **kwargs):
+            out.extend((d, score) for d in self.doc_ids[name_id])
+        return out[:limit]
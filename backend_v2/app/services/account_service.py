@@ -1,13 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.schemas.account import AccountCreate
 from app.repositories.account_repository import AccountRepository
+from app.services.client_summary_service import ClientSummaryService
 
 
 class AccountService:
 
     @staticmethod
     def create(db: Session, data: AccountCreate):
-        return AccountRepository.create(db, data)
+        account = AccountRepository.create(db, data)
+        ClientSummaryService.refresh_clients(db, [data.client_id])
+        return account
 
     @staticmethod
     def get(db: Session, account_id: int):
@@ -16,3 +20,7 @@ class AccountService:
     @staticmethod
     def list_by_client(db: Session, client_id: int):
         return AccountRepository.list_by_client(db, client_id)
+
+    @staticmethod
+    async def list_by_client_async(db: AsyncSession, client_id: int):
+        return await AccountRepository.list_by_client_async(db, client_id)
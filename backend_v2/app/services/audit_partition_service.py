@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.periodic import PeriodicTask
+
+
+_AVAILABLE_SQL = text("SELECT to_regprocedure('public.audit_events_ensure_partitions(integer)') IS NOT NULL")
+_ENSURE_SQL = text("SELECT public.audit_events_ensure_partitions(:months_ahead)")
+_DETACH_SQL = text("SELECT public.audit_events_detach_expired(:retention_months)")
+_PARTITIONS_SQL = text("""
+    SELECT c.relname AS partition, pg_get_expr(c.relpartbound, c.oid) AS bounds,
+           GREATEST(c.reltuples, 0)::bigint AS estimated_rows
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'public.audit_events'::regclass
+    ORDER BY c.relname
+""")
+
+
+class AuditPartitionService:
+    """
+    Monthly partitions of audit_events (migration 003).
+
+    ensure() creates the current month and the next `months_ahead` so the
+    audit writer never lands in the default partition (the API runs it
+    periodically, see start_maintenance); detach_expired() detaches months
+    past retention (left as plain tables for archiving). Both are no-ops
+    until the migration is applied.
+    """
+
+    @staticmethod
+    def available(db: Session) -> bool:
+        return bool(db.execute(_AVAILABLE_SQL).scalar())
+
+    @staticmethod
+    def ensure(db: Session, months_ahead: int) -> int:
+        if not AuditPartitionService.available(db):
+            return 0
+        created = db.execute(_ENSURE_SQL, {"months_ahead": months_ahead}).scalar()
+        db.commit()
+        return int(created or 0)
+
+    @staticmethod
+    def detach_expired(db: Session, retention_months: int) -> List[str]:
+        if not AuditPartitionService.available(db):
+            return []
+        detached = [r[0] for r in db.execute(_DETACH_SQL, {"retention_months": retention_months}).fetchall()]
+        db.commit()
+        return detached
+
+    @staticmethod
+    def partitions(db: Session) -> List[Dict[str, Any]]:
+        if not AuditPartitionService.available(db):
+            return []
+        return [dict(r) for r in db.execute(_PARTITIONS_SQL).mappings().all()]
+
+
+def _ensure_with(session_factory: Callable[[], Session], months_ahead: int) -> Callable[[], int]:
+    def ensure() -> int:
+        db = session_factory()
+        try:
+            return AuditPartitionService.ensure(db, months_ahead)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    return ensure
+
+
+_MAINTAINER: Optional[PeriodicTask] = None
+_LOCK = threading.Lock()
+
+
+def start_maintenance(session_factory: Callable[[], Session], months_ahead: int, interval: float) -> PeriodicTask:
+    """Run ensure() now and every `interval` seconds in this process (started once)."""
+    global _MAINTAINER
+    with _LOCK:
+        if _MAINTAINER is None:
+            _MAINTAINER = PeriodicTask("audit-partitions", _ensure_with(session_factory, months_ahead), interval)
+        return _MAINTAINER
+
+
+def stop_maintenance() -> None:
+    global _MAINTAINER
+    with _LOCK:
+        maintainer, _MAINTAINER = _MAINTAINER, None
+    if maintainer is not None:
+        maintainer.close()
+
+
+def maintenance_stats() -> Optional[Dict[str, Any]]:
+    return _MAINTAINER.stats() if _MAINTAINER is not None else None
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import uuid
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# Decision values that link a source record to a client (anything else is ignored)
+MATCHED_DECISIONS: Tuple[str, ...] = ("MATCH", "AUTO_MATCH", "MANUAL_MATCH")
+
+_RATIONALE = "Transitive closure of match_decisions (union-find)"
+
+# Rows per round trip when streaming edges / bulk inserting memberships
+_STREAM_BATCH = 10_000
+_INSERT_CHUNK = 5_000
+
+
+class UnionFind:
+    """
+    Array-backed disjoint-set forest over integer keys (client ids).
+
+    - keys are mapped to dense slots on first sight
+    - parent/rank live in flat `array`s (no per-node Python objects)
+    - find() uses path halving, union() uses union by rank
+    """
+
+    def __init__(self) -> None:
+        self._slot: Dict[int, int] = {}
+        self._keys = array("q")
+        self._parent = array("q")
+        self._rank = array("B")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._slot
+
+    def add(self, key: int) -> int:
+        slot = self._slot.get(key)
+        if slot is None:
+            slot = len(self._keys)
+            self._slot[key] = slot
+            self._keys.append(key)
+            self._parent.append(slot)
+            self._rank.append(0)
+        return slot
+
+    def _find_slot(self, slot: int) -> int:
+        parent = self._parent
+        while parent[slot] != slot:
+            parent[slot] = parent[parent[slot]]
+            slot = parent[slot]
+        return slot
+
+    def find(self, key: int) -> int:
+        """Return the representative key of the set containing `key`."""
+        return self._keys[self._find_slot(self.add(key))]
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets containing a and b. Returns False if already joined."""
+        ra = self._find_slot(self.add(a))
+        rb = self._find_slot(self.add(b))
+        if ra == rb:
+            return False
+
+        rank = self._rank
+        if rank[ra] < rank[rb]:
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        if rank[ra] == rank[rb]:
+            rank[ra] += 1
+        return True
+
+    def groups(self, min_size: int = 1) -> List[List[int]]:
+        """
+        Return the sets as sorted lists of keys (deterministic order:
+        groups sorted by their smallest key).
+        """
+        by_root: Dict[int, List[int]] = {}
+        for slot, key in enumerate(self._keys):
+            by_root.setdefault(self._find_slot(slot), []).append(key)
+
+        out = [sorted(g) for g in by_root.values() if len(g) >= min_size]
+        out.sort(key=lambda g: g[0])
+        return out
+
+
+def edges_from_decisions(rows: Iterable[Sequence[Any]]) -> Iterator[Tuple[int, int]]:
+    """
+    Turn (source_record_id, matched_client_id) rows, ordered by source_record_id,
+    into client<->client edges.
+
+    Every client matched from the same source record is linked to the first
+    client seen for that record, which is enough for the closure.
+    """
+    current_source: Optional[str] = None
+    anchor: Optional[int] = None
+
+    for source_record_id, client_id in rows:
+        if client_id is None:
+            continue
+        if source_record_id != current_source:
+            current_source = source_record_id
+            anchor = client_id
+            yield client_id, client_id
+            continue
+        yield anchor, client_id
+
+
+@dataclass(frozen=True)
+class ClusterBuildResult:
+    edges: int
+    clusters: int
+    members: int
+
+
+@dataclass(frozen=True)
+class ClusterMergeResult:
+    edges: int
+    clusters_created: int
+    clusters_merged: int
+    members_added: int
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class ClientClusterService:
+    """
+    Clustering stage: match_decisions -> client_clusters / client_cluster_members.
+
+    - build(): full rebuild, streaming every matched edge through one UnionFind
+    - merge_edges() / merge_run(): incremental, only touches clusters reached by new edges
+    """
+
+    @staticmethod
+    def _stream_edges(db: Session, sql: str, params: Dict[str, Any]) -> Iterator[Tuple[int, int]]:
+        result = db.execute(
+            text(sql),
+            params,
+            execution_options={"yield_per": _STREAM_BATCH},
+        )
+        return edges_from_decisions(result)
+
+    @staticmethod
+    def _insert_clusters(db: Session, groups: List[Tuple[str, List[int]]]) -> None:
+        """Bulk insert (cluster_id, [client_ids]) groups using unnest() arrays."""
+        cluster_ids = [cid for cid, _ in groups]
+        for chunk in _chunks(cluster_ids, _INSERT_CHUNK):
+            db.execute(
+                text("""
+                    INSERT INTO client_clusters (cluster_id, rationale)
+                    SELECT unnest(CAST(:cluster_ids AS uuid[])), :rationale
+                """),
+                {"cluster_ids": list(chunk), "rationale": _RATIONALE},
+            )
+
+        ClientClusterService._insert_members(
+            db, [(cid, client_id) for cid, members in groups for client_id in members]
+        )
+
+    @staticmethod
+    def _insert_members(db: Session, pairs: List[Tuple[str, int]]) -> None:
+        for chunk in _chunks(pairs, _INSERT_CHUNK):
+            db.execute(
+                text("""
+                    INSERT INTO client_cluster_members (cluster_id, client_id)
+                    SELECT * FROM unnest(CAST(:cluster_ids AS uuid[]), CAST(:client_ids AS integer[]))
+                """),
+                {
+                    "cluster_ids": [cid for cid, _ in chunk],
+                    "client_ids": [client_id for _, client_id in chunk],
+                },
+            )
+
+    @staticmethod
+    def build(db: Session, decisions: Sequence[str] = MATCHED_DECISIONS) -> ClusterBuildResult:
+        """
+        Rebuild every cluster from match_decisions.
+
+        Edges are streamed in source_record_id order (server-side cursor),
+        so memory is bounded by the number of distinct clients, not decisions.
+        """
+        uf = UnionFind()
+        edges = 0
+        for a, b in ClientClusterService._stream_edges(
+            db,
+            """
+                SELECT source_record_id::text, matched_client_id
+                FROM match_decisions
+                WHERE matched_client_id IS NOT NULL
+                  AND decision = ANY(:decisions)
+                ORDER BY source_record_id
+            """,
+            {"decisions": list(decisions)},
+        ):
+            uf.union(a, b)
+            edges += 1
+
+        groups = [(str(uuid.uuid4()), g) for g in uf.groups(min_size=2)]
+
+        db.execute(text("DELETE FROM client_cluster_members"))
+        db.execute(text("DELETE FROM client_clusters"))
+        ClientClusterService._insert_clusters(db, groups)
+        db.commit()
+
+        return ClusterBuildResult(
+            edges=edges,
+            clusters=len(groups),
+            members=sum(len(g) for _, g in groups),
+        )
+
+    @staticmethod
+    def merge_run(
+        db: Session,
+        match_run_id: str,
+        decisions: Sequence[str] = MATCHED_DECISIONS,
+    ) -> ClusterMergeResult:
+        """
+        Incrementally fold a match run into the existing clusters.
+
+        Pulls every matched decision for the source records touched by the run
+        (older decisions included) so new links to previously matched clients are seen.
+        """
+        edges = ClientClusterService._stream_edges(
+            db,
+            """
+                SELECT source_record_id::text, matched_client_id
+                FROM match_decisions
+                WHERE source_record_id IN (
+                        SELECT source_record_id
+                        FROM match_decisions
+                        WHERE match_run_id = CAST(:match_run_id AS uuid)
+                    )
+                  AND matched_client_id IS NOT NULL
+                  AND decision = ANY(:decisions)
+                ORDER BY source_record_id
+            """,
+            {"match_run_id": match_run_id, "decisions": list(decisions)},
+        )
+        return ClientClusterService.merge_edges(db, list(edges))
+
+    @staticmethod
+    def merge_edges(db: Session, edges: Iterable[Tuple[int, int]]) -> ClusterMergeResult:
+        """
+        Apply new client<->client edges without recomputing untouched clusters.
+
+        - clusters reached by the edges are loaded and unioned with the new edges
+        - a group spanning several clusters keeps the largest one and absorbs the rest
+        - clients not yet clustered are appended as members
+        """
+        uf = UnionFind()
+        edge_count = 0
+        for a, b in edges:
+            uf.union(a, b)
+            edge_count += 1
+
+        touched = [k for g in uf.groups() for k in g]
+        if not touched:
+            return ClusterMergeResult(edges=0, clusters_created=0, clusters_merged=0, members_added=0)
+
+        # Existing memberships for every client in the touched clusters
+        cluster_of: Dict[int, str] = {}
+        rows = db.execute(
+            text("""
+                SELECT m.cluster_id::text, m.client_id
+                FROM client_cluster_members m
+                WHERE m.cluster_id IN (
+                    SELECT cluster_id
+                    FROM client_cluster_members
+                    WHERE client_id = ANY(:client_ids)
+                )
+            """),
+            {"client_ids": touched},
+        ).fetchall()
+
+        first_member: Dict[str, int] = {}
+        for cluster_id, client_id in rows:
+            cluster_of[client_id] = cluster_id
+            anchor = first_member.setdefault(cluster_id, client_id)
+            uf.union(anchor, client_id)
+
+        cluster_sizes: Dict[str, int] = {}
+        for cluster_id in cluster_of.values():
+            cluster_sizes[cluster_id] = cluster_sizes.get(cluster_id, 0) + 1
+
+        new_groups: List[Tuple[str, List[int]]] = []
+        new_members: List[Tuple[str, int]] = []
+        absorbed_by: Dict[str, str] = {}
+
+        for group in uf.groups(min_size=2):
+            existing = sorted(
+                {cluster_of[c] for c in group if c in cluster_of},
+                key=lambda cid: (-cluster_sizes[cid], cid),
+            )
+            if not existing:
+                new_groups.append((str(uuid.uuid4()), group))
+                continue
+
+            survivor = existing[0]
+            for cid in existing[1:]:
+                absorbed_by[cid] = survivor
+            new_members.extend((survivor, c) for c in group if c not in cluster_of)
+
+        if absorbed_by:
+            params = {"absorbed": list(absorbed_by), "survivors": list(absorbed_by.values())}
+            db.execute(
+                text("""
+                    UPDATE client_cluster_members m
+                    SET cluster_id = x.survivor
+                    FROM unnest(CAST(:absorbed AS uuid[]), CAST(:survivors AS uuid[])) AS x(absorbed, survivor)
+                    WHERE m.cluster_id = x.absorbed
+                """),
+                params,
+            )
+            db.execute(
+                text("DELETE FROM client_clusters WHERE cluster_id = ANY(CAST(:absorbed AS uuid[]))"),
+                {"absorbed": params["absorbed"]},
+            )
+
+        ClientClusterService._insert_clusters(db, new_groups)
+        ClientClusterService._insert_members(db, new_members)
+        db.commit()
+
+        return ClusterMergeResult(
+            edges=edge_count,
+            clusters_created=len(new_groups),
+            clusters_merged=len(absorbed_by),
+            members_added=len(new_members) + sum(len(g) for _, g in new_groups),
+        )
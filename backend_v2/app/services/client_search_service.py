@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.periodic import PeriodicTask
+from app.search.bitmap import Bitmap
+from app.search.facets import FacetIndex
+from app.search.index import SearchDocument
+from app.search.segments import SegmentedIndex
+from app.search.storage import open_index_dir, read_manifest
+from app.search.suggest import SuggestIndex, segment_weight
+from app.services.search_hydration_service import SearchHydrationService
+
+
+_STREAM_BATCH = 10_000
+# search_changes entries are pruned after this (tools/build_search_segments.py)
+CHANGES_RETENTION = timedelta(days=7)
+
+# One index per worker process; built on first search or via rebuild(),
+# then kept current by this worker's writes (index_documents) and, for
+# everyone else's, by catch_up() from the watermarks it was built at
+_INDEX: Optional[SegmentedIndex] = None
+_WATERMARKS: Optional[Dict[str, Any]] = None
+_SUGGEST: Optional[SuggestIndex] = None
+_FACETS: Optional[FacetIndex] = None
+_CATCH_UP: Optional[PeriodicTask] = None
+_LOCK = threading.Lock()
+
+
+def client_document(r: Any) -> SearchDocument:
+    """`clients` row (ORM object or result row) -> search document."""
+    return SearchDocument(
+        key=f"client:{r.id}",
+        kind="client",
+        client_id=r.id,
+        name=r.full_name,
+        identifiers=(r.external_id, r.tax_id),
+        email=r.email,
+        address=r.primary_address,
+    )
+
+
+def contact_document(r: Any) -> SearchDocument:
+    """`crm_contacts` row (ORM object or result row) -> search document."""
+    return SearchDocument(
+        key=f"crm_contact:{r.id}",
+        kind="crm_contact",
+        client_id=None,
+        name=" ".join(p for p in (r.first_name, r.last_name) if p) or None,
+        identifiers=(r.source_record_id,),
+        email=r.email,
+    )
+
+
+def iter_documents(db: Session) -> Iterator[SearchDocument]:
+    """Stream searchable documents from `clients` and `crm_contacts`."""
+    clients = db.execute(
+        text("""
+            SELECT id, external_id, full_name, email, primary_address, tax_id
+            FROM clients
+            ORDER BY id
+        """),
+        execution_options={"yield_per": _STREAM_BATCH},
+    )
+    for r in clients:
+        yield client_document(r)
+
+    contacts = db.execute(
+        text("""
+            SELECT id::text AS id, source_system, source_record_id, first_name, last_name, email
+            FROM crm_contacts
+            ORDER BY created_at
+        """),
+        execution_options={"yield_per": _STREAM_BATCH},
+    )
+    for r in contacts:
+        yield contact_document(r)
+
+
+def current_watermarks(db: Session) -> Dict[str, Any]:
+    """
+    Where an index build stands relative to the tables (read before streaming):
+    the oldest transaction still running, as a 64-bit xid. Every change a
+    build cannot have seen was written by that transaction or a later one,
+    whatever order they commit in, so catch-up reads the search_changes
+    entries (migration 010) of transactions not older (iter_changes).
+    "applied" lists entries in that window already indexed.
+    """
+    txid = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")).scalar()
+    return {"txid": txid, "applied": []}
+
+
+_CHANGES_SQL = text("""
+    SELECT change_id, txid, source, row_key
+    FROM search_changes
+    WHERE txid >= CAST(:txid AS bigint)
+    ORDER BY change_id
+""")
+
+_CLIENTS_BY_ID_SQL = text("""
+    SELECT id, external_id, full_name, email, primary_address, tax_id, country, segment, risk_rating
+    FROM clients
+    WHERE id = ANY(:ids)
+""")
+
+_OPEN_FLAGS_BY_CLIENT_SQL = text("""
+    SELECT client_id, code
+    FROM kyc_flags
+    WHERE client_id = ANY(:ids) AND upper(status) = 'OPEN'
+""")
+
+_CONTACTS_BY_ID_SQL = text("""
+    SELECT id::text AS id, source_system, source_record_id, first_name, last_name, email
+    FROM crm_contacts
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+""")
+
+
+def iter_changes(db: Session, watermarks: Dict[str, Any]) -> Iterator[Any]:
+    """search_changes entries of transactions since `watermarks` (ix_search_changes_txid)."""
+    yield from db.execute(_CHANGES_SQL, {"txid": watermarks["txid"]})
+
+
+def iter_suggestions(db: Session) -> Iterator[Tuple[int, str, Optional[str], float]]:
+    """(client_id, full_name, external_id, static weight) for the type-ahead index."""
+    rows = db.execute(
+        text("SELECT id, full_name, external_id, segment FROM clients"),
+        execution_options={"yield_per": _STREAM_BATCH},
+    )
+    for r in rows:
+        yield r.id, r.full_name, r.external_id, segment_weight(r.segment)
+
+
+def build_facets(db: Session) -> FacetIndex:
+    clients = db.execute(
+        text("SELECT id, country, segment, risk_rating FROM clients"),
+        execution_options={"yield_per": _STREAM_BATCH},
+    )
+    open_flags = db.execute(
+        text("SELECT client_id, code FROM kyc_flags WHERE upper(status) = 'OPEN'"),
+        execution_options={"yield_per": _STREAM_BATCH},
+    )
+    return FacetIndex.build(((r.id, r.country, r.segment, r.risk_rating) for r in clients), open_flags)
+
+
+def _older_than_change_feed(built_at: Optional[str]) -> bool:
+    """A build from before the oldest retained search_changes cannot be caught up."""
+    if not built_at:
+        return True
+    return datetime.fromisoformat(built_at) < datetime.now(timezone.utc) - CHANGES_RETENTION
+
+
+def _hit(doc: SearchDocument) -> Dict[str, Any]:
+    return {
+        "doc_id": doc.key,
+        "kind": doc.kind,
+        "client_id": doc.client_id,
+        "name": doc.name,
+    }
+
+
+class ClientSearchService:
+    """
+    FT-08 / ST-16 search over an in-process, segmented inverted index.
+
+    The index is built from the database once per process and then served
+    from memory; search never reads the client tables. Writes that change
+    searchable data push their rows through index_documents() so this
+    worker's index stays current without a rebuild; catch_up() (every
+    SEARCH_CATCH_UP_SECONDS, see start_catch_up) picks up rows written
+    through other workers and processes.
+    """
+
+    @staticmethod
+    def rebuild(db: Session, workers: int = 1) -> Dict[str, Any]:
+        global _INDEX, _FACETS, _WATERMARKS
+        watermarks = current_watermarks(db)
+        index = SegmentedIndex.from_documents(iter_documents(db), workers=workers)
+        facets = build_facets(db)
+        with _LOCK:
+            _INDEX = index
+            _FACETS = facets
+            _WATERMARKS = watermarks
+        return {**index.stats(), "suggest": ClientSearchService.rebuild_suggest(db)}
+
+    @staticmethod
+    def load_persisted(db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Open the prebuilt segments in SEARCH_INDEX_DIR (mmap; no documents are read),
+        then index rows written since the build. None when no build is configured,
+        or the build predates the change feed or its retention (rebuild it).
+        """
+        global _INDEX, _WATERMARKS
+        directory = settings.SEARCH_INDEX_DIR
+        if not directory or read_manifest(Path(directory)) is None:
+            return None
+        watermarks = current_watermarks(db)
+        index, manifest = open_index_dir(Path(directory))
+        built_at = manifest.get("watermarks") or {}
+        if "txid" not in built_at or _older_than_change_feed(manifest.get("built_at")):
+            return None
+        caught_up, applied = ClientSearchService._apply_changes(db, index, None, built_at, watermarks)
+        with _LOCK:
+            _INDEX = index
+            _WATERMARKS = {**watermarks, "applied": applied}
+        return {**index.stats(), "caught_up": caught_up}
+
+    @staticmethod
+    def _apply_changes(
+        db: Session,
+        index: SegmentedIndex,
+        facets: Optional[FacetIndex],
+        since: Dict[str, Any],
+        now: Dict[str, Any],
+    ) -> Tuple[int, List[int]]:
+        """
+        Index the rows changed since `since` (skipping entries it lists as
+        applied), remove those since deleted, and re-read the open KYC flags
+        of clients whose flags changed. Returns the documents written
+        or removed, and the entries read that `now`'s window will read again.
+        """
+        skip = set(since.get("applied") or ())
+        changes = list(iter_changes(db, since))
+        reread_from = int(now["txid"])
+        applied = [c.change_id for c in changes if c.txid >= reread_from]
+        keys: Dict[str, Set[str]] = {"clients": set(), "crm_contacts": set(), "kyc_flags": set()}
+        for c in changes:
+            if c.change_id not in skip:
+                keys.setdefault(c.source, set()).add(c.row_key)
+        if facets is not None and keys["kyc_flags"]:
+            # kyc_flags entries are keyed by client: re-read its open flags
+            flagged = [int(k) for k in keys["kyc_flags"]]
+            open_codes: Dict[int, List[str]] = {client_id: [] for client_id in flagged}
+            for r in db.execute(_OPEN_FLAGS_BY_CLIENT_SQL, {"ids": flagged}):
+                open_codes[r.client_id].append(r.code)
+            for client_id, codes in open_codes.items():
+                facets.set_flags(client_id, codes)
+        if not keys["clients"] and not keys["crm_contacts"]:
+            return 0, applied
+
+        clients = (
+            list(db.execute(_CLIENTS_BY_ID_SQL, {"ids": [int(k) for k in keys["clients"]]}))
+            if keys["clients"] else []
+        )
+        contacts = (
+            list(db.execute(_CONTACTS_BY_ID_SQL, {"ids": list(keys["crm_contacts"])}))
+            if keys["crm_contacts"] else []
+        )
+        gone_clients = keys["clients"] - {str(r.id) for r in clients}
+        gone_contacts = keys["crm_contacts"] - {r.id for r in contacts}
+
+        if facets is not None:
+            for r in clients:
+                facets.upsert_client(r.id, r.country, r.segment, r.risk_rating)
+            for k in gone_clients:
+                facets.remove_client(int(k))
+        suggest = _SUGGEST
+        if suggest is not None:
+            for r in clients:
+                suggest.upsert(r.id, r.full_name, r.external_id, segment_weight(r.segment))
+            for k in gone_clients:
+                suggest.remove(int(k))
+        docs = [client_document(r) for r in clients] + [contact_document(r) for r in contacts]
+        written = index.upsert(docs) if docs else 0
+        removed = [f"client:{k}" for k in gone_clients] + [f"crm_contact:{k}" for k in gone_contacts]
+        if removed:
+            written += index.delete(removed)
+        return written, applied
+
+    @staticmethod
+    def catch_up(db: Session) -> int:
+        """
+        Index rows written or deleted anywhere since the last build or
+        catch-up, from the search_changes feed. No-op until the index has
+        been built.
+        """
+        global _WATERMARKS
+        index, since = _INDEX, _WATERMARKS
+        if index is None or since is None:
+            return 0
+        watermarks = current_watermarks(db)
+        written, applied = ClientSearchService._apply_changes(db, index, _FACETS, since, watermarks)
+        with _LOCK:
+            if _INDEX is index:
+                _WATERMARKS = {**watermarks, "applied": applied}
+        if _SUGGEST is not None and _SUGGEST.needs_rebuild:
+            ClientSearchService.rebuild_suggest(db)
+        return written
+
+    @staticmethod
+    def start_catch_up(session_factory: Callable[[], Session], interval: float) -> PeriodicTask:
+        """Run catch_up() every `interval` seconds in this process (started once)."""
+        global _CATCH_UP
+
+        def run() -> int:
+            db = session_factory()
+            try:
+                return ClientSearchService.catch_up(db)
+            finally:
+                db.close()
+
+        with _LOCK:
+            if _CATCH_UP is None:
+                _CATCH_UP = PeriodicTask("search-catch-up", run, interval)
+            return _CATCH_UP
+
+    @staticmethod
+    def stop_catch_up() -> None:
+        global _CATCH_UP
+        with _LOCK:
+            task, _CATCH_UP = _CATCH_UP, None
+        if task is not None:
+            task.close()
+
+    @staticmethod
+    def get_index(db: Session) -> SegmentedIndex:
+        if _INDEX is None and ClientSearchService.load_persisted(db) is None:
+            ClientSearchService.rebuild(db)
+        return _INDEX  # type: ignore[return-value]
+
+    @staticmethod
+    def index_documents(docs: List[SearchDocument]) -> int:
+        """
+        Add or replace documents in the live index (one new segment per call).
+        No-op until the index has been built; the first build reads the tables anyway.
+        """
+        index = _INDEX
+        if index is None or not docs:
+            return 0
+        return index.upsert(docs)
+
+    @staticmethod
+    def index_client(client: Any) -> None:
+        """New or changed client row: update the text index, the facet bitmaps and type-ahead."""
+        ClientSearchService.index_documents([client_document(client)])
+        facets = _FACETS
+        if facets is not None:
+            facets.upsert_client(client.id, client.country, client.segment, client.risk_rating)
+        suggest = _SUGGEST
+        if suggest is not None:
+            suggest.upsert(client.id, client.full_name, client.external_id, segment_weight(client.segment))
+
+    @staticmethod
+    def index_kyc_flag(flag: Any) -> None:
+        """New KYC flag: an open one adds its client to the kyc_flag facet."""
+        facets = _FACETS
+        if facets is not None and (flag.status or "").upper() == "OPEN":
+            facets.add_flag(flag.client_id, flag.code)
+
+    @staticmethod
+    def get_facets(db: Session) -> FacetIndex:
+        global _FACETS
+        if _FACETS is None:
+            facets = build_facets(db)
+            with _LOCK:
+                _FACETS = facets
+        return _FACETS  # type: ignore[return-value]
+
+    @staticmethod
+    def remove_documents(keys: List[str]) -> int:
+        index = _INDEX
+        if index is None:
+            return 0
+        return index.delete(keys)
+
+    @staticmethod
+    def rebuild_suggest(db: Session) -> Dict[str, Any]:
+        global _SUGGEST
+        suggest = SuggestIndex.build(iter_suggestions(db))
+        with _LOCK:
+            _SUGGEST = suggest
+        return {"clients": len(suggest), "keys": len(suggest.keys)}
+
+    @staticmethod
+    def suggest(db: Session, query: str, limit: int = 10) -> Dict[str, Any]:
+        """Type-ahead completions on client names and external ids, best weight first."""
+        if _SUGGEST is None:
+            ClientSearchService.rebuild_suggest(db)
+        return {"query": query, "suggestions": _SUGGEST.suggest(query, limit=limit)}  # type: ignore[union-attr]
+
+    @staticmethod
+    def search(
+        db: Session,
+        query: str,
+        limit: int = 50,
+        mode: str = "and",
+        fuzzy: str = "auto",
+        offset: int = 0,
+        filters: Optional[Dict[str, List[str]]] = None,
+        facets: bool = False,
+        hydrate: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Ranked, paginated search (ST-19 / ST-33).
+
+        fuzzy="off": exact terms only, BM25-ranked; "on": trigram name search only,
+        ranked by similarity; "auto": exact first, falling back to trigram search
+        when nothing matches (ST-18).
+
+        filters: facet -> accepted values (country, segment, risk_rating, kyc_flag);
+        hits must belong to a client matching every filtered facet. facets=True
+        adds per-value counts over the text matches. hydrate=True attaches a
+        summary row to each hit (one query for the page).
+
+        total is the number of matches. Fuzzy matches are the names the trigram
+        index puts forward (at most its max_candidates per segment) within the
+        edit bound; facet counts and filtered hits are taken from the same set.
+        """
+        index = ClientSearchService.get_index(db)
+        filters = {f: v for f, v in (filters or {}).items() if v}
+        facet_index = ClientSearchService.get_facets(db) if filters or facets else None
+        clients = facet_index.filter_bitmap(filters) if facet_index is not None else None
+        page: Dict[str, Any] = {"query": query, "offset": offset, "limit": limit, "filters": filters}
+
+        if fuzzy != "on":
+            total, ranked = index.rank(query, mode=mode, offset=offset, limit=limit, clients=clients)
+            if total or fuzzy == "off":
+                if facets:
+                    page["facets"] = facet_index.counts(index.matched_clients(query, mode=mode), filters)  # type: ignore[union-attr]
+                hits = [
+                    {**_hit(doc), "score": score, "score_breakdown": breakdown}
+                    for doc, score, breakdown in ranked
+                ]
+                if hydrate:
+                    SearchHydrationService.hydrate(db, hits)
+                return {**page, "fuzzy": False, "ranking": "bm25", "total": total, "hits": hits}
+
+        # Every fuzzy match, once: counts, the filtered page and its total all come from it
+        scored = index.fuzzy(query, limit=None)
+        if facets:
+            matched = Bitmap.from_iterable(doc.client_id for doc, _ in scored if doc.client_id)
+            page["facets"] = facet_index.counts(matched, filters)  # type: ignore[union-attr]
+        if clients is not None:
+            scored = [(doc, score) for doc, score in scored if doc.client_id in clients]
+        hits = [{**_hit(doc), "score": score} for doc, score in scored[offset : offset + limit]]
+        if hydrate:
+            SearchHydrationService.hydrate(db, hits)
+        total = len(scored)
+        return {**page, "fuzzy": True, "ranking": "similarity", "total": total, "hits": hits}
@@ -2,16 +2,22 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.schemas.client import ClientCreate
 from app.repositories.client_repository import ClientRepository
+from app.services.client_search_service import ClientSearchService
+from app.services.client_summary_service import ClientSummaryService
 
 
 class ClientService:
     @staticmethod
     def create(db: Session, data: ClientCreate):
-        return ClientRepository.create(db, data)
+        client = ClientRepository.create(db, data)
+        ClientSearchService.index_client(client)
+        ClientSummaryService.refresh_clients(db, [client.id])
+        return client
 
     @staticmethod
     def list(db: Session):
@@ -39,6 +45,19 @@ class ClientService:
 
         return ClientService._assemble_client_profile(client)
 
+    @staticmethod
+    async def get_async(db: AsyncSession, client_id: int) -> Optional[Dict[str, Any]]:
+        """get() on the async engine (hot read path)."""
+        client = await ClientRepository.get_async(db, client_id)
+        if client is None:
+            return None
+
+        return ClientService._assemble_client_profile(client)
+
+    @staticmethod
+    async def list_async(db: AsyncSession):
+        return await ClientRepository.list_async(db)
+
     @staticmethod
     def _assemble_client_profile(client: Any) -> Dict[str, Any]:
         """
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import schema_registry
+
+
+_SUMMARY_COLUMNS = (
+    "client_id",
+    "full_name",
+    "country",
+    "segment",
+    "risk_rating",
+    "account_count",
+    "open_kyc_flags",
+    "open_kyc_flag_codes",
+    "last_transaction_date",
+    "kyc_overall_status",
+    "onboarding_status",
+    "fatca_status",
+    "crs_status",
+    "regulatory_updated_at",
+    "match_decision_count",
+    "refreshed_at",
+)
+
+
+def _refresh_sql(scoped: bool):
+    """
+    Upsert of client_summary from the source tables, either for every client
+    or only for :ids. Each aggregate is grouped once and joined back, so a
+    full refresh is a handful of scans rather than per-client lookups.
+    """
+    scope = (lambda col: f"{col} = ANY(:ids)") if scoped else (lambda col: "TRUE")
+    updates = ",\n            ".join(f"{c} = EXCLUDED.{c}" for c in _SUMMARY_COLUMNS[1:])
+    return text(f"""
+        INSERT INTO client_summary ({", ".join(_SUMMARY_COLUMNS)})
+        SELECT
+            c.id,
+            c.full_name,
+            c.country,
+            c.segment,
+            c.risk_rating,
+            COALESCE(a.account_count, 0),
+            COALESCE(k.open_kyc_flags, 0),
+            COALESCE(k.codes, '{{}}'),
+            t.last_transaction_date,
+            r.kyc_overall_status,
+            r.onboarding_status,
+            r.fatca_status,
+            r.crs_status,
+            r.updated_at,
+            COALESCE(m.match_decision_count, 0),
+            now()
+        FROM clients c
+        LEFT JOIN (
+            SELECT client_id, count(*) AS account_count
+            FROM accounts
+            WHERE {scope("client_id")}
+            GROUP BY client_id
+        ) a ON a.client_id = c.id
+        LEFT JOIN (
+            SELECT client_id, count(*) AS open_kyc_flags, array_agg(DISTINCT upper(code)) AS codes
+            FROM kyc_flags
+            WHERE {scope("client_id")} AND upper(status) = 'OPEN'
+            GROUP BY client_id
+        ) k ON k.client_id = c.id
+        LEFT JOIN (
+            SELECT acc.client_id, max(tx.trade_date) AS last_transaction_date
+            FROM transactions tx
+            JOIN accounts acc ON acc.id = tx.account_id
+            WHERE {scope("acc.client_id")}
+            GROUP BY acc.client_id
+        ) t ON t.client_id = c.id
+        LEFT JOIN (
+            SELECT DISTINCT ON (client_id)
+                client_id, kyc_overall_status, onboarding_status, fatca_status, crs_status, updated_at
+            FROM client_regulatory_enrichment
+            WHERE {scope("client_id")}
+            ORDER BY client_id, updated_at DESC
+        ) r ON r.client_id = c.id
+        LEFT JOIN (
+            SELECT matched_client_id AS client_id, count(*) AS match_decision_count
+            FROM match_decisions
+            WHERE {scope("matched_client_id")}
+            GROUP BY matched_client_id
+        ) m ON m.client_id = c.id
+        WHERE {scope("c.id")}
+        ON CONFLICT (client_id) DO UPDATE SET
+            {updates}
+    """)
+
+
+_REFRESH_ALL_SQL = _refresh_sql(scoped=False)
+_REFRESH_CLIENTS_SQL = _refresh_sql(scoped=True)
+
+_GET_MANY_SQL = text(f"""
+    SELECT {", ".join(_SUMMARY_COLUMNS)}
+    FROM client_summary
+    WHERE client_id = ANY(:ids)
+""")
+
+schema_registry.track("client_summary")  # appears with migration 002
+
+
+class ClientSummaryService:
+    """
+    Per-client aggregates materialised in client_summary (migration 002).
+
+    Write paths call refresh_clients() for the clients they touched after
+    committing; the refresh job calls refresh_all() to pick up everything
+    else (match runs, regulatory enrichment loads). Until the migration is
+    applied every method is a no-op and readers fall back to computing the
+    aggregates themselves.
+    """
+
+    @staticmethod
+    def available(db: Session) -> bool:
+        return schema_registry.has_table(db, "client_summary")
+
+    @staticmethod
+    def refresh_all(db: Session) -> int:
+        """Recompute every client's summary row; returns rows written."""
+        if not ClientSummaryService.available(db):
+            return 0
+        written = db.execute(_REFRESH_ALL_SQL).rowcount
+        db.commit()
+        return written
+
+    @staticmethod
+    def refresh_clients(db: Session, client_ids: Iterable[Optional[int]]) -> int:
+        """Recompute the summary rows of `client_ids` only (incremental path)."""
+        ids = sorted({int(c) for c in client_ids if c})
+        if not ids or not ClientSummaryService.available(db):
+            return 0
+        written = db.execute(_REFRESH_CLIENTS_SQL, {"ids": ids}).rowcount
+        db.commit()
+        return written
+
+    @staticmethod
+    def refresh_for_account(db: Session, account_id: Optional[int]) -> int:
+        """Refresh the client owning `account_id` (transactions only carry the account)."""
+        if not account_id or not ClientSummaryService.available(db):
+            return 0
+        client_id = db.execute(
+            text("SELECT client_id FROM accounts WHERE id = :id"), {"id": account_id}
+        ).scalar()
+        return ClientSummaryService.refresh_clients(db, [client_id])
+
+    @staticmethod
+    def get_many(db: Session, client_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Summary rows by client id: one primary-key index lookup for the whole set."""
+        ids: List[int] = sorted({int(c) for c in client_ids if c})
+        if not ids:
+            return {}
+        rows = db.execute(_GET_MANY_SQL, {"ids": ids}).mappings().all()
+        return {r["client_id"]: dict(r) for r in rows}
+
+    @staticmethod
+    def get(db: Session, client_id: int) -> Optional[Dict[str, Any]]:
+        return ClientSummaryService.get_many(db, [client_id]).get(client_id)
@@ -3,11 +3,15 @@ from __future__ import annotations
 import csv
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, Optional, Protocol
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol
 
 from sqlalchemy.orm import Session
 
+from app import audit_sink
+from app.audit_sink import AuditEvent, AuditSink, audit_event
+from app.search.index import SearchDocument
 from app.repositories.crm_contact_repository import CRMContactRepository
+from app.services.client_search_service import ClientSearchService, contact_document
 
 
 @dataclass(frozen=True)
@@ -42,7 +46,9 @@ class FileCrmSource:
         with self.path.open("r", encoding="utf-8", newline="") as f:
             reader = csv.DictReader(f)
             for row in reader:
-                # Normalise keys we care about (ignore extras)
+                # Trim the keys we care about (ignore extras). Values are stored
+                # as the source sent them: source_system / source_record_id are
+                # the upsert key, and match keys are normalised at match time.
                 yield {
                     "source_system": (row.get("source_system") or "").strip() or None,
                     "source_record_id": (row.get("source_record_id") or "").strip() or None,
@@ -57,12 +63,30 @@ class BulkCrmIngestionService:
     ST-05 operational batch ingestion.
     - minimal validation
     - real persistence through repository
-    - idempotent via upsert
+    - idempotent via upsert, committed every `batch_size` upserts (a failed
+      load is resumed by re-running it)
+    - each committed batch is pushed to the search index and its audit
+      events (one per upserted contact) to the batched audit writer before
+      the next batch is read, so memory stays bounded and a full audit queue
+      slows the read loop down. Events the queue cannot take within its
+      timeout are spilled to disk rather than failing a committed load.
     """
 
     @staticmethod
-    def ingest(db: Session, source: CrmSource) -> IngestionResult:
+    def ingest(
+        db: Session, source: CrmSource, audit: Optional[AuditSink] = None, batch_size: int = 5_000
+    ) -> IngestionResult:
+        audit = audit or audit_sink.default_sink()
         total = inserted = updated = skipped = 0
+        indexed: Dict[str, SearchDocument] = {}
+        events: List[AuditEvent] = []
+
+        def commit_batch() -> None:
+            db.commit()
+            ClientSearchService.index_documents(list(indexed.values()))
+            audit.emit_many(events, spill_when_full=True)
+            indexed.clear()
+            events.clear()
 
         for rec in source.read():
             total += 1
@@ -75,7 +99,7 @@ class BulkCrmIngestionService:
                 skipped += 1
                 continue
 
-            status, _row = CRMContactRepository.upsert(
+            status, row = CRMContactRepository.upsert(
                 db,
                 source_system=source_system,
                 source_record_id=source_record_id,
@@ -84,12 +108,24 @@ class BulkCrmIngestionService:
                 email=rec.get("email"),
             )
 
+            doc = contact_document(row)
+            indexed[doc.key] = doc
+            events.append(
+                audit_event(
+                    f"crm_contact.{status}",
+                    "ingestion:crm",
+                    details={"source_system": source_system, "source_record_id": source_record_id},
+                )
+            )
+
             if status == "inserted":
                 inserted += 1
             else:
                 updated += 1
+            if len(events) >= batch_size:
+                commit_batch()
 
-        db.commit()
+        commit_batch()
 
         return IngestionResult(
             total=total,
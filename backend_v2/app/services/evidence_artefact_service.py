@@ -1,28 +1,192 @@
 # backend_v2/app/services/evidence_artefact_service.py
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
 
-_EVIDENCE_ARTEFACTS_COLS: Optional[Set[str]] = None
+from app import evidence_store, schema_registry
+from app.evidence_store import ContentStore
 
 
-def _get_evidence_artefacts_columns(db: Session) -> Set[str]:
-    global _EVIDENCE_ARTEFACTS_COLS
-    if _EVIDENCE_ARTEFACTS_COLS is not None:
-        return _EVIDENCE_ARTEFACTS_COLS
+def _id_column(cols: FrozenSet[str]) -> str:
+    return "artifact_id" if "artefact_id" not in cols and "artifact_id" in cols else "artefact_id"
 
-    rows = db.execute(
-        text("""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = 'evidence_artefacts'
-        """)
-    ).fetchall()
 
-    _EVIDENCE_ARTEFACTS_COLS = {r[0] for r in rows}
-    return _EVIDENCE_ARTEFACTS_COLS
+def _select_parts(cols: FrozenSet[str], alias: str = "") -> List[str]:
+    """
+    Artefact headers: everything the panel shows, plus content_hash and the
+    content size in bytes. The content itself is served by get_content()
+    (GET /evidence/{artefact_id}/content) when a row is expanded.
+    """
+    select_parts = [
+        f"{alias}artefact_id",
+        f"{alias}evidence_bundle_id",
+        f"{alias}artefact_type",
+        f"{alias}created_at",
+        f"{alias}content_hash" if "content_hash" in cols else "NULL AS content_hash",
+        f"{alias}storage_ref" if "storage_ref" in cols else "NULL AS storage_ref",
+        # Stored (possibly compressed) size; read from the TOAST pointer, the value is not fetched
+        f"pg_column_size({alias}content) AS content_size",
+    ]
+    if "content_size" in cols:  # migrations 005 / 008: bytes get_content() serves, kept on the row
+        select_parts[-1] = f"COALESCE({alias}content_size, pg_column_size({alias}content)) AS content_size"
+
+    # If some environments use artifact_* spelling, adapt (defensive)
+    if "artefact_id" not in cols and "artifact_id" in cols:
+        select_parts[0] = f"{alias}artifact_id AS artefact_id"
+    if "evidence_bundle_id" not in cols and "bundle_id" in cols:
+        select_parts[1] = f"{alias}bundle_id AS evidence_bundle_id"
+    if "artefact_type" not in cols and "artifact_type" in cols:
+        select_parts[2] = f"{alias}artifact_type AS artefact_type"
+    return select_parts
+
+
+@schema_registry.register("evidence_artefacts.by_source_records", "evidence_artefacts")
+def _build_artefacts_sql(schema: schema_registry.Schema) -> TextClause:
+    # Adapt to schema if columns vary slightly
+    select_parts = _select_parts(schema.get("evidence_artefacts", frozenset()))
+
+    # Filter: jsonb array contains-any using ?| against text[]
+    return text(f"""
+        SELECT {", ".join(select_parts)}
+        FROM evidence_artefacts
+        WHERE (content -> 'source_record_ids') ?| :source_ids
+        ORDER BY created_at DESC
+        LIMIT :limit
+    """)
+
+
+@schema_registry.register("evidence_artefacts.by_client", "evidence_artefacts", "evidence_artefact_subjects")
+def _build_linked_sql(schema: schema_registry.Schema) -> Optional[TextClause]:
+    """
+    The client's artefacts through evidence_artefact_subjects (migration 004):
+    an index range scan on (client_id, created_at) joined to artefacts by key.
+    None until the migration is applied.
+    """
+    if "evidence_artefact_subjects" not in schema:
+        return None
+    select_parts = _select_parts(schema.get("evidence_artefacts", frozenset()), alias="a.")
+    return text(f"""
+        SELECT {", ".join(select_parts)}
+        FROM (
+            SELECT artefact_id, max(created_at) AS created_at
+            FROM evidence_artefact_subjects
+            WHERE client_id = :client_id
+            GROUP BY artefact_id
+            ORDER BY max(created_at) DESC
+            LIMIT :limit
+        ) s
+        JOIN evidence_artefacts a ON a.artefact_id = s.artefact_id
+        ORDER BY s.created_at DESC
+    """)
+
+
+@schema_registry.register("evidence_artefacts.content", "evidence_artefacts")
+def _build_content_sql(schema: schema_registry.Schema) -> Dict[str, TextClause]:
+    """
+    "hash": content_hash only (answers If-None-Match without the blob);
+    "body": the content as JSON text and storage_ref (evidence store reference).
+    """
+    cols = schema.get("evidence_artefacts", frozenset())
+    id_col = _id_column(cols)
+    hash_expr = "content_hash" if "content_hash" in cols else "NULL"
+    ref_expr = "storage_ref" if "storage_ref" in cols else "NULL"
+    return {
+        "hash": text(f"SELECT {hash_expr} AS content_hash FROM evidence_artefacts WHERE {id_col} = :artefact_id"),
+        "body": text(f"""
+            SELECT {hash_expr} AS content_hash, {ref_expr} AS storage_ref, content::text AS body
+            FROM evidence_artefacts
+            WHERE {id_col} = :artefact_id
+        """),
+    }
+
+
+# match_decisions(matched_client_id) -> source_record_id
+_SOURCE_IDS_SQL = text("""
+    SELECT DISTINCT source_record_id::text AS source_record_id
+    FROM match_decisions
+    WHERE matched_client_id = :client_id
+""")
+
+
+# Backfill of evidence_artefact_subjects (migration 004), keyset-paged by artefact_id
+_NEXT_ARTEFACT_IDS_SQL = text("""
+    SELECT artefact_id
+    FROM evidence_artefacts
+    WHERE artefact_id > :after
+    ORDER BY artefact_id
+    LIMIT :batch_size
+""")
+_LINK_SUBJECTS_SQL = text("SELECT public.link_evidence_artefact_subjects(:ids)")
+_FIRST_UUID = "00000000-0000-0000-0000-000000000000"
+_CHUNK_SIZE = 64 * 1024
+
+# Offload of inline content into the evidence store (migration 005), keyset-paged
+_NEXT_INLINE_CONTENT_SQL = text("""
+    SELECT artefact_id, content::text AS body
+    FROM evidence_artefacts
+    WHERE artefact_id > :after
+      AND content IS NOT NULL
+      AND storage_ref IS NULL
+    ORDER BY artefact_id
+    LIMIT :batch_size
+""")
+# content_size of inline rows written before migration 008, keyset-paged
+_SET_INLINE_CONTENT_SIZES_SQL = text("""
+    WITH batch AS (
+        SELECT artefact_id
+        FROM evidence_artefacts
+        WHERE artefact_id > :after
+        ORDER BY artefact_id
+        LIMIT :batch_size
+    ), updated AS (
+        UPDATE evidence_artefacts a
+        SET content_size = octet_length(a.content::text)
+        FROM batch
+        WHERE a.artefact_id = batch.artefact_id
+          AND a.storage_ref IS NULL
+          AND a.content_size IS NULL
+        RETURNING 1
+    )
+    SELECT (SELECT artefact_id FROM batch ORDER BY artefact_id DESC LIMIT 1)::text AS last_id,
+           (SELECT count(*) FROM batch) AS artefacts,
+           (SELECT count(*) FROM updated) AS updated
+""")
+# Content keeps only the source_record_ids the subject linkage (migration 004) is built
+# from; an existing content_hash is kept
+_SET_STORED_CONTENT_SQL = text("""
+    UPDATE evidence_artefacts
+    SET storage_ref = :storage_ref,
+        content_hash = COALESCE(content_hash, :content_hash),
+        content_size = :content_size,
+        content = CASE WHEN content ? 'source_record_ids'
+                       THEN jsonb_build_object('source_record_ids', content -> 'source_record_ids')
+                  END
+    WHERE artefact_id = :artefact_id
+""")
+
+
+def _chunks(body: bytes) -> Iterator[bytes]:
+    for start in range(0, len(body), _CHUNK_SIZE):
+        yield body[start:start + _CHUNK_SIZE]
+
+
+def _artefacts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    artefacts: List[Dict[str, Any]] = []
+    for r in rows:
+        d = dict(r._mapping)
+
+        # Shape to what the UI panel expects (keep existing keys too)
+        # UI-friendly fields:
+        d["source_system"] = "MATCHING"  # stable label; can refine later
+        d["storage_ref"] = d.get("storage_ref") or str(d.get("evidence_bundle_id") or d.get("artefact_id"))
+        d["content_url"] = f"/evidence/{d.get('artefact_id')}/content"
+        artefacts.append(d)
+
+    return artefacts
 
 
 class EvidenceArtefactService:
@@ -37,67 +201,163 @@ class EvidenceArtefactService:
         There is no direct client_id, so we link via:
           match_decisions(matched_client_id) -> source_record_id
           evidence_artefacts.content->'source_record_ids' contains those IDs
+
+        Once migration 004 is applied that linkage is maintained in
+        evidence_artefact_subjects and read with one indexed query.
         """
-        cols = _get_evidence_artefacts_columns(db)
+        linked = schema_registry.compiled(db, "evidence_artefacts.by_client")
+        if linked is not None:
+            return _artefacts(db.execute(linked, {"client_id": client_id, "limit": limit}).fetchall())
 
         # 1) Pull the client's source_record_ids from match_decisions
-        src_rows = db.execute(
-            text("""
-                SELECT DISTINCT source_record_id::text AS source_record_id
-                FROM match_decisions
-                WHERE matched_client_id = :client_id
-            """),
-            {"client_id": client_id},
-        ).fetchall()
+        src_rows = db.execute(_SOURCE_IDS_SQL, {"client_id": client_id}).fetchall()
 
         source_ids = [r[0] for r in src_rows if r and r[0]]
         if not source_ids:
             return []
 
-        # 2) Select artefacts; adapt to schema if columns vary slightly
-        select_parts = [
-            "artefact_id",
-            "evidence_bundle_id",
-            "artefact_type",
-            "created_at",
-            "content",
-        ]
-
-        # If some environments use artifact_* spelling, adapt (defensive)
-        if "artefact_id" not in cols and "artifact_id" in cols:
-            select_parts[0] = "artifact_id AS artefact_id"
-        if "evidence_bundle_id" not in cols and "bundle_id" in cols:
-            select_parts[1] = "bundle_id AS evidence_bundle_id"
-        if "artefact_type" not in cols and "artifact_type" in cols:
-            select_parts[2] = "artifact_type AS artefact_type"
-
-        # Filter: jsonb array contains-any using ?| against text[]
-        sql = f"""
-            SELECT {", ".join(select_parts)}
-            FROM evidence_artefacts
-            WHERE (content -> 'source_record_ids') ?| :source_ids
-            ORDER BY created_at DESC
-            LIMIT :limit
-        """
-
+        # 2) Select artefacts (statement adapted to the schema by the registry)
+        sql = schema_registry.compiled(db, "evidence_artefacts.by_source_records")
         rows = db.execute(
-            text(sql),
+            sql,
             {
                 "source_ids": source_ids,  # SQLAlchemy/psycopg will bind Python list as text[]
                 "limit": limit,
             },
         ).fetchall()
 
-        artefacts: List[Dict[str, Any]] = []
-        for r in rows:
-            d = dict(r._mapping)
+        return _artefacts(rows)
+
+    @staticmethod
+    async def list_by_client_async(db: AsyncSession, client_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """list_by_client() on the async engine (hot read path)."""
+        linked = await schema_registry.compiled_async(db, "evidence_artefacts.by_client")
+        if linked is not None:
+            return _artefacts((await db.execute(linked, {"client_id": client_id, "limit": limit})).fetchall())
+
+        src_rows = (await db.execute(_SOURCE_IDS_SQL, {"client_id": client_id})).fetchall()
+        source_ids = [r[0] for r in src_rows if r and r[0]]
+        if not source_ids:
+            return []
+
+        sql = await schema_registry.compiled_async(db, "evidence_artefacts.by_source_records")
+        rows = (await db.execute(sql, {"source_ids": source_ids, "limit": limit})).fetchall()
+        return _artefacts(rows)
+
+    @staticmethod
+    def backfill_subjects(db: Session, batch_size: int = 10_000) -> Dict[str, int]:
+        """
+        (Re)build evidence_artefact_subjects for every artefact, one committed
+        batch of `batch_size` artefacts at a time (safe to re-run or resume).
+        Returns {"artefacts": ..., "links": ...}; zeros before migration 004.
+        """
+        if not schema_registry.has_table(db, "evidence_artefact_subjects"):
+            return {"artefacts": 0, "links": 0}
+
+        artefacts = links = 0
+        after = _FIRST_UUID
+        while True:
+            ids = [r[0] for r in db.execute(_NEXT_ARTEFACT_IDS_SQL, {"after": after, "batch_size": batch_size})]
+            if not ids:
+                break
+            links += int(db.execute(_LINK_SUBJECTS_SQL, {"ids": ids}).scalar() or 0)
+            db.commit()
+            artefacts += len(ids)
+            after = ids[-1]
+        return {"artefacts": artefacts, "links": links}
 
-            # Shape to what the UI panel expects (keep existing keys too)
-            # UI-friendly fields:
-            d["source_system"] = "MATCHING"  # stable label; can refine later
-            d["storage_ref"] = str(d.get("evidence_bundle_id") or d.get("artefact_id"))
-            artefacts.append(d)
+    @staticmethod
+    def backfill_content_sizes(db: Session, batch_size: int = 10_000) -> Dict[str, int]:
+        """
+        Set content_size on inline artefacts that predate migration 008, one
+        committed batch of `batch_size` artefacts at a time (safe to re-run or
+        resume). Returns {"artefacts": ..., "updated": ...}; zeros before
+        migration 005.
+        """
+        if "content_size" not in schema_registry.columns(db, "evidence_artefacts"):
+            return {"artefacts": 0, "updated": 0}
 
-        return artefacts
+        artefacts = updated = 0
+        after = _FIRST_UUID
+        while True:
+            row = db.execute(_SET_INLINE_CONTENT_SIZES_SQL, {"after": after, "batch_size": batch_size}).fetchone()
+            if row is None or row.last_id is None:
+                break
+            db.commit()
+            artefacts += int(row.artefacts)
+            updated += int(row.updated or 0)
+            after = row.last_id
+        return {"artefacts": artefacts, "updated": updated}
 
+    @staticmethod
+    def get_content_hash(db: Session, artefact_id: str) -> Optional[str]:
+        """The stored content_hash (None if the artefact is missing or has none)."""
+        sql = schema_registry.compiled(db, "evidence_artefacts.content")["hash"]
+        return db.execute(sql, {"artefact_id": artefact_id}).scalar()
+
+    @staticmethod
+    def get_content(
+        db: Session, artefact_id: str, store: Optional[ContentStore] = None
+    ) -> Optional[Tuple[str, int, Iterator[bytes]]]:
+        """
+        (content_hash, size in bytes, chunks) of one artefact's content as
+        JSON; None if there is no such artefact, or its evidence store object
+        is missing. Store-backed content is read from disk as it is iterated.
+        Inline artefacts without a stored content_hash get the SHA-256 of
+        the body.
+        """
+        sql = schema_registry.compiled(db, "evidence_artefacts.content")["body"]
+        row = db.execute(sql, {"artefact_id": artefact_id}).fetchone()
+        if row is None:
+            return None
+        digest = evidence_store.parse_ref(row.storage_ref)
+        if digest is not None:
+            store = store or evidence_store.default_store()
+            if not store.exists(digest):
+                return None
+            return row.content_hash or digest, store.size(digest), store.iter_chunks(digest)
+        body = (row.body or "null").encode("utf-8")
+        return row.content_hash or evidence_store.content_hash(body), len(body), _chunks(body)
+
+    @staticmethod
+    def offload_content(db: Session, store: ContentStore, batch_size: int = 1_000) -> Dict[str, int]:
+        """
+        Move inline content into the evidence store, one committed batch of
+        `batch_size` artefacts at a time (safe to stop and re-run). Each
+        object is written, fsynced and verified before the batch that trims
+        its row commits. Artefacts that already have a storage_ref are left
+        alone. Returns counts; zeros before migration 005.
+
+        The store then holds the only full copy, so it must be given
+        explicitly and live outside the checkout (ValueError otherwise).
+        """
+        if evidence_store.inside_checkout(store.root):
+            raise ValueError(f"evidence store {store.root} is inside the repository; offload to a store outside it")
+        if "content_size" not in schema_registry.columns(db, "evidence_artefacts"):
+            return {"artefacts": 0, "bytes": 0, "stored": 0, "deduplicated": 0}
 
+        counts = {"artefacts": 0, "bytes": 0, "stored": 0, "deduplicated": 0}
+        after = _FIRST_UUID
+        while True:
+            rows = db.execute(_NEXT_INLINE_CONTENT_SQL, {"after": after, "batch_size": batch_size}).fetchall()
+            if not rows:
+                break
+            params = []
+            for artefact_id, body in rows:
+                data = body.encode("utf-8")
+                counts["deduplicated" if store.exists(evidence_store.content_hash(data)) else "stored"] += 1
+                digest = store.put(data)
+                if not store.verify(digest):
+                    raise RuntimeError(f"evidence store object {digest} for artefact {artefact_id} failed verification")
+                params.append({
+                    "artefact_id": artefact_id,
+                    "storage_ref": evidence_store.ref(digest),
+                    "content_hash": digest,
+                    "content_size": len(data),
+                })
+                counts["bytes"] += len(data)
+            db.execute(_SET_STORED_CONTENT_SQL, params)
+            db.commit()
+            counts["artefacts"] += len(rows)
+            after = rows[-1][0]
+        return counts
@@ -1,14 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.schemas.kyc_flag import KycFlagCreate
 from app.repositories.kyc_flag_repository import KycFlagRepository
+from app.services.client_search_service import ClientSearchService
+from app.services.client_summary_service import ClientSummaryService
 
 
 class KycFlagService:
 
     @staticmethod
     def create(db: Session, data: KycFlagCreate):
-        return KycFlagRepository.create(db, data)
+        flag = KycFlagRepository.create(db, data)
+        ClientSearchService.index_kyc_flag(flag)
+        ClientSummaryService.refresh_clients(db, [data.client_id])
+        return flag
 
     @staticmethod
     def list_by_client(db: Session, client_id: int):
         return KycFlagRepository.list_by_client(db, client_id)
+
+    @staticmethod
+    async def list_by_client_async(db: AsyncSession, client_id: int):
+        return await KycFlagRepository.list_by_client_async(db, client_id)
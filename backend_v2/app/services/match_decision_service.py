@@ -1,79 +1,151 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set
+import base64
+from datetime import datetime
+from typing import AbstractSet, Any, Dict, List, Optional, Tuple
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app import schema_registry
+
+
+def _build_select_list(cols: AbstractSet[str]) -> str:
+    # Core columns (assumed present from your schema)
+    select_parts = [
+        "match_decision_id",
+        "match_run_id",
+        "source_record_id",
+        "decided_at",
+        "decision",
+        "matched_client_id",
+    ]
+
+    # Optional columns used by the UI
+    if "source_system" in cols:
+        select_parts.append("source_system")
+    elif "system" in cols:
+        select_parts.append("system AS source_system")
+    else:
+        select_parts.append("NULL AS source_system")
+
+    if "confidence" in cols:
+        select_parts.append("confidence")
+    else:
+        select_parts.append("NULL AS confidence")
+
+    # Keep any extra useful columns if they exist (won't break UI; expand panel will show them)
+    for extra in ["details", "reason", "rule", "candidate_id"]:
+        if extra in cols:
+            select_parts.append(extra)
+
+    return ", ".join(select_parts)
+
+
+@schema_registry.register("match_decisions.page", "match_decisions")
+def _build_page_sql(schema: schema_registry.Schema) -> Dict[str, TextClause]:
+    """Panel page query: "first" page, and "next" pages with the keyset condition."""
+    select_list = _build_select_list(schema.get("match_decisions", frozenset()))
+
+    def page(keyset_sql: str) -> TextClause:
+        return text(f"""
+            SELECT {select_list}
+            FROM match_decisions
+            WHERE matched_client_id = :client_id
+              {keyset_sql}
+            ORDER BY decided_at DESC, match_decision_id DESC
+            LIMIT :limit
+        """)
 
+    return {
+        "first": page(""),
+        "next": page("AND (decided_at, match_decision_id) < (:cursor_ts, CAST(:cursor_id AS uuid))"),
+    }
 
-# Cache discovered columns so we don't hit information_schema on every request
-_MATCH_DECISIONS_COLS: Optional[Set[str]] = None
 
+def encode_cursor(decided_at: Any, match_decision_id: Any) -> str:
+    ts = decided_at.isoformat() if isinstance(decided_at, datetime) else str(decided_at)
+    raw = f"{ts}|{match_decision_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
 
-def _get_match_decisions_columns(db: Session) -> Set[str]:
-    global _MATCH_DECISIONS_COLS
-    if _MATCH_DECISIONS_COLS is not None:
-        return _MATCH_DECISIONS_COLS
 
-    rows = db.execute(
-        text("""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = 'match_decisions'
-        """)
-    ).fetchall()
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        ts, match_decision_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), match_decision_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
 
-    _MATCH_DECISIONS_COLS = {r[0] for r in rows}
-    return _MATCH_DECISIONS_COLS
+def _page_params(client_id: int, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"client_id": client_id, "limit": limit + 1}
+    if cursor:
+        decided_at, match_decision_id = decode_cursor(cursor)
+        params["cursor_ts"] = decided_at
+        params["cursor_id"] = match_decision_id
+    return params
+
+
+def _page(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["decided_at"], last["match_decision_id"])
+
+    return {"items": rows, "next_cursor": next_cursor}
 
 
 class MatchDecisionService:
+    @staticmethod
+    def list_page(
+        db: Session,
+        client_id: int,
+        limit: int = 25,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginated match decisions for a client, newest first.
+
+        Ordered by (decided_at DESC, match_decision_id DESC) so each page is a
+        range scan on ix_match_decisions_client_decided (see
+        backend_v2/migrations/001_match_decisions_client_decided.sql) with no sort.
+
+        Returns: {"items": [...], "next_cursor": str | None}
+        """
+        params = _page_params(client_id, limit, cursor)
+        sql = schema_registry.compiled(db, "match_decisions.page")["next" if cursor else "first"]
+        rows = [dict(r._mapping) for r in db.execute(sql, params).fetchall()]
+        return _page(rows, limit)
+
+    @staticmethod
+    async def list_page_async(
+        db: AsyncSession,
+        client_id: int,
+        limit: int = 25,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """list_page() on the async engine (hot read path)."""
+        params = _page_params(client_id, limit, cursor)
+        sql = (await schema_registry.compiled_async(db, "match_decisions.page"))["next" if cursor else "first"]
+        rows = [dict(r._mapping) for r in (await db.execute(sql, params)).fetchall()]
+        return _page(rows, limit)
+
     @staticmethod
     def list_by_client(db: Session, client_id: int, limit: int = 25) -> List[Dict[str, Any]]:
         """
         Return match decisions for a client, newest first.
 
         Important:
-        - Uses information_schema to adapt to whether optional columns exist
-          (e.g. source_system/system, confidence).
+        - Adapts to whether optional columns exist (e.g. source_system/system,
+          confidence) via the schema registry.
         - Returns dict rows to keep profile contract flexible (matches current SCV pattern).
         """
-        cols = _get_match_decisions_columns(db)
-
-        # Core columns (assumed present from your schema)
-        select_parts = [
-            "match_decision_id",
-            "match_run_id",
-            "source_record_id",
-            "decided_at",
-            "decision",
-            "matched_client_id",
-        ]
-
-        # Optional columns used by the UI
-        if "source_system" in cols:
-            select_parts.append("source_system")
-        elif "system" in cols:
-            select_parts.append("system AS source_system")
-        else:
-            select_parts.append("NULL AS source_system")
-
-        if "confidence" in cols:
-            select_parts.append("confidence")
-        else:
-            select_parts.append("NULL AS confidence")
-
-        # Keep any extra useful columns if they exist (won't break UI; expand panel will show them)
-        for extra in ["details", "reason", "rule", "candidate_id"]:
-            if extra in cols:
-                select_parts.append(extra)
-
-        sql = f"""
-            SELECT {", ".join(select_parts)}
-            FROM match_decisions
-            WHERE matched_client_id = :client_id
-            ORDER BY decided_at DESC
-            LIMIT :limit
-        """
+        return MatchDecisionService.list_page(db, client_id, limit=limit)["items"]
 
-        rows = db.execute(text(sql), {"client_id": client_id, "limit": limit}).fetchall()
-        return [dict(r._mapping) for r in rows]
+    @staticmethod
+    async def list_by_client_async(db: AsyncSession, client_id: int, limit: int = 25) -> List[Dict[str, Any]]:
+        return (await MatchDecisionService.list_page_async(db, client_id, limit=limit))["items"]
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.normalisation import FIELD_NORMALISERS, normalise_text
+
+
+# -------------------------------------------------------------------
+# Declarative ruleset (versioned; the version is stamped on match_runs)
+# -------------------------------------------------------------------
+DEFAULT_RULESET: Dict[str, Any] = {
+    "ruleset_version": "2026.10.1",
+    "match_threshold": 0.90,
+    "review_threshold": 0.70,
+    "rules": [
+        {"name": "tax_id_exact", "kind": "exact", "field": "tax_id", "confidence": 0.99, "decisive": True},
+        {
+            "name": "registration_number_exact",
+            "kind": "exact",
+            "field": "registration_number",
+            "confidence": 0.97,
+            "decisive": True,
+        },
+        {"name": "email_exact", "kind": "exact", "field": "email", "confidence": 0.80},
+        {"name": "name_fuzzy", "kind": "fuzzy", "field": "name", "threshold": 0.85, "confidence": 0.75},
+    ],
+}
+
+# Relative evaluation cost per rule kind; plans run cheapest first
+RULE_COSTS: Dict[str, int] = {
+    "exact": 1,
+    "fuzzy": 10,
+}
+
+# Record keys accepted for each logical field (ORM rows, CRM payloads, profiles)
+FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "name": ("name", "full_name", "legal_name"),
+    "email": ("email", "primary_email"),
+    "tax_id": ("tax_id",),
+    "registration_number": ("registration_number",),
+}
+
+
+class RulesetError(ValueError):
+    pass
+
+
+def _field_getter(name: str) -> Callable[[Any], Any]:
+    keys = FIELD_ALIASES.get(name, (name,))
+
+    def get(record: Any) -> Any:
+        for k in keys:
+            if isinstance(record, Mapping):
+                if record.get(k):
+                    return record[k]
+            elif getattr(record, k, None):
+                return getattr(record, k)
+        return None
+
+    return get
+
+
+def _normaliser(spec: Dict[str, Any]) -> Callable[[Optional[str]], Optional[str]]:
+    return FIELD_NORMALISERS.get(spec.get("normaliser") or spec["field"], normalise_text)
+
+
+def _exact_predicate(spec: Dict[str, Any]) -> Callable[[Any, Any], Optional[float]]:
+    norm = _normaliser(spec)
+
+    def predicate(a: Any, b: Any) -> Optional[float]:
+        ka = norm(str(a)) if a is not None else None
+        kb = norm(str(b)) if b is not None else None
+        if ka is None or kb is None:
+            return None
+        return 1.0 if ka == kb else 0.0
+
+    return predicate
+
+
+def _fuzzy_predicate(spec: Dict[str, Any]) -> Callable[[Any, Any], Optional[float]]:
+    threshold = float(spec.get("threshold", 0.85))
+    norm = _normaliser(spec)
+
+    def predicate(a: Any, b: Any) -> Optional[float]:
+        ka = norm(str(a)) if a else None
+        kb = norm(str(b)) if b else None
+        if not ka or not kb:
+            return None
+        sm = SequenceMatcher(None, ka, kb)
+        # Cheap upper bounds first; skip the full ratio when it cannot reach the threshold
+        if sm.real_quick_ratio() < threshold or sm.quick_ratio() < threshold:
+            return 0.0
+        return sm.ratio()
+
+    return predicate
+
+
+_PREDICATE_FACTORIES: Dict[str, Callable[[Dict[str, Any]], Callable[[Any, Any], Optional[float]]]] = {
+    "exact": _exact_predicate,
+    "fuzzy": _fuzzy_predicate,
+}
+
+
+@dataclass
+class RuleStats:
+    evaluations: int = 0
+    hits: int = 0
+    total_ns: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "hits": self.hits,
+            "total_ms": round(self.total_ns / 1_000_000, 3),
+            "mean_us": round(self.total_ns / self.evaluations / 1_000, 3) if self.evaluations else 0.0,
+        }
+
+
+@dataclass
+class CompiledRule:
+    name: str
+    kind: str
+    cost: int
+    confidence: float
+    threshold: float
+    decisive: bool
+    get: Callable[[Any], Any]
+    predicate: Callable[[Any, Any], Optional[float]]
+    stats: RuleStats = field(default_factory=RuleStats)
+
+
+@dataclass(frozen=True)
+class MatchOutcome:
+    decision: str  # MATCH | REVIEW | NO_MATCH
+    confidence: float
+    rule_hits: Dict[str, Any]
+
+
+class CompiledRuleset:
+    """
+    A ruleset compiled into an ordered predicate plan.
+
+    - rules run cheapest kind first (exact keys before fuzzy names)
+    - a decisive rule hit short-circuits the rest of the plan
+    - per-rule evaluation counts, hits and time are accumulated in `stats()`
+    """
+
+    def __init__(
+        self,
+        version: str,
+        rules: List[CompiledRule],
+        match_threshold: float,
+        review_threshold: float,
+    ) -> None:
+        self.version = version
+        self.rules = rules
+        self.match_threshold = match_threshold
+        self.review_threshold = review_threshold
+
+    def evaluate(self, left: Any, right: Any) -> MatchOutcome:
+        """Evaluate the plan for a (candidate record, client record) pair."""
+        confidence = 0.0
+        hits: Dict[str, float] = {}
+        evaluated: List[str] = []
+
+        for rule in self.rules:
+            t0 = time.perf_counter_ns()
+            score = rule.predicate(rule.get(left), rule.get(right))
+            rule.stats.total_ns += time.perf_counter_ns() - t0
+            rule.stats.evaluations += 1
+            evaluated.append(rule.name)
+
+            if score is None or score < rule.threshold:
+                continue
+
+            rule.stats.hits += 1
+            hits[rule.name] = round(score, 4)
+            # Independent evidence: 1 - prod(1 - c_i)
+            confidence = 1.0 - (1.0 - confidence) * (1.0 - rule.confidence)
+            if rule.decisive:
+                break
+
+        if confidence >= self.match_threshold:
+            decision = "MATCH"
+        elif confidence >= self.review_threshold:
+            decision = "REVIEW"
+        else:
+            decision = "NO_MATCH"
+
+        return MatchOutcome(
+            decision=decision,
+            confidence=round(confidence, 4),
+            rule_hits={
+                "ruleset_version": self.version,
+                "evaluated": evaluated,
+                "hits": hits,
+            },
+        )
+
+    def match_candidates(self, record: Any, candidates: Sequence[Any]) -> List[Tuple[Any, MatchOutcome]]:
+        """Evaluate `record` against candidates; returns non NO_MATCH pairs, best first."""
+        out = []
+        for cand in candidates:
+            outcome = self.evaluate(record, cand)
+            if outcome.decision != "NO_MATCH":
+                out.append((cand, outcome))
+        out.sort(key=lambda pair: pair[1].confidence, reverse=True)
+        return out
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-rule statistics in plan order."""
+        return [{"rule": r.name, "kind": r.kind, **r.stats.as_dict()} for r in self.rules]
+
+    def reset_stats(self) -> None:
+        for r in self.rules:
+            r.stats = RuleStats()
+
+    def reordered(self) -> "CompiledRuleset":
+        """
+        Return a plan re-sorted by observed mean evaluation time within each cost tier.
+        Stats carry over so the new plan keeps reporting cumulative numbers.
+        """
+
+        def observed(rule: CompiledRule) -> Tuple[int, float]:
+            s = rule.stats
+            return rule.cost, (s.total_ns / s.evaluations) if s.evaluations else 0.0
+
+        return CompiledRuleset(
+            self.version,
+            sorted(self.rules, key=observed),
+            self.match_threshold,
+            self.review_threshold,
+        )
+
+
+def compile_ruleset(spec: Optional[Dict[str, Any]] = None) -> CompiledRuleset:
+    """Validate a declarative ruleset and compile it into a CompiledRuleset."""
+    spec = spec or DEFAULT_RULESET
+
+    version = spec.get("ruleset_version")
+    if not version:
+        raise RulesetError("ruleset_version is required")
+
+    compiled: List[CompiledRule] = []
+    seen = set()
+    for rule in spec.get("rules") or []:
+        name, kind = rule.get("name"), rule.get("kind")
+        if not name or name in seen:
+            raise RulesetError(f"Rule name missing or duplicated: {name!r}")
+        if kind not in _PREDICATE_FACTORIES:
+            raise RulesetError(f"Unknown rule kind for {name}: {kind!r}")
+        if not rule.get("field"):
+            raise RulesetError(f"Rule {name} has no field")
+        seen.add(name)
+
+        compiled.append(
+            CompiledRule(
+                name=name,
+                kind=kind,
+                cost=RULE_COSTS[kind],
+                confidence=float(rule.get("confidence", 1.0)),
+                threshold=float(rule.get("threshold", 1.0)),
+                decisive=bool(rule.get("decisive", False)),
+                get=_field_getter(rule["field"]),
+                predicate=_PREDICATE_FACTORIES[kind](rule),
+            )
+        )
+
+    # Stable sort keeps declaration order within a cost tier
+    compiled.sort(key=lambda r: r.cost)
+
+    return CompiledRuleset(
+        version=str(version),
+        rules=compiled,
+        match_threshold=float(spec.get("match_threshold", 0.9)),
+        review_threshold=float(spec.get("review_threshold", 0.7)),
+    )
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.search.index import SearchDocument
+from app.search.segments import SegmentedIndex
+from app.services.client_cluster_service import (
+    MATCHED_DECISIONS,
+    ClientClusterService,
+    ClusterMergeResult,
+    edges_from_decisions,
+)
+from app.services.client_search_service import ClientSearchService
+from app.services.client_summary_service import ClientSummaryService
+from app.services.match_rule_engine import FIELD_ALIASES, CompiledRuleset, MatchOutcome, compile_ruleset
+
+
+_BATCH_RECORDS = 1_000
+# Candidate clients per blocking key (identifier, email, fuzzy name)
+_CANDIDATES_PER_KEY = 5
+# Hits fetched per wanted candidate (crm_contact docs share the index)
+_OVERFETCH = 4
+
+_START_RUN_SQL = text("""
+    INSERT INTO match_runs (status, ruleset_version)
+    VALUES ('started', :ruleset_version)
+    RETURNING match_run_id::text
+""")
+
+_FINISH_RUN_SQL = text("""
+    UPDATE match_runs
+    SET status = :status, finished_at = now(), notes = :notes
+    WHERE match_run_id = CAST(:match_run_id AS uuid)
+""")
+
+# Structurally valid records without a decision yet, oldest first
+_PENDING_SQL = text("""
+    SELECT sr.source_record_id::text AS source_record_id, ss.code AS source_code, sr.payload,
+           sr.extracted_email, sr.extracted_tax_id, sr.extracted_external_id
+    FROM source_records_raw sr
+    JOIN source_systems ss ON ss.source_system_id = sr.source_system_id
+    WHERE sr.structural_ok
+      AND NOT EXISTS (SELECT 1 FROM match_decisions md WHERE md.source_record_id = sr.source_record_id)
+    ORDER BY sr.received_at, sr.source_record_id
+    LIMIT :limit
+""")
+
+_CLIENTS_SQL = text("""
+    SELECT id, full_name, email, tax_id, external_id
+    FROM clients
+    WHERE id = ANY(:ids)
+""")
+
+_INSERT_DECISIONS_SQL = text("""
+    INSERT INTO match_decisions
+        (match_run_id, source_record_id, decision, matched_client_id, confidence, rule_hits, conflict_summary)
+    SELECT CAST(:match_run_id AS uuid), d.source_record_id, d.decision, d.client_id, d.confidence,
+           CAST(d.rule_hits AS jsonb), CAST(d.conflict_summary AS jsonb)
+    FROM unnest(
+        CAST(:source_record_ids AS uuid[]), CAST(:decisions AS text[]), CAST(:client_ids AS integer[]),
+        CAST(:confidences AS numeric[]), CAST(:rule_hits AS text[]), CAST(:conflict_summaries AS text[])
+    ) AS d(source_record_id, decision, client_id, confidence, rule_hits, conflict_summary)
+""")
+
+
+@dataclass(frozen=True)
+class MatchRunResult:
+    match_run_id: str
+    ruleset_version: str
+    records: int
+    decisions: Dict[str, int]
+    rule_stats: List[Dict[str, Any]]
+    clusters: Dict[str, int]
+
+
+def match_record(row: Any) -> Dict[str, Any]:
+    """Pending source record -> the record the ruleset compares (payload plus extracted keys)."""
+    payload: Mapping[str, Any] = row.payload or {}
+    return {
+        **payload,
+        "email": row.extracted_email or payload.get("email"),
+        "tax_id": row.extracted_tax_id or payload.get("tax_id"),
+        "external_id": row.extracted_external_id or payload.get("external_id"),
+    }
+
+
+def _client_hits(search: Callable[[int], List[SearchDocument]], limit: int) -> List[int]:
+    """
+    The first `limit` client docs of a search that also returns crm_contact
+    docs: fetch a multiple of `limit` and widen until enough client docs come
+    back or the search runs out, so contacts cannot crowd out candidates.
+    """
+    fetch = limit * _OVERFETCH
+    while True:
+        docs = search(fetch)
+        ids = [d.client_id for d in docs if d.kind == "client"]
+        if len(ids) >= limit or len(docs) < fetch:
+            return ids[:limit]
+        fetch *= _OVERFETCH
+
+
+def candidate_client_ids(index: SegmentedIndex, record: Mapping[str, Any]) -> List[int]:
+    """
+    Blocking through the search index: exact identifier / email hits and
+    fuzzy name hits, so the ruleset only scores a handful of clients.
+    """
+    ids: Dict[int, None] = {}
+    for field in ("tax_id", "external_id", "email"):
+        value = record.get(field)
+        if value:
+            hits = _client_hits(
+                lambda n, q=str(value): [doc for doc, _, _ in index.rank(q, limit=n)[1]], _CANDIDATES_PER_KEY
+            )
+            ids.update((i, None) for i in hits)
+    name = next((record[k] for k in FIELD_ALIASES["name"] if record.get(k)), None)
+    if name:
+        hits = _client_hits(lambda n: [doc for doc, _ in index.fuzzy(str(name), limit=n)], _CANDIDATES_PER_KEY)
+        ids.update((i, None) for i in hits)
+    return list(ids)
+
+
+def _decision_rows(source_record_id: str, outcomes: Sequence[Tuple[Any, MatchOutcome]]) -> List[Tuple]:
+    """
+    The best candidate's decision, plus a MATCH row for every other candidate
+    the ruleset also matched: those are the links clustering closes over
+    (one record matching two clients makes them the same party).
+    """
+    if not outcomes:
+        return [(source_record_id, "NO_MATCH", None, None, None, None)]
+    (best, outcome), others = outcomes[0], outcomes[1:]
+    also_matched = [(c, o) for c, o in others if outcome.decision == o.decision == "MATCH"]
+    conflict = [
+        {"client_id": c["id"], "decision": o.decision, "confidence": o.confidence}
+        for c, o in others
+        if not outcome.decision == o.decision == "MATCH"
+    ]
+    rows = [
+        (
+            source_record_id,
+            outcome.decision,
+            best["id"],
+            outcome.confidence,
+            json.dumps(outcome.rule_hits),
+            json.dumps(conflict) if conflict else None,
+        )
+    ]
+    rows.extend(
+        (source_record_id, o.decision, c["id"], o.confidence, json.dumps(o.rule_hits), None) for c, o in also_matched
+    )
+    return rows
+
+
+class MatchRunService:
+    """
+    FT-06 match run: score pending source records against clients with the
+    compiled ruleset (match_rule_engine) and record one match_decisions row
+    per record.
+
+    Records are taken in batches of `batch_size`; candidates come from the
+    search index (blocking), their client rows are read with one query per
+    batch, and decisions are written with one INSERT ... unnest() and
+    committed per batch, so an interrupted run resumes with the records it
+    had not decided. Each batch's matches are folded into client_clusters
+    (ClientClusterService.merge_edges) in the same transaction as its
+    decisions, so a failed run leaves no unclustered decisions. The run's
+    ruleset version, cluster changes and per-rule statistics are stamped
+    on match_runs.
+    """
+
+    @staticmethod
+    def run(
+        db: Session,
+        ruleset: Optional[CompiledRuleset] = None,
+        batch_size: int = _BATCH_RECORDS,
+    ) -> MatchRunResult:
+        ruleset = ruleset or compile_ruleset()
+        ruleset.reset_stats()
+        index = ClientSearchService.get_index(db)
+        match_run_id = db.execute(_START_RUN_SQL, {"ruleset_version": ruleset.version}).scalar()
+        db.commit()
+
+        records = 0
+        decisions: Dict[str, int] = {}
+        clusters = asdict(ClusterMergeResult(edges=0, clusters_created=0, clusters_merged=0, members_added=0))
+        try:
+            while True:
+                pending = db.execute(_PENDING_SQL, {"limit": batch_size}).fetchall()
+                if not pending:
+                    break
+                batch = [(r.source_record_id, match_record(r)) for r in pending]
+                wanted = {sr: candidate_client_ids(index, rec) for sr, rec in batch}
+                all_ids = sorted({i for ids in wanted.values() for i in ids})
+                clients = {
+                    r.id: dict(r._mapping)
+                    for r in (db.execute(_CLIENTS_SQL, {"ids": all_ids}).fetchall() if all_ids else [])
+                }
+
+                rows = []
+                for source_record_id, record in batch:
+                    candidates = [clients[i] for i in wanted[source_record_id] if i in clients]
+                    record_rows = _decision_rows(source_record_id, ruleset.match_candidates(record, candidates))
+                    decisions[record_rows[0][1]] = decisions.get(record_rows[0][1], 0) + 1
+                    rows.extend(record_rows)
+
+                columns = list(zip(*rows))
+                db.execute(
+                    _INSERT_DECISIONS_SQL,
+                    {
+                        "match_run_id": match_run_id,
+                        "source_record_ids": list(columns[0]),
+                        "decisions": list(columns[1]),
+                        "client_ids": list(columns[2]),
+                        "confidences": list(columns[3]),
+                        "rule_hits": list(columns[4]),
+                        "conflict_summaries": list(columns[5]),
+                    },
+                )
+                matched = {row[2] for row in rows if row[2] is not None}
+                if matched and ClientSummaryService.available(db):
+                    ClientSummaryService.refresh_clients(db, matched)
+                # Batch records had no decisions before, so their own rows are every new link
+                merged = ClientClusterService.merge_edges(
+                    db, edges_from_decisions((row[0], row[2]) for row in rows if row[1] in MATCHED_DECISIONS)
+                )
+                db.commit()
+                records += len(batch)
+                for key, value in asdict(merged).items():
+                    clusters[key] += value
+        except Exception as exc:
+            db.rollback()
+            db.execute(
+                _FINISH_RUN_SQL,
+                {"match_run_id": match_run_id, "status": "failed", "notes": json.dumps({"error": repr(exc)})},
+            )
+            db.commit()
+            raise
+
+        notes = {"records": records, "decisions": decisions, "clusters": clusters, "rules": ruleset.stats()}
+        db.execute(
+            _FINISH_RUN_SQL, {"match_run_id": match_run_id, "status": "completed", "notes": json.dumps(notes)}
+        )
+        db.commit()
+        return MatchRunResult(
+            match_run_id=match_run_id,
+            ruleset_version=ruleset.version,
+            records=records,
+            decisions=decisions,
+            rule_stats=ruleset.stats(),
+            clusters=clusters,
+        )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.client_summary_service import ClientSummaryService
+
+
+# Materialised path (migration 002): one primary-key lookup for the page.
+_MATERIALISED_SQL = text("""
+    SELECT
+        client_id,
+        full_name AS name,
+        country,
+        risk_rating,
+        open_kyc_flags,
+        account_count AS accounts
+    FROM client_summary
+    WHERE client_id = ANY(:ids)
+""")
+
+# Fallback before client_summary exists, and for clients it has no row for yet
+# (created before the migration or since the last refresh): per-client aggregates
+# are computed for the requested ids only and joined back (ix_kyc_flags_client_id,
+# ix_accounts_client_id).
+_SUMMARY_SQL = text("""
+    SELECT
+        c.id AS client_id,
+        c.full_name AS name,
+        c.country,
+        c.risk_rating,
+        COALESCE(k.open_kyc_flags, 0) AS open_kyc_flags,
+        COALESCE(a.accounts, 0) AS accounts
+    FROM clients c
+    LEFT JOIN (
+        SELECT client_id, count(*) AS open_kyc_flags
+        FROM kyc_flags
+        WHERE client_id = ANY(:ids) AND upper(status) = 'OPEN'
+        GROUP BY client_id
+    ) k ON k.client_id = c.id
+    LEFT JOIN (
+        SELECT client_id, count(*) AS accounts
+        FROM accounts
+        WHERE client_id = ANY(:ids)
+        GROUP BY client_id
+    ) a ON a.client_id = c.id
+    WHERE c.id = ANY(:ids)
+""")
+
+
+class SearchHydrationService:
+    """
+    Summary rows for search hits (name, country, risk rating, open KYC flag
+    count, account count), fetched set-based for the whole page rather than
+    per hit through ClientService.get / KycFlagService.list_by_client.
+    Read from client_summary when it exists; clients without a summary row
+    (or every client, before the migration) are aggregated on the fly.
+    """
+
+    @staticmethod
+    def fetch_summaries(db: Session, client_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        ids = sorted({int(c) for c in client_ids if c})
+        if not ids:
+            return {}
+        summaries: Dict[int, Dict[str, Any]] = {}
+        if ClientSummaryService.available(db):
+            rows = db.execute(_MATERIALISED_SQL, {"ids": ids}).mappings().all()
+            summaries = {r["client_id"]: dict(r) for r in rows}
+            ids = [i for i in ids if i not in summaries]
+            if not ids:
+                return summaries
+        rows = db.execute(_SUMMARY_SQL, {"ids": ids}).mappings().all()
+        summaries.update((r["client_id"], dict(r)) for r in rows)
+        return summaries
+
+    @staticmethod
+    def hydrate(db: Session, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach `summary` to every hit (None for hits without a client, e.g. CRM contacts)."""
+        summaries = SearchHydrationService.fetch_summaries(db, (h.get("client_id") for h in hits))
+        for h in hits:
+            h["summary"] = summaries.get(h.get("client_id"))
+        return hits
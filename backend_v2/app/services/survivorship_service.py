@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import schema_registry
+from app.normalisation import FIELD_NORMALISERS, clean_text, normalise_text
+from app.services.client_cluster_service import MATCHED_DECISIONS
+
+
+# Canonical attribute -> clients column written by the golden-record merge (FT-07)
+GOLDEN_COLUMNS: Dict[str, str] = {
+    "name": "full_name",
+    "email": "email",
+    "phone": "phone",
+    "primary_address": "primary_address",
+    "country": "country",
+    "tax_id": "tax_id",
+}
+
+# Comparison keys per attribute (values agree when their keys agree)
+_COMPARE_AS: Dict[str, str] = {"primary_address": "address"}
+
+# Used when attribute_precedence_rules / source_field_mappings are empty:
+# CRM > KYC, identity fields mapped 1:1 (matches ClientProfileService's demo priority)
+DEFAULT_PRECEDENCE: Dict[str, Sequence[str]] = {attr: ("CRM", "KYC") for attr in GOLDEN_COLUMNS}
+
+_BATCH_CLIENTS = 1_000
+
+# Keyset pages of matched clients (ix_match_decisions_client_decided, migration 001)
+_NEXT_CLIENTS_SQL = text("""
+    SELECT DISTINCT matched_client_id
+    FROM match_decisions
+    WHERE matched_client_id > :after
+      AND decision = ANY(:decisions)
+    ORDER BY matched_client_id
+    LIMIT :limit
+""")
+
+_CLIENT_RECORDS_SQL = text("""
+    SELECT md.matched_client_id, ss.code, sr.payload
+    FROM match_decisions md
+    JOIN source_records_raw sr ON sr.source_record_id = md.source_record_id
+    JOIN source_systems ss ON ss.source_system_id = sr.source_system_id
+    WHERE md.matched_client_id = ANY(:ids)
+      AND md.decision = ANY(:decisions)
+    ORDER BY md.matched_client_id
+""")
+
+# Per-attribute outcome (source, ST-12 confidence, conflict), migration 007
+schema_registry.track("client_golden_attributes")
+
+_RECORD_OUTCOMES_SQL = text("""
+    INSERT INTO client_golden_attributes (client_id, attribute, value, source_code, confidence, conflict)
+    SELECT * FROM unnest(
+        CAST(:ids AS integer[]), CAST(:attrs AS text[]), CAST(:vals AS text[]),
+        CAST(:sources AS text[]), CAST(:confidences AS numeric[]), CAST(:conflicts AS boolean[])
+    )
+    ON CONFLICT (client_id, attribute) DO UPDATE
+    SET value = EXCLUDED.value, source_code = EXCLUDED.source_code, confidence = EXCLUDED.confidence,
+        conflict = EXCLUDED.conflict, resolved_at = now()
+""")
+
+
+@dataclass(frozen=True)
+class ResolvedAttribute:
+    value: Optional[str]
+    source: Optional[str]
+    confidence: float  # ST-12: share of precedence weight agreeing with the chosen value
+    conflict: bool
+    candidates: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+class SurvivorshipRules:
+    """
+    attribute_precedence_rules + source_field_mappings compiled into lookup tables.
+
+    - field_map[source][source_field] -> (attribute, transform)
+    - weight[attribute][source] -> 1 / precedence_rank
+    - rank[attribute][source] -> precedence_rank (lower wins)
+    """
+
+    def __init__(
+        self,
+        field_map: Dict[str, Dict[str, Tuple[str, Optional[Callable[[Optional[str]], Optional[str]]]]]],
+        rank: Dict[str, Dict[str, int]],
+    ) -> None:
+        self.field_map = field_map
+        self.rank = rank
+        self.weight = {attr: {src: 1.0 / r for src, r in by_src.items()} for attr, by_src in rank.items()}
+        self.compare_key = {
+            attr: FIELD_NORMALISERS.get(_COMPARE_AS.get(attr, attr), normalise_text) for attr in rank
+        }
+
+    @classmethod
+    def default(cls) -> "SurvivorshipRules":
+        rank = {attr: {src: i + 1 for i, src in enumerate(order)} for attr, order in DEFAULT_PRECEDENCE.items()}
+        field_map = {src: {attr: (attr, None) for attr in GOLDEN_COLUMNS} for src in ("CRM", "KYC")}
+        return cls(field_map, rank)
+
+    @classmethod
+    def from_rows(
+        cls,
+        precedence_rows: Iterable[Sequence[Any]],
+        mapping_rows: Iterable[Sequence[Any]],
+    ) -> "SurvivorshipRules":
+        """
+        precedence_rows: (attribute, source_code, precedence_rank)
+        mapping_rows:    (source_code, source_field, attribute, transform_rule)
+        """
+        rank: Dict[str, Dict[str, int]] = {}
+        for attr, source, precedence_rank in precedence_rows:
+            rank.setdefault(attr, {})[source] = int(precedence_rank)
+
+        field_map: Dict[str, Dict[str, Tuple[str, Optional[Callable[[Optional[str]], Optional[str]]]]]] = {}
+        for source, source_field, attr, transform_rule in mapping_rows:
+            transform = FIELD_NORMALISERS.get((transform_rule or "").strip()) if transform_rule else None
+            field_map.setdefault(source, {})[source_field] = (attr, transform)
+
+        if not rank or not field_map:
+            return cls.default()
+        return cls(field_map, rank)
+
+    def project(self, source: str, payload: Mapping[str, Any]) -> Dict[str, Optional[str]]:
+        """Map one raw source payload onto canonical attributes."""
+        out: Dict[str, Optional[str]] = {}
+        for source_field, (attr, transform) in self.field_map.get(source, {}).items():
+            raw = payload.get(source_field)
+            if raw is None or raw == "":
+                continue
+            value = clean_text(str(raw))
+            if transform is not None:
+                value = transform(value) or value
+            out[attr] = value
+        return out
+
+    def resolve(self, records: Sequence[Tuple[str, Mapping[str, Any]]]) -> Dict[str, ResolvedAttribute]:
+        """
+        Resolve golden values for one client from (source_code, payload) records.
+
+        Winner = lowest precedence rank with a value. Confidence = weight of sources
+        whose comparison key agrees with the winner / weight of all sources with a value.
+        """
+        projected = [(src, self.project(src, payload)) for src, payload in records]
+
+        out: Dict[str, ResolvedAttribute] = {}
+        for attr, ranks in self.rank.items():
+            weights = self.weight[attr]
+            key_of = self.compare_key[attr]
+
+            best: Optional[Tuple[int, str, str]] = None
+            candidates: Dict[str, Optional[str]] = {}
+            for src, values in projected:
+                value = values.get(attr)
+                if value is None or src not in ranks:
+                    continue
+                candidates.setdefault(src, value)
+                if best is None or ranks[src] < best[0]:
+                    best = (ranks[src], src, value)
+
+            if best is None:
+                out[attr] = ResolvedAttribute(value=None, source=None, confidence=0.0, conflict=False)
+                continue
+
+            _, winner_src, winner_value = best
+            winner_key = key_of(winner_value)
+            total = agree = 0.0
+            keys = set()
+            for src, value in candidates.items():
+                k = key_of(value)
+                keys.add(k)
+                total += weights[src]
+                if k == winner_key:
+                    agree += weights[src]
+
+            out[attr] = ResolvedAttribute(
+                value=winner_value,
+                source=winner_src,
+                confidence=round(agree / total, 4) if total else 0.0,
+                conflict=len(keys) > 1,
+                candidates=candidates,
+            )
+        return out
+
+    def resolve_batch(
+        self, records_by_client: Mapping[int, Sequence[Tuple[str, Mapping[str, Any]]]]
+    ) -> Dict[int, Dict[str, ResolvedAttribute]]:
+        return {client_id: self.resolve(records) for client_id, records in records_by_client.items()}
+
+
+# Compiled once per process; refresh after editing the rule tables
+_RULES: Optional[SurvivorshipRules] = None
+
+
+def load_rules(db: Session, refresh: bool = False) -> SurvivorshipRules:
+    global _RULES
+    if _RULES is not None and not refresh:
+        return _RULES
+
+    precedence_rows = db.execute(
+        text("""
+            SELECT ad.canonical_name, ss.code, apr.precedence_rank
+            FROM attribute_precedence_rules apr
+            JOIN attribute_dictionary ad ON ad.attribute_id = apr.attribute_id
+            JOIN source_systems ss ON ss.source_system_id = apr.source_system_id
+            WHERE apr.is_active AND ss.is_active
+        """)
+    ).fetchall()
+
+    mapping_rows = db.execute(
+        text("""
+            SELECT ss.code, sfm.source_field, ad.canonical_name, sfm.transform_rule
+            FROM source_field_mappings sfm
+            JOIN attribute_dictionary ad ON ad.attribute_id = sfm.attribute_id
+            JOIN source_systems ss ON ss.source_system_id = sfm.source_system_id
+            WHERE sfm.is_active AND ss.is_active
+        """)
+    ).fetchall()
+
+    _RULES = SurvivorshipRules.from_rows(precedence_rows, mapping_rows)
+    return _RULES
+
+
+@dataclass(frozen=True)
+class GoldenRecordMergeResult:
+    clients: int
+    attributes_updated: int  # clients columns actually changed
+    conflicts: int
+    mean_confidence: float  # over resolved attributes with a value
+    outcomes_recorded: int  # client_golden_attributes rows (0 before migration 007)
+
+
+def _group_by_client(
+    rows: Iterable[Sequence[Any]],
+) -> Iterator[Tuple[int, List[Tuple[str, Mapping[str, Any]]]]]:
+    current: Optional[int] = None
+    records: List[Tuple[str, Mapping[str, Any]]] = []
+    for client_id, source, payload in rows:
+        if client_id != current:
+            if current is not None:
+                yield current, records
+            current, records = client_id, []
+        records.append((source, payload or {}))
+    if current is not None:
+        yield current, records
+
+
+class GoldenRecordMergeService:
+    """
+    FT-07 batch job: resolve golden values for every matched client and write
+    them back to `clients` in bulk.
+
+    Matched clients are paged by id (keyset), `batch_clients` at a time; each
+    page's source payloads are read in one query, resolved with the compiled
+    rules, applied with one UPDATE ... FROM unnest() per attribute and
+    committed, so client rows are locked for one batch only and a failed run
+    keeps the batches before it. Profile reads then serve precomputed values.
+    The winning source, confidence and conflict flag of every resolved
+    attribute go to client_golden_attributes (one upsert per batch) when it
+    exists.
+    """
+
+    @staticmethod
+    def _record_outcomes(db: Session, resolved: Dict[int, Dict[str, ResolvedAttribute]]) -> int:
+        rows = [
+            (client_id, attr, r.value, r.source, r.confidence, r.conflict)
+            for client_id, attrs in resolved.items()
+            for attr, r in attrs.items()
+            if r.value is not None
+        ]
+        if not rows:
+            return 0
+        ids, attrs, values, sources, confidences, conflicts = (list(col) for col in zip(*rows))
+        db.execute(
+            _RECORD_OUTCOMES_SQL,
+            {"ids": ids, "attrs": attrs, "vals": values, "sources": sources,
+             "confidences": confidences, "conflicts": conflicts},
+        )
+        return len(rows)
+
+    @staticmethod
+    def _apply(db: Session, resolved: Dict[int, Dict[str, ResolvedAttribute]]) -> int:
+        updated = 0
+        for attr, column in GOLDEN_COLUMNS.items():
+            ids: List[int] = []
+            values: List[str] = []
+            for client_id, attrs in resolved.items():
+                r = attrs.get(attr)
+                if r is not None and r.value is not None:
+                    ids.append(client_id)
+                    values.append(r.value)
+            if not ids:
+                continue
+            result = db.execute(
+                text(f"""
+                    UPDATE clients c
+                    SET {column} = g.value
+                    FROM unnest(CAST(:ids AS integer[]), CAST(:vals AS text[])) AS g(client_id, value)
+                    WHERE c.id = g.client_id
+                      AND c.{column} IS DISTINCT FROM g.value
+                """),
+                {"ids": ids, "vals": values},
+            )
+            # Rows whose value was already the golden one are not updated
+            updated += result.rowcount
+        return updated
+
+    @staticmethod
+    def run(
+        db: Session,
+        rules: Optional[SurvivorshipRules] = None,
+        decisions: Sequence[str] = MATCHED_DECISIONS,
+        batch_clients: int = _BATCH_CLIENTS,
+    ) -> GoldenRecordMergeResult:
+        rules = rules or load_rules(db)
+        record_outcomes = schema_registry.has_table(db, "client_golden_attributes")
+        clients = updated = conflicts = recorded = resolved_values = 0
+        confidence_sum = 0.0
+
+        after = 0
+        while True:
+            ids = [
+                r[0]
+                for r in db.execute(
+                    _NEXT_CLIENTS_SQL, {"after": after, "decisions": list(decisions), "limit": batch_clients}
+                ).fetchall()
+            ]
+            if not ids:
+                break
+            rows = db.execute(_CLIENT_RECORDS_SQL, {"ids": ids, "decisions": list(decisions)}).fetchall()
+            resolved = rules.resolve_batch(dict(_group_by_client(rows)))
+            for attrs in resolved.values():
+                for r in attrs.values():
+                    conflicts += r.conflict
+                    if r.value is not None:
+                        resolved_values += 1
+                        confidence_sum += r.confidence
+            updated += GoldenRecordMergeService._apply(db, resolved)
+            if record_outcomes:
+                recorded += GoldenRecordMergeService._record_outcomes(db, resolved)
+            db.commit()
+            clients += len(resolved)
+            after = ids[-1]
+
+        return GoldenRecordMergeResult(
+            clients=clients,
+            attributes_updated=updated,
+            conflicts=conflicts,
+            mean_confidence=round(confidence_sum / resolved_values, 4) if resolved_values else 0.0,
+            outcomes_recorded=recorded,
+        )
@@ -1,14 +1,22 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.schemas.transaction import TransactionCreate
 from app.repositories.transaction_repository import TransactionRepository
+from app.services.client_summary_service import ClientSummaryService
 
 
 class TransactionService:
 
     @staticmethod
     def create(db: Session, data: TransactionCreate):
-        return TransactionRepository.create(db, data)
+        transaction = TransactionRepository.create(db, data)
+        ClientSummaryService.refresh_for_account(db, data.account_id)
+        return transaction
 
     @staticmethod
     def list_by_account(db: Session, account_id: int):
         return TransactionRepository.list_by_account(db, account_id)
+
+    @staticmethod
+    async def list_by_accounts_async(db: AsyncSession, account_ids: list[int]):
+        return await TransactionRepository.list_by_accounts_async(db, account_ids)
@@ -0,0 +1,16 @@
+-- 001: covering access path for the match-decision panel
+--
+-- MatchDecisionService.list_page filters on matched_client_id and pages by
+-- (decided_at DESC, match_decision_id DESC). The old single-column index
+-- forced a sort over every decision of heavily matched clients; this one is
+-- read in order and covers the panel columns (index-only scans).
+--
+-- Apply with psql (CONCURRENTLY cannot run inside a transaction block):
+--   psql -d scv -f backend_v2/migrations/001_match_decisions_client_decided.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_match_decisions_client_decided
+    ON public.match_decisions USING btree (matched_client_id, decided_at DESC, match_decision_id DESC)
+    INCLUDE (match_run_id, source_record_id, decision, confidence);
+
+-- Prefix of the new index; no longer needed
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_match_decisions_client;
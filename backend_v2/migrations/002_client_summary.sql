@@ -0,0 +1,34 @@
+-- 002: client_summary materialization
+--
+-- One row per client with the aggregates the client list, search hit
+-- hydration and the BFF client list otherwise compute per request (account
+-- count, open KYC flags, last transaction date, latest regulatory status,
+-- match decision count). Reads become a single primary-key lookup.
+--
+-- Maintained by ClientSummaryService:
+--   - incrementally from the client / account / transaction / KYC flag write paths
+--   - in full by the refresh job (tools/refresh_client_summary.py), which also
+--     picks up rows written outside the API (match runs, regulatory enrichment)
+--
+-- Apply, then populate:
+--   psql -d scv -f backend_v2/migrations/002_client_summary.sql
+--   python tools/refresh_client_summary.py
+
+CREATE TABLE IF NOT EXISTS public.client_summary (
+    client_id              integer PRIMARY KEY REFERENCES public.clients (id) ON DELETE CASCADE,
+    full_name              varchar,
+    country                varchar,
+    segment                varchar,
+    risk_rating            varchar,
+    account_count          integer NOT NULL DEFAULT 0,
+    open_kyc_flags         integer NOT NULL DEFAULT 0,
+    open_kyc_flag_codes    text[] NOT NULL DEFAULT '{}',
+    last_transaction_date  varchar(50),
+    kyc_overall_status     varchar(50),
+    onboarding_status      varchar(50),
+    fatca_status           varchar(50),
+    crs_status             varchar(50),
+    regulatory_updated_at  timestamptz,
+    match_decision_count   integer NOT NULL DEFAULT 0,
+    refreshed_at           timestamptz NOT NULL DEFAULT now()
+);
@@ -0,0 +1,137 @@
+-- 003: monthly range partitioning of audit_events on occurred_at
+--
+-- audit_events grows with every ingestion, merge and match (batched writer,
+-- app/audit_sink.py). Partitioning by month keeps each partition's
+-- (client_id, occurred_at DESC) index small, lets AuditTrailService prune
+-- "latest N events" lookups to the most recent partitions, and makes
+-- retention a metadata operation (DETACH PARTITION) instead of a DELETE.
+--
+-- Partitions are named audit_events_yYYYYmMM. Maintenance (also run by the
+-- API at startup and by tools/maintain_audit_partitions.py):
+--   SELECT audit_events_ensure_partitions(3);     -- this month + 3 ahead
+--   SELECT audit_events_detach_expired(24);       -- detach months older than 24
+-- Detached partitions are left as plain tables for archiving, then DROP them.
+-- audit_events_default catches rows outside every partition; keep it empty
+-- (ensure_partitions cannot create a month the default already holds rows for).
+--
+-- The existing table is converted in one transaction: rows are copied into
+-- the partitioned table and the old table is dropped. Run it in a quiet
+-- window; the API's audit writer retries batches while the table is locked.
+--
+--   psql -d scv -f backend_v2/migrations/003_audit_events_partitioned.sql
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.audit_events_ensure_partition(month date)
+RETURNS text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    lower_bound date := date_trunc('month', month)::date;
+    partition_name text := format('audit_events_y%sm%s', to_char(lower_bound, 'YYYY'), to_char(lower_bound, 'MM'));
+BEGIN
+    IF to_regclass(format('public.%I', partition_name)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public.audit_events FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, (lower_bound + interval '1 month')::date
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.audit_events_ensure_partitions(months_ahead integer)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    i integer;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        PERFORM public.audit_events_ensure_partition((date_trunc('month', now()) + make_interval(months => i))::date);
+    END LOOP;
+    RETURN months_ahead + 1;
+END;
+$$;
+
+-- Detach monthly partitions that end on or before the start of the month
+-- `retention_months` ago; returns the detached table names.
+CREATE OR REPLACE FUNCTION public.audit_events_detach_expired(retention_months integer)
+RETURNS SETOF text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    cutoff date := (date_trunc('month', now()) - make_interval(months => retention_months))::date;
+    part record;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public.audit_events'::regclass
+          AND c.relname ~ '^audit_events_y[0-9]{4}m[0-9]{2}$'
+          AND make_date(substr(c.relname, 15, 4)::int, substr(c.relname, 20, 2)::int, 1) + interval '1 month' <= cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE public.audit_events DETACH PARTITION public.%I', part.relname);
+        RETURN NEXT part.relname;
+    END LOOP;
+END;
+$$;
+
+DO $$
+DECLARE
+    first_month date;
+    m date;
+BEGIN
+    -- Already partitioned (re-run): nothing to convert
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('public.audit_events')
+    ) THEN
+        RETURN;
+    END IF;
+
+    IF to_regclass('public.audit_events') IS NOT NULL THEN
+        ALTER TABLE public.audit_events RENAME TO audit_events_unpartitioned;
+        ALTER TABLE public.audit_events_unpartitioned RENAME CONSTRAINT audit_events_pkey TO audit_events_unpartitioned_pkey;
+        ALTER INDEX IF EXISTS public.ix_audit_events_client_time RENAME TO ix_audit_events_unpartitioned_client_time;
+    END IF;
+
+    CREATE TABLE public.audit_events (
+        audit_event_id uuid DEFAULT gen_random_uuid() NOT NULL,
+        occurred_at timestamp with time zone DEFAULT now() NOT NULL,
+        actor character varying(200) NOT NULL,
+        event_type character varying(80) NOT NULL,
+        client_id integer REFERENCES public.clients (id) ON DELETE SET NULL,
+        source_record_id uuid REFERENCES public.source_records_raw (source_record_id) ON DELETE SET NULL,
+        evidence_bundle_id uuid REFERENCES public.evidence_bundles (evidence_bundle_id) ON DELETE SET NULL,
+        details jsonb,
+        -- The partition key must be part of the primary key
+        CONSTRAINT audit_events_pkey PRIMARY KEY (audit_event_id, occurred_at)
+    ) PARTITION BY RANGE (occurred_at);
+
+    CREATE INDEX ix_audit_events_client_time ON public.audit_events USING btree (client_id, occurred_at DESC);
+    CREATE TABLE public.audit_events_default PARTITION OF public.audit_events DEFAULT;
+
+    -- One partition per month of existing history, then the months ahead
+    IF to_regclass('public.audit_events_unpartitioned') IS NOT NULL THEN
+        SELECT date_trunc('month', min(occurred_at))::date INTO first_month FROM public.audit_events_unpartitioned;
+        m := first_month;
+        WHILE m IS NOT NULL AND m < date_trunc('month', now())::date LOOP
+            PERFORM public.audit_events_ensure_partition(m);
+            m := (m + interval '1 month')::date;
+        END LOOP;
+    END IF;
+    PERFORM public.audit_events_ensure_partitions(3);
+
+    IF to_regclass('public.audit_events_unpartitioned') IS NOT NULL THEN
+        INSERT INTO public.audit_events
+            (audit_event_id, occurred_at, actor, event_type, client_id, source_record_id, evidence_bundle_id, details)
+        SELECT audit_event_id, occurred_at, actor, event_type, client_id, source_record_id, evidence_bundle_id, details
+        FROM public.audit_events_unpartitioned;
+        DROP TABLE public.audit_events_unpartitioned;
+    END IF;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,134 @@
+-- 004: evidence_artefact_subjects, an indexed client -> evidence linkage
+--
+-- The evidence panel used to find a client's artefacts in two steps: the
+-- client's source_record_ids from match_decisions, then
+-- (content -> 'source_record_ids') ?| ids against evidence_artefacts, i.e. a
+-- sequential scan of a jsonb column. This table holds the same linkage, one
+-- row per (artefact, source record, matched client), so the panel is an index
+-- range scan on (client_id, created_at) joined to evidence_artefacts by key.
+--
+-- Maintained in the database, whoever writes the artefacts or decisions:
+--   - evidence_artefacts INSERT / UPDATE OF content: link_evidence_artefact_subjects()
+--   - match_decisions INSERT: newly matched clients of already-linked source records
+-- Source records with no match decision yet are kept with client_id NULL so
+-- a later decision can pick them up.
+--
+-- Apply, then backfill existing artefacts in batches:
+--   psql -d scv -f backend_v2/migrations/004_evidence_artefact_subjects.sql
+--   python tools/backfill_evidence_subjects.py
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.evidence_artefact_subjects (
+    artefact_id       uuid NOT NULL REFERENCES public.evidence_artefacts (artefact_id) ON DELETE CASCADE,
+    source_record_id  text NOT NULL,
+    client_id         integer REFERENCES public.clients (id) ON DELETE CASCADE,
+    created_at        timestamptz NOT NULL  -- the artefact's, so the panel orders without a join
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_evidence_artefact_subjects_matched
+    ON public.evidence_artefact_subjects (artefact_id, source_record_id, client_id)
+    WHERE client_id IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_evidence_artefact_subjects_unmatched
+    ON public.evidence_artefact_subjects (artefact_id, source_record_id)
+    WHERE client_id IS NULL;
+CREATE INDEX IF NOT EXISTS ix_evidence_artefact_subjects_client_created
+    ON public.evidence_artefact_subjects (client_id, created_at DESC, artefact_id)
+    WHERE client_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_evidence_artefact_subjects_source_record
+    ON public.evidence_artefact_subjects (source_record_id);
+
+-- Linkage lookups go from source record to decisions
+CREATE INDEX IF NOT EXISTS ix_match_decisions_source_record
+    ON public.match_decisions (source_record_id);
+
+-- (Re)link the given artefacts: one row per source record in
+-- content->'source_record_ids' and per client it was matched to.
+CREATE OR REPLACE FUNCTION public.link_evidence_artefact_subjects(ids uuid[])
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    linked integer;
+BEGIN
+    DELETE FROM public.evidence_artefact_subjects WHERE artefact_id = ANY(ids);
+
+    INSERT INTO public.evidence_artefact_subjects (artefact_id, source_record_id, client_id, created_at)
+    SELECT DISTINCT a.artefact_id, src.id, md.matched_client_id, a.created_at
+    FROM public.evidence_artefacts a
+    CROSS JOIN LATERAL jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(a.content -> 'source_record_ids') = 'array'
+             THEN a.content -> 'source_record_ids' ELSE '[]'::jsonb END
+    ) AS src(id)
+    LEFT JOIN public.match_decisions md
+        ON src.id ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+       AND md.source_record_id = src.id::uuid
+       AND md.matched_client_id IS NOT NULL
+    WHERE a.artefact_id = ANY(ids)
+    ON CONFLICT DO NOTHING;
+
+    GET DIAGNOSTICS linked = ROW_COUNT;
+    RETURN linked;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.evidence_artefacts_link_inserted()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM public.link_evidence_artefact_subjects(ARRAY(SELECT artefact_id FROM new_artefacts));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.evidence_artefacts_link_updated()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM public.link_evidence_artefact_subjects(ARRAY[NEW.artefact_id]);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.match_decisions_link_evidence()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.evidence_artefact_subjects (artefact_id, source_record_id, client_id, created_at)
+    SELECT DISTINCT s.artefact_id, s.source_record_id, d.matched_client_id, s.created_at
+    FROM new_decisions d
+    JOIN public.evidence_artefact_subjects s ON s.source_record_id = d.source_record_id::text
+    WHERE d.matched_client_id IS NOT NULL
+    ON CONFLICT DO NOTHING;
+
+    DELETE FROM public.evidence_artefact_subjects s
+    USING new_decisions d
+    WHERE s.client_id IS NULL
+      AND s.source_record_id = d.source_record_id::text
+      AND d.matched_client_id IS NOT NULL;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_evidence_artefacts_link_inserted ON public.evidence_artefacts;
+CREATE TRIGGER trg_evidence_artefacts_link_inserted
+    AFTER INSERT ON public.evidence_artefacts
+    REFERENCING NEW TABLE AS new_artefacts
+    FOR EACH STATEMENT EXECUTE FUNCTION public.evidence_artefacts_link_inserted();
+
+DROP TRIGGER IF EXISTS trg_evidence_artefacts_link_updated ON public.evidence_artefacts;
+CREATE TRIGGER trg_evidence_artefacts_link_updated
+    AFTER UPDATE OF content ON public.evidence_artefacts
+    FOR EACH ROW WHEN (OLD.content IS DISTINCT FROM NEW.content)
+    EXECUTE FUNCTION public.evidence_artefacts_link_updated();
+
+DROP TRIGGER IF EXISTS trg_match_decisions_link_evidence ON public.match_decisions;
+CREATE TRIGGER trg_match_decisions_link_evidence
+    AFTER INSERT ON public.match_decisions
+    REFERENCING NEW TABLE AS new_decisions
+    FOR EACH STATEMENT EXECUTE FUNCTION public.match_decisions_link_evidence();
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- 005: evidence_artefacts content held in the content-addressed store
+--
+-- Artefact content moves out of the content jsonb column into the evidence
+-- store (backend_v2/app/evidence_store.py), which keys objects by SHA-256,
+-- so identical artefacts are stored once. The row keeps the reference:
+--   storage_ref   'cas:sha256:<hex>'
+--   content_hash  <hex> (an existing content_hash is kept)
+--   content_size  the object's size in bytes (new column; headers show it)
+-- and content shrinks to {"source_record_ids": [...]}, which the linkage
+-- in evidence_artefact_subjects (migration 004) is built from.
+--
+-- Apply, then move existing content in batches into a store outside the
+-- checkout (it then holds the only full copy):
+--   psql -d scv -f backend_v2/migrations/005_evidence_content_store.sql
+--   python tools/offload_evidence_content.py --store /srv/scv/evidence-store
+
+BEGIN;
+
+ALTER TABLE public.evidence_artefacts ADD COLUMN IF NOT EXISTS content_size bigint;
+
+-- Rows sharing an object, e.g. to check references before archiving the store
+CREATE INDEX IF NOT EXISTS ix_evidence_artefacts_content_hash
+    ON public.evidence_artefacts (content_hash);
+
+COMMIT;
@@ -0,0 +1,65 @@
+-- 006: audit_events partitions can be created for months the default holds
+--
+-- If a month's partition did not exist when its first rows were written
+-- (maintenance did not run), those rows land in audit_events_default, and
+-- CREATE TABLE ... PARTITION OF for that month then fails for good: the
+-- default partition already holds rows that belong to it. From here on
+-- audit_events_ensure_partition() moves such rows out of the default in the
+-- same transaction: the month is created as a plain table, the rows are
+-- moved into it, and it is attached (which adds the indexes and keys).
+-- The API runs audit_events_ensure_partitions() at startup and every
+-- AUDIT_PARTITION_CHECK_SECONDS, so this is the exception, not the rule.
+--
+--   psql -d scv -f backend_v2/migrations/006_audit_events_partition_from_default.sql
+--   SELECT audit_events_ensure_partitions(3);   -- repairs any stuck month
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.audit_events_ensure_partition(month date)
+RETURNS text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    lower_bound date := date_trunc('month', month)::date;
+    upper_bound date := (date_trunc('month', month) + interval '1 month')::date;
+    partition_name text := format('audit_events_y%sm%s', to_char(lower_bound, 'YYYY'), to_char(lower_bound, 'MM'));
+BEGIN
+    IF to_regclass(format('public.%I', partition_name)) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    IF to_regclass('public.audit_events_default') IS NULL OR NOT EXISTS (
+        SELECT 1 FROM public.audit_events_default
+        WHERE occurred_at >= lower_bound AND occurred_at < upper_bound
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public.audit_events FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, upper_bound
+        );
+        RETURN partition_name;
+    END IF;
+
+    -- The default holds rows for this month: move them, then attach
+    LOCK TABLE public.audit_events_default IN ACCESS EXCLUSIVE MODE;
+    EXECUTE format(
+        'CREATE TABLE public.%I (LIKE public.audit_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (
+             DELETE FROM public.audit_events_default
+             WHERE occurred_at >= %L AND occurred_at < %L
+             RETURNING *
+         )
+         INSERT INTO public.%I SELECT * FROM moved',
+        lower_bound, upper_bound, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE public.audit_events ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound
+    );
+    RETURN partition_name;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- 007: client_golden_attributes, the survivorship outcome per client attribute
+--
+-- The golden-record merge (GoldenRecordMergeService, FT-07) writes winning
+-- values onto clients; this table keeps how each was chosen: the winning
+-- source, the ST-12 confidence (share of precedence weight agreeing with the
+-- value) and whether the sources disagreed. One row per (client, attribute),
+-- replaced on every merge run. Until it exists the merge only updates clients.
+--
+--   psql -d scv -f backend_v2/migrations/007_client_golden_attributes.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.client_golden_attributes (
+    client_id    integer NOT NULL REFERENCES public.clients (id) ON DELETE CASCADE,
+    attribute    varchar(100) NOT NULL,
+    value        text,
+    source_code  varchar(50),
+    confidence   numeric(5,4) NOT NULL,
+    conflict     boolean NOT NULL,
+    resolved_at  timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (client_id, attribute)
+);
+
+-- Review queues: low-confidence and conflicting attributes
+CREATE INDEX IF NOT EXISTS ix_client_golden_attributes_review
+    ON public.client_golden_attributes (attribute, confidence)
+    WHERE conflict;
+
+COMMIT;
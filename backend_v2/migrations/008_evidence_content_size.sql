@@ -0,0 +1,35 @@
+-- 008: evidence_artefacts.content_size for inline content too
+--
+-- Artefact headers show content_size (migration 005), which until now was
+-- set only when content moved into the evidence store; inline rows had it
+-- computed per header read as octet_length(content::text), which
+-- decompresses and serialises every artefact on each profile load. From
+-- here on a trigger keeps content_size at the byte length of the inline
+-- content's JSON text on INSERT / UPDATE OF content (rows with a
+-- storage_ref keep the object's size, set by the offload). Headers read the
+-- column; rows not yet backfilled fall back to pg_column_size(content).
+--
+-- Apply (after 005), then backfill existing inline rows in batches:
+--   psql -d scv -f backend_v2/migrations/008_evidence_content_size.sql
+--   python tools/backfill_evidence_content_sizes.py
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.evidence_artefacts_set_content_size()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.storage_ref IS NULL THEN
+        NEW.content_size := octet_length(NEW.content::text);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_evidence_artefacts_content_size ON public.evidence_artefacts;
+CREATE TRIGGER trg_evidence_artefacts_content_size
+    BEFORE INSERT OR UPDATE OF content, storage_ref ON public.evidence_artefacts
+    FOR EACH ROW EXECUTE FUNCTION public.evidence_artefacts_set_content_size();
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- 009: index ingestion audit entries by entity_id
+--
+-- The ST-30 AuditIngestionService (src/services/audit/service.py) stores the
+-- ingested entity in details ->> 'entity_id' of 'ingestion.*' rows and reads
+-- one entity's entries back by it, which without an index scans every
+-- audit_events partition. This partial expression index (created on the
+-- partitioned table, so on every partition, and on partitions created
+-- later) serves that lookup in occurred_at order; callers that pass `since`
+-- also prune the older partitions.
+--
+-- Apply (after 003):
+--   psql -d scv -f backend_v2/migrations/009_audit_events_ingestion_entity.sql
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_audit_events_ingestion_entity
+    ON public.audit_events USING btree ((details ->> 'entity_id'), occurred_at)
+    WHERE event_type LIKE 'ingestion.%';
+
+COMMIT;
@@ -0,0 +1,89 @@
+-- 010: search_changes, the change feed behind search index catch-up
+--
+-- Every API worker keeps its search index current by re-reading rows written
+-- elsewhere (ClientSearchService.catch_up, every SEARCH_CATCH_UP_SECONDS).
+-- Until now it found them with age(xmin), which no index can serve: each
+-- worker scanned clients and crm_contacts in full every cycle, and deleted
+-- rows were never noticed. Statement-level triggers now append one row per
+-- changed row key (with the writing transaction's id) to search_changes;
+-- catch-up reads the entries of transactions at or after its watermark
+-- (the oldest transaction running when it last looked) through
+-- ix_search_changes_txid, skips those it already applied, and re-reads only
+-- the changed rows by primary key. A key whose row is gone is removed from
+-- the index.
+--
+-- Entries older than a week are pruned by tools/build_search_segments.py
+-- (SELECT search_changes_prune(interval '7 days')); a persisted index built
+-- before that is rebuilt rather than caught up.
+--
+-- Apply, then rebuild the persisted search segments (tools/build_search_segments.py):
+--   psql -d scv -f backend_v2/migrations/010_search_changes.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.search_changes (
+    change_id bigserial PRIMARY KEY,
+    txid bigint NOT NULL DEFAULT (pg_current_xact_id()::text::bigint),
+    source text NOT NULL,
+    row_key text NOT NULL,
+    op character(1) NOT NULL,  -- I, U or D
+    changed_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_search_changes_txid ON public.search_changes USING btree (txid);
+CREATE INDEX IF NOT EXISTS ix_search_changes_changed_at ON public.search_changes USING btree (changed_at);
+
+-- TG_ARGV[0]: the column that keys the changed rows in the search index
+CREATE OR REPLACE FUNCTION public.search_changes_record()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO public.search_changes (source, row_key, op)
+        SELECT DISTINCT TG_TABLE_NAME, to_jsonb(o) ->> TG_ARGV[0], 'D' FROM old_rows o;
+    ELSE
+        INSERT INTO public.search_changes (source, row_key, op)
+        SELECT DISTINCT TG_TABLE_NAME, to_jsonb(n) ->> TG_ARGV[0], left(TG_OP, 1) FROM new_rows n;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_clients_search_insert ON public.clients;
+CREATE TRIGGER trg_clients_search_insert AFTER INSERT ON public.clients
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+DROP TRIGGER IF EXISTS trg_clients_search_update ON public.clients;
+CREATE TRIGGER trg_clients_search_update AFTER UPDATE ON public.clients
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+DROP TRIGGER IF EXISTS trg_clients_search_delete ON public.clients;
+CREATE TRIGGER trg_clients_search_delete AFTER DELETE ON public.clients
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+
+DROP TRIGGER IF EXISTS trg_crm_contacts_search_insert ON public.crm_contacts;
+CREATE TRIGGER trg_crm_contacts_search_insert AFTER INSERT ON public.crm_contacts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+DROP TRIGGER IF EXISTS trg_crm_contacts_search_update ON public.crm_contacts;
+CREATE TRIGGER trg_crm_contacts_search_update AFTER UPDATE ON public.crm_contacts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+DROP TRIGGER IF EXISTS trg_crm_contacts_search_delete ON public.crm_contacts;
+CREATE TRIGGER trg_crm_contacts_search_delete AFTER DELETE ON public.crm_contacts
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+
+CREATE OR REPLACE FUNCTION public.search_changes_prune(keep interval)
+RETURNS bigint
+LANGUAGE sql
+AS $$
+    WITH pruned AS (
+        DELETE FROM public.search_changes WHERE changed_at < now() - keep RETURNING 1
+    )
+    SELECT count(*) FROM pruned;
+$$;
+
+COMMIT;
@@ -0,0 +1,63 @@
+-- 011: kyc_flags on the search change feed
+--
+-- The search kyc_flag facet (open flag codes per client) is kept current by
+-- search catch-up like the text index (migration 010), so flags opened,
+-- closed or deleted through other workers or processes reach every
+-- worker's facets. kyc_flags changes are recorded keyed by client_id;
+-- catch-up re-reads that client's open flags (ix_kyc_flags_client_id).
+-- An UPDATE now records the keys of the old rows as well as the new ones,
+-- so a flag moved to another client updates both.
+--
+-- Apply (after 010):
+--   psql -d scv -f backend_v2/migrations/011_search_changes_kyc_flags.sql
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.search_changes_record()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO public.search_changes (source, row_key, op)
+        SELECT DISTINCT TG_TABLE_NAME, to_jsonb(o) ->> TG_ARGV[0], 'D' FROM old_rows o;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO public.search_changes (source, row_key, op)
+        SELECT TG_TABLE_NAME, k, 'U'
+        FROM (
+            SELECT to_jsonb(n) ->> TG_ARGV[0] AS k FROM new_rows n
+            UNION
+            SELECT to_jsonb(o) ->> TG_ARGV[0] FROM old_rows o
+        ) keys;
+    ELSE
+        INSERT INTO public.search_changes (source, row_key, op)
+        SELECT DISTINCT TG_TABLE_NAME, to_jsonb(n) ->> TG_ARGV[0], 'I' FROM new_rows n;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- UPDATE triggers now need both transition tables
+DROP TRIGGER IF EXISTS trg_clients_search_update ON public.clients;
+CREATE TRIGGER trg_clients_search_update AFTER UPDATE ON public.clients
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+DROP TRIGGER IF EXISTS trg_crm_contacts_search_update ON public.crm_contacts;
+CREATE TRIGGER trg_crm_contacts_search_update AFTER UPDATE ON public.crm_contacts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('id');
+
+DROP TRIGGER IF EXISTS trg_kyc_flags_search_insert ON public.kyc_flags;
+CREATE TRIGGER trg_kyc_flags_search_insert AFTER INSERT ON public.kyc_flags
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('client_id');
+DROP TRIGGER IF EXISTS trg_kyc_flags_search_update ON public.kyc_flags;
+CREATE TRIGGER trg_kyc_flags_search_update AFTER UPDATE ON public.kyc_flags
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('client_id');
+DROP TRIGGER IF EXISTS trg_kyc_flags_search_delete ON public.kyc_flags;
+CREATE TRIGGER trg_kyc_flags_search_delete AFTER DELETE ON public.kyc_flags
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.search_changes_record('client_id');
+
+COMMIT;
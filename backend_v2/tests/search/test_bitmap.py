@@ -0,0 +1,51 @@
+import random
+
+from app.search.bitmap import Bitmap
+
+
+def _sample(rng, n, spread):
+    return {rng.randrange(spread) for _ in range(n)}
+
+
+def test_bitmap_ops_agree_with_sets_for_sparse_and_dense_chunks():
+    rng = random.Random(3)
+    for n_a, n_b in ((50, 60), (9_000, 40), (9_000, 12_000)):
+        a, b = _sample(rng, n_a, 140_000), _sample(rng, n_b, 140_000)
+        ba, bb = Bitmap.from_iterable(a), Bitmap.from_iterable(b)
+
+        assert len(ba) == len(a)
+        assert list(ba & bb) == sorted(a & b)
+        assert list(ba | bb) == sorted(a | b)
+        assert list(ba - bb) == sorted(a - b)
+        assert ba.and_cardinality(bb) == len(a & b)
+        probe = next(iter(a))
+        assert probe in ba and -1 not in ba
+
+
+def test_dense_chunk_is_a_bitset_and_shrinks_back():
+    dense = Bitmap.from_iterable(range(5_000))
+    assert isinstance(dense.chunks[0], int)
+
+    sparse = dense & Bitmap.from_iterable(range(0, 5_000, 10))
+    assert not isinstance(sparse.chunks[0], int)
+    assert len(sparse) == 500
+
+
+def test_add_and_discard():
+    bm = Bitmap()
+    for v in (5, 70_000, 5):
+        bm.add(v)
+    assert list(bm) == [5, 70_000]
+    bm.discard(70_000)
+    bm.discard(12)
+    assert list(bm) == [5]
+    assert bm.chunks.keys() == {0}
+
+
+def test_and_not_across_container_kinds():
+    dense = Bitmap.from_iterable(range(5_000))
+    sparse = Bitmap.from_iterable([3, 4_999, 70_000])
+    assert list(sparse - dense) == [70_000]
+    assert len(dense - sparse) == 4_998 and 3 not in (dense - sparse)
+    assert list(dense - dense) == [] and (dense - dense).chunks == {}
+    assert list(sparse - Bitmap()) == [3, 4_999, 70_000]
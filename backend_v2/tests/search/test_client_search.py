@@ -0,0 +1,56 @@
+from app.search.index import InvertedIndex, SearchDocument
+
+
+DOCS = [
+    SearchDocument(
+        key="client:1",
+        kind="client",
+        client_id=1,
+        name="Acme Manufacturing Ltd",
+        identifiers=("CRM-CORP-001", "GB999000111"),
+        email="treasury@acme-mfg.co.uk",
+        address="10 Foundry Park, Birmingham, B1 2AB, United Kingdom",
+    ),
+    SearchDocument(
+        key="client:2",
+        kind="client",
+        client_id=2,
+        name="Northbridge Capital Markets LLP",
+        identifiers=("CRM-FI-002", "GB777123456"),
+        email="ops@northbridgecm.com",
+        address="25 Bishopsgate, London EC2N 4AA, United Kingdom",
+    ),
+]
+
+
+def _client_ids(index, query, **kwargs):
+    _, ranked = index.rank(query, **kwargs)
+    return [index.docs[d].client_id for d, _, _ in ranked]
+
+
+def test_empty_index_returns_no_matches():
+    assert _client_ids(InvertedIndex().freeze(), "dummy query") == []
+
+
+def test_search_by_name_ignores_case_and_legal_suffix():
+    assert _client_ids(InvertedIndex.from_documents(DOCS), "acme LIMITED") == [1]
+
+
+def test_search_by_identifier_and_email():
+    index = InvertedIndex.from_documents(DOCS)
+    assert _client_ids(index, "crm-fi-002") == [2]
+    assert _client_ids(index, "TREASURY@acme-mfg.co.uk") == [1]
+
+
+def test_and_or_modes():
+    index = InvertedIndex.from_documents(DOCS)
+    assert _client_ids(index, "acme northbridge") == []
+    assert set(_client_ids(index, "acme northbridge", mode="or")) == {1, 2}
+
+
+def test_fuzzy_search_tolerates_typos():
+    index = InvertedIndex.from_documents(DOCS)
+    assert _client_ids(index, "Northbrigde") == []
+    hits = index.fuzzy("Northbrigde Capital Markets")
+    assert [index.docs[d].client_id for d, _ in hits] == [2]
+    assert 0.8 < hits[0][1] < 1.0
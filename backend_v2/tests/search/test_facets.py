@@ -0,0 +1,174 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.repositories.kyc_flag_repository import KycFlagRepository
+from app.schemas.kyc_flag import KycFlagCreate
+from app.search.facets import FacetIndex
+from app.search.bitmap import Bitmap
+from app.search.index import SearchDocument
+from app.search.segments import SegmentedIndex
+from app.services import client_search_service
+from app.services.client_search_service import ClientSearchService
+from app.services.client_summary_service import ClientSummaryService
+from app.services.kyc_flag_service import KycFlagService
+
+
+CLIENTS = [
+    (1, "United Kingdom", "Corporate – Mid Cap", "Medium"),
+    (2, "GB", "Financial Institution – Broker/Dealer", "High"),
+    (3, "Germany", "Corporate – Mid Cap", "low"),
+    (4, "UK", "Asset Manager – Fund", "High"),
+]
+FLAGS = [(2, "PEP"), (2, "SANCTIONS"), (4, "pep")]
+
+
+def _facets():
+    return FacetIndex.build(CLIENTS, FLAGS)
+
+
+def test_filters_or_within_facet_and_across_facets():
+    idx = _facets()
+    assert idx.filter_bitmap({}) is None
+    assert list(idx.filter_bitmap({"country": ["uk"]})) == [1, 2, 4]
+    assert list(idx.filter_bitmap({"country": ["GB"], "kyc_flag": ["PEP"]})) == [2, 4]
+    assert list(idx.filter_bitmap({"risk_rating": ["high", "low"], "kyc_flag": ["sanctions"]})) == [2]
+    assert list(idx.filter_bitmap({"country": ["FR"]})) == []
+
+
+def test_counts_are_multi_select_and_filter_bitmaps_are_cached():
+    idx = _facets()
+    matched = Bitmap.from_iterable([1, 2, 3])
+    counts = idx.counts(matched, {"country": ["GB"]})
+
+    # the selected facet counts ignore its own filter; the others apply it
+    assert counts["country"] == {"GB": 2, "DE": 1}
+    assert counts["risk_rating"] == {"HIGH": 1, "MEDIUM": 1}
+    assert counts["kyc_flag"] == {"PEP": 1, "SANCTIONS": 1}
+    assert idx.filter_bitmap({"country": ["GB"]}) is idx.filter_bitmap({"country": ["gb"]})
+
+    idx.upsert_client(5, country="France")
+    idx.add_flag(5, "PEP")
+    assert list(idx.filter_bitmap({"kyc_flag": ["PEP"]})) == [2, 4, 5]
+
+
+def test_updated_client_moves_between_bitmaps():
+    idx = _facets()
+    idx.upsert_client(3, country="France", segment="Corporate – Mid Cap", risk_rating="High")
+    assert list(idx.filter_bitmap({"country": ["DE"]})) == []
+    assert "DE" not in idx.values["country"]
+    assert list(idx.filter_bitmap({"country": ["FR"]})) == [3]
+    assert list(idx.filter_bitmap({"risk_rating": ["HIGH"]})) == [2, 3, 4]
+    assert list(idx.filter_bitmap({"risk_rating": ["LOW"]})) == []
+
+    idx.remove_client(2)
+    assert list(idx.filter_bitmap({"country": ["GB"]})) == [1, 4]
+    assert list(idx.filter_bitmap({"kyc_flag": ["PEP"]})) == [4]
+    assert "SANCTIONS" not in idx.values["kyc_flag"]
+
+
+def test_flag_leaves_the_facet_with_the_last_open_flag_of_its_code():
+    idx = _facets()
+    idx.add_flag(4, "PEP")  # a second open PEP flag
+    idx.set_flags(4, ["PEP"])  # one of them closed
+    assert list(idx.filter_bitmap({"kyc_flag": ["PEP"]})) == [2, 4]
+    idx.set_flags(4, [])
+    assert list(idx.filter_bitmap({"kyc_flag": ["PEP"]})) == [2]
+    idx.set_flags(2, ["SANCTIONS"])
+    assert list(idx.filter_bitmap({"kyc_flag": ["PEP"]})) == []
+    assert list(idx.filter_bitmap({"kyc_flag": ["SANCTIONS"]})) == [2]
+
+
+def test_search_applies_filters_and_reports_facets(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    index.upsert(
+        [SearchDocument(key=f"client:{i}", kind="client", client_id=i, name=f"Acme {i}") for i, *_ in CLIENTS]
+        + [SearchDocument(key="crm_contact:x", kind="crm_contact", client_id=None, name="Acme Contact")]
+    )
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(client_search_service, "_FACETS", _facets())
+
+    result = ClientSearchService.search(None, "acme", filters={"kyc_flag": ["PEP"]}, facets=True)
+    assert sorted(h["client_id"] for h in result["hits"]) == [2, 4]
+    assert result["total"] == 2
+    assert result["facets"]["kyc_flag"] == {"PEP": 2, "SANCTIONS": 1}
+    assert result["facets"]["country"] == {"GB": 2}
+
+    unfiltered = ClientSearchService.search(None, "acme")
+    assert unfiltered["total"] == 5 and "facets" not in unfiltered
+
+
+def test_new_open_kyc_flag_updates_the_facet(monkeypatch):
+    facets = _facets()
+    monkeypatch.setattr(client_search_service, "_FACETS", facets)
+    monkeypatch.setattr(KycFlagRepository, "create", staticmethod(lambda db, data: SimpleNamespace(**data.model_dump())))
+    monkeypatch.setattr(ClientSummaryService, "refresh_clients", staticmethod(lambda db, ids: 0))
+
+    KycFlagService.create(MagicMock(), KycFlagCreate(client_id=3, code="sanctions"))
+    KycFlagService.create(MagicMock(), KycFlagCreate(client_id=1, code="PEP", status="CLOSED"))
+
+    assert list(facets.filter_bitmap({"kyc_flag": ["SANCTIONS"]})) == [2, 3]
+    assert list(facets.filter_bitmap({"kyc_flag": ["PEP"]})) == [2, 4]
+
+
+def test_counts_while_clients_are_added():
+    idx = _facets()
+    matched = Bitmap.from_iterable(range(20_000))
+    stop = threading.Event()
+
+    def writer():
+        client_id = 100
+        while not stop.is_set():
+            idx.upsert_client(client_id, country=f"Country {client_id % 500}")
+            idx.add_flag(client_id, f"F{client_id % 300}")
+            client_id += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(50):
+            idx.counts(matched, {"country": ["GB"]})
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_catch_up_rereads_the_open_flags_of_changed_clients(monkeypatch):
+    facets = _facets()
+    monkeypatch.setattr(client_search_service, "_INDEX", SegmentedIndex(background_merge=False))
+    monkeypatch.setattr(client_search_service, "_FACETS", facets)
+    monkeypatch.setattr(client_search_service, "_SUGGEST", None)
+    monkeypatch.setattr(client_search_service, "_WATERMARKS", {"txid": "700", "applied": []})
+    changes = [
+        SimpleNamespace(change_id=1, txid=705, source="kyc_flags", row_key="2"),
+        SimpleNamespace(change_id=2, txid=706, source="kyc_flags", row_key="4"),
+    ]
+
+    def execute(stmt, params=None):
+        sql = str(stmt)
+        if "pg_current_snapshot" in sql:
+            return MagicMock(scalar=MagicMock(return_value="812"))
+        if "FROM search_changes" in sql:
+            return iter(changes)
+        assert "FROM kyc_flags" in sql and sorted(params["ids"]) == [2, 4]
+        return iter([SimpleNamespace(client_id=2, code="SANCTIONS")])  # 2's PEP and 4's pep closed
+
+    ClientSearchService.catch_up(MagicMock(execute=execute))
+    assert list(facets.filter_bitmap({"kyc_flag": ["PEP"]})) == []
+    assert list(facets.filter_bitmap({"kyc_flag": ["SANCTIONS"]})) == [2]
+
+
+def test_fuzzy_facet_counts_agree_with_filtered_totals(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    index.upsert([
+        SearchDocument(key=f"client:{i}", kind="client", client_id=i, name=name)
+        for i, name in ((1, "Northbridge Capital"), (2, "Northbridge Capitol"), (3, "Northbrige Capital"), (4, "Acme"))
+    ])
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(client_search_service, "_FACETS", _facets())
+
+    unfiltered = ClientSearchService.search(None, "Northbrigde Capital", fuzzy="on", limit=1, facets=True)
+    for country, count in unfiltered["facets"]["country"].items():
+        filtered = ClientSearchService.search(None, "Northbrigde Capital", fuzzy="on", limit=1, filters={"country": [country]})
+        assert filtered["total"] == count
+    assert unfiltered["facets"]["country"] == {"GB": 2, "DE": 1}
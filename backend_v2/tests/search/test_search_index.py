@@ -0,0 +1,24 @@
+from app.search.index import InvertedIndex, SearchDocument, intersect, union
+
+
+def test_intersect_and_union_of_sorted_postings():
+    assert intersect([[1, 3, 5, 7], [3, 4, 5], [0, 3, 5, 9]]) == [3, 5]
+    assert intersect([[1, 2], []]) == []
+    assert union([[1, 4], [2, 4], []]) == [1, 2, 4]
+
+
+def test_postings_are_compact_sorted_arrays():
+    idx = InvertedIndex.from_documents(
+        [
+            SearchDocument(key="client:1", kind="client", client_id=1, name="London Fund"),
+            SearchDocument(key="client:2", kind="client", client_id=2, name="Paris Fund"),
+            SearchDocument(key="crm_contact:x", kind="crm_contact", client_id=None, name="Jane London"),
+        ]
+    )
+
+    postings = idx.postings["name"]["london"]
+    assert postings.typecode == "I"
+    assert list(postings) == [0, 2]
+    assert idx.match("fund london") == [0]
+    assert idx.match("fund", mode="or") == [0, 1]
+    assert idx.stats()["documents"] == 3
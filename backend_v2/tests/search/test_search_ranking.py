@@ -0,0 +1,60 @@
+import pytest
+
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.ranking import top_k
+
+
+def _index():
+    return InvertedIndex.from_documents(
+        [
+            SearchDocument(key="client:1", kind="client", client_id=1, name="Acme Holdings", address="1 Acme Way"),
+            SearchDocument(key="client:2", kind="client", client_id=2, name="Acme", email="ops@acme.com"),
+            SearchDocument(key="client:3", kind="client", client_id=3, name="Zenith Ltd", identifiers=("ACME",)),
+            SearchDocument(key="client:4", kind="client", client_id=4, name="Blue Acme Partners Group"),
+            SearchDocument(key="client:5", kind="client", client_id=5, name="Other", address="2 Acme Road"),
+        ]
+    )
+
+
+def test_top_k_orders_by_score_then_doc_id():
+    assert top_k({4: 1.0, 1: 2.0, 2: 1.0, 3: 0.5}, 3) == [(1, 2.0), (2, 1.0), (4, 1.0)]
+    assert top_k({1: 1.0}, 0) == []
+
+
+def test_field_boosts_and_length_norms_order_hits():
+    idx = _index()
+    total, ranked = idx.rank("acme")
+
+    assert total == 5
+    order = [idx.docs[d].client_id for d, _, _ in ranked]
+    # identifier > name (shorter name first) > address-only
+    assert order[0] == 3
+    assert order.index(2) < order.index(4)
+    assert order[-1] == 5
+    assert set(ranked[0][2]) == {"identifier"}
+    assert set(ranked[1][2]) == {"name", "email"}
+    assert ranked[1][1] == round(sum(ranked[1][2].values()), 4)
+
+
+def test_rank_paginates_without_changing_order():
+    idx = _index()
+    _, full = idx.rank("acme", limit=5)
+    _, page = idx.rank("acme", offset=2, limit=2)
+    assert [d for d, _, _ in page] == [d for d, _, _ in full[2:4]]
+    assert idx.rank("nothing here") == (0, [])
+
+
+def test_term_at_a_time_scores_match_the_per_field_breakdown(monkeypatch):
+    import app.search.index as index_module
+
+    idx = _index()
+    lookups = idx.lookups("acme holdings")
+    docs = idx.match("acme holdings", mode="or")
+    walked = idx.score(docs, lookups)
+    monkeypatch.setattr(index_module, "_PROBE_RATIO", 0)
+    probed = idx.score(docs, lookups)
+
+    for d in docs:
+        assert walked[d] == pytest.approx(probed[d])
+        assert walked[d] == pytest.approx(sum(idx.breakdown(d, lookups).values()), abs=1e-3)  # breakdown is rounded
+    assert idx.score([], lookups) == {}
@@ -0,0 +1,80 @@
+import pytest
+
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.storage import (
+    MappedIndex,
+    SegmentFormatError,
+    open_index_dir,
+    read_manifest,
+    write_index_dir,
+    write_segment,
+)
+
+
+DOCS = [
+    SearchDocument(
+        key="client:1", kind="client", client_id=1, name="Acme Manufacturing Ltd",
+        identifiers=("CRM-CORP-001", "GB999000111"), email="treasury@acme-mfg.co.uk",
+        address="10 Foundry Park, Birmingham",
+    ),
+    SearchDocument(key="client:2", kind="client", client_id=2, name="Flextronics Ltd", identifiers=("TAX-777",)),
+    SearchDocument(key="crm_contact:x", kind="crm_contact", client_id=None, name="Jane Acme", email="jane@acme.com"),
+]
+
+
+def test_mapped_segment_answers_like_the_in_memory_index(tmp_path):
+    built = InvertedIndex.from_documents(DOCS)
+    mapped = MappedIndex(write_segment(built, tmp_path / "a.scvseg"))
+
+    assert len(mapped) == 3
+    assert mapped.docs[0] == DOCS[0]
+    for query in ("acme", "CRM-CORP-001", "jane@acme.com", "birmingham acme"):
+        assert mapped.match(query) == built.match(query)
+        total, ranked = mapped.rank(query)
+        expected_total, expected = built.rank(query)
+        assert total == expected_total
+        assert [(d, round(s, 3)) for d, s, _ in ranked] == [(d, round(s, 3)) for d, s, _ in expected]
+    assert mapped.fuzzy("Flextronix") == built.fuzzy("Flextronix")
+    assert list(mapped.match_clients("acme")) == list(built.match_clients("acme")) == [1]
+    assert mapped.locate("crm_contact:x") == 2
+    assert mapped.locate("client:404") is None
+
+
+def test_index_dir_opens_without_decoding_and_accepts_deltas(tmp_path):
+    manifest = write_index_dir(
+        tmp_path, [InvertedIndex.from_documents(DOCS[:2]), InvertedIndex.from_documents(DOCS[2:])],
+        meta={"watermarks": {"txid": "812", "applied": []}},
+    )
+    assert read_manifest(tmp_path)["watermarks"] == {"txid": "812", "applied": []}
+    assert len(list(tmp_path.glob("*.scvseg"))) == len(manifest["segments"]) == 2
+
+    index, _ = open_index_dir(tmp_path, background_merge=False)
+    assert len(index) == 3
+    assert index.live == {}
+
+    index.upsert([SearchDocument(key="client:2", kind="client", client_id=2, name="Flextronix Group")])
+    index.delete(["crm_contact:x"])
+    assert len(index) == 2
+    assert [d.client_id for d in index.match("flextronix")] == [2]
+    assert index.match("flextronics") == []
+    assert [d.client_id for d in index.match("acme")] == [1]
+
+    # a new generation replaces the old one; its files outlive the swap for a while
+    old = sorted(p.name for p in tmp_path.glob("*.scvseg"))
+    manifest = write_index_dir(tmp_path, [InvertedIndex.from_documents(DOCS)], generation="next", retain_seconds=0)
+    assert manifest["segments"] == ["seg-next-00000.scvseg"] and sorted(manifest["retired"]) == old
+    assert len(list(tmp_path.glob("*.scvseg"))) == 3
+
+    # ...and are deleted by the first write after retain_seconds
+    manifest = write_index_dir(tmp_path, [InvertedIndex.from_documents(DOCS)], generation="last", retain_seconds=0)
+    assert sorted(p.name for p in tmp_path.glob("*.scvseg")) == ["seg-last-00000.scvseg", "seg-next-00000.scvseg"]
+    assert list(manifest["retired"]) == ["seg-next-00000.scvseg"]
+    write_index_dir(tmp_path, [InvertedIndex.from_documents(DOCS)], generation="last", retain_seconds=3600)
+    assert "seg-next-00000.scvseg" in read_manifest(tmp_path)["retired"]
+
+
+def test_rejects_foreign_files(tmp_path):
+    bogus = tmp_path / "bogus.scvseg"
+    bogus.write_bytes(b"not a segment at all")
+    with pytest.raises(SegmentFormatError):
+        MappedIndex(bogus)
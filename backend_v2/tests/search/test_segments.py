@@ -0,0 +1,212 @@
+from unittest.mock import MagicMock
+
+import app.search.segments as segments
+from app.search.index import SearchDocument
+from app.search.segments import SegmentedIndex
+from app.search.suggest import SuggestIndex
+from app.services import client_search_service
+from app.services.client_search_service import ClientSearchService
+
+
+def _doc(i, name, **kw):
+    return SearchDocument(key=f"client:{i}", kind="client", client_id=i, name=name, **kw)
+
+
+def _ids(index, query):
+    return [doc.client_id for doc, _, _ in index.rank(query)[1]]
+
+
+def test_upsert_replaces_previous_version_and_delete_tombstones():
+    index = SegmentedIndex.from_documents([_doc(1, "Acme Ltd"), _doc(2, "Zenith Holdings")], background_merge=False)
+
+    index.upsert([_doc(1, "Acme Renamed Group"), _doc(3, "Acme Logistics")])
+    assert index.stats()["segments"] == 2
+    assert sorted(_ids(index, "acme")) == [1, 3]
+    assert _ids(index, "renamed") == [1]
+    assert len(index) == 3
+
+    assert index.delete(["client:3", "client:missing"]) == 1
+    assert _ids(index, "acme") == [1]
+    assert [d.client_id for d in index.match("zenith")] == [2]
+
+
+def test_idf_spans_segments():
+    index = SegmentedIndex.from_documents([_doc(i, "Common Name") for i in range(20)], background_merge=False)
+    index.upsert([_doc(99, "Common Rare")])
+
+    _, ranked = index.rank("common", mode="or")
+    fresh = next(s for d, s, _ in ranked if d.client_id == 99)
+    # "common" is frequent corpus-wide, so the single-doc segment does not inflate its score
+    assert fresh < 2 * ranked[0][1]
+    assert _ids(index, "rare") == [99]
+
+
+def test_small_segments_merge_when_they_pile_up(monkeypatch):
+    monkeypatch.setattr(segments, "MERGE_FACTOR", 3)
+    index = SegmentedIndex(background_merge=False)
+    index.upsert([_doc(1, "Alpha")])
+    index.upsert([_doc(2, "Beta")])
+    assert index.stats()["segments"] == 2
+    index.upsert([_doc(3, "Gamma")])
+    assert index.stats()["segments"] == 1
+    assert sorted(d.client_id for d in index.match("alpha beta gamma", mode="or")) == [1, 2, 3]
+
+
+def test_merge_keeps_updates_made_while_it_runs(monkeypatch):
+    monkeypatch.setattr(segments, "MERGE_FACTOR", 100)
+    monkeypatch.setattr(segments, "MAX_DELETED_RATIO", 2.0)
+    index = SegmentedIndex(background_merge=False)
+    index.upsert([_doc(1, "Alpha"), _doc(2, "Beta")])
+    index.upsert([_doc(3, "Gamma")])
+    old = list(index.segments)
+
+    build = segments.InvertedIndex.from_documents
+
+    def build_while_writing(docs):
+        built = build(docs)
+        monkeypatch.setattr(segments.InvertedIndex, "from_documents", build)
+        index.upsert([_doc(2, "Beta Updated")])
+        return built
+
+    monkeypatch.setattr(segments.InvertedIndex, "from_documents", build_while_writing)
+    merged = index.merge(old)
+
+    assert merged.live_count == 2
+    assert sorted(d.client_id for d in index.match("beta")) == [2]
+    assert _ids(index, "updated") == [2]
+    assert index.merge(old) is None  # stale segments are not merged twice
+
+
+def test_service_indexes_documents_once_built(monkeypatch):
+    monkeypatch.setattr(client_search_service, "_INDEX", None)
+    assert ClientSearchService.index_documents([_doc(1, "Acme")]) == 0
+
+    monkeypatch.setattr(client_search_service, "_INDEX", SegmentedIndex(background_merge=False))
+    assert ClientSearchService.index_documents([_doc(1, "Acme")]) == 1
+    result = ClientSearchService.search(db=None, query="acme")
+    assert [h["client_id"] for h in result["hits"]] == [1]
+    assert ClientSearchService.remove_documents(["client:1"]) == 1
+
+
+class Row:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class ChangeFeedDb:
+    """search_changes entries and the current rows they point at."""
+
+    def __init__(self, changes, clients=(), contacts=(), xmin="812"):
+        self.changes, self.clients, self.contacts, self.xmin = changes, clients, contacts, xmin
+        self.executed = []
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        self.executed.append((sql, params))
+        if "pg_current_snapshot" in sql:
+            return MagicMock(scalar=MagicMock(return_value=self.xmin))
+        if "FROM search_changes" in sql:
+            return iter(self.changes)
+        if "FROM clients" in sql:
+            return iter([r for r in self.clients if r.id in params["ids"]])
+        return iter([r for r in self.contacts if r.id in params["ids"]])
+
+
+def _change(change_id, txid, source, row_key):
+    return Row(change_id=change_id, txid=txid, source=source, row_key=row_key)
+
+
+def _client(i, name):
+    return Row(id=i, external_id=f"E{i}", full_name=name, email=None, primary_address=None,
+               tax_id=None, country="GB", segment="Corporate", risk_rating="LOW")
+
+
+def test_catch_up_indexes_rows_written_elsewhere_and_advances_the_watermark(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(client_search_service, "_FACETS", None)
+    monkeypatch.setattr(client_search_service, "_SUGGEST", None)
+    monkeypatch.setattr(client_search_service, "_WATERMARKS", {"txid": "700", "applied": []})
+    db = ChangeFeedDb(
+        [_change(1, 705, "clients", "5"), _change(2, 820, "clients", "5")],
+        clients=[_client(5, "Acme Holdings")],
+    )
+
+    assert ClientSearchService.catch_up(db) == 1
+    assert _ids(index, "acme") == [5]
+    # Entries of transactions from the new watermark on are read again next time: remember them
+    assert client_search_service._WATERMARKS == {"txid": "812", "applied": [2]}
+    # The new watermark is read before the changes, which are read from the old one
+    assert "pg_current_snapshot" in db.executed[0][0]
+    assert db.executed[1][1] == {"txid": "700"}
+    assert db.executed[2][1] == {"ids": [5]}  # only the changed rows, by primary key
+
+
+def test_catch_up_skips_applied_entries_and_writes_no_segment_without_changes(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(client_search_service, "_FACETS", None)
+    monkeypatch.setattr(client_search_service, "_SUGGEST", None)
+    monkeypatch.setattr(client_search_service, "_WATERMARKS", {"txid": "812", "applied": [2]})
+    db = ChangeFeedDb([_change(2, 820, "clients", "5")], clients=[_client(5, "Acme Holdings")], xmin="900")
+
+    assert ClientSearchService.catch_up(db) == 0
+    assert index.stats()["segments"] == 0
+    assert not any("FROM clients" in sql for sql, _ in db.executed)
+    assert client_search_service._WATERMARKS == {"txid": "900", "applied": []}
+
+
+def test_catch_up_removes_deleted_rows(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    contact = SearchDocument(key="crm_contact:c-1", kind="crm_contact", client_id=None, name="Acme Contact")
+    index.upsert([_doc(5, "Acme Holdings"), _doc(6, "Acme Trading"), contact])
+    suggest = SuggestIndex.build([(5, "Acme Holdings", "E5", 1.0), (6, "Acme Trading", "E6", 1.0)])
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(client_search_service, "_FACETS", None)
+    monkeypatch.setattr(client_search_service, "_SUGGEST", suggest)
+    monkeypatch.setattr(client_search_service, "_WATERMARKS", {"txid": "700", "applied": []})
+    db = ChangeFeedDb([_change(1, 705, "clients", "5"), _change(2, 706, "crm_contacts", "c-1")])
+
+    assert ClientSearchService.catch_up(db) == 2
+    assert [d.key for d in index.match("acme")] == ["client:6"]
+    assert [s["client_id"] for s in suggest.suggest("acme")] == [6]
+
+
+def test_catch_up_waits_for_the_index(monkeypatch):
+    monkeypatch.setattr(client_search_service, "_INDEX", None)
+    db = MagicMock()
+    assert ClientSearchService.catch_up(db) == 0
+    db.execute.assert_not_called()
+
+
+def test_fuzzy_total_counts_every_match_beyond_the_page(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    index.upsert([_doc(1, "Northbridge Capital"), _doc(2, "Northbridge Capitol"), _doc(3, "Acme")])
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+
+    page = ClientSearchService.search(db=None, query="Northbrigde Capital", fuzzy="on", limit=1)
+    assert len(page["hits"]) == 1 and page["total"] == 2
+    second = ClientSearchService.search(db=None, query="Northbrigde Capital", fuzzy="on", limit=1, offset=1)
+    assert [h["client_id"] for h in second["hits"]] != [h["client_id"] for h in page["hits"]]
+
+    all_hits = ClientSearchService.search(db=None, query="Northbrigde Capital", fuzzy="on", limit=10)
+    assert all_hits["total"] == len(all_hits["hits"]) == 2
+
+
+def test_matched_clients_is_bitmap_algebra_over_live_segments():
+    index = SegmentedIndex.from_documents(
+        [_doc(1, "Acme Holdings"), _doc(2, "Acme Trading"), _doc(3, "Zenith Holdings")], background_merge=False
+    )
+    index.upsert([_doc(2, "Beta Trading")])  # 2's first version is tombstoned
+    index.upsert([SearchDocument(key="crm_contact:x", kind="crm_contact", client_id=None, name="Acme Holdings")])
+
+    assert list(index.matched_clients("acme")) == [1]
+    assert list(index.matched_clients("trading")) == [2]
+    assert list(index.matched_clients("acme holdings")) == [1]
+    assert list(index.matched_clients("acme zenith", mode="or")) == [1, 3]
+    index.delete(["client:1"])
+    assert list(index.matched_clients("holdings")) == [3]
+    # agrees with the doc-level match
+    for query in ("acme", "trading", "holdings", "beta"):
+        expected = sorted(d.client_id for d in index.match(query) if d.client_id)
+        assert list(index.matched_clients(query)) == expected
@@ -0,0 +1,96 @@
+import random
+from types import SimpleNamespace
+
+from app.search.suggest import SuggestIndex, segment_weight
+from app.services import client_search_service
+from app.services.client_search_service import ClientSearchService
+
+
+ROWS = [
+    (1, "Acme Manufacturing Ltd", "CRM-CORP-001", segment_weight("Corporate – Mid Cap")),
+    (2, "Northbridge Capital Markets LLP", "CRM-FI-002", segment_weight("Financial Institution – Broker/Dealer")),
+    (3, "Acme Logistics", "CRM-CORP-003", segment_weight(None)),
+    (4, "Capital Health Trust", "CRM-PS-004", segment_weight("Public Sector / Healthcare")),
+]
+
+
+def test_segment_weights():
+    assert segment_weight("Financial Institution – Broker/Dealer") == 1.0
+    assert segment_weight("unknown") == segment_weight(None) == 0.5
+
+
+def test_prefix_on_name_word_starts_ranked_by_weight():
+    idx = SuggestIndex.build(ROWS)
+    assert [s["client_id"] for s in idx.suggest("acm")] == [1, 3]
+    # "capital" matches a later word of client 2 and the first word of client 4
+    assert [s["client_id"] for s in idx.suggest("Capital")] == [2, 4]
+    assert idx.suggest("zzz") == []
+
+
+def test_prefix_on_external_id_and_limit():
+    idx = SuggestIndex.build(ROWS)
+    assert [s["client_id"] for s in idx.suggest("crm-corp")] == [1, 3]
+    assert [s["client_id"] for s in idx.suggest("crm", limit=2)] == [2, 1]
+
+
+def test_block_heap_matches_brute_force_top_n():
+    rng = random.Random(7)
+    words = ["alpha", "beta", "gamma", "delta", "alps", "bear"]
+    rows = [
+        (i, " ".join(rng.choice(words) for _ in range(2)), None, round(rng.random(), 3))
+        for i in range(2_000)
+    ]
+    idx = SuggestIndex.build(rows)
+    got = [s["client_id"] for s in idx.suggest("al", limit=20)]
+
+    matching = [r for r in rows if any(w.startswith("al") for w in r[1].split())]
+    best = sorted(idx.weights[r[0]] for r in matching)[-20:]
+    assert sorted(idx.weights[c] for c in got) == best
+
+
+def test_short_prefix_table_agrees_with_range_search():
+    rng = random.Random(11)
+    rows = [(i, f"{rng.choice('abc')}{rng.choice('xyz')} co {i}", None, round(rng.random(), 3)) for i in range(500)]
+    idx = SuggestIndex.build(rows)
+    for q in ("a", "bx", "c"):
+        cached = idx.suggest(q, limit=10)
+        ranged = idx.suggest(q, limit=60)[:10]
+        assert [s["weight"] for s in cached] == [s["weight"] for s in ranged]
+
+
+def test_upserted_clients_are_suggested_before_a_rebuild():
+    idx = SuggestIndex.build(ROWS)
+
+    idx.upsert(5, "Acme Shipping", "CRM-CORP-005", 0.95)  # new
+    idx.upsert(3, "Zenith Logistics", "CRM-CORP-003", segment_weight(None))  # renamed
+
+    assert [s["client_id"] for s in idx.suggest("acm")] == [5, 1]
+    assert [s["label"] for s in idx.suggest("zen")] == ["Zenith Logistics"]
+    assert [s["client_id"] for s in idx.suggest("crm-corp")] == [5, 1, 3]
+    assert not idx.needs_rebuild
+
+
+def test_cached_wide_ranges_are_returned_as_copies():
+    rows = [(i, f"Client {i}", f"CRM-{i:05d}", 0.5) for i in range(5_000)]
+    idx = SuggestIndex.build(rows)
+
+    first = idx.suggest("crm-0", limit=10)
+    first[0]["label"] = "changed"
+    first.clear()
+
+    again = idx.suggest("crm-0", limit=10)
+    assert len(again) == 10 and again[0]["label"] != "changed"
+
+
+def test_client_writes_reach_type_ahead(monkeypatch):
+    monkeypatch.setattr(client_search_service, "_SUGGEST", SuggestIndex.build(ROWS))
+    monkeypatch.setattr(client_search_service, "_INDEX", None)
+    monkeypatch.setattr(client_search_service, "_FACETS", None)
+    client = SimpleNamespace(
+        id=9, full_name="Acme Aerospace", external_id="CRM-CORP-009", segment="Financial Institution – Bank",
+        email=None, primary_address=None, tax_id=None, country=None, risk_rating=None,
+    )
+
+    ClientSearchService.index_client(client)
+
+    assert [s["client_id"] for s in ClientSearchService.suggest(None, "acme")["suggestions"]] == [9, 1, 3]
@@ -0,0 +1,32 @@
+from app.search.trigram import TrigramIndex, bounded_levenshtein, trigrams
+
+
+def test_trigrams_are_padded():
+    assert trigrams("ab") == ["  a", " ab", "ab "]
+
+
+def test_bounded_levenshtein_stops_early():
+    assert bounded_levenshtein("flextronics", "flextronix", 3) == 2
+    assert bounded_levenshtein("acme", "northbridge", 2) == 3
+
+
+def test_typo_tolerant_search_reranks_by_edit_similarity():
+    idx = TrigramIndex.from_names(
+        [
+            (0, "Flextronics Ltd"),
+            (1, "Flextronix Limited"),
+            (2, "Flexible Packaging plc"),
+            (3, "Acme Manufacturing Ltd"),
+            (4, "FLEXTRONICS LTD."),
+        ]
+    )
+
+    # both spellings normalise onto a name; duplicate names share a name id
+    assert len(idx) == 4
+    results = idx.search("Flextronix")
+    names = [idx.names[n] for n, _ in results]
+    assert names[:2] == ["flextronix", "flextronics"]
+    assert "acme manufacturing" not in names
+
+    docs = [d for d, _ in idx.search_docs("flextronics")]
+    assert set(docs[:2]) == {0, 4}
@@ -0,0 +1,99 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import schema_registry
+from app.periodic import PeriodicTask
+from app.services import audit_partition_service
+from app.services.audit_partition_service import AuditPartitionService
+from app.services.audit_trail_service import RECENT_WINDOW, AuditTrailService
+
+
+class Row:
+    def __init__(self, **kwargs):
+        self._mapping = kwargs
+
+
+@pytest.fixture(autouse=True)
+def audit_events_schema():
+    schema_registry.load(
+        {"audit_events": {"audit_event_id", "occurred_at", "actor", "event_type", "client_id", "details"}}
+    )
+    yield
+    schema_registry.reset()
+
+
+def _rows(n):
+    return [Row(audit_event_id=str(i), occurred_at=datetime(2026, 9, 1, tzinfo=timezone.utc)) for i in range(n)]
+
+
+def test_latest_events_come_from_the_recent_window_in_index_order():
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = _rows(5)
+
+    events = AuditTrailService.list_by_client(db, 7, limit=5)
+
+    assert len(events) == 5
+    assert db.execute.call_count == 1
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "occurred_at >= :since" in sql
+    assert "ORDER BY occurred_at DESC\n" in sql and "NULLS LAST" not in sql
+    assert params["client_id"] == 7 and params["limit"] == 5
+    assert datetime.now(timezone.utc) - params["since"] == pytest.approx(RECENT_WINDOW, abs=timedelta(minutes=1))
+
+
+def test_sparse_history_reads_older_events_for_the_rest():
+    db = MagicMock()
+    db.execute.return_value.fetchall.side_effect = [_rows(2), _rows(1)]
+
+    assert len(AuditTrailService.list_by_client(db, 7, limit=5)) == 3
+    (recent, recent_params), (older, older_params) = [c.args for c in db.execute.call_args_list]
+    assert "occurred_at >= :since" in str(recent) and "occurred_at < :since" in str(older)
+    assert older_params["since"] == recent_params["since"] and older_params["limit"] == 3
+
+
+def test_other_audit_tables_keep_nulls_last():
+    schema_registry.load({"audit_log": {"id", "created_at", "client_id"}})
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = []
+
+    AuditTrailService.list_by_client(db, 7, limit=5)
+
+    assert db.execute.call_count == 1
+    assert "ORDER BY created_at DESC NULLS LAST" in str(db.execute.call_args.args[0])
+
+
+def test_partition_maintenance_is_a_no_op_before_the_migration():
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = False
+
+    assert AuditPartitionService.ensure(db, 3) == 0
+    assert AuditPartitionService.detach_expired(db, 24) == []
+    db.commit.assert_not_called()
+
+
+def test_partitions_are_ensured_periodically_and_failures_are_retried():
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = 4
+    calls = []
+
+    def execute(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("database is starting up")
+        return db.execute.return_value
+
+    db.execute.side_effect = execute
+    maintainer = PeriodicTask("test", audit_partition_service._ensure_with(lambda: db, 3), interval=0.01)
+    try:
+        deadline = time.monotonic() + 5
+        while maintainer.stats()["runs"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        maintainer.close()
+
+    stats = maintainer.stats()
+    assert stats["failures"] == 1 and stats["runs"] >= 1 and stats["last_error"] is None
+    db.rollback.assert_called()
@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+from app.services.client_cluster_service import (
+    ClientClusterService,
+    UnionFind,
+    edges_from_decisions,
+)
+
+
+def test_union_find_groups_transitive_links():
+    uf = UnionFind()
+    uf.union(1, 2)
+    uf.union(3, 4)
+    uf.union(2, 3)
+    uf.add(9)
+
+    assert uf.find(1) == uf.find(4)
+    assert uf.find(9) != uf.find(1)
+    assert uf.union(1, 4) is False
+    assert uf.groups() == [[1, 2, 3, 4], [9]]
+    assert uf.groups(min_size=2) == [[1, 2, 3, 4]]
+
+
+def test_edges_from_decisions_links_clients_sharing_a_source_record():
+    rows = [
+        ("src-a", 1),
+        ("src-a", 2),
+        ("src-a", None),
+        ("src-b", 3),
+        ("src-c", 2),
+        ("src-c", 5),
+    ]
+
+    uf = UnionFind()
+    for a, b in edges_from_decisions(rows):
+        uf.union(a, b)
+
+    assert uf.groups() == [[1, 2, 5], [3]]
+
+
+def test_merge_edges_absorbs_smaller_cluster_and_appends_new_members():
+    db = MagicMock()
+    # existing clusters: big = {1, 2, 3}, small = {7, 8}
+    db.execute.return_value.fetchall.return_value = [
+        ("big", 1),
+        ("big", 2),
+        ("big", 3),
+        ("small", 7),
+        ("small", 8),
+    ]
+
+    result = ClientClusterService.merge_edges(db, [(3, 7), (8, 11)])
+
+    assert result.edges == 2
+    assert result.clusters_created == 0
+    assert result.clusters_merged == 1
+    assert result.members_added == 1
+
+    update_params = db.execute.call_args_list[1].args[1]
+    assert update_params == {"absorbed": ["small"], "survivors": ["big"]}
+
+    insert_params = db.execute.call_args_list[-1].args[1]
+    assert insert_params == {"cluster_ids": ["big"], "client_ids": [11]}
+    db.commit.assert_called_once()
+
+
+def test_merge_edges_creates_cluster_for_unclustered_clients():
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = []
+
+    result = ClientClusterService.merge_edges(db, [(4, 5)])
+
+    assert result.clusters_created == 1
+    assert result.members_added == 2
+    members_params = db.execute.call_args_list[-1].args[1]
+    assert members_params["client_ids"] == [4, 5]
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import schema_registry
+from app.services.client_summary_service import ClientSummaryService
+
+
+@pytest.fixture(autouse=True)
+def _summary_table():
+    schema_registry.load({"client_summary": {"client_id"}})
+    yield
+    schema_registry.reset()
+
+
+def test_refresh_clients_is_one_scoped_upsert():
+    db = MagicMock()
+    db.execute.return_value.rowcount = 2
+
+    assert ClientSummaryService.refresh_clients(db, [3, None, 1, 3]) == 2
+
+    sql, params = db.execute.call_args.args
+    assert params == {"ids": [1, 3]}
+    assert "ON CONFLICT (client_id) DO UPDATE" in str(sql)
+    assert "c.id = ANY(:ids)" in str(sql)
+    db.commit.assert_called_once()
+
+
+def test_refresh_all_is_unscoped():
+    db = MagicMock()
+    ClientSummaryService.refresh_all(db)
+
+    sql = str(db.execute.call_args.args[0])
+    assert ":ids" not in sql
+    db.commit.assert_called_once()
+
+
+def test_no_writes_before_migration():
+    schema_registry.load({})
+    db = MagicMock()
+
+    assert ClientSummaryService.refresh_clients(db, [1]) == 0
+    assert ClientSummaryService.refresh_all(db) == 0
+    db.execute.assert_not_called()
+
+
+def test_get_many_keys_rows_by_client():
+    db = MagicMock()
+    db.execute.return_value.mappings.return_value.all.return_value = [
+        {"client_id": 7, "account_count": 4, "open_kyc_flags": 1},
+    ]
+
+    assert ClientSummaryService.get_many(db, [7, 8]) == {7: {"client_id": 7, "account_count": 4, "open_kyc_flags": 1}}
+    assert db.execute.call_args.args[1] == {"ids": [7, 8]}
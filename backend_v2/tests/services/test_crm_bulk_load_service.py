@@ -0,0 +1,76 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.audit_sink import AuditSink
+from app.repositories.crm_contact_repository import CRMContactRepository
+from app.services.crm_bulk_load_service import BulkCrmIngestionService, FileCrmSource
+
+
+class ListSource:
+    def __init__(self, n):
+        self.n = n
+
+    def read(self):
+        for i in range(self.n):
+            yield {"source_system": "CRM", "source_record_id": f"r{i}", "first_name": "Ada", "last_name": None, "email": None}
+
+
+def test_each_batch_is_committed_then_audited_before_the_next_is_read(monkeypatch):
+    log = []
+
+    def upsert(db, **kw):
+        log.append("upsert")
+        return "inserted", SimpleNamespace(id=kw["source_record_id"], source_record_id=kw["source_record_id"], **{
+            k: kw[k] for k in ("first_name", "last_name", "email")
+        })
+
+    monkeypatch.setattr(CRMContactRepository, "upsert", staticmethod(upsert))
+    db = MagicMock()
+    db.commit.side_effect = lambda: log.append("commit")
+    audit = MagicMock(spec=AuditSink)
+    audit.emit_many.side_effect = lambda events, spill_when_full: log.append(("emit", len(events), spill_when_full))
+
+    result = BulkCrmIngestionService.ingest(db, ListSource(5), audit=audit, batch_size=2)
+
+    assert result.inserted == 5
+    assert log == [
+        "upsert", "upsert", "commit", ("emit", 2, True),
+        "upsert", "upsert", "commit", ("emit", 2, True),
+        "upsert", "commit", ("emit", 1, True),
+    ]
+
+
+def test_a_full_audit_queue_spills_instead_of_failing_a_committed_batch(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        CRMContactRepository, "upsert",
+        staticmethod(lambda db, **kw: ("updated", SimpleNamespace(id=1, source_record_id="r", first_name=None, last_name=None, email=None))),
+    )
+    stalled = threading.Event()
+    audit = AuditSink(lambda batch: stalled.wait(5), capacity=1, batch_size=1, enqueue_timeout=0.01, spill_dir=tmp_path)
+
+    result = BulkCrmIngestionService.ingest(MagicMock(), ListSource(4), audit=audit)
+
+    assert result.updated == 4
+    assert audit.stats()["spilled"] >= 2
+    stalled.set()
+    audit.close(timeout=5)
+
+
+def test_file_source_keeps_identifiers_and_emails_as_sent(tmp_path):
+    path = tmp_path / "crm.csv"
+    path.write_text(
+        "source_system,source_record_id,first_name,last_name,email\n"
+        " CRM ,ＡＢＣ-001 , Ada ,,Ops@Example.COM\n",
+        encoding="utf-8",
+    )
+
+    [record] = list(FileCrmSource(path).read())
+
+    assert record == {
+        "source_system": "CRM",
+        "source_record_id": "ＡＢＣ-001",
+        "first_name": "Ada",
+        "last_name": None,
+        "email": "Ops@Example.COM",
+    }
@@ -0,0 +1,195 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import evidence_store, schema_registry
+from app.evidence_store import ContentStore
+from app.services.evidence_artefact_service import EvidenceArtefactService
+
+
+ARTEFACT_COLUMNS = {"artefact_id", "evidence_bundle_id", "artefact_type", "created_at", "content"}
+
+
+class Row:
+    def __init__(self, **kwargs):
+        self._mapping = kwargs
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    yield
+    schema_registry.reset()
+
+
+def test_linked_lookup_is_one_indexed_query_once_migrated():
+    schema_registry.load(
+        {
+            "evidence_artefacts": ARTEFACT_COLUMNS,
+            "evidence_artefact_subjects": {"artefact_id", "source_record_id", "client_id", "created_at"},
+        }
+    )
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = [Row(artefact_id="a1", evidence_bundle_id="b1")]
+
+    artefacts = EvidenceArtefactService.list_by_client(db, 7, limit=10)
+
+    assert db.execute.call_count == 1
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "FROM evidence_artefact_subjects" in sql and "?|" not in sql
+    assert params == {"client_id": 7, "limit": 10}
+    assert artefacts[0]["storage_ref"] == "b1"
+
+
+def test_falls_back_to_jsonb_lookup_before_migration():
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS})
+    db = MagicMock()
+    db.execute.return_value.fetchall.side_effect = [[("sr-1",)], []]
+
+    EvidenceArtefactService.list_by_client(db, 7)
+
+    assert db.execute.call_count == 2
+    assert "?| :source_ids" in str(db.execute.call_args.args[0])
+
+
+def test_backfill_links_in_keyset_batches():
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS, "evidence_artefact_subjects": {"artefact_id"}})
+    db = MagicMock()
+    pages = iter([[("a1",), ("a2",)], [("a3",)], []])
+    links = iter([5, 2])
+
+    def execute(sql, params):
+        result = MagicMock()
+        if "batch_size" in params:
+            result.__iter__.return_value = iter(next(pages))
+        else:
+            result.scalar.return_value = next(links)
+        return result
+
+    db.execute.side_effect = execute
+
+    assert EvidenceArtefactService.backfill_subjects(db, batch_size=2) == {"artefacts": 3, "links": 7}
+    assert db.commit.call_count == 2
+    last_page_params = [c.args[1] for c in db.execute.call_args_list if "batch_size" in c.args[1]][-1]
+    assert last_page_params["after"] == "a3"
+
+
+def test_profile_gets_headers_not_content():
+    schema_registry.load(
+        {
+            "evidence_artefacts": ARTEFACT_COLUMNS | {"content_hash", "storage_ref"},
+            "evidence_artefact_subjects": {"artefact_id"},
+        }
+    )
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = [Row(artefact_id="a1", storage_ref="cas://ab/cd", content_hash="h")]
+
+    artefacts = EvidenceArtefactService.list_by_client(db, 7)
+
+    sql = str(db.execute.call_args.args[0])
+    assert "a.content," not in sql and "pg_column_size(a.content) AS content_size" in sql
+    assert artefacts[0]["storage_ref"] == "cas://ab/cd"
+    assert artefacts[0]["content_url"] == "/evidence/a1/content"
+
+
+def test_content_hash_falls_back_to_sha256_of_body():
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS})
+    db = MagicMock()
+    db.execute.return_value.fetchone.return_value = MagicMock(content_hash=None, storage_ref=None, body='{"a": 1}')
+
+    content_hash, size, chunks = EvidenceArtefactService.get_content(db, "a1")
+
+    assert b"".join(chunks) == b'{"a": 1}' and size == 8
+    assert content_hash == "f9d86028c6e0d64e225186f96acb69338b2c59764df79162107f5c4bb34d1310"
+    assert "NULL AS content_hash" in str(db.execute.call_args.args[0])
+
+
+def test_stored_content_is_read_from_the_evidence_store(tmp_path):
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS | {"content_hash", "storage_ref"}})
+    store = ContentStore(tmp_path)
+    digest = store.put(b'{"explanation": "same name and date of birth"}')
+    db = MagicMock()
+    db.execute.return_value.fetchone.return_value = MagicMock(
+        content_hash=digest, storage_ref=evidence_store.ref(digest), body='{"source_record_ids": []}'
+    )
+
+    content_hash, size, chunks = EvidenceArtefactService.get_content(db, "a1", store)
+    assert (content_hash, size) == (digest, store.size(digest))
+    assert b"".join(chunks) == store.get(digest)
+    assert EvidenceArtefactService.get_content(db, "a1", ContentStore(tmp_path / "empty")) is None
+
+
+def test_offload_stores_duplicate_content_once(tmp_path):
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS | {"content_hash", "storage_ref", "content_size"}})
+    store = ContentStore(tmp_path)
+    pages = iter([[("a1", '{"x": 1}'), ("a2", '{"x": 1}')], [("a3", '{"x": 2}')], []])
+    db = MagicMock()
+
+    def execute(sql, params):
+        result = MagicMock()
+        if isinstance(params, dict):
+            result.fetchall.return_value = next(pages)
+        return result
+
+    db.execute.side_effect = execute
+
+    counts = EvidenceArtefactService.offload_content(db, store, batch_size=2)
+
+    assert counts == {"artefacts": 3, "bytes": 24, "stored": 2, "deduplicated": 1}
+    assert db.commit.call_count == 2
+    updates = [c.args[1] for c in db.execute.call_args_list if isinstance(c.args[1], list)]
+    assert updates[0][0]["storage_ref"] == updates[0][1]["storage_ref"] == evidence_store.ref(
+        evidence_store.content_hash(b'{"x": 1}')
+    )
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 2
+    update_sql = next(str(c.args[0]) for c in db.execute.call_args_list if isinstance(c.args[1], list))
+    assert "content_hash = COALESCE(content_hash, :content_hash)" in update_sql
+
+
+def test_offload_stops_before_trimming_rows_whose_object_fails_verification(tmp_path, monkeypatch):
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS | {"content_hash", "storage_ref", "content_size"}})
+    store = ContentStore(tmp_path)
+    monkeypatch.setattr(store, "verify", lambda digest: False)
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = [("a1", '{"x": 1}')]
+
+    with pytest.raises(RuntimeError):
+        EvidenceArtefactService.offload_content(db, store)
+    assert db.execute.call_count == 1
+    db.commit.assert_not_called()
+
+
+def test_offload_is_a_no_op_before_migration():
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS})
+    db = MagicMock()
+
+    assert EvidenceArtefactService.offload_content(db, ContentStore("/srv/evidence"))["artefacts"] == 0
+    db.execute.assert_not_called()
+
+
+def test_offload_refuses_a_store_inside_the_checkout():
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS | {"content_size"}})
+    db = MagicMock()
+
+    with pytest.raises(ValueError):
+        EvidenceArtefactService.offload_content(db, ContentStore(evidence_store.REPO_ROOT / "evidence" / "store"))
+    db.execute.assert_not_called()
+
+
+def test_content_size_backfill_pages_by_artefact_id():
+    schema_registry.load({"evidence_artefacts": ARTEFACT_COLUMNS | {"storage_ref", "content_size"}})
+    db = MagicMock()
+    pages = iter([("a2", 2, 1), ("a3", 1, 1), (None, 0, 0)])
+
+    def execute(sql, params):
+        last_id, artefacts, updated = next(pages)
+        result = MagicMock()
+        result.fetchone.return_value = MagicMock(last_id=last_id, artefacts=artefacts, updated=updated)
+        return result
+
+    db.execute.side_effect = execute
+
+    assert EvidenceArtefactService.backfill_content_sizes(db, batch_size=2) == {"artefacts": 3, "updated": 2}
+    assert [c.args[1]["after"] for c in db.execute.call_args_list] == [
+        "00000000-0000-0000-0000-000000000000", "a2", "a3",
+    ]
+    assert db.commit.call_count == 2
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app import schema_registry
+from app.services.match_decision_service import MatchDecisionService, decode_cursor, encode_cursor
+
+
+class Row:
+    def __init__(self, **kwargs):
+        self._mapping = kwargs
+
+
+@pytest.fixture(autouse=True)
+def resolved_schema():
+    schema_registry.load({"match_decisions": {"match_decision_id", "decided_at", "confidence"}})
+    yield
+    schema_registry.reset()
+
+
+def _rows(n):
+    return [
+        Row(
+            match_decision_id=f"00000000-0000-0000-0000-00000000000{i}",
+            decided_at=datetime(2026, 1, 10 - i, tzinfo=timezone.utc),
+            decision="MATCH",
+        )
+        for i in range(n)
+    ]
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(ts, "abc")) == (ts, "abc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_list_page_returns_next_cursor_when_more_rows_exist():
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = _rows(3)
+
+    page = MatchDecisionService.list_page(db, 1, limit=2)
+
+    assert len(page["items"]) == 2
+    ts, decision_id = decode_cursor(page["next_cursor"])
+    assert decision_id == page["items"][-1]["match_decision_id"]
+
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "ORDER BY decided_at DESC, match_decision_id DESC" in sql
+    assert "NULL AS source_system" in sql
+    assert params["limit"] == 3
+
+
+def test_list_page_applies_keyset_and_ends_without_cursor():
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = _rows(1)
+    cursor = encode_cursor(datetime(2026, 1, 5, tzinfo=timezone.utc), "some-id")
+
+    page = MatchDecisionService.list_page(db, 1, limit=2, cursor=cursor)
+
+    assert page["next_cursor"] is None
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "(decided_at, match_decision_id) <" in sql
+    assert params["cursor_id"] == "some-id"
+
+
+def test_list_page_async_matches_sync_paging():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.execute.return_value.fetchall = MagicMock(return_value=_rows(3))
+
+    page = asyncio.run(MatchDecisionService.list_page_async(db, 1, limit=2))
+
+    assert len(page["items"]) == 2
+    assert decode_cursor(page["next_cursor"])[1] == page["items"][-1]["match_decision_id"]
+    assert db.execute.await_args.args[1]["limit"] == 3
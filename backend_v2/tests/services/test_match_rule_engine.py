@@ -0,0 +1,66 @@
+import pytest
+
+from app.services.match_rule_engine import RulesetError, compile_ruleset
+
+
+def test_exact_rules_run_before_fuzzy_rules():
+    ruleset = compile_ruleset(
+        {
+            "ruleset_version": "test-1",
+            "rules": [
+                {"name": "name_fuzzy", "kind": "fuzzy", "field": "name", "threshold": 0.8},
+                {"name": "tax_id_exact", "kind": "exact", "field": "tax_id", "decisive": True},
+            ],
+        }
+    )
+
+    assert [r.name for r in ruleset.rules] == ["tax_id_exact", "name_fuzzy"]
+
+
+def test_decisive_exact_hit_short_circuits_fuzzy_rule():
+    ruleset = compile_ruleset()
+
+    outcome = ruleset.evaluate(
+        {"name": "Flextronics Ltd", "tax_id": "TAX-777"},
+        {"full_name": "Flextronix Limited", "tax_id": "tax 777"},
+    )
+
+    assert outcome.decision == "MATCH"
+    assert outcome.rule_hits["ruleset_version"] == ruleset.version
+    assert outcome.rule_hits["evaluated"] == ["tax_id_exact"]
+    assert "tax_id_exact" in outcome.rule_hits["hits"]
+
+    stats = {s["rule"]: s for s in ruleset.stats()}
+    assert stats["tax_id_exact"]["evaluations"] == 1
+    assert stats["tax_id_exact"]["hits"] == 1
+    assert stats["name_fuzzy"]["evaluations"] == 0
+
+
+def test_fuzzy_name_only_goes_to_review():
+    ruleset = compile_ruleset()
+
+    outcome = ruleset.evaluate({"name": "Flextronics"}, {"name": "Flextronix"})
+
+    assert outcome.decision == "REVIEW"
+    assert list(outcome.rule_hits["hits"]) == ["name_fuzzy"]
+
+
+def test_unrelated_records_are_no_match_and_stats_reset():
+    ruleset = compile_ruleset()
+
+    outcome = ruleset.evaluate(
+        {"name": "Acme Manufacturing", "tax_id": "GB1"},
+        {"name": "Northbridge Capital", "tax_id": "GB2"},
+    )
+    assert outcome.decision == "NO_MATCH"
+    assert outcome.rule_hits["hits"] == {}
+
+    ruleset.reset_stats()
+    assert all(s["evaluations"] == 0 for s in ruleset.stats())
+
+
+def test_invalid_rulesets_are_rejected():
+    with pytest.raises(RulesetError):
+        compile_ruleset({"rules": []})
+    with pytest.raises(RulesetError):
+        compile_ruleset({"ruleset_version": "x", "rules": [{"name": "r", "kind": "regex", "field": "name"}]})
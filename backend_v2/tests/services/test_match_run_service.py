@@ -0,0 +1,169 @@
+import json
+from unittest.mock import MagicMock
+
+from app.search.index import SearchDocument
+from app.search.segments import SegmentedIndex
+from app.services import client_search_service
+from app.services.client_cluster_service import ClientClusterService, ClusterMergeResult
+from app.services.client_summary_service import ClientSummaryService
+from app.services.match_rule_engine import MatchOutcome
+from app.services.match_run_service import MatchRunService, _decision_rows, candidate_client_ids
+
+
+class Row:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+        self._mapping = kwargs
+
+
+CLIENTS = {
+    1: {"id": 1, "full_name": "Flextronics Limited", "email": "ops@flex.com", "tax_id": "TAX-777", "external_id": "C1"},
+    2: {"id": 2, "full_name": "Northbridge Capital LLP", "email": None, "tax_id": None, "external_id": "C2"},
+}
+
+
+def _pending(source_record_id, payload, email=None, tax_id=None):
+    return Row(source_record_id=source_record_id, source_code="CRM", payload=payload,
+               extracted_email=email, extracted_tax_id=tax_id, extracted_external_id=None)
+
+
+def _db(batches):
+    db = MagicMock()
+    batches = list(batches)
+
+    def execute(stmt, params=None, **kwargs):
+        sql = str(stmt)
+        if "INSERT INTO match_runs" in sql:
+            return MagicMock(scalar=MagicMock(return_value="run-1"))
+        if "FROM source_records_raw" in sql:
+            return MagicMock(fetchall=MagicMock(return_value=batches.pop(0) if batches else []))
+        if "FROM clients" in sql:
+            return MagicMock(fetchall=MagicMock(return_value=[Row(**CLIENTS[i]) for i in params["ids"] if i in CLIENTS]))
+        return MagicMock()
+
+    db.execute.side_effect = execute
+    return db
+
+
+def _params(db, fragment):
+    return [c.args[1] for c in db.execute.call_args_list if fragment in str(c.args[0])]
+
+
+def test_match_run_scores_pending_records_and_stamps_the_run(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    index.upsert([
+        SearchDocument(key=f"client:{c['id']}", kind="client", client_id=c["id"], name=c["full_name"],
+                       identifiers=(c["external_id"], c["tax_id"]), email=c["email"])
+        for c in CLIENTS.values()
+    ])
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(ClientSummaryService, "available", staticmethod(lambda db: False))
+    db = _db([
+        [
+            _pending("00000000-0000-0000-0000-000000000001", {"legal_name": "Flextronix Ltd"}, tax_id="tax 777"),
+            _pending("00000000-0000-0000-0000-000000000002", {"full_name": "Unrelated Holdings"}),
+        ],
+        [_pending("00000000-0000-0000-0000-000000000003", {"full_name": "Northbridge Capital LLP"})],
+    ])
+
+    result = MatchRunService.run(db, batch_size=2)
+
+    assert result.match_run_id == "run-1"
+    assert result.records == 3
+    assert result.decisions == {"MATCH": 1, "NO_MATCH": 1, "REVIEW": 1}
+    first, second = _params(db, "INSERT INTO match_decisions")
+    assert first["decisions"] == ["MATCH", "NO_MATCH"] and first["client_ids"] == [1, None]
+    assert json.loads(first["rule_hits"][0])["hits"] == {"tax_id_exact": 1.0}
+    assert second["decisions"] == ["REVIEW"] and second["client_ids"] == [2]
+
+    [finished] = _params(db, "UPDATE match_runs")
+    assert finished["status"] == "completed"
+    notes = json.loads(finished["notes"])
+    assert notes["records"] == 3
+    assert {r["rule"]: r["hits"] for r in notes["rules"]}["tax_id_exact"] == 1
+    assert notes["clusters"] == {"edges": 1, "clusters_created": 0, "clusters_merged": 0, "members_added": 0}
+    assert db.commit.call_count >= 4  # run row, two batches (merge_edges may commit too), finish
+
+
+def test_failed_run_is_marked_failed(monkeypatch):
+    monkeypatch.setattr(client_search_service, "_INDEX", SegmentedIndex(background_merge=False))
+    db = _db([])
+    original = db.execute.side_effect
+
+    def execute(stmt, params=None, **kwargs):
+        if "FROM source_records_raw" in str(stmt):
+            raise RuntimeError("connection lost")
+        return original(stmt, params, **kwargs)
+
+    db.execute.side_effect = execute
+
+    try:
+        MatchRunService.run(db)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("expected the run to fail")
+    [finished] = _params(db, "UPDATE match_runs")
+    assert finished["status"] == "failed" and "connection lost" in finished["notes"]
+    db.rollback.assert_called_once()
+
+
+def test_second_matched_client_gets_its_own_match_row():
+    match = MatchOutcome(decision="MATCH", confidence=1.0, rule_hits={"hits": {"tax_id_exact": 1.0}})
+    review = MatchOutcome(decision="REVIEW", confidence=0.7, rule_hits={"hits": {"name_fuzzy": 0.7}})
+
+    rows = _decision_rows("sr-1", [({"id": 1}, match), ({"id": 2}, match), ({"id": 3}, review)])
+
+    assert [(r[1], r[2]) for r in rows] == [("MATCH", 1), ("MATCH", 2)]
+    assert json.loads(rows[0][5]) == [{"client_id": 3, "decision": "REVIEW", "confidence": 0.7}]
+
+
+def test_each_batch_is_folded_into_clusters_before_it_commits(monkeypatch):
+    index = SegmentedIndex(background_merge=False)
+    index.upsert([
+        SearchDocument(key=f"client:{c['id']}", kind="client", client_id=c["id"], name=c["full_name"],
+                       identifiers=(c["external_id"], c["tax_id"]), email=c["email"])
+        for c in CLIENTS.values()
+    ])
+    monkeypatch.setattr(client_search_service, "_INDEX", index)
+    monkeypatch.setattr(ClientSummaryService, "available", staticmethod(lambda db: False))
+    db = _db([
+        [_pending("00000000-0000-0000-0000-000000000001", {"legal_name": "Flextronix Ltd"}, tax_id="tax 777")],
+        [_pending("00000000-0000-0000-0000-000000000002", {"full_name": "Northbridge Capital LLP"})],
+    ])
+    merged = []
+
+    def merge_edges(session, edges):
+        merged.append((list(edges), db.commit.call_count))
+        if len(merged) == 2:
+            raise RuntimeError("connection lost")
+        return ClusterMergeResult(edges=1, clusters_created=0, clusters_merged=0, members_added=0)
+
+    monkeypatch.setattr(ClientClusterService, "merge_edges", staticmethod(merge_edges))
+
+    try:
+        MatchRunService.run(db, batch_size=1)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("expected the run to fail")
+
+    # first batch: its MATCH edge folded before its commit; second batch (REVIEW only): no edges
+    assert merged == [([(1, 1)], 1), ([], 2)]
+    [finished] = _params(db, "UPDATE match_runs")
+    assert finished["status"] == "failed"
+
+
+def test_contacts_do_not_crowd_out_candidate_clients():
+    index = SegmentedIndex(background_merge=False)
+    index.upsert(
+        [
+            SearchDocument(key=f"crm_contact:{i}", kind="crm_contact", client_id=None, name="Flextronics Limited",
+                           email="ops@flex.com")
+            for i in range(30)
+        ]
+        + [SearchDocument(key="client:1", kind="client", client_id=1, name="Flextronics Limited", email="ops@flex.com")]
+    )
+
+    assert candidate_client_ids(index, {"email": "ops@flex.com"}) == [1]
+    assert candidate_client_ids(index, {"legal_name": "Flextronix Ltd"}) == [1]
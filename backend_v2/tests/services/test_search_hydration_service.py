@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import schema_registry
+from app.services.search_hydration_service import SearchHydrationService
+
+
+@pytest.fixture(autouse=True)
+def _reset_schema():
+    yield
+    schema_registry.reset()
+
+
+def test_hydrates_a_page_with_one_query():
+    schema_registry.load({})
+    db = MagicMock()
+    db.execute.return_value.mappings.return_value.all.return_value = [
+        {"client_id": 1, "name": "Acme", "country": "GB", "risk_rating": "High", "open_kyc_flags": 2, "accounts": 3},
+        {"client_id": 2, "name": "Zenith", "country": "DE", "risk_rating": None, "open_kyc_flags": 0, "accounts": 0},
+    ]
+    hits = [{"client_id": 2}, {"client_id": 1}, {"client_id": None, "kind": "crm_contact"}, {"client_id": 1}]
+
+    SearchHydrationService.hydrate(db, hits)
+
+    assert db.execute.call_count == 1
+    assert db.execute.call_args.args[1] == {"ids": [1, 2]}
+    assert hits[1]["summary"]["open_kyc_flags"] == 2
+    assert hits[0]["summary"]["name"] == "Zenith"
+    assert hits[2]["summary"] is None
+
+
+def test_no_query_without_client_hits():
+    db = MagicMock()
+    assert SearchHydrationService.hydrate(db, [{"client_id": None}]) == [{"client_id": None, "summary": None}]
+    db.execute.assert_not_called()
+
+
+def test_reads_the_materialised_summary_when_present():
+    schema_registry.load({"client_summary": {"client_id"}})
+    db = MagicMock()
+    db.execute.return_value.mappings.return_value.all.return_value = [{"client_id": 5, "accounts": 1}]
+
+    SearchHydrationService.hydrate(db, [{"client_id": 5}])
+
+    assert db.execute.call_count == 1
+    assert "FROM client_summary" in str(db.execute.call_args.args[0])
+
+
+def test_clients_without_a_summary_row_are_aggregated():
+    schema_registry.load({"client_summary": {"client_id"}})
+    db = MagicMock()
+    db.execute.return_value.mappings.return_value.all.side_effect = [
+        [{"client_id": 5, "accounts": 1}],
+        [{"client_id": 9, "accounts": 2}],
+    ]
+    hits = [{"client_id": 5}, {"client_id": 9}]
+
+    SearchHydrationService.hydrate(db, hits)
+
+    assert db.execute.call_count == 2
+    assert db.execute.call_args.args[1] == {"ids": [9]}
+    assert "FROM client_summary" not in str(db.execute.call_args.args[0])
+    assert [h["summary"]["accounts"] for h in hits] == [1, 2]
@@ -0,0 +1,130 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import schema_registry
+from app.services.survivorship_service import GoldenRecordMergeService, SurvivorshipRules
+
+
+def _rules():
+    return SurvivorshipRules.from_rows(
+        precedence_rows=[
+            ("name", "KYC", 1),
+            ("name", "CRM", 2),
+            ("email", "CRM", 1),
+            ("email", "KYC", 2),
+            ("country", "KYC", 1),
+            ("country", "CRM", 2),
+        ],
+        mapping_rows=[
+            ("CRM", "full_name", "name", None),
+            ("CRM", "email", "email", None),
+            ("CRM", "country", "country", "country"),
+            ("KYC", "legal_name", "name", None),
+            ("KYC", "contact_email", "email", None),
+            ("KYC", "country_code", "country", "country"),
+        ],
+    )
+
+
+def test_precedence_and_confidence_from_compiled_tables():
+    resolved = _rules().resolve(
+        [
+            ("CRM", {"full_name": "Flextronix Ltd", "email": "ops@flex.com", "country": "UK"}),
+            ("KYC", {"legal_name": "Flextronics Limited", "contact_email": "OPS@flex.com", "country_code": "GB"}),
+        ]
+    )
+
+    name = resolved["name"]
+    assert (name.value, name.source, name.conflict) == ("Flextronics Limited", "KYC", True)
+    assert name.confidence == round(1 / 1.5, 4)
+
+    email = resolved["email"]
+    assert (email.value, email.source, email.conflict, email.confidence) == ("ops@flex.com", "CRM", False, 1.0)
+
+    # transform_rule "country" canonicalises both sides before comparison
+    assert resolved["country"].value == "GB"
+    assert resolved["country"].confidence == 1.0
+
+
+def test_missing_attribute_resolves_to_none():
+    resolved = _rules().resolve([("CRM", {"full_name": "Acme"})])
+    assert resolved["email"].value is None
+    assert resolved["email"].confidence == 0.0
+    assert resolved["name"].confidence == 1.0
+
+
+def test_empty_rule_tables_fall_back_to_crm_over_kyc():
+    rules = SurvivorshipRules.from_rows([], [])
+    resolved = rules.resolve([("KYC", {"name": "B"}), ("CRM", {"name": "A"})])
+    assert resolved["name"].value == "A"
+
+
+def _merge_db(rows, rowcount=1):
+    db = MagicMock()
+
+    def execute(stmt, params=None, **kwargs):
+        sql = str(stmt)
+        if "SELECT DISTINCT matched_client_id" in sql:
+            ids = sorted({r[0] for r in rows if r[0] > params["after"]})[: params["limit"]]
+            return MagicMock(fetchall=MagicMock(return_value=[(i,) for i in ids]))
+        if "FROM match_decisions" in sql:
+            return MagicMock(fetchall=MagicMock(return_value=[r for r in rows if r[0] in params["ids"]]))
+        return MagicMock(rowcount=rowcount)
+
+    db.execute.side_effect = execute
+    return db
+
+
+def _sql_params(db, fragment):
+    return [c.args[1] for c in db.execute.call_args_list if fragment in str(c.args[0])]
+
+
+ROWS = [
+    (1, "CRM", {"full_name": "Acme Ltd"}),
+    (1, "KYC", {"legal_name": "ACME LIMITED"}),
+    (2, "CRM", {"full_name": "Northbridge LLP", "email": "ops@nb.com"}),
+]
+
+
+def test_merge_job_pages_clients_and_commits_each_batch():
+    schema_registry.load({})
+    db = _merge_db(ROWS)
+
+    result = GoldenRecordMergeService.run(db, rules=_rules(), batch_clients=1)
+
+    assert result.clients == 2
+    assert result.attributes_updated == 3
+    update_params = _sql_params(db, "UPDATE clients")
+    assert {"ids": [1], "vals": ["ACME LIMITED"]} in update_params
+    assert {"ids": [2], "vals": ["ops@nb.com"]} in update_params
+    assert _sql_params(db, "client_golden_attributes") == []
+    assert result.outcomes_recorded == 0
+    assert [p["after"] for p in _sql_params(db, "SELECT DISTINCT matched_client_id")] == [0, 1, 2]
+    assert db.commit.call_count == 2
+
+
+def test_merge_counts_changed_rows_and_records_confidence():
+    schema_registry.load({"client_golden_attributes": {"client_id", "attribute", "confidence"}})
+    rows = [(1, "CRM", {"full_name": "Acme Trading"})] + ROWS[1:]
+    db = _merge_db(rows, rowcount=0)  # every client already held its golden values
+
+    result = GoldenRecordMergeService.run(db, rules=_rules())
+
+    assert result.attributes_updated == 0
+    assert result.conflicts == 1
+    # name of client 1: KYC wins against a disagreeing CRM (1 / 1.5); the rest agree
+    assert result.mean_confidence == round((1 / 1.5 + 1.0 + 1.0) / 3, 4)
+    assert result.outcomes_recorded == 3
+    [outcomes] = _sql_params(db, "INSERT INTO client_golden_attributes")
+    assert outcomes["ids"] == [1, 2, 2]
+    assert outcomes["attrs"] == ["name", "name", "email"]
+    assert outcomes["sources"] == ["KYC", "CRM", "CRM"]
+    assert outcomes["confidences"] == [round(1 / 1.5, 4), 1.0, 1.0]
+    assert outcomes["conflicts"] == [True, False, False]
+
+
+@pytest.fixture(autouse=True)
+def _reset_schema():
+    yield
+    schema_registry.reset()
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import audit_sink
+from app.audit_sink import AuditSink, AuditSinkFull, DatabaseAuditStore, MemoryAuditStore, audit_event
+
+
+def _events(n, entity="client-1"):
+    return [audit_event("ingestion.success", "CRM", details={"entity_id": entity, "n": i}) for i in range(n)]
+
+
+def test_events_are_written_in_batches():
+    batches = []
+    sink = AuditSink(batches.append, batch_size=100, flush_interval=5.0)
+
+    sink.emit_many(_events(250))
+    assert sink.flush(timeout=5)
+    sink.close()
+
+    assert sum(len(b) for b in batches) == 250
+    assert len(batches) <= 4  # not one write per event
+    assert sink.stats()["written"] == 250
+
+
+def test_full_queue_applies_backpressure():
+    release = threading.Event()
+    sink = AuditSink(lambda batch: release.wait(5), capacity=2, batch_size=1, enqueue_timeout=0.05)
+
+    with pytest.raises(AuditSinkFull):
+        sink.emit_many(_events(10))
+    assert sink.stats()["blocked_enqueues"] >= 1
+
+    release.set()
+    assert sink.close(timeout=5)
+
+
+def test_close_flushes_pending_events():
+    store = MemoryAuditStore()
+    sink = AuditSink(store.write, batch_size=1_000, flush_interval=10.0)
+
+    sink.emit_many(_events(3))
+    sink.close(timeout=5)
+
+    assert len(store.read("client-1")) == 3
+    with pytest.raises(RuntimeError):
+        sink.emit(_events(1)[0])
+
+
+def test_failed_batches_are_retried_until_written(monkeypatch):
+    monkeypatch.setattr(audit_sink, "_RETRY_BACKOFF_SECONDS", (0.0, 0.0))
+    calls = []
+
+    def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) < 5:
+            raise OSError("connection reset")
+
+    sink = AuditSink(flaky, flush_interval=0.01)
+    sink.emit_many(_events(2))
+    assert sink.flush(timeout=5)
+    stats = sink.stats()
+    assert (stats["written"], stats["retries"], stats["failed"], stats["failing"]) == (2, 4, 0, False)
+    sink.close()
+
+
+def test_outage_is_visible_and_unwritten_batches_are_spilled_then_replayed(monkeypatch, tmp_path):
+    monkeypatch.setattr(audit_sink, "_RETRY_BACKOFF_SECONDS", (0.01,))
+
+    def broken(batch):
+        raise OSError("database down")
+
+    sink = AuditSink(broken, flush_interval=0.01, capacity=1, enqueue_timeout=0.05, spill_dir=tmp_path)
+    sink.emit(_events(1)[0])
+    assert not sink.flush(timeout=0.2)
+    stats = sink.stats()
+    assert stats["failing"] and "database down" in stats["last_error"] and stats["written"] == 0
+    sink.emit(_events(1)[0])  # fills the queue
+    with pytest.raises(AuditSinkFull, match="database down"):
+        sink.emit(_events(1)[0])
+
+    sink.close(timeout=0.2)
+    assert sink.stats()["spilled"] == 2 and sink.stats()["failed"] == 0
+
+    store = MemoryAuditStore()
+    recovered = AuditSink(store.write, flush_interval=0.01, spill_dir=tmp_path)
+    recovered.close(timeout=5)
+    assert len(store.read("client-1")) == 2
+    assert recovered.stats()["replayed"] == 2
+    assert not list(tmp_path.glob("*.jsonl"))
+
+
+def test_memory_store_is_bounded_and_indexed():
+    store = MemoryAuditStore(maxlen=3)
+    store.write(_events(2, "a") + _events(2, "b"))
+
+    assert len(store.read()) == 3
+    assert len(store.read("a")) == 1
+    assert len(store.read("b")) == 2
+
+
+def test_database_store_multi_row_insert(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE audit_events (
+                occurred_at TIMESTAMP, actor TEXT, event_type TEXT, client_id INTEGER,
+                source_record_id TEXT, evidence_bundle_id TEXT, details TEXT
+            )
+        """))
+
+    DatabaseAuditStore(engine).write(_events(5))
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM audit_events")).scalar() == 5
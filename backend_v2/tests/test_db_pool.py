@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app import db_pool
+
+
+def _cfg(**overrides):
+    values = dict(
+        DATABASE_URL="postgresql+psycopg://u:p@localhost/scv",
+        DB_PREPARE_THRESHOLD=2,
+        DB_POOL_SIZE=1,
+        DB_MAX_OVERFLOW=1,
+        DB_POOL_TIMEOUT=0.05,
+        DB_POOL_RECYCLE=-1,
+        DB_PRE_PING="idle",
+        DB_PRE_PING_IDLE_SECONDS=0.0,
+        DB_EXTERNAL_POOLER="",
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture(autouse=True)
+def clean_counters():
+    db_pool.reset()
+    yield
+    db_pool.reset()
+
+
+def _engine(tmp_path, name, cfg):
+    options = db_pool.engine_options(cfg, name)
+    options.pop("connect_args", None)  # psycopg-only
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+    db_pool.instrument(engine, cfg)
+    return engine
+
+
+def test_engine_options_from_settings():
+    options = db_pool.engine_options(_cfg(), "primary")
+    assert options["poolclass"] is db_pool.TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_pre_ping"]) == (1, 1, False)
+    assert options["connect_args"] == {"prepare_threshold": 2}
+
+    with pytest.raises(ValueError):
+        db_pool.engine_options(_cfg(DB_PRE_PING="sometimes"), "primary")
+
+
+def test_external_pooler_disables_local_pool_and_prepared_statements():
+    options = db_pool.engine_options(_cfg(DB_EXTERNAL_POOLER="statement"), "primary")
+    assert options["poolclass"] is db_pool.TimedNullPool
+    assert options["isolation_level"] == "AUTOCOMMIT"
+    assert options["connect_args"] == {"prepare_threshold": None}
+    assert "pool_size" not in options
+
+
+def test_checkout_telemetry_counts_overflow_and_timeouts(tmp_path):
+    engine = _engine(tmp_path, "test", _cfg(DB_PRE_PING="never"))
+
+    first, second = engine.connect(), engine.connect()  # pool_size 1 + 1 overflow
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    second.close()
+    first.close()
+
+    stats = db_pool.stats()["test"]
+    assert stats["checkouts"] == 2
+    assert stats["overflow_checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["peak_in_use"] == 2
+    assert stats["in_use"] == 0
+    assert stats["wait_ms"]["max"] >= 0
+
+
+def test_idle_pre_ping_only_pings_returned_connections(tmp_path):
+    engine = _engine(tmp_path, "test", _cfg())
+
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    stats = db_pool.stats()["test"]
+    assert stats["pre_pings"] == 2  # the first checkout opened a new connection
+    assert stats["pre_ping_failures"] == 0
@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db_routing import ReplicaRouter
+
+
+def _replica(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+
+
+def test_reads_use_replica_within_max_lag(tmp_path):
+    router = ReplicaRouter(max_lag_seconds=5, check_interval_seconds=60, lag_sql=text("SELECT 1.5"))
+
+    assert router.use_replica(_replica(tmp_path)) is True
+    assert router.use_replica(_replica(tmp_path)) is True  # cached probe
+    status = router.status()
+    assert status["lag_seconds"] == 1.5
+    assert (status["replica_reads"], status["primary_fallbacks"]) == (2, 0)
+
+
+def test_lagging_replica_falls_back_to_primary(tmp_path):
+    router = ReplicaRouter(max_lag_seconds=5, check_interval_seconds=60, lag_sql=text("SELECT 30"))
+
+    assert router.use_replica(_replica(tmp_path)) is False
+    assert router.status()["primary_fallbacks"] == 1
+
+
+def test_standby_that_is_not_streaming_falls_back_to_primary(tmp_path):
+    router = ReplicaRouter(max_lag_seconds=5, check_interval_seconds=60, lag_sql=text("SELECT NULL"))
+
+    assert router.use_replica(_replica(tmp_path)) is False
+    assert "not streaming" in router.status()["error"]
+
+
+def test_unreachable_replica_falls_back_until_next_probe(tmp_path):
+    router = ReplicaRouter(max_lag_seconds=5, check_interval_seconds=0, lag_sql=text("SELECT no_such_fn()"))
+    assert router.use_replica(_replica(tmp_path)) is False
+    assert router.status()["error"]
+
+    router._lag_sql = text("SELECT 0")
+    assert router.use_replica(_replica(tmp_path)) is True
+    assert router.status()["error"] is None
+
+
+def test_async_probe(tmp_path):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    router = ReplicaRouter(max_lag_seconds=5, check_interval_seconds=60, lag_sql=text("SELECT 0"))
+
+    assert asyncio.run(router.use_replica_async(engine)) is True
+
+
+@pytest.mark.skipif(not os.getenv("SCV_TEST_REPLICA_URL"), reason="set SCV_TEST_REPLICA_URL to a second local Postgres")
+def test_postgres_replica_lag_probe():
+    router = ReplicaRouter(max_lag_seconds=5, check_interval_seconds=60)
+
+    assert router.use_replica(create_engine(os.environ["SCV_TEST_REPLICA_URL"])) is True
@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db import get_read_db
+from app.routers import evidence_router
+from app.services.evidence_artefact_service import EvidenceArtefactService
+
+ARTEFACT_ID = "6f1c2a9e-3b4d-4e5f-8a7b-9c0d1e2f3a4b"
+BODY = b'{"source_record_ids": ["sr-1"], "explanation": "' + b"x" * 200_000 + b'"}'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = {"content": 0}
+
+    def get_content(db, artefact_id):
+        calls["content"] += 1
+        return ("abc123", len(BODY), iter([BODY[:1000], BODY[1000:]])) if artefact_id == ARTEFACT_ID else None
+
+    monkeypatch.setattr(EvidenceArtefactService, "get_content_hash", staticmethod(lambda db, artefact_id: "abc123"))
+    monkeypatch.setattr(EvidenceArtefactService, "get_content", staticmethod(get_content))
+    app = FastAPI()
+    app.include_router(evidence_router.router)
+    app.dependency_overrides[get_read_db] = lambda: MagicMock()
+    test_client = TestClient(app)
+    test_client.calls = calls
+    return test_client
+
+
+def test_content_is_served_with_hash_etag(client):
+    resp = client.get(f"/evidence/{ARTEFACT_ID}/content")
+
+    assert resp.status_code == 200
+    assert resp.content == BODY
+    assert resp.headers["etag"] == '"abc123"'
+    assert resp.headers["content-type"] == "application/json"
+
+
+def test_matching_etag_is_answered_without_reading_the_blob(client):
+    resp = client.get(f"/evidence/{ARTEFACT_ID}/content", headers={"If-None-Match": 'W/"old", "abc123"'})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert client.calls["content"] == 0
+
+
+def test_unknown_or_malformed_artefact(client):
+    assert client.get("/evidence/00000000-0000-0000-0000-000000000000/content").status_code == 404
+    assert client.get("/evidence/not-a-uuid/content").status_code == 422
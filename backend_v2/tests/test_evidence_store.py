@@ -0,0 +1,60 @@
+import stat
+
+import pytest
+
+from app import evidence_store
+from app.evidence_store import ContentStore
+
+
+def test_identical_content_is_stored_once_in_sharded_directories(tmp_path):
+    store = ContentStore(tmp_path / "store")
+
+    first = store.put(b'{"a": 1}')
+    second = store.put(b'{"a": 1}')
+
+    assert first == second == evidence_store.content_hash(b'{"a": 1}')
+    assert store.path(first) == tmp_path / "store" / first[:2] / first[2:4] / first
+    assert [p for p in (tmp_path / "store").rglob("*") if p.is_file()] == [store.path(first)]
+    assert store.stats()["writes"] == 1 and store.stats()["deduplicated"] == 1
+
+
+def test_objects_are_read_only_and_verifiable(tmp_path):
+    store = ContentStore(tmp_path)
+    digest = store.put(b"evidence")
+
+    assert not stat.S_IMODE(store.path(digest).stat().st_mode) & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    assert store.get(digest) == b"evidence"
+    assert b"".join(store.iter_chunks(digest, chunk_size=3)) == b"evidence"
+    assert store.verify(digest)
+
+
+def test_refs_round_trip_and_reject_other_storage_refs():
+    digest = evidence_store.content_hash(b"x")
+
+    assert evidence_store.parse_ref(evidence_store.ref(digest)) == digest
+    assert evidence_store.parse_ref("6f1c2a9e-3b4d-4e5f-8a7b-9c0d1e2f3a4b") is None
+    assert evidence_store.parse_ref("cas:sha256:../../etc/passwd") is None
+    assert evidence_store.parse_ref(None) is None
+    with pytest.raises(ValueError):
+        ContentStore("/tmp").path("../x")
+
+
+def test_publish_writes_plain_files_and_skips_unchanged(tmp_path):
+    a = tmp_path / "evidence" / "ST-16.json"
+
+    assert evidence_store.publish_json({"suite": "search"}, a)
+    mtime = a.stat().st_mtime_ns
+    assert not evidence_store.publish_json({"suite": "search"}, a)
+    assert a.stat().st_mtime_ns == mtime
+    assert a.read_bytes() == evidence_store.json_bytes({"suite": "search"})
+
+    assert evidence_store.publish_json({"suite": "search", "run": 2}, a)
+    assert a.read_bytes() == evidence_store.json_bytes({"suite": "search", "run": 2})
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == ["ST-16.json"]
+
+
+def test_default_root_comes_from_the_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("EVIDENCE_STORE_DIR", str(tmp_path))
+    assert evidence_store.default_root() == tmp_path
+    monkeypatch.delenv("EVIDENCE_STORE_DIR")
+    assert evidence_store.default_root() == evidence_store.REPO_ROOT / "evidence" / "store"
@@ -0,0 +1,59 @@
+from app.normalisation import (
+    FIELD_NORMALISERS,
+    normalise_address,
+    normalise_column,
+    normalise_country,
+    normalise_email,
+    normalise_identifier,
+    normalise_name,
+    normalise_phone,
+    normalise_records,
+)
+
+
+def test_name_casefolds_nfkc_and_strips_legal_suffixes():
+    assert normalise_name("Acme Manufacturing Ltd") == "acme manufacturing"
+    assert normalise_name("Northbridge Capital Markets LLP") == "northbridge capital markets"
+    assert normalise_name("EuroTech Components AG") == "eurotech components"
+    assert normalise_name("ＡＣＭＥ  Co. Ltd.") == "acme"
+    assert normalise_name("AG") == "ag"
+    assert normalise_name("   ") is None
+
+
+def test_identifiers_and_emails():
+    assert normalise_identifier(" gb-999 000 111 ") == "GB999000111"
+    assert normalise_email(" Treasury@ACME-mfg.co.uk ") == "treasury@acme-mfg.co.uk"
+    assert normalise_email("not-an-email") is None
+
+
+def test_country_canonicalisation():
+    assert normalise_country("UK") == "GB"
+    assert normalise_country("United Kingdom") == "GB"
+    assert normalise_country("deu") == "DE"
+    assert normalise_country("ZZ") == "ZZ"
+    assert normalise_country("Atlantis") is None
+
+
+def test_phone_e164():
+    assert normalise_phone("+44 20 7000 1001") == "+442070001001"
+    assert normalise_phone("0049 69 9000 3300") == "+496990003300"
+    assert normalise_phone("020 7000 1001", "UK") == "+442070001001"
+    assert normalise_phone("020 7000 1001") is None
+    assert normalise_phone("+44 12") is None
+
+
+def test_address_abbreviations():
+    assert normalise_address("10 Foundry Street, Birmingham") == "10 foundry st birmingham"
+
+
+def test_column_and_record_batches():
+    assert normalise_column("country", ["UK", "Germany", "UK", None]) == ["GB", "DE", "GB", None]
+
+    rows = normalise_records([{"full_name": "Acme Ltd", "country": "UK"}], {"full_name": "name", "country": "country"})
+    assert rows == [{"full_name": "Acme Ltd", "country": "UK", "full_name_norm": "acme", "country_norm": "GB"}]
+
+
+def test_phone_field_reads_national_numbers_as_the_default_country():
+    assert FIELD_NORMALISERS["phone"]("020 7946 0958") == "+442079460958"
+    assert FIELD_NORMALISERS["phone"]("+49 69 9000 3300") == "+496990003300"
+    assert normalise_column("phone", ["020 7946 0958", None]) == ["+442079460958", None]
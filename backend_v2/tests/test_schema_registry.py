@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from app import schema_registry
+from app.services import (  # noqa: F401  (importing registers their tables and statements)
+    audit_trail_service,
+    client_summary_service,
+    evidence_artefact_service,
+    match_decision_service,
+)
+from app.services.audit_trail_service import AuditTrailService
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    schema_registry.reset()
+    yield
+    schema_registry.reset()
+
+
+def _catalog(*rows):
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = list(rows)
+    return db
+
+
+def test_refresh_reflects_all_tracked_tables_in_one_query():
+    db = _catalog(
+        ("match_decisions", "match_decision_id"),
+        ("match_decisions", "system"),
+        ("audit_log", "id"),
+        ("audit_log", "client_id"),
+        ("audit_log", "created_at"),
+    )
+
+    stats = schema_registry.refresh(db)
+
+    assert db.execute.call_count == 1
+    tracked = db.execute.call_args.args[1]["tables"]
+    assert {"match_decisions", "evidence_artefacts", "audit_events", "client_summary"} <= set(tracked)
+    assert stats["present"] == {"audit_log": 3, "match_decisions": 2}
+    assert "client_summary" in stats["missing"]
+    assert "system AS source_system" in str(schema_registry.compiled(db, "match_decisions.page")["first"])
+    assert db.execute.call_count == 1  # lookups after refresh are free
+
+
+def test_first_lookup_refreshes_when_startup_could_not():
+    db = _catalog(("evidence_artefacts", "artifact_id"))
+
+    sql = str(schema_registry.compiled(db, "evidence_artefacts.by_source_records"))
+
+    assert "artifact_id AS artefact_id" in sql
+    assert schema_registry.has_table(db, "evidence_artefacts")
+    assert db.execute.call_count == 1
+
+
+def test_audit_query_follows_the_available_table():
+    schema_registry.load({"audit_trail": {"id", "timestamp", "entity_id"}})
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = []
+
+    AuditTrailService.list_by_client(db, 7)
+
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "FROM audit_trail" in sql and "entity_id = :client_id_key" in sql
+    assert params["client_id_key"] == "client:7"
+
+    schema_registry.load({})
+    assert AuditTrailService.list_by_client(MagicMock(), 7) == []
+
+
+class _DriverConnection:
+    pass
+
+
+def test_counts_compile_cache_hits_and_prepared_reuse(monkeypatch):
+    monkeypatch.setattr(schema_registry, "_PREPARE_THRESHOLD", 1)
+    schema_registry.load({"evidence_artefacts": {"artefact_id"}})
+    stmt = schema_registry.compiled(MagicMock(), "evidence_artefacts.by_source_records")
+    conn = MagicMock()
+    conn.connection.driver_connection = _DriverConnection()
+
+    for hit in (CACHE_MISS, CACHE_HIT, CACHE_HIT, CACHE_HIT):
+        context = SimpleNamespace(compiled=SimpleNamespace(statement=stmt), cache_hit=hit)
+        schema_registry.record_execution(conn, None, "", {}, context, False)
+    schema_registry.record_execution(conn, None, "", {}, SimpleNamespace(compiled=None), False)
+
+    # 1st plain, 2nd prepares, 3rd and 4th reuse the server-side statement
+    assert schema_registry.execution_stats() == {
+        "evidence_artefacts.by_source_records": {"executions": 4, "compile_cache_hits": 3, "prepared_executions": 2}
+    }
+
+
+def test_counts_survive_a_refresh_that_rebuilds_equal_statements():
+    schema_registry.load({"evidence_artefacts": {"artefact_id"}})
+    before = schema_registry.compiled(MagicMock(), "evidence_artefacts.by_source_records")
+    schema_registry.load({"evidence_artefacts": {"artefact_id"}})
+    after = schema_registry.compiled(MagicMock(), "evidence_artefacts.by_source_records")
+    assert before is not after
+    conn = MagicMock()
+    conn.connection.driver_connection = None
+
+    # SQLAlchemy's compiled cache keeps returning the compiled form of the old object
+    context = SimpleNamespace(compiled=SimpleNamespace(statement=before), cache_hit=CACHE_HIT)
+    schema_registry.record_execution(conn, None, "", {}, context, False)
+
+    assert schema_registry.execution_stats()["evidence_artefacts.by_source_records"]["executions"] == 1
+
+
+def test_lookups_re_reflect_once_the_schema_is_older_than_the_max_age(monkeypatch):
+    monkeypatch.setattr(schema_registry, "_MAX_AGE", 60.0)
+    schema_registry.load({"audit_events": {"audit_event_id"}})
+    db = _catalog(("audit_events", "audit_event_id"), ("evidence_artefacts", "content_size"))
+
+    assert not schema_registry.has_table(db, "evidence_artefacts")
+    db.execute.assert_not_called()
+
+    # Another worker applied a migration a minute ago
+    monkeypatch.setattr(schema_registry, "_LOADED_MONOTONIC", schema_registry._LOADED_MONOTONIC - 61)
+    assert schema_registry.has_table(db, "evidence_artefacts")
+    assert db.execute.call_count == 1
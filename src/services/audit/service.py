@@ -1,14 +1,141 @@
-from typing import List, Dict, Any
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
 import datetime
+import json
+import threading
+
+from sqlalchemy import text
+
+from src.services.audit.writer import AuditBatchWriter
+
+
+_INSERT_SQL = text("""
+    INSERT INTO audit_events (occurred_at, actor, event_type, details)
+    VALUES (:occurred_at, :actor, :event_type, CAST(:details AS jsonb))
+""")
+
+_SELECT_SQL = text("""
+    SELECT occurred_at, actor, details
+    FROM audit_events
+    WHERE event_type LIKE 'ingestion.%'
+      AND occurred_at >= COALESCE(CAST(:since AS timestamptz), '-infinity')
+    ORDER BY occurred_at, audit_event_id
+""")
+
+# One entity's entries: ix_audit_events_ingestion_entity (migration 009) in
+# each partition; partitions before :since are pruned
+_SELECT_ENTITY_SQL = text("""
+    SELECT occurred_at, actor, details
+    FROM audit_events
+    WHERE event_type LIKE 'ingestion.%'
+      AND details ->> 'entity_id' = :entity_id
+      AND occurred_at >= COALESCE(CAST(:since AS timestamptz), '-infinity')
+    ORDER BY occurred_at, audit_event_id
+""")
+
+
+class DatabaseAuditLog:
+    """Ingestion audit entries as rows of audit_events (the default)."""
+
+    def __init__(self, session_factory: Callable[[], Any]):
+        self._session_factory = session_factory
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        db = self._session_factory()
+        try:
+            # One multi-row INSERT per call
+            db.execute(_INSERT_SQL, [{**e, "details": json.dumps(e["details"], default=str)} for e in entries])
+            db.commit()
+        finally:
+            db.close()
+
+    def read(self, entity_id: Optional[str] = None, since: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        db = self._session_factory()
+        try:
+            if entity_id is None:
+                rows = db.execute(_SELECT_SQL, {"since": since}).fetchall()
+            else:
+                rows = db.execute(_SELECT_ENTITY_SQL, {"entity_id": entity_id, "since": since}).fetchall()
+        finally:
+            db.close()
+        return [{"occurred_at": r.occurred_at, "actor": r.actor, "details": r.details} for r in rows]
+
+
+class InMemoryAuditLog:
+    """
+    Non-persistent log for tests and demos without a database: keeps the
+    newest `maxlen` entries, indexed by entity_id.
+    """
+
+    def __init__(self, maxlen: int = 10_000):
+        self._entries: Deque[Dict[str, Any]] = deque()
+        self._by_entity: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._maxlen = maxlen
+        self._lock = threading.Lock()
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for e in entries:
+                if len(self._entries) >= self._maxlen:
+                    oldest = self._entries.popleft()
+                    bucket = self._by_entity[oldest["details"]["entity_id"]]
+                    bucket.popleft()
+                    if not bucket:
+                        del self._by_entity[oldest["details"]["entity_id"]]
+                self._entries.append(e)
+                self._by_entity.setdefault(e["details"]["entity_id"], deque()).append(e)
+
+    def read(self, entity_id: Optional[str] = None, since: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries if entity_id is None else self._by_entity.get(entity_id, ()))
+        return [e for e in entries if since is None or e["occurred_at"] >= since]
+
+
+# Process-wide writer in front of audit_events (see _default_writer)
+_WRITER: Optional[AuditBatchWriter] = None
+_LOCK = threading.Lock()
+
+
+def _default_writer() -> AuditBatchWriter:
+    global _WRITER
+    with _LOCK:
+        if _WRITER is None:
+            from database import SessionLocal
+
+            _WRITER = AuditBatchWriter(DatabaseAuditLog(SessionLocal))
+        return _WRITER
+
 
 class AuditIngestionService:
     """
     Service for auditing ingestion events (ST-30).
     Records audit entries for each ingestion event.
+
+    Entries are persisted to audit_events through the root database session
+    (database.SessionLocal) unless another log is passed, and read back from
+    there. record_audit_entries() only enqueues: a background AuditBatchWriter
+    (one per process for audit_events, shut down at exit) appends them in
+    batches, and blocks callers while its queue is full. Reads flush first.
     """
-    def __init__(self):
-        # In-memory audit log for demonstration; replace with persistent storage in production
-        self._audit_log: List[Dict[str, Any]] = []
+    def __init__(self, log: Optional[Any] = None):
+        if log is None:
+            from database import SessionLocal
+
+            self._log = DatabaseAuditLog(SessionLocal)
+            self._writer = _default_writer()
+            self._owns_writer = False
+        else:
+            self._log = log
+            self._writer = AuditBatchWriter(log)
+            self._owns_writer = True
+
+    def close(self) -> None:
+        """Write what is queued and stop this service's writer (the shared one stops at exit)."""
+        if self._owns_writer:
+            self._writer.close()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return self._writer.flush(timeout)
 
     def record_audit_entry(self, source: str, entity_id: str, status: str, details: Dict[str, Any] = None) -> None:
         """
@@ -18,21 +145,41 @@ class AuditIngestionService:
         :param status: Status of the ingestion (e.g., 'success', 'fail')
         :param details: Optional additional details (dict)
         """
-        entry = {
-            "timestamp": datetime.datetime.utcnow().isoformat() + 'Z',
-            "source": source,
-            "entity_id": entity_id,
-            "status": status,
-            "details": details or {}
-        }
-        self._audit_log.append(entry)
-
-    def get_audit_entries(self, entity_id: str = None) -> List[Dict[str, Any]]:
+        self.record_audit_entries([
+            {"source": source, "entity_id": entity_id, "status": status, "details": details}
+        ])
+
+    def record_audit_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Record several ingestion events at once (keys as record_audit_entry's
+        parameters; details optional).
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self._writer.append([
+            {
+                "occurred_at": now,
+                "actor": e["source"],
+                "event_type": f"ingestion.{e['status']}",
+                "details": {"entity_id": e["entity_id"], "status": e["status"], "details": e.get("details") or {}},
+            }
+            for e in entries
+        ])
+
+    def get_audit_entries(self, entity_id: str = None, since: datetime.datetime = None) -> List[Dict[str, Any]]:
         """
         Retrieve audit entries, optionally filtered by entity_id.
         :param entity_id: If provided, only entries for this entity are returned.
+        :param since: If provided, only entries at or after this time (older partitions are skipped).
         :return: List of audit entries (dicts)
         """
-        if entity_id:
-            return [entry for entry in self._audit_log if entry["entity_id"] == entity_id]
-        return list(self._audit_log)
+        self._writer.flush()
+        return [
+            {
+                "timestamp": e["occurred_at"].astimezone(datetime.timezone.utc).replace(tzinfo=None).isoformat() + 'Z',
+                "source": e["actor"],
+                "entity_id": e["details"]["entity_id"],
+                "status": e["details"]["status"],
+                "details": e["details"]["details"],
+            }
+            for e in self._log.read(entity_id, since)
+        ]
@@ -0,0 +1,180 @@
+"""
+Batched writer for ingestion audit entries: entries go into a bounded
+in-process queue and a background thread appends them to the log in
+batches (the design of backend_v2's AuditSink, kept here so src does not
+import backend_v2).
+
+  - append() only enqueues. When the queue is full it blocks for up to
+    enqueue_timeout (backpressure on the ingesting caller) and then raises
+    AuditQueueFull.
+  - The writer takes up to batch_size entries at a time, lingering up to
+    flush_interval for a batch to fill, and hands each batch to the log in
+    one append() (one multi-row INSERT for DatabaseAuditLog).
+  - A failed batch is retried with backoff (capped) until it is written;
+    meanwhile the queue fills and producers see the backpressure.
+  - flush() waits until everything enqueued so far is written; close()
+    flushes and stops the thread (also run at exit). A batch that still
+    cannot be written once closing is counted as failed.
+"""
+
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+_RETRY_BACKOFF_SECONDS = (0.5, 1.0, 2.0, 5.0, 10.0)  # the last one repeats until the write succeeds
+_STOP = object()
+
+
+class AuditQueueFull(RuntimeError):
+    """The audit queue stayed full for the whole enqueue timeout."""
+
+
+class AuditBatchWriter:
+    def __init__(
+        self,
+        log: Any,
+        *,
+        capacity: int = 50_000,
+        batch_size: int = 5_000,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 30.0,
+    ) -> None:
+        self._log = log
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=capacity)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._lock = threading.Condition()
+        self._pending = 0  # enqueued, not yet written (or given up on)
+        self._flush_requested = threading.Event()
+        self._closing = threading.Event()
+        self._closed = False
+        self._counters = {"enqueued": 0, "written": 0, "batches": 0, "failed": 0, "retries": 0, "blocked_enqueues": 0}
+        self._last_error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._run, name="ingestion-audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -- producer side --
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        """Enqueue `entries`, blocking while the queue is full (AuditQueueFull after enqueue_timeout)."""
+        for entry in entries:
+            if self._closed:
+                raise RuntimeError("audit writer is closed")
+            with self._lock:
+                self._pending += 1
+                self._counters["enqueued"] += 1
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                with self._lock:
+                    self._counters["blocked_enqueues"] += 1
+                try:
+                    self._queue.put(entry, timeout=self.enqueue_timeout)
+                except queue.Full:
+                    with self._lock:
+                        self._counters["enqueued"] -= 1
+                        last_error = self._last_error
+                    self._done(1)
+                    cause = f"; last write error: {last_error}" if last_error else ""
+                    raise AuditQueueFull(
+                        f"audit queue full ({self._queue.maxsize} entries) for {self.enqueue_timeout}s{cause}"
+                    ) from None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every entry appended so far is written; False on timeout."""
+        self._flush_requested.set()
+        with self._lock:
+            return self._lock.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        if self._closed:
+            return True
+        flushed = self.flush(timeout)
+        self._closed = True
+        self._closing.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "queued": self._queue.qsize(),
+                "pending": self._pending,
+                "capacity": self._queue.maxsize,
+                "batch_size": self.batch_size,
+                "last_error": self._last_error,
+            }
+
+    # -- writer thread --
+    def _done(self, n: int) -> None:
+        with self._lock:
+            self._pending -= n
+            self._lock.notify_all()
+
+    def _next_batch(self) -> Optional[List[Dict[str, Any]]]:
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                # Linger for a fuller batch unless someone is waiting on flush()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._flush_requested.is_set():
+                    break
+                try:
+                    item = self._queue.get(timeout=min(remaining, 0.05))
+                except queue.Empty:
+                    continue
+            if item is _STOP:
+                self._queue.put(_STOP)  # finish this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        attempt = 0
+        while True:
+            try:
+                self._log.append(batch)
+            except Exception as e:
+                with self._lock:
+                    self._last_error = f"{type(e).__name__}: {e}"
+                    if self._closing.is_set():
+                        self._counters["failed"] += len(batch)
+                        return
+                    self._counters["retries"] += 1
+                self._closing.wait(_RETRY_BACKOFF_SECONDS[min(attempt, len(_RETRY_BACKOFF_SECONDS) - 1)])
+                attempt += 1
+                continue
+            with self._lock:
+                self._counters["written"] += len(batch)
+                self._counters["batches"] += 1
+                self._last_error = None
+            return
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            finally:
+                self._done(len(batch))
+                if self._queue.empty():
+                    self._flush_requested.clear()
@@ -1,8 +1,15 @@
+import datetime
+import threading
+import time
+
 import pytest
-from src.services.audit.service import AuditIngestionService
+from unittest.mock import MagicMock
+
+from src.services.audit.service import AuditIngestionService, DatabaseAuditLog, InMemoryAuditLog
+from src.services.audit.writer import AuditBatchWriter, AuditQueueFull
 
 def test_record_audit_entry():
-    service = AuditIngestionService()
+    service = AuditIngestionService(InMemoryAuditLog())
     service.record_audit_entry(
         source="CRM",
         entity_id="client-123",
@@ -19,7 +26,7 @@ def test_record_audit_entry():
     assert "timestamp" in entry
 
 def test_get_audit_entries_filters_by_entity():
-    service = AuditIngestionService()
+    service = AuditIngestionService(InMemoryAuditLog())
     service.record_audit_entry("CRM", "client-1", "success")
     service.record_audit_entry("KYC", "client-2", "fail")
     entries = service.get_audit_entries("client-1")
@@ -27,7 +34,7 @@ def test_get_audit_entries_filters_by_entity():
     assert len(entries) == 1
 
 def test_get_audit_entries_returns_all():
-    service = AuditIngestionService()
+    service = AuditIngestionService(InMemoryAuditLog())
     service.record_audit_entry("CRM", "client-1", "success")
     service.record_audit_entry("KYC", "client-2", "fail")
     entries = service.get_audit_entries()
@@ -36,8 +43,88 @@ def test_get_audit_entries_returns_all():
     assert sources == {"CRM", "KYC"}
 
 def test_record_audit_entry_defaults_details():
-    service = AuditIngestionService()
+    service = AuditIngestionService(InMemoryAuditLog())
     service.record_audit_entry("CRM", "client-3", "success")
     entry = service.get_audit_entries("client-3")[0]
     assert entry["details"] == {}
     assert entry["status"] == "success"
+
+def test_entries_are_persisted_to_audit_events_by_the_database_log():
+    db = MagicMock()
+    service = AuditIngestionService(DatabaseAuditLog(lambda: db))
+    service.record_audit_entries([
+        {"source": "CRM", "entity_id": "client-1", "status": "success"},
+        {"source": "CRM", "entity_id": "client-2", "status": "fail", "details": {"rows": 0}},
+    ])
+    service.close()
+    assert db.execute.call_count == 1
+    sql, rows = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "INSERT INTO audit_events" in sql
+    assert [r["event_type"] for r in rows] == ["ingestion.success", "ingestion.fail"]
+    db.commit.assert_called_once()
+    db.close.assert_called_once()
+
+
+def test_entity_lookup_uses_the_entity_query():
+    db = MagicMock()
+    DatabaseAuditLog(lambda: db).read("client-1")
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "details ->> 'entity_id' = :entity_id" in sql
+    assert "IS NULL OR" not in sql
+    assert params == {"entity_id": "client-1", "since": None}
+
+
+def test_entries_are_written_in_batches_in_the_background():
+    log = InMemoryAuditLog()
+    calls = []
+    append = log.append
+    log.append = lambda entries: (calls.append(len(entries)), append(entries))
+    service = AuditIngestionService(log)
+    for i in range(50):
+        service.record_audit_entry("CRM", f"client-{i}", "success")
+    service.close()
+    assert sum(calls) == 50
+    assert len(calls) < 50
+
+
+def test_get_audit_entries_filters_by_time():
+    service = AuditIngestionService(InMemoryAuditLog())
+    service.record_audit_entry("CRM", "client-1", "success")
+    later = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=1)
+    assert service.get_audit_entries("client-1", since=later) == []
+    assert len(service.get_audit_entries("client-1")) == 1
+
+
+def test_in_memory_log_keeps_the_newest_entries():
+    log = InMemoryAuditLog(maxlen=2)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    log.append([
+        {"occurred_at": now, "actor": "CRM", "details": {"entity_id": e, "status": "success", "details": {}}}
+        for e in ("client-1", "client-2", "client-1")
+    ])
+    assert [e["details"]["entity_id"] for e in log.read()] == ["client-2", "client-1"]
+    assert len(log.read("client-1")) == 1
+    assert len(log.read("client-2")) == 1
+
+
+def test_full_queue_blocks_then_raises():
+    release = threading.Event()
+
+    class StuckLog:
+        def append(self, entries):
+            release.wait()
+
+    writer = AuditBatchWriter(StuckLog(), capacity=1, batch_size=1, flush_interval=0, enqueue_timeout=0.05)
+    try:
+        writer.append([{"n": 0}])  # taken by the writer, which then blocks
+        assert writer.flush(timeout=0.05) is False
+        while writer.stats()["queued"]:
+            time.sleep(0.01)
+        writer.append([{"n": 1}])  # fills the queue
+        with pytest.raises(AuditQueueFull):
+            writer.append([{"n": 2}])
+        assert writer.stats()["blocked_enqueues"] == 1
+    finally:
+        release.set()
+        assert writer.close() is True
+    assert writer.stats()["written"] == 2
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Backfill evidence_artefacts.content_size (migration 008) for inline content.
+
+New and changed artefacts get content_size from a trigger; this job sets it
+for inline rows written before the migration, in committed batches keyed by
+artefact_id, so it can be stopped and re-run at any point. Each row's
+content is read once here instead of on every evidence panel load.
+
+Run (from repo root):
+
+    python tools/backfill_evidence_content_sizes.py
+    python tools/backfill_evidence_content_sizes.py --batch-size 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app import schema_registry  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.evidence_artefact_service import EvidenceArtefactService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if "content_size" not in schema_registry.columns(db, "evidence_artefacts"):
+            print("evidence_artefacts.content_size does not exist; apply backend_v2/migrations/005_evidence_content_store.sql first", file=sys.stderr)
+            return 1
+        result = EvidenceArtefactService.backfill_content_sizes(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
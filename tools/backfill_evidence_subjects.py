@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Backfill evidence_artefact_subjects (migration 004) for existing artefacts.
+
+New artefacts and match decisions are linked by triggers; this job links
+everything written before the migration, in committed batches keyed by
+artefact_id, so it can be stopped and re-run at any point.
+
+Run (from repo root):
+
+    python tools/backfill_evidence_subjects.py
+    python tools/backfill_evidence_subjects.py --batch-size 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app import schema_registry  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.evidence_artefact_service import EvidenceArtefactService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if not schema_registry.has_table(db, "evidence_artefact_subjects"):
+            print("evidence_artefact_subjects does not exist; apply backend_v2/migrations/004_evidence_artefact_subjects.sql first", file=sys.stderr)
+            return 1
+        result = EvidenceArtefactService.backfill_subjects(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
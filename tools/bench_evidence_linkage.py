@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Evidence panel benchmark: client -> artefacts lookup before and after the
+evidence_artefact_subjects linkage (migration 004).
+
+Builds a synthetic corpus in a scratch schema (bench_evidence) of the target
+database: --artefacts artefacts (default 1M), each citing
+--ids-per-artefact source records in content->'source_record_ids', and one
+match decision per source record spread over --clients clients. It then
+times the panel lookup for --queries random clients with the service's own
+statements (EvidenceArtefactService):
+
+  jsonb_scan  match_decisions -> (content -> 'source_record_ids') ?| ids  (before)
+  jsonb_gin   the same, with a GIN index on the expression               (alternative)
+  linked      evidence_artefact_subjects join                            (after)
+
+and reports setup time, p50/p95/p99 latency and buffers for one EXPLAIN
+(ANALYZE, BUFFERS) per variant. --baseline compares against an earlier run.
+The scratch schema is dropped afterwards unless --keep. The report is
+written to evidence/performance/evidence_linkage.json (--out to change),
+with the server version and memory settings it was measured under.
+
+Run (from repo root; needs a Postgres you can create a schema in):
+
+    python tools/bench_evidence_linkage.py
+    python tools/bench_evidence_linkage.py --artefacts 100k --queries 100
+    python tools/bench_evidence_linkage.py --baseline evidence/performance/evidence_linkage.json --out /tmp/run.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import Connection  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.services.evidence_artefact_service import (  # noqa: E402
+    _SOURCE_IDS_SQL,
+    _build_artefacts_sql,
+    _build_linked_sql,
+)
+from search_corpus import percentile  # noqa: E402
+
+SCHEMA = "bench_evidence"
+DEFAULT_OUT = REPO_ROOT / "evidence" / "performance" / "evidence_linkage.json"
+ARTEFACT_COLUMNS = frozenset({"artefact_id", "evidence_bundle_id", "artefact_type", "created_at", "content"})
+SUBJECT_COLUMNS = frozenset({"artefact_id", "source_record_id", "client_id", "created_at"})
+
+# Source record i is md5('sr' || i)::uuid; artefact n cites ids (n * 7919 + j * 104729) mod source_records
+SETUP_SQL = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    """
+    CREATE TABLE match_decisions (
+        match_decision_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+        source_record_id uuid NOT NULL,
+        matched_client_id integer,
+        decided_at timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    INSERT INTO match_decisions (source_record_id, matched_client_id)
+    SELECT md5('sr' || i)::uuid, 1 + (i * 2654435761 % :clients)
+    FROM generate_series(0, :source_records - 1) AS i
+    """,
+    "CREATE INDEX ON match_decisions (matched_client_id)",
+    "CREATE INDEX ON match_decisions (source_record_id)",
+    """
+    CREATE TABLE evidence_artefacts (
+        artefact_id uuid PRIMARY KEY,
+        evidence_bundle_id uuid NOT NULL,
+        artefact_type varchar(50) NOT NULL,
+        created_at timestamptz NOT NULL,
+        content jsonb
+    )
+    """,
+    """
+    INSERT INTO evidence_artefacts (artefact_id, evidence_bundle_id, artefact_type, created_at, content)
+    SELECT md5('ea' || n)::uuid, md5('eb' || (n / 10))::uuid, 'MATCH_EXPLANATION',
+           now() - make_interval(secs => n),
+           jsonb_build_object(
+               'source_record_ids',
+               (SELECT jsonb_agg(md5('sr' || ((n * 7919 + j * 104729) % :source_records))::uuid::text)
+                FROM generate_series(0, :ids_per_artefact - 1) AS j),
+               'explanation', repeat('x', 200)
+           )
+    FROM generate_series(0, :artefacts - 1) AS n
+    """,
+    "ANALYZE match_decisions",
+    "ANALYZE evidence_artefacts",
+]
+
+GIN_SQL = [
+    "CREATE INDEX ix_bench_artefacts_source_ids ON evidence_artefacts USING gin ((content -> 'source_record_ids'))",
+    "ANALYZE evidence_artefacts",
+]
+DROP_GIN_SQL = ["DROP INDEX ix_bench_artefacts_source_ids"]
+
+# Same linkage as link_evidence_artefact_subjects() (migration 004), for every artefact at once
+LINKED_SQL = [
+    """
+    CREATE TABLE evidence_artefact_subjects (
+        artefact_id uuid NOT NULL REFERENCES evidence_artefacts (artefact_id) ON DELETE CASCADE,
+        source_record_id text NOT NULL,
+        client_id integer,
+        created_at timestamptz NOT NULL
+    )
+    """,
+    """
+    INSERT INTO evidence_artefact_subjects (artefact_id, source_record_id, client_id, created_at)
+    SELECT DISTINCT a.artefact_id, src.id, md.matched_client_id, a.created_at
+    FROM evidence_artefacts a
+    CROSS JOIN LATERAL jsonb_array_elements_text(a.content -> 'source_record_ids') AS src(id)
+    LEFT JOIN match_decisions md
+        ON md.source_record_id = src.id::uuid AND md.matched_client_id IS NOT NULL
+    """,
+    """
+    CREATE INDEX ix_bench_subjects_client_created
+        ON evidence_artefact_subjects (client_id, created_at DESC, artefact_id)
+        WHERE client_id IS NOT NULL
+    """,
+    "ANALYZE evidence_artefact_subjects",
+]
+
+
+def parse_scale(value: str) -> int:
+    value = value.strip().lower()
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def server_settings(conn: Connection) -> Dict[str, Any]:
+    """Server version and the settings the latencies depend on."""
+    rows = conn.execute(
+        text("""
+            SELECT name, setting, unit FROM pg_settings
+            WHERE name IN ('server_version', 'shared_buffers', 'work_mem', 'effective_cache_size', 'jit')
+        """)
+    ).fetchall()
+    return {name: f"{setting}{' ' + unit if unit else ''}" for name, setting, unit in rows}
+
+
+def run_sql(conn: Connection, statements: List[str], params: Dict[str, Any]) -> float:
+    started = time.perf_counter()
+    for sql in statements:
+        stmt = text(sql)
+        conn.execute(stmt, {k: v for k, v in params.items() if f":{k}" in sql})
+    conn.commit()
+    return round(time.perf_counter() - started, 2)
+
+
+def legacy_lookup(conn: Connection, client_id: int, limit: int) -> int:
+    ids = [r[0] for r in conn.execute(_SOURCE_IDS_SQL, {"client_id": client_id})]
+    if not ids:
+        return 0
+    sql = _build_artefacts_sql({"evidence_artefacts": ARTEFACT_COLUMNS})
+    return len(conn.execute(sql, {"source_ids": ids, "limit": limit}).fetchall())
+
+
+def linked_lookup(conn: Connection, client_id: int, limit: int) -> int:
+    sql = _build_linked_sql({"evidence_artefacts": ARTEFACT_COLUMNS, "evidence_artefact_subjects": SUBJECT_COLUMNS})
+    return len(conn.execute(sql, {"client_id": client_id, "limit": limit}).fetchall())
+
+
+def explain(conn: Connection, variant: str, client_id: int, limit: int) -> Dict[str, Any]:
+    """Plan root timing and buffers for the artefact query of one lookup."""
+    if variant == "linked":
+        sql = _build_linked_sql({"evidence_artefacts": ARTEFACT_COLUMNS, "evidence_artefact_subjects": SUBJECT_COLUMNS})
+        params: Dict[str, Any] = {"client_id": client_id, "limit": limit}
+    else:
+        ids = [r[0] for r in conn.execute(_SOURCE_IDS_SQL, {"client_id": client_id})]
+        sql = _build_artefacts_sql({"evidence_artefacts": ARTEFACT_COLUMNS})
+        params = {"source_ids": ids, "limit": limit}
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql.text}"), params).scalar()[0]
+    root = plan["Plan"]
+    return {
+        "execution_ms": plan.get("Execution Time"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks"),
+        "shared_read_blocks": root.get("Shared Read Blocks"),
+        "root_node": root.get("Node Type"),
+    }
+
+
+def measure(conn: Connection, variant: str, client_ids: List[int], limit: int) -> Dict[str, Any]:
+    lookup = linked_lookup if variant == "linked" else legacy_lookup
+    lookup(conn, client_ids[0], limit)  # warm the cache
+    latencies: List[float] = []
+    hits = 0
+    for client_id in client_ids:
+        started = time.perf_counter()
+        hits += lookup(conn, client_id, limit)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    conn.rollback()
+    return {
+        "queries": len(client_ids),
+        "artefacts_returned": hits,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "explain": explain(conn, variant, client_ids[0], limit),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"baseline_commit": baseline.get("git_commit"), "variants": {}}
+    for name, cur in report["variants"].items():
+        old = baseline.get("variants", {}).get(name)
+        if old and old.get("p50_ms"):
+            out["variants"][name] = {
+                "p50_change_pct": round((cur["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100.0, 1),
+                "p99_change_pct": round((cur["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100.0, 1),
+            }
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--artefacts", default="1m")
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--ids-per-artefact", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200, help="Client lookups per variant")
+    parser.add_argument("--limit", type=int, default=50, help="Artefacts per lookup (panel page size)")
+    parser.add_argument("--skip-gin", action="store_true", help="Skip the jsonb GIN variant")
+    parser.add_argument("--seed", type=int, default=48)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema afterwards")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument(
+        "--out", type=Path, default=DEFAULT_OUT, help="Write the JSON report here as well as stdout"
+    )
+    args = parser.parse_args()
+
+    artefacts = parse_scale(args.artefacts)
+    params = {
+        "artefacts": artefacts,
+        "source_records": artefacts,
+        "clients": args.clients,
+        "ids_per_artefact": args.ids_per_artefact,
+    }
+    rng = random.Random(args.seed)
+    client_ids = [rng.randint(1, args.clients) for _ in range(args.queries)]
+
+    engine = create_engine(args.database_url, connect_args={"options": f"-c search_path={SCHEMA},public"})
+    setup: Dict[str, float] = {}
+    variants: Dict[str, Any] = {}
+    with engine.connect() as conn:
+        server = server_settings(conn)
+        try:
+            setup["corpus_s"] = run_sql(conn, SETUP_SQL, params)
+            variants["jsonb_scan"] = measure(conn, "jsonb_scan", client_ids, args.limit)
+            if not args.skip_gin:
+                setup["gin_index_s"] = run_sql(conn, GIN_SQL, params)
+                variants["jsonb_gin"] = measure(conn, "jsonb_gin", client_ids, args.limit)
+                run_sql(conn, DROP_GIN_SQL, params)
+            setup["linkage_backfill_s"] = run_sql(conn, LINKED_SQL, params)
+            variants["linked"] = measure(conn, "linked", client_ids, args.limit)
+        finally:
+            if not args.keep:
+                conn.rollback()
+                run_sql(conn, [f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"], {})
+
+    report: Dict[str, Any] = {
+        "suite": "evidence_linkage",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "postgres": server,
+        },
+        "config": {**params, "queries": args.queries, "limit": args.limit, "seed": args.seed},
+        "setup": setup,
+        "variants": variants,
+    }
+    if "jsonb_scan" in variants and variants["linked"]["p50_ms"]:
+        report["speedup_p50"] = round(variants["jsonb_scan"]["p50_ms"] / variants["linked"]["p50_ms"], 1)
+    if args.baseline:
+        report["comparison"] = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+    payload = json.dumps(report, indent=2)
+    print(payload)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(payload + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
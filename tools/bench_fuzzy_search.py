@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark trigram fuzzy name search (ST-18) on a synthetic corpus.
+
+Builds a TrigramIndex over N generated corporate names, then times
+queries that are misspellings (one or two random edits) of names in the
+corpus and reports build time, p50/p99 latency and hit rate.
+
+Run (from repo root):
+
+    python tools/bench_fuzzy_search.py                 # 1M names
+    python tools/bench_fuzzy_search.py --names 100000 --queries 500
+    python tools/bench_fuzzy_search.py --out evidence/perf/ST-18.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.normalisation import normalise_name  # noqa: E402
+from app.search.trigram import TrigramIndex  # noqa: E402
+from search_corpus import misspell, percentile, synthetic_name  # noqa: E402
+
+
+def run(names: int, queries: int, limit: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    corpus = [synthetic_name(rng) for _ in range(names)]
+
+    t0 = time.perf_counter()
+    index = TrigramIndex.from_names(enumerate(corpus))
+    build_s = time.perf_counter() - t0
+
+    latencies_ms: List[float] = []
+    hits = 0
+    for _ in range(queries):
+        target = corpus[rng.randrange(names)]
+        query = misspell(rng, target, rng.choice((1, 1, 2)))
+        t0 = time.perf_counter()
+        results = index.search(query, limit=limit)
+        latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+        if normalise_name(target) in {index.names[n] for n, _ in results}:
+            hits += 1
+
+    return {
+        "story_id": "ST-18",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "corpus": {"names": names, "distinct_names": len(index), "trigrams": len(index.postings), "seed": seed},
+        "build_seconds": round(build_s, 3),
+        "queries": queries,
+        "limit": limit,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 3),
+            "p99": round(percentile(latencies_ms, 99), 3),
+            "mean": round(statistics.fmean(latencies_ms), 3),
+            "max": round(max(latencies_ms), 3),
+        },
+        "hit_rate": round(hits / queries, 4) if queries else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=18)
+    parser.add_argument("--out", type=Path, help="Write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    report = run(args.names, args.queries, args.limit, args.seed)
+    payload = json.dumps(report, indent=2)
+    print(payload)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(payload + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Search benchmark suite (FT-08 indexing, FT-09 fuzzy search, FT-16 search API).
+
+For each corpus size, generates synthetic clients (tools/search_corpus.py),
+builds the search index exactly as the service does (client_document ->
+SegmentedIndex, plus the type-ahead index), then measures per workload:
+
+  identifier  exact external id / tax id lookups (noisy formatting)
+  name        name queries, typo'd at --typo-rate, on the "auto" path
+              (BM25 first, trigram fallback when nothing matches)
+  fuzzy       misspelled names (1-2 edits) on the trigram path
+  address     street + city queries, BM25
+  suggest     3-6 character name prefixes on the type-ahead index
+
+and reports build time, p50/p95/p99 latency and recall@k. A hit counts as
+relevant if it is the generated record or, for name workloads, a client
+with the same normalised name. Every run with the same seed and options
+uses the same corpus and queries, so reports are comparable across commits;
+--baseline adds the change against an earlier report.
+
+--storage mapped builds segments one at a time into mmapped files (the
+production offline build), which is what makes 10M documents fit in memory.
+The type-ahead index is in memory only; drop the suggest workload at 10M.
+
+Run (from repo root):
+
+    python tools/bench_search.py                                  # 10k
+    python tools/bench_search.py --scales 10k,1m --queries 500
+    python tools/bench_search.py --scales 10m --storage mapped --workloads identifier,name,fuzzy,address
+    python tools/bench_search.py --baseline evidence/performance/ST-16.json --evidence
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.evidence_store import publish_json  # noqa: E402
+from app.normalisation import normalise_name  # noqa: E402
+from app.search.index import InvertedIndex, SearchDocument  # noqa: E402
+from app.search.segments import BULK_SEGMENT_SIZE, Segment, SegmentedIndex  # noqa: E402
+from app.search.storage import MappedIndex, write_segment  # noqa: E402
+from app.search.suggest import SuggestIndex, segment_weight  # noqa: E402
+from app.services.client_search_service import client_document  # noqa: E402
+from search_corpus import client, clients, misspell, percentile  # noqa: E402
+
+
+WORKLOADS = ("identifier", "name", "fuzzy", "address", "suggest")
+EVIDENCE_DIR = REPO_ROOT / "evidence" / "performance"
+STORIES = ("ST-16", "ST-18", "ST-19")  # build index, fuzzy queries, ranking
+
+# Ranked hits as (doc key, name)
+Hits = List[Tuple[str, Optional[str]]]
+
+
+def parse_scale(value: str) -> int:
+    value = value.strip().lower().replace("_", "")
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process; None where getrusage() is unavailable."""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ---------------------------
+# Build
+# ---------------------------
+def _documents(seed: int, count: int, noise_rate: float) -> Iterator[SearchDocument]:
+    for c in clients(seed, count, noise_rate):
+        yield client_document(c)
+
+
+def build_index(
+    seed: int, count: int, noise_rate: float, storage: str, segment_size: int, workers: int, workdir: Path
+) -> SegmentedIndex:
+    docs = _documents(seed, count, noise_rate)
+    if storage == "memory":
+        return SegmentedIndex.from_documents(
+            docs, segment_size=segment_size, workers=workers, background_merge=False
+        )
+
+    # One segment in memory at a time; the rest are mapped files
+    segments: List[Segment] = []
+    batch: List[SearchDocument] = []
+
+    def flush() -> None:
+        path = workdir / f"bench-{count}-{len(segments):04d}.seg"
+        write_segment(InvertedIndex.from_documents(batch), path)
+        segments.append(Segment(MappedIndex(path)))
+        batch.clear()
+
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= segment_size:
+            flush()
+    if batch:
+        flush()
+    return SegmentedIndex(segments, background_merge=False)
+
+
+def build_suggest(seed: int, count: int, noise_rate: float) -> SuggestIndex:
+    return SuggestIndex.build(
+        (c.id, c.full_name, c.external_id, segment_weight(c.segment)) for c in clients(seed, count, noise_rate)
+    )
+
+
+# ---------------------------
+# Workloads
+# ---------------------------
+def _auto(index: SegmentedIndex, query: str, k: int) -> Hits:
+    """ClientSearchService.search(fuzzy="auto") without the service's globals and hit shaping."""
+    total, ranked = index.rank(query, limit=k)
+    if total:
+        return [(doc.key, doc.name) for doc, _, _ in ranked]
+    return [(doc.key, doc.name) for doc, _ in index.fuzzy(query, limit=k)]
+
+
+def _bm25(index: SegmentedIndex, query: str, k: int) -> Hits:
+    return [(doc.key, doc.name) for doc, _, _ in index.rank(query, limit=k)[1]]
+
+
+def _fuzzy(index: SegmentedIndex, query: str, k: int) -> Hits:
+    return [(doc.key, doc.name) for doc, _ in index.fuzzy(query, limit=k)]
+
+
+def make_queries(
+    workload: str, rng: random.Random, seed: int, count: int, n: int, noise_rate: float, typo_rate: float
+) -> List[Tuple[str, str, Optional[str]]]:
+    """(query, target key, target normalised name or None when only the key is relevant)."""
+    out: List[Tuple[str, str, Optional[str]]] = []
+    for _ in range(n):
+        target = client(seed, rng.randint(1, count), noise_rate)
+        clean_name = client(seed, target.id).full_name
+        key = f"client:{target.id}"
+        if workload == "identifier":
+            ident = target.tax_id if rng.random() < 0.5 else target.external_id
+            query = ident.lower() if rng.random() < 0.5 else ident
+            out.append((query, key, None))
+        elif workload == "name":
+            query = misspell(rng, clean_name, 1) if rng.random() < typo_rate else clean_name
+            out.append((query, key, normalise_name(clean_name)))
+        elif workload == "fuzzy":
+            out.append((misspell(rng, clean_name, rng.choice((1, 1, 2))), key, normalise_name(clean_name)))
+        elif workload == "address":
+            street, rest = target.primary_address.split(", ", 1)
+            city = rest.rsplit(" ", 2)[0]
+            out.append((f"{street} {city}", key, None))
+        else:  # suggest
+            out.append((clean_name[: rng.randint(3, 6)], key, None))
+    return out
+
+
+def measure(
+    search: Callable[[str, int], Hits],
+    queries: Sequence[Tuple[str, str, Optional[str]]],
+    ks: Sequence[int],
+    recall: bool = True,
+) -> Dict[str, Any]:
+    depth = max(ks)
+    latencies_ms: List[float] = []
+    found = {k: 0 for k in ks}
+    for query, key, name in queries:
+        t0 = time.perf_counter()
+        hits = search(query, depth)
+        latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+        if not recall:
+            continue
+        for rank, (hit_key, hit_name) in enumerate(hits):
+            if hit_key == key or (name is not None and normalise_name(hit_name) == name):
+                for k in ks:
+                    if rank < k:
+                        found[k] += 1
+                break
+
+    result: Dict[str, Any] = {
+        "queries": len(queries),
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 3),
+            "p95": round(percentile(latencies_ms, 95), 3),
+            "p99": round(percentile(latencies_ms, 99), 3),
+            "mean": round(statistics.fmean(latencies_ms), 3),
+            "max": round(max(latencies_ms), 3),
+        },
+    }
+    if recall:
+        result["recall"] = {f"@{k}": round(found[k] / len(queries), 4) for k in ks}
+    return result
+
+
+def run_scale(count: int, args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    index = build_index(
+        args.seed, count, args.noise_rate, args.storage, args.segment_size, args.workers, workdir
+    )
+    build_s = time.perf_counter() - t0
+    build: Dict[str, Any] = {
+        "seconds": round(build_s, 3),
+        "docs_per_second": round(count / build_s) if build_s else None,
+        "segments": len(index.segments),
+    }
+
+    suggest: Optional[SuggestIndex] = None
+    if "suggest" in args.workloads:
+        t0 = time.perf_counter()
+        suggest = build_suggest(args.seed, count, args.noise_rate)
+        build["suggest_seconds"] = round(time.perf_counter() - t0, 3)
+        build["suggest_keys"] = len(suggest.keys)
+    build["peak_rss_mb"] = peak_rss_mb()
+
+    searches: Dict[str, Callable[[str, int], Hits]] = {
+        "identifier": lambda q, k: _bm25(index, q, k),
+        "name": lambda q, k: _auto(index, q, k),
+        "fuzzy": lambda q, k: _fuzzy(index, q, k),
+        "address": lambda q, k: _bm25(index, q, k),
+        "suggest": lambda q, k: [(f"client:{s['client_id']}", s["label"]) for s in suggest.suggest(q, limit=k)],  # type: ignore[union-attr]
+    }
+
+    workloads: Dict[str, Any] = {}
+    for workload in args.workloads:
+        rng = random.Random(f"{args.seed}:{workload}")
+        queries = make_queries(workload, rng, args.seed, count, args.queries, args.noise_rate, args.typo_rate)
+        # Prefixes match many clients by design; recall is not meaningful there
+        workloads[workload] = measure(searches[workload], queries, args.k, recall=workload != "suggest")
+
+    return {"documents": count, "build": build, "workloads": workloads}
+
+
+# ---------------------------
+# Report
+# ---------------------------
+def _change_pct(new: float, old: float) -> Optional[float]:
+    return round((new - old) / old * 100.0, 1) if old else None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Per scale and workload: latency change (%) and recall change (absolute) against `baseline`."""
+    before = {s["documents"]: s for s in baseline.get("scales", [])}
+    out: Dict[str, Any] = {"baseline_commit": baseline.get("git_commit"), "scales": {}}
+    for scale in report["scales"]:
+        old = before.get(scale["documents"])
+        if old is None:
+            continue
+        rows: Dict[str, Any] = {
+            "build_seconds_change_pct": _change_pct(scale["build"]["seconds"], old["build"]["seconds"])
+        }
+        for name, now in scale["workloads"].items():
+            was = old["workloads"].get(name)
+            if was is None:
+                continue
+            row = {
+                f"{p}_change_pct": _change_pct(now["latency_ms"][p], was["latency_ms"][p])
+                for p in ("p50", "p95", "p99")
+                if p in was["latency_ms"]
+            }
+            for at, value in now.get("recall", {}).items():
+                if at in was.get("recall", {}):
+                    row[f"recall{at}_change"] = round(value - was["recall"][at], 4)
+            rows[name] = row
+        out["scales"][str(scale["documents"])] = rows
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10k", help="Comma-separated corpus sizes, e.g. 10k,1m,10m")
+    parser.add_argument("--queries", type=int, default=1_000, help="Queries per workload")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--k", default="1,10", help="Comma-separated recall cut-offs")
+    parser.add_argument("--typo-rate", type=float, default=0.2, help="Share of name queries with a typo")
+    parser.add_argument("--noise-rate", type=float, default=0.1, help="Share of stored names with formatting noise")
+    parser.add_argument("--storage", choices=("memory", "mapped"), default="memory")
+    parser.add_argument("--segment-size", type=int, default=BULK_SEGMENT_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Build processes (memory storage)")
+    parser.add_argument("--seed", type=int, default=40)
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here as well as stdout")
+    parser.add_argument(
+        "--evidence", action="store_true",
+        help=f"Also write evidence/performance/<story>.json for {', '.join(STORIES)} (MissionLog)",
+    )
+    args = parser.parse_args()
+
+    args.workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = sorted(set(args.workloads) - set(WORKLOADS))
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+    args.k = sorted({int(k) for k in args.k.split(",")})
+    scales = [parse_scale(s) for s in args.scales.split(",") if s.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="scv-bench-") as tmp:
+        results = [run_scale(count, args, Path(tmp)) for count in scales]
+
+    report: Dict[str, Any] = {
+        "suite": "search",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "seed": args.seed,
+            "queries": args.queries,
+            "k": args.k,
+            "typo_rate": args.typo_rate,
+            "noise_rate": args.noise_rate,
+            "storage": args.storage,
+            "segment_size": args.segment_size,
+            "workers": args.workers,
+        },
+        "scales": results,
+    }
+    if args.baseline:
+        report["comparison"] = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+    payload = json.dumps(report, indent=2)
+    print(payload)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(payload + "\n", encoding="utf-8")
+    if args.evidence:
+        # One report for all three stories (the story id is the file name, and
+        # MissionLog publishing adds it to meta); files are only rewritten when it changes
+        for story_id in STORIES:
+            publish_json(report, EVIDENCE_DIR / f"{story_id}.json")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
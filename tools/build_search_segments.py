@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Build the client search index offline into mmapped segment files.
+
+Streams clients and CRM contacts from the database, builds segments
+(optionally in parallel processes), writes them with a manifest into the
+index directory and replaces the previous generation atomically. Workers
+started with SEARCH_INDEX_DIR pointing at that directory map the segments
+at startup instead of rebuilding, then index only rows written since the
+build (from the search_changes feed, at the watermark recorded in the
+manifest), and keep catching up every SEARCH_CATCH_UP_SECONDS. Feed
+entries older than CHANGES_RETENTION are pruned after each build. The
+previous generation's files are removed by a later build, once they have
+been unreferenced for --retain-seconds.
+
+Run (from repo root):
+
+    python tools/build_search_segments.py
+    python tools/build_search_segments.py --out /srv/scv/search_index --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.config import settings  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.search.segments import BULK_SEGMENT_SIZE, SegmentedIndex  # noqa: E402
+from app.search.storage import RETAIN_SECONDS, write_index_dir  # noqa: E402
+from app.services.client_search_service import CHANGES_RETENTION, current_watermarks, iter_documents  # noqa: E402
+
+_PRUNE_CHANGES_SQL = text("SELECT public.search_changes_prune(:keep)")
+
+
+DEFAULT_OUT = BACKEND_ROOT / "var" / "search_index"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=Path(settings.SEARCH_INDEX_DIR) if settings.SEARCH_INDEX_DIR else DEFAULT_OUT)
+    parser.add_argument("--segment-size", type=int, default=BULK_SEGMENT_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--retain-seconds", type=float, default=RETAIN_SECONDS,
+                        help="Keep replaced segment files this long for workers still opening them")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        built_at = datetime.now(timezone.utc)
+        watermarks = current_watermarks(db)
+        index = SegmentedIndex.from_documents(
+            iter_documents(db), segment_size=args.segment_size, workers=args.workers
+        )
+    finally:
+        db.close()
+
+    generation = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    manifest = write_index_dir(
+        args.out,
+        [seg.index for seg in index.segments],
+        meta={
+            "built_at": built_at.isoformat(),
+            "documents": len(index),
+            "watermarks": watermarks,
+        },
+        generation=generation,
+        retain_seconds=args.retain_seconds,
+    )
+
+    db = SessionLocal()
+    try:
+        pruned = db.execute(_PRUNE_CHANGES_SQL, {"keep": CHANGES_RETENTION}).scalar()
+        db.commit()
+    finally:
+        db.close()
+
+    print(json.dumps(
+        {**manifest, "changes_pruned": pruned, "out": str(args.out), "seconds": round(time.perf_counter() - started, 2)},
+        indent=2,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,6 +7,7 @@ Supports:
 - Security evidence
 - Quality (code quality) evidence
 - Guardrails evidence
+- Performance evidence (optional; only stories with benchmarks have it)
 
 Testing source (generated by tools/run_story_tests.py):
   evidence/test_results/<STORY_ID>.json
@@ -28,9 +29,17 @@ Guardrails source (generated by tools/run_story_guardrails.py):
 Guardrails destination (served to MissionLog UI):
   app_frontend/public/missionlog/evidence/<STORY_ID>/guardrails.json
 
+Performance source (generated by tools/bench_search.py --evidence):
+  evidence/performance/<STORY_ID>.json
+Performance destination (served to MissionLog UI):
+  app_frontend/public/missionlog/evidence/<STORY_ID>/performance.json
+
 MissionLog fetches:
   /missionlog/evidence/<story_id>/<dimension>.json
-Where dimensions include "testing", "security", "code_quality", "guardrails".
+Where dimensions include "testing", "security", "code_quality", "guardrails", "performance".
+
+A file whose payload has not changed since the last run is not rewritten
+(backend_v2/app/evidence_store.py publish()).
 """
 
 from __future__ import annotations
@@ -38,6 +47,7 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
@@ -61,6 +71,11 @@ def detect_repo_root() -> Path:
 
 
 REPO_ROOT = detect_repo_root()
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.evidence_store import content_hash, json_bytes, publish_json  # noqa: E402
 
 
 # -----------------------------
@@ -71,6 +86,7 @@ TEST_SOURCE_DIR = REPO_ROOT / "evidence" / "test_results"
 SECURITY_SOURCE_DIR = REPO_ROOT / "evidence" / "security"
 LINT_SOURCE_DIR = REPO_ROOT / "evidence" / "lint"
 GUARDRAILS_SOURCE_DIR = REPO_ROOT / "evidence" / "guardrails"
+PERFORMANCE_SOURCE_DIR = REPO_ROOT / "evidence" / "performance"
 
 MISSIONLOG_PUBLIC_DIR = REPO_ROOT / "app_frontend" / "public" / "missionlog"
 PUBLISH_ROOT = MISSIONLOG_PUBLIC_DIR / "evidence"  # /<story_id>/<dimension>.json
@@ -91,11 +107,6 @@ def read_json(path: Path) -> Dict[str, Any]:
         raise RuntimeError(f"Invalid JSON in {path}: {e}") from e
 
 
-def write_json(path: Path, payload: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-
-
 def _scrub_repo_paths(obj: Any) -> Any:
     """
     Demo-safe sanitisation: remove absolute local paths from evidence payloads.
@@ -136,6 +147,25 @@ def _wrap_published(story_id: str, dimension: str, src: Path, evidence: Dict[str
     }
 
 
+def _publish(dest: Path, story_id: str, dimension: str, src: Path, evidence: Dict[str, Any]) -> str:
+    """
+    Write dest (a plain file). meta.content_hash is the hash of the payload;
+    if dest already carries it, nothing is written and published_at_utc
+    stays as it was.
+    """
+    payload_hash = content_hash(json_bytes(evidence))
+    if dest.is_file():
+        try:
+            if read_json(dest).get("meta", {}).get("content_hash") == payload_hash:
+                return "Unchanged"
+        except RuntimeError:
+            pass
+    wrapped = _wrap_published(story_id, dimension, src, evidence)
+    wrapped["meta"]["content_hash"] = payload_hash
+    publish_json(wrapped, dest)
+    return "Published"
+
+
 # -----------------------------
 # Publish per-dimension
 # -----------------------------
@@ -147,8 +177,8 @@ def publish_testing_evidence_for_story(story_id: str) -> Tuple[bool, str]:
 
     evidence = _scrub_repo_paths(read_json(src))
     dest = PUBLISH_ROOT / story_id / "testing.json"
-    write_json(dest, _wrap_published(story_id, "testing", src, evidence))
-    return True, f"Published testing evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
+    verb = _publish(dest, story_id, "testing", src, evidence)
+    return True, f"{verb} testing evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
 
 
 def publish_security_evidence_for_story(story_id: str) -> Tuple[bool, str]:
@@ -158,8 +188,8 @@ def publish_security_evidence_for_story(story_id: str) -> Tuple[bool, str]:
 
     evidence = _scrub_repo_paths(read_json(src))
     dest = PUBLISH_ROOT / story_id / "security.json"
-    write_json(dest, _wrap_published(story_id, "security", src, evidence))
-    return True, f"Published security evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
+    verb = _publish(dest, story_id, "security", src, evidence)
+    return True, f"{verb} security evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
 
 
 def publish_code_quality_evidence_for_story(story_id: str) -> Tuple[bool, str]:
@@ -169,8 +199,8 @@ def publish_code_quality_evidence_for_story(story_id: str) -> Tuple[bool, str]:
 
     evidence = _scrub_repo_paths(read_json(src))
     dest = PUBLISH_ROOT / story_id / "code_quality.json"
-    write_json(dest, _wrap_published(story_id, "code_quality", src, evidence))
-    return True, f"Published code-quality evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
+    verb = _publish(dest, story_id, "code_quality", src, evidence)
+    return True, f"{verb} code-quality evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
 
 
 def publish_guardrails_evidence_for_story(story_id: str) -> Tuple[bool, str]:
@@ -184,8 +214,19 @@ def publish_guardrails_evidence_for_story(story_id: str) -> Tuple[bool, str]:
 
     evidence = _scrub_repo_paths(read_json(src))
     dest = PUBLISH_ROOT / story_id / "guardrails.json"
-    write_json(dest, _wrap_published(story_id, "guardrails", src, evidence))
-    return True, f"Published guardrails evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
+    verb = _publish(dest, story_id, "guardrails", src, evidence)
+    return True, f"{verb} guardrails evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
+
+
+def publish_performance_evidence_for_story(story_id: str) -> Tuple[bool, str]:
+    src = PERFORMANCE_SOURCE_DIR / f"{story_id}.json"
+    if not src.exists():
+        return False, f"No performance evidence: {src.relative_to(REPO_ROOT)}"
+
+    evidence = _scrub_repo_paths(read_json(src))
+    dest = PUBLISH_ROOT / story_id / "performance.json"
+    verb = _publish(dest, story_id, "performance", src, evidence)
+    return True, f"{verb} performance evidence: {src.relative_to(REPO_ROOT)} -> {dest.relative_to(REPO_ROOT)}"
 
 
 def discover_story_ids() -> List[str]:
@@ -206,6 +247,9 @@ def discover_story_ids() -> List[str]:
     if GUARDRAILS_SOURCE_DIR.exists():
         ids.update(p.stem for p in GUARDRAILS_SOURCE_DIR.glob("ST-*.json"))
 
+    if PERFORMANCE_SOURCE_DIR.exists():
+        ids.update(p.stem for p in PERFORMANCE_SOURCE_DIR.glob("ST-*.json"))
+
     return sorted(ids)
 
 
@@ -279,6 +323,14 @@ def main(argv: List[str] | None = None) -> int:
             warn_count += 1
             print(f"[WARN] {msg}")
 
+        # Performance (optional: not every story is benchmarked, so absence is not a warning)
+        ok, msg = publish_performance_evidence_for_story(sid)
+        if ok:
+            ok_count += 1
+            print(f">>> {msg}")
+        else:
+            print(f"[SKIP] {msg}")
+
     print(f"\nDone. Published artefacts: {ok_count}. Warnings: {warn_count}.")
     return 0 if warn_count == 0 else 2
 
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test for the backend_v2 read API.
+
+Runs a closed loop against a running server at increasing concurrency
+levels (--levels, default 1..256): each level keeps N requests in flight
+for --duration seconds, cycling through --paths with client ids drawn from
+--client-ids. Per level it reports throughput, p50/p95/p99 latency and
+errors, and the knee: the first level whose p99 exceeds --knee-factor times
+the p99 at concurrency 1, or whose throughput stops growing (< 10% gain
+over the previous level).
+
+Sync routes hit FastAPI's threadpool limit (40 threads) well before
+Postgres is saturated; the async read routes should move the knee to the
+database pool instead. Run it before and after a change and compare:
+
+    uvicorn app.main:app --port 8000          # from backend_v2/
+    python tools/load_test_api.py --out evidence/performance/api_load_before.json
+    # ... apply the change, restart the server ...
+    python tools/load_test_api.py --baseline evidence/performance/api_load_before.json
+
+Requires httpx.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_PATHS = [
+    "/clients/{client_id}/profile",
+    "/clients/{client_id}",
+    "/clients/{client_id}/accounts",
+    "/clients/{client_id}/match_decisions",
+]
+DEFAULT_LEVELS = "1,2,4,8,16,32,64,128,256"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def parse_ids(value: str) -> List[int]:
+    """"1-500" or "3,7,9"."""
+    if "-" in value:
+        lo, hi = value.split("-", 1)
+        return list(range(int(lo), int(hi) + 1))
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float,
+    paths: List[str],
+    client_ids: List[int],
+    seed: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed * 1_000 + n)
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths).format(client_id=rng.choice(client_ids))
+            started = time.perf_counter()
+            try:
+                resp = await client.get(path)
+                ok = resp.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def find_knee(levels: List[Dict[str, Any]], knee_factor: float) -> Optional[int]:
+    """First concurrency where p99 blows past the single-client p99 or throughput stops scaling."""
+    if not levels:
+        return None
+    base_p99 = levels[0]["p99_ms"] or 1e-9
+    for prev, cur in zip(levels, levels[1:]):
+        if cur["p99_ms"] > knee_factor * base_p99:
+            return cur["concurrency"]
+        if cur["throughput_rps"] < prev["throughput_rps"] * 1.1:
+            return cur["concurrency"]
+    return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Per concurrency level: throughput and p99 change (%) against `baseline`."""
+    before = {lvl["concurrency"]: lvl for lvl in baseline.get("levels", [])}
+
+    def pct(new: float, old: float) -> Optional[float]:
+        return round((new - old) / old * 100.0, 1) if old else None
+
+    out: Dict[str, Any] = {
+        "baseline_commit": baseline.get("git_commit"),
+        "knee_before": baseline.get("knee_concurrency"),
+        "knee_after": report.get("knee_concurrency"),
+        "levels": {},
+    }
+    for lvl in report["levels"]:
+        old = before.get(lvl["concurrency"])
+        if old:
+            out["levels"][str(lvl["concurrency"])] = {
+                "throughput_change_pct": pct(lvl["throughput_rps"], old["throughput_rps"]),
+                "p99_change_pct": pct(lvl["p99_ms"], old["p99_ms"]),
+            }
+    return out
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=max(args.levels), max_keepalive_connections=max(args.levels))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        # Warm-up: schema registry, pools, compiled cache
+        await run_level(client, 1, min(2.0, args.duration), args.paths, args.client_ids, args.seed)
+        results = []
+        for concurrency in args.levels:
+            result = await run_level(client, concurrency, args.duration, args.paths, args.client_ids, args.seed)
+            print(
+                f"c={concurrency:>4}  {result['throughput_rps']:>8.1f} rps  "
+                f"p50={result['p50_ms']:.1f}ms  p99={result['p99_ms']:.1f}ms  errors={result['errors']}",
+                flush=True,
+            )
+            results.append(result)
+        return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--paths", default=",".join(DEFAULT_PATHS), help="Comma-separated paths; {client_id} is filled in")
+    parser.add_argument("--client-ids", default="1-50", help='Client ids to request, "1-500" or "3,7,9"')
+    parser.add_argument("--knee-factor", type=float, default=3.0, help="p99 multiple of the c=1 p99 that marks the knee")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=43)
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    args.levels = sorted({int(c) for c in args.levels.split(",") if c.strip()})
+    args.paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    args.client_ids = parse_ids(args.client_ids)
+
+    levels = asyncio.run(run(args))
+    report: Dict[str, Any] = {
+        "suite": "api_load",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "base_url": args.base_url,
+            "duration_s": args.duration,
+            "paths": args.paths,
+            "client_ids": len(args.client_ids),
+            "knee_factor": args.knee_factor,
+            "seed": args.seed,
+        },
+        "levels": levels,
+        "knee_concurrency": find_knee(levels, args.knee_factor),
+    }
+    if args.baseline:
+        report["comparison"] = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+    payload = json.dumps(report, indent=2)
+    print(payload)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(payload + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
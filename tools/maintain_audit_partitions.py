@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Maintain the monthly audit_events partitions (migration 003).
+
+Creates the current month and the next AUDIT_PARTITIONS_AHEAD months, and
+detaches months older than AUDIT_RETENTION_MONTHS (detached partitions stay
+as plain tables until archived and dropped). The API creates upcoming
+partitions at startup and every AUDIT_PARTITION_CHECK_SECONDS; schedule
+this monthly so retention is applied too.
+
+Run (from repo root):
+
+    python tools/maintain_audit_partitions.py
+    python tools/maintain_audit_partitions.py --retention-months 36 --no-detach
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.config import settings  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.audit_partition_service import AuditPartitionService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=settings.AUDIT_PARTITIONS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=settings.AUDIT_RETENTION_MONTHS)
+    parser.add_argument("--no-detach", action="store_true", help="Only create upcoming partitions")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not AuditPartitionService.available(db):
+            print("audit_events is not partitioned; apply backend_v2/migrations/003_audit_events_partitioned.sql first", file=sys.stderr)
+            return 1
+        ensured = AuditPartitionService.ensure(db, args.months_ahead)
+        detached = [] if args.no_detach else AuditPartitionService.detach_expired(db, args.retention_months)
+        partitions = AuditPartitionService.partitions(db)
+    finally:
+        db.close()
+
+    print(json.dumps({"ensured": ensured, "detached": detached, "partitions": partitions}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
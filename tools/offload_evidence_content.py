@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Move evidence_artefacts content into the content-addressed evidence store
+(migration 005).
+
+Each artefact's content is written to the store once per distinct content
+(identical artefacts share one object) and the row keeps the reference:
+storage_ref, content_hash and content_size. Batches are committed keyed by
+artefact_id, so the job can be stopped and re-run at any point.
+
+The store then holds the only full copy of the content, so --store is
+required and must be outside the checkout (not the evidence/store default,
+which git clean would remove). Every object is verified before its row is
+trimmed. Point EVIDENCE_STORE_DIR at the same directory, on a volume every
+API worker mounts, or content served from the store will 404.
+
+Run (from repo root):
+
+    python tools/offload_evidence_content.py --store /srv/scv/evidence-store
+    python tools/offload_evidence_content.py --store /srv/scv/evidence-store --batch-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app import evidence_store, schema_registry  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.evidence_artefact_service import EvidenceArtefactService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", type=Path, required=True, help="Store root, outside the repository")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    if evidence_store.inside_checkout(args.store):
+        parser.error(f"--store {args.store} is inside the repository; use a directory outside it")
+    store = evidence_store.ContentStore(args.store)
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if "content_size" not in schema_registry.columns(db, "evidence_artefacts"):
+            print("evidence_artefacts.content_size does not exist; apply backend_v2/migrations/005_evidence_content_store.sql first", file=sys.stderr)
+            return 1
+        result = EvidenceArtefactService.offload_content(db, store, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(json.dumps({**result, "store": store.stats(), "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
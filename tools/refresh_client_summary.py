@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Refresh the client_summary materialization (migration 002) in full.
+
+The API keeps summary rows current for the clients it writes to; this job
+recomputes every row so changes made outside the API (match runs,
+regulatory enrichment loads, bulk SQL) are picked up. Schedule it after
+those loads, or nightly.
+
+Run (from repo root):
+
+    python tools/refresh_client_summary.py
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.db import SessionLocal  # noqa: E402
+from app.services.client_summary_service import ClientSummaryService  # noqa: E402
+
+
+def main() -> int:
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if not ClientSummaryService.available(db):
+            print("client_summary does not exist; apply backend_v2/migrations/002_client_summary.sql first", file=sys.stderr)
+            return 1
+        written = ClientSummaryService.refresh_all(db)
+    finally:
+        db.close()
+
+    print(json.dumps({"rows": written, "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Run the matching stage (FT-06) over source records without a decision.
+
+Scores each pending source_records_raw row against candidate clients with
+the compiled match ruleset (app/services/match_rule_engine.py), writes one
+match_decisions row per record under a new match_runs row, and prints the
+run's decision counts and per-rule statistics.
+
+Run (from repo root):
+
+    python tools/run_match.py
+    python tools/run_match.py --batch-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = REPO_ROOT / "backend_v2"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.db import SessionLocal  # noqa: E402
+from app.services.match_run_service import MatchRunService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = MatchRunService.run(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(json.dumps({**asdict(result), "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
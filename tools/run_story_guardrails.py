@@ -18,7 +18,6 @@ MVP implementation:
 from __future__ import annotations
 
 import dataclasses
-import json
 import re
 import sys
 from pathlib import Path
@@ -35,6 +34,8 @@ BACKEND_ROOT = REPO_ROOT / "backend_v2"
 sys.path.insert(0, str(BACKEND_ROOT))
 os.environ["PYTHONPATH"] = str(BACKEND_ROOT)
 
+from app.evidence_store import publish_json  # noqa: E402
+
 
 
 # ---------------------------------------------------------------------------
@@ -78,7 +79,8 @@ def write_guardrail_evidence(
     if guardrail_results is not None:
         payload["guardrail_results"] = guardrail_results
 
-    evidence_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # The file is only rewritten when it changes
+    publish_json(payload, evidence_path)
     print(
         f">>> Wrote guardrail evidence for {story_id} to "
         f"{evidence_path.relative_to(REPO_ROOT)}"
@@ -29,6 +29,8 @@ BACKEND_ROOT = REPO_ROOT / "backend_v2"
 sys.path.insert(0, str(BACKEND_ROOT))
 os.environ["PYTHONPATH"] = str(BACKEND_ROOT)
 
+from app.evidence_store import publish_json  # noqa: E402
+
 
 # ---------------------------------------------------------------------------
 # Repo root + sys.path
@@ -339,7 +341,8 @@ def write_security_evidence(
         "rule_family_results": rule_family_results,
     }
 
-    evidence_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # The file is only rewritten when it changes
+    publish_json(payload, evidence_path)
     print(
         f">>> Wrote security evidence for {story_id} to {evidence_path.relative_to(REPO_ROOT)}"
     )
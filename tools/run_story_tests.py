@@ -11,7 +11,6 @@ For each Story:
 
 from __future__ import annotations
 
-import json
 import os
 import re
 import subprocess
@@ -32,6 +31,8 @@ BACKEND_ROOT = REPO_ROOT / "backend_v2"
 sys.path.insert(0, str(BACKEND_ROOT))
 os.environ["PYTHONPATH"] = str(BACKEND_ROOT)
 
+from app.evidence_store import publish_json  # noqa: E402
+
 
 # Repo root = parent of /tools
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -282,7 +283,8 @@ def write_test_result_evidence(
         # mapping-driven scope additions only
         "scope": scope,
     }
-    evidence_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # The file is only rewritten when it changes
+    publish_json(payload, evidence_path)
     print(
         ">>> Wrote test evidence for "
         f"{story_id} to {evidence_path.relative_to(REPO_ROOT)}"
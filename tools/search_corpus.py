@@ -0,0 +1,140 @@
+"""
+Synthetic client corpora and shared helpers for the search benchmarks
+(tools/bench_search.py, tools/bench_fuzzy_search.py).
+
+Client n is generated from its own seeded RNG, so any record can be
+regenerated on demand: a 10M-document corpus is streamed into the index
+and queries are drawn from it without ever holding it in memory.
+
+noise_rate is the share of stored records with formatting noise (case,
+punctuation, legal-form variants, stray whitespace) as seen in source
+systems; misspell() applies the typing errors used for fuzzy queries.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Iterator, List
+
+
+SYLLABLES = [
+    "ac", "al", "an", "ar", "bel", "bri", "cor", "dan", "del", "east", "el", "fin",
+    "flex", "gar", "grey", "hal", "in", "kin", "lake", "lin", "mar", "mer", "nor",
+    "north", "on", "or", "pen", "ra", "ri", "ron", "sal", "ster", "tan", "tech",
+    "tra", "tron", "ul", "ven", "vin", "west", "wood", "zen",
+]
+SECTORS = [
+    "Holdings", "Partners", "Manufacturing", "Logistics", "Capital", "Energy",
+    "Systems", "Trading", "Foods", "Media", "Pharma", "Group",
+]
+SUFFIXES = ["Ltd", "Limited", "PLC", "LLC", "Inc", "GmbH", "SA", ""]
+SUFFIX_VARIANTS = {"Ltd": "Ltd.", "Limited": "Ltd", "PLC": "Plc", "LLC": "L.L.C.", "Inc": "Inc.", "GmbH": "GMBH", "SA": "S.A."}
+SEGMENTS = [
+    "Financial Institution", "Corporate Large Cap", "Asset Manager",
+    "Corporate Mid Cap", "Public Sector", "SME",
+]
+STREETS = [
+    "High", "Station", "Church", "Victoria", "Mill", "Park", "King", "Queen",
+    "Market", "Bridge", "Harbour", "Castle", "Chapel", "Meadow", "Orchard",
+]
+STREET_TYPES = ["Street", "Road", "Lane", "Avenue", "Way", "Place"]
+CITIES = [
+    ("London", "GB"), ("Manchester", "GB"), ("Edinburgh", "GB"), ("Dublin", "IE"),
+    ("Paris", "FR"), ("Lyon", "FR"), ("Frankfurt", "DE"), ("Berlin", "DE"),
+    ("Amsterdam", "NL"), ("Madrid", "ES"), ("Milan", "IT"), ("Zurich", "CH"),
+    ("New York", "US"), ("Chicago", "US"), ("Toronto", "CA"), ("Singapore", "SG"),
+]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+@dataclass(frozen=True)
+class SyntheticClient:
+    """Shaped like a `clients` row, so client_document() indexes it as in production."""
+
+    id: int
+    full_name: str
+    external_id: str
+    tax_id: str
+    email: str
+    primary_address: str
+    country: str
+    segment: str
+
+
+def synthetic_name(rng: random.Random) -> str:
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    parts = [word]
+    if rng.random() < 0.7:
+        parts.append(rng.choice(SECTORS))
+    suffix = rng.choice(SUFFIXES)
+    if suffix:
+        parts.append(suffix)
+    return " ".join(parts)
+
+
+def misspell(rng: random.Random, value: str, edits: int) -> str:
+    chars = list(value)
+    for _ in range(edits):
+        op = rng.choice(("sub", "del", "ins", "swap"))
+        i = rng.randrange(len(chars))
+        if op == "sub":
+            chars[i] = rng.choice(LETTERS)
+        elif op == "del" and len(chars) > 4:
+            del chars[i]
+        elif op == "ins":
+            chars.insert(i, rng.choice(LETTERS))
+        elif i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def add_noise(rng: random.Random, name: str) -> str:
+    """Source-system formatting noise that normalisation is expected to absorb."""
+    op = rng.choice(("case", "suffix", "punct", "space"))
+    if op == "case":
+        return name.upper() if rng.random() < 0.5 else name.lower()
+    if op == "suffix":
+        words = name.split()
+        words[-1] = SUFFIX_VARIANTS.get(words[-1], words[-1])
+        return " ".join(words)
+    if op == "punct":
+        return name.replace(" ", ", ", 1) if " " in name else name + "."
+    return "  " + name.replace(" ", "  ") + " "
+
+
+def client(seed: int, n: int, noise_rate: float = 0.0) -> SyntheticClient:
+    """Client number n (1-based) of the corpus for `seed`; the same inputs give the same record."""
+    rng = random.Random(seed * 1_000_003 + n)
+    name = synthetic_name(rng)
+    slug = "".join(ch for ch in name.split()[0].lower() if ch.isalpha())
+    city, country = rng.choice(CITIES)
+    address = (
+        f"{rng.randint(1, 250)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}, "
+        f"{city} {rng.choice(LETTERS).upper()}{rng.randint(1, 99)} {rng.randint(1, 9)}{rng.choice(LETTERS).upper()}"
+    )
+    tax_id = f"{country}{rng.randrange(10**9):09d}"
+    segment = rng.choice(SEGMENTS)
+    if rng.random() < noise_rate:
+        name = add_noise(rng, name)
+    return SyntheticClient(
+        id=n,
+        full_name=name,
+        external_id=f"CRM-{n:08d}",
+        tax_id=tax_id,
+        email=f"info@{slug}{n % 997}.example.com",
+        primary_address=address,
+        country=country,
+        segment=segment,
+    )
+
+
+def clients(seed: int, count: int, noise_rate: float = 0.0) -> Iterator[SyntheticClient]:
+    for n in range(1, count + 1):
+        yield client(seed, n, noise_rate)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[k]